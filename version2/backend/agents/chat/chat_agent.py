@@ -88,6 +88,7 @@ class ChatAgent(BaseAgent):
             query=context.query,
             df=df,
             dataset_id=context.dataset_id,
+            user_id=context.user_id,
         )
         row_count = result.get("row_count", 0)
         return result, f"Executed SQL query, returned {row_count} rows"
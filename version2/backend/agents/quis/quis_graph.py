@@ -26,8 +26,10 @@ This replaces the linear `run_analysis()` in enhanced_quis.py with a
 self-correcting loop that can retry on errors and filter boring insights.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
-from pathlib import Path
 from typing import Dict, Any, Literal, Optional, List, Tuple
 from datetime import datetime, timezone
 import polars as pl
@@ -274,24 +276,19 @@ async def _load_dataset_cached(
 ) -> Optional[pl.DataFrame]:
     """Load dataset from MongoDB with tenant-scoped caching.
 
-    Uses CacheService (Redis + in-memory LRU) instead of the old in-memory
-    FIFO dict to support multi-worker deployments.
+    The sampled frame is kept in the process-wide frame cache
+    (``services/cache/frame_cache.py``) as a memory-mapped Arrow file,
+    shared by every worker and keyed by the version of the file it was
+    read from, so a mutated dataset is never served stale.
 
     Returns sampled DataFrame if > 100K rows, with deterministic seed per user.
     """
     tid = tenant_id or user_id or "default"
 
-    # Use CacheService for tenant-scoped caching (Redis + in-memory LRU fallback)
-    from services.cache.cache_service import CacheService
-
-    cache = CacheService()
-    cache_key = f"quis:df:{tid}:{dataset_id}"
-    cached = await cache.get_dataframe(cache_key)
-    if cached is not None:
-        logger.debug("[CACHE] Hit for tenant %s dataset %s", tid, dataset_id)
-        return cached
-
+    from services.cache.frame_cache import frame_cache
+    from services.datasets.dataset_handle import open_dataset
     from services.datasets.enhanced_dataset_service import enhanced_dataset_service
+    from services.datasets.sampling import reservoir_sample
 
     # Strictly workspace-scoped raw read (handles str/ObjectId _id + tenant pin).
     # When tenant_id is None, the helper resolves the user's personal workspace.
@@ -301,32 +298,41 @@ async def _load_dataset_cached(
     if not dataset:
         return None
 
-    parquet_path = dataset.get("parquet_path")
-    data_path = (
-        parquet_path if parquet_path and Path(parquet_path).exists() else dataset.get("file_path")
-    )
-    if not data_path:
-        return None
-
+    loop = asyncio.get_running_loop()
     try:
-        df = pl.read_parquet(data_path)
-    except Exception:
-        try:
-            df = pl.read_csv(data_path)
-        except Exception as e:
-            logger.error(f"Failed to load dataset {dataset_id}: {e}")
-            return None
+        handle = await loop.run_in_executor(None, open_dataset, dataset_id, dataset)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Failed to open dataset {dataset_id}: {e}")
+        return None
 
-    row_count = len(df)
-    if row_count > QUIS_MAX_ROWS:
-        # Use user_id as seed so each user gets a different representative sample
-        import hashlib
+    variant = f"quis:{tid}"
+    cached = frame_cache.get(dataset_id, handle.path, variant=variant)
+    if cached is not None:
+        logger.debug("[CACHE] Hit for tenant %s dataset %s", tid, dataset_id)
+        return cached
 
-        seed = int(hashlib.sha256(tid.encode()).hexdigest()[:8], 16)
-        df = df.sample(n=QUIS_MAX_ROWS, seed=seed)
-        logger.info(f"[SAMPLE] Sampled {QUIS_MAX_ROWS:,} from {row_count:,} rows (seed={seed})")
+    # Use the tenant as seed so each tenant gets its own representative
+    # sample. Large datasets are sampled while streaming the scan, so the
+    # full table is never materialised.
+    seed = int(hashlib.sha256(tid.encode()).hexdigest()[:8], 16)
+    row_count = handle.num_rows
+    try:
+        if row_count > QUIS_MAX_ROWS:
+            df = await loop.run_in_executor(
+                None, reservoir_sample, handle.scan(), QUIS_MAX_ROWS, seed, row_count
+            )
+            logger.info(f"[SAMPLE] Sampled {QUIS_MAX_ROWS:,} from {row_count:,} rows (seed={seed})")
+        else:
+            df = await loop.run_in_executor(None, handle.collect)
+    except Exception as e:
+        logger.error(f"Failed to load dataset {dataset_id}: {e}")
+        return None
 
-    await cache.set_dataframe(cache_key, df)
+    await loop.run_in_executor(
+        None, functools.partial(frame_cache.put, dataset_id, handle.path, df, variant=variant)
+    )
     return df
 
 
@@ -1803,7 +1809,6 @@ async def run_quis_analysis(
     Raises:
         HTTPException: If dataset not found or still processing
     """
-    import polars as pl
     import json
     from fastapi import HTTPException
     from db.database import get_database
@@ -1826,24 +1831,21 @@ async def run_quis_analysis(
     if not file_path:
         raise HTTPException(status_code=409, detail="Dataset is still processing")
 
-    # Use parquet_path if available, fall back to file_path
-    parquet_path = dataset.get("parquet_path")
-    data_path = parquet_path if parquet_path and Path(parquet_path).exists() else file_path
+    # Build lightweight schema summary from the dataset handle (footer
+    # metadata, cached per file version; only 5 rows are read)
+    from services.datasets.dataset_handle import open_dataset
 
-    # Build lightweight schema summary using lazy loading
     try:
-        lf = pl.scan_parquet(data_path)
-        schema = {col: str(dtype) for col, dtype in lf.schema.items()}
+        handle = open_dataset(dataset_id, dataset)
+        schema = {col: str(dtype) for col, dtype in handle.schema.items()}
 
         # Get sample rows (limit to 5 for context)
-        sample_df = lf.limit(5).collect()
+        sample_df = handle.collect(limit=5)
         sample_rows = sample_df.to_pandas().to_string()
 
-        # Get row count from metadata or estimate
+        # Get row count from metadata or the handle
         metadata = dataset.get("metadata", {})
-        row_count = metadata.get("dataset_overview", {}).get("total_rows", 0)
-        if not row_count:
-            row_count = lf.select(pl.count()).collect().item()
+        row_count = metadata.get("dataset_overview", {}).get("total_rows", 0) or handle.num_rows
 
         column_count = len(schema)
 
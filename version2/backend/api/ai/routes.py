@@ -2,7 +2,6 @@
 AI API routes - provides endpoints for AI-generated dashboard configs and design endpoints.
 """
 
-import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Optional, List
@@ -205,11 +204,14 @@ async def retry_chart(
 
     Request body:
     - component: The dashboard component object with config (chart_type, columns, ...)
+    - trace_encoding: "json" | "bdata" (default "json"; see services/charts/trace_encoding.py)
 
     Returns rendered chart_data (traces + layout) and the resolved config.
     """
     from db.database import get_database
+    from services.cache.chart_render_cache import chart_render_cache
     from services.charts.chart_render_service import chart_render_service
+    from services.charts.trace_encoding import encode_payload, resolve_trace_encoding
     from services.datasets.enhanced_dataset_service import enhanced_dataset_service
 
     db = get_database()
@@ -219,6 +221,10 @@ async def retry_chart(
 
     if not component:
         raise HTTPException(status_code=400, detail="component is required")
+    try:
+        encoding = resolve_trace_encoding(body.get("trace_encoding"))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
     # Extract + validate chart config from component
     chart_config = _resolve_chart_config(component)
@@ -228,37 +234,50 @@ async def retry_chart(
         )
 
     try:
-        df = await enhanced_dataset_service.load_dataset_data(
-            dataset_id,
-            current_user["id"],
-            max_rows=body.get("max_rows", 10000),
+        max_rows = body.get("max_rows", 10000)
+        theme = body.get("theme", "dark")
+        dataset = await enhanced_dataset_service.get_dataset(dataset_id, current_user["id"])
+        render_key = chart_render_cache.key(
+            chart_config, theme, dataset,
+            scope={"max_rows": max_rows, "filters": body.get("filters")},
         )
+        chart_payload = await chart_render_cache.get(render_key)
+        if chart_payload is None:
+            df = await enhanced_dataset_service.load_dataset_data(
+                dataset_id,
+                current_user["id"],
+                max_rows=max_rows,
+            )
 
-        if df is None or df.is_empty():
-            raise HTTPException(status_code=400, detail="Dataset is empty or not found")
+            if df is None or df.is_empty():
+                raise HTTPException(status_code=400, detail="Dataset is empty or not found")
 
-        # Cross-filter: apply {field, value} filters before rendering so the
-        # chart re-aggregates over only the filtered rows (Power BI-style).
-        from core.chart_filter import apply_df_filters
+            # Cross-filter: apply {field, value} filters before rendering so the
+            # chart re-aggregates over only the filtered rows (Power BI-style).
+            from core.chart_filter import apply_df_filters
 
-        df = apply_df_filters(df, body.get("filters"))
-        if df.is_empty():
-            chart_data = {
-                "data": [],
-                "layout": {},
-                "metadata": {"empty_filtered": True, "filtered_out": True},
-            }
-            return {
-                "success": True,
-                "chart_data": chart_data,
-                "updated_config": chart_config,
-            }
+            df = apply_df_filters(df, body.get("filters"))
+            if df.is_empty():
+                chart_data = {
+                    "data": [],
+                    "layout": {},
+                    "metadata": {"empty_filtered": True, "filtered_out": True},
+                }
+                return {
+                    "success": True,
+                    "chart_data": chart_data,
+                    "updated_config": chart_config,
+                }
 
-        chart_payload = await chart_render_service.render_chart(
-            df,
-            chart_config,
-            theme=body.get("theme", "dark"),
-        )
+            chart_payload = await chart_render_service.render_chart(
+                df,
+                chart_config,
+                theme=theme,
+                # Cross-filtered frames must re-aggregate; only unfiltered
+                # charts may be served from the rollup cube.
+                dataset_id=None if body.get("filters") else dataset_id,
+            )
+            await chart_render_cache.set(render_key, chart_payload)
 
         chart_data = {
             "data": chart_payload.get("data") or chart_payload.get("traces", []),
@@ -301,9 +320,10 @@ async def retry_chart(
                     {"$set": {"blueprint": blueprint, "updated_at": datetime.now(timezone.utc).replace(tzinfo=None)}},
                 )
 
+        # The blueprint keeps plain JSON; only the response is encoded
         return {
             "success": True,
-            "chart_data": chart_data,
+            "chart_data": encode_payload(chart_data, encoding),
             "updated_config": chart_config,
         }
     except HTTPException:
@@ -326,14 +346,15 @@ async def hydrate_charts(
 
     Replaces the N-per-chart `retry-chart` calls the dashboard used to fire
     (Tradeoff #1 from CHART_PRODUCTION_READINESS.md). Loads the dataset ONCE,
-    renders all charts in parallel server-side, persists successes into the
-    default dashboard blueprint in a single write, and returns per-component
-    results.
+    renders all charts server-side in one shared aggregation pass, persists
+    successes into the default dashboard blueprint in a single write, and
+    returns per-component results.
 
     Request body:
     - components: list of dashboard chart component dicts (each with config)
     - theme: "light" | "dark" (default "dark")
     - max_rows: optional row cap (default 10000)
+    - trace_encoding: "json" | "bdata" (default "json"; see services/charts/trace_encoding.py)
 
     Returns:
     {
@@ -353,7 +374,9 @@ async def hydrate_charts(
     }
     """
     from db.database import get_database
+    from services.cache.chart_render_cache import chart_render_cache
     from services.charts.chart_render_service import chart_render_service
+    from services.charts.trace_encoding import encode_payload, resolve_trace_encoding
     from services.datasets.enhanced_dataset_service import enhanced_dataset_service
 
     db = get_database()
@@ -362,6 +385,10 @@ async def hydrate_charts(
     components = body.get("components") or []
     if not isinstance(components, list) or not components:
         return {"hydrated": 0, "total": 0, "results": []}
+    try:
+        encoding = resolve_trace_encoding(body.get("trace_encoding"))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
     # Resolve renderable chart configs (skip non-chart / invalid components).
     targets = []  # (index_in_request, component, chart_config)
@@ -373,92 +400,118 @@ async def hydrate_charts(
     if not targets:
         return {"hydrated": 0, "total": 0, "results": []}
 
+    max_rows = body.get("max_rows", 10000)
+    theme = body.get("theme", "dark")
+    filters = body.get("filters")
+
     try:
-        df = await enhanced_dataset_service.load_dataset_data(
-            dataset_id,
-            current_user["id"],
-            max_rows=body.get("max_rows", 10000),
-        )
-        if df is None or df.is_empty():
-            raise HTTPException(status_code=400, detail="Dataset is empty or not found")
+        dataset = await enhanced_dataset_service.get_dataset(dataset_id, current_user["id"])
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to load dataset: {str(exc)}")
 
-    # Cross-filter: apply the shared filter context to the loaded frame ONCE
-    # so every hydrated chart re-aggregates over the same filtered rows.
-    filters = body.get("filters")
-    if filters:
-        from core.chart_filter import apply_df_filters
+    # ── Render cache: charts already rendered for this dataset version,
+    # theme and filter context (by any user) skip the load and hydration ──
+    render_keys = [
+        chart_render_cache.key(
+            cfg, theme, dataset, scope={"max_rows": max_rows, "filters": filters}
+        )
+        for _, _, cfg in targets
+    ]
+    payloads = await chart_render_cache.get_many(render_keys)
+    missing = [i for i, chart_payload in enumerate(payloads) if chart_payload is None]
+
+    if missing:
+        try:
+            df = await enhanced_dataset_service.load_dataset_data(
+                dataset_id,
+                current_user["id"],
+                max_rows=max_rows,
+            )
+            if df is None or df.is_empty():
+                raise HTTPException(status_code=400, detail="Dataset is empty or not found")
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Failed to load dataset: {str(exc)}")
+
+        # Cross-filter: apply the shared filter context to the loaded frame ONCE
+        # so every hydrated chart re-aggregates over the same filtered rows.
+        if filters:
+            from core.chart_filter import apply_df_filters
 
-        df = apply_df_filters(df, filters)
+            df = apply_df_filters(df, filters)
+
+        # Filter excluded every row → every chart renders the honest empty state.
+        if df.is_empty():
+            empty_results = []
+            for idx, comp, chart_config in targets:
+                empty_results.append(
+                    {
+                        "index": idx,
+                        "id": comp.get("id"),
+                        "title": comp.get("title"),
+                        "success": True,
+                        "chart_data": {
+                            "data": [],
+                            "layout": {},
+                            "metadata": {"empty_filtered": True, "filtered_out": True},
+                        },
+                        "updated_config": chart_config,
+                        "error": None,
+                    }
+                )
+            return {
+                "hydrated": len(empty_results),
+                "total": len(targets),
+                "results": empty_results,
+            }
 
-    # Filter excluded every row → every chart renders the honest empty state.
-    if df.is_empty():
-        empty_results = []
-        for idx, comp, chart_config in targets:
-            empty_results.append(
+        # ── Server-side rendering (one dataset load, one shared aggregation
+        # pass, every uncached chart hydrated in a worker thread) ──
+        rendered = await chart_render_service.render_dashboard(
+            df,
+            [targets[i][2] for i in missing],
+            theme=theme,
+            dataset_id=None if filters else dataset_id,
+        )
+        for i, chart_payload in zip(missing, rendered):
+            payloads[i] = chart_payload
+            if not isinstance(chart_payload, Exception):
+                await chart_render_cache.set(render_keys[i], chart_payload)
+
+    results = []
+    for (idx, comp, chart_config), chart_payload in zip(targets, payloads):
+        if isinstance(chart_payload, Exception):
+            logger.warning(f"[hydrate-charts] component {idx} failed: {chart_payload}")
+            results.append(
                 {
                     "index": idx,
                     "id": comp.get("id"),
                     "title": comp.get("title"),
-                    "success": True,
-                    "chart_data": {
-                        "data": [],
-                        "layout": {},
-                        "metadata": {"empty_filtered": True, "filtered_out": True},
-                    },
-                    "updated_config": chart_config,
-                    "error": None,
+                    "success": False,
+                    "chart_data": None,
+                    "updated_config": None,
+                    "error": str(chart_payload)[:300],
                 }
             )
-        return {
-            "hydrated": len(empty_results),
-            "total": len(targets),
-            "results": empty_results,
-        }
-
-    theme = body.get("theme", "dark")
-
-    async def _render_one(idx: int, comp: dict, chart_config: dict):
-        """Render one chart; never raises — failures become error results."""
-        try:
-            chart_payload = await chart_render_service.render_chart(
-                df,
-                chart_config,
-                theme=theme,
-            )
-            chart_data = {
-                "data": chart_payload.get("data") or chart_payload.get("traces", []),
-                "layout": chart_payload.get("layout", {}),
-                "metadata": chart_payload.get("metadata", {}),
-            }
-            return {
+            continue
+        results.append(
+            {
                 "index": idx,
                 "id": comp.get("id"),
                 "title": comp.get("title"),
                 "success": True,
-                "chart_data": chart_data,
+                "chart_data": {
+                    "data": chart_payload.get("data") or chart_payload.get("traces", []),
+                    "layout": chart_payload.get("layout", {}),
+                    "metadata": chart_payload.get("metadata", {}),
+                },
                 "updated_config": chart_config,
                 "error": None,
             }
-        except Exception as exc:  # noqa: BLE001
-            logger.warning(f"[hydrate-charts] component {idx} failed: {exc}")
-            return {
-                "index": idx,
-                "id": comp.get("id"),
-                "title": comp.get("title"),
-                "success": False,
-                "chart_data": None,
-                "updated_config": None,
-                "error": str(exc)[:300],
-            }
-
-    # ── Parallel server-side rendering (one dataset load, many charts) ──
-    results = await asyncio.gather(
-        *(_render_one(idx, comp, cfg) for idx, comp, cfg in targets)
-    )
+        )
 
     # ── Persist successful renders into the default blueprint (single write) ──
     # Cross-filter results (filters active) are NEVER persisted — they are
@@ -514,6 +567,12 @@ async def hydrate_charts(
     except Exception as exc:  # noqa: BLE001
         logger.warning(f"[hydrate-charts] blueprint persistence skipped: {exc}")
 
+    # The blueprint keeps plain JSON; only the response is encoded
+    if encoding != "json":
+        for r in results:
+            if r.get("chart_data"):
+                r["chart_data"] = encode_payload(r["chart_data"], encoding)
+
     return {
         "hydrated": sum(1 for r in results if r.get("success")),
         "total": len(targets),
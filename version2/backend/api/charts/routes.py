@@ -18,7 +18,9 @@ from core.rate_limiter import limiter, RateLimits
 from db.database import get_database
 from db.schemas_charts import ChartRenderRequest, ChartResponse
 from services.auth_service import get_current_user
+from services.cache.chart_render_cache import chart_render_cache
 from services.charts.chart_render_service import chart_render_service
+from services.charts.trace_encoding import encode_payload, resolve_trace_encoding
 from services.datasets.enhanced_dataset_service import enhanced_dataset_service
 
 logger = logging.getLogger(__name__)
@@ -37,8 +39,15 @@ async def render_chart(
     Render a chart from dataset data with full configuration.
 
     Accepts chart type, column fields, aggregation, filters, date ranges,
-    and grouping. Returns Plotly-compatible traces and layout.
+    and grouping. Returns Plotly-compatible traces and layout; with
+    ``trace_encoding: "bdata"`` long numeric trace arrays come back as typed
+    base64 buffers (see ``services/charts/trace_encoding.py``).
     """
+    try:
+        encoding = resolve_trace_encoding(body.trace_encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         user_id = current_user["id"]
         dataset_id = body.dataset_id
@@ -54,13 +63,6 @@ async def render_chart(
                 detail="Dataset still processing — try again shortly",
             )
 
-        # Load data
-        df = await enhanced_dataset_service.load_dataset_data(
-            dataset_id, user_id, max_rows=body.limit
-        )
-        if df is None or df.is_empty():
-            raise HTTPException(status_code=422, detail="Dataset is empty")
-
         # Build config for render service
         config: Dict[str, Any] = {
             "chart_type": body.chart_type,
@@ -81,8 +83,27 @@ async def render_chart(
         if body.granularity:
             config["granularity"] = body.granularity
 
-        # Render
-        chart_payload = await chart_render_service.render_chart(df, config)
+        # A render of this config over this version of the dataset may
+        # already be cached — then neither the frame load nor hydration runs
+        render_key = chart_render_cache.key(config, "light", dataset, scope={"limit": body.limit})
+        chart_payload = await chart_render_cache.get(render_key)
+        if chart_payload is None:
+            # Load only the chart's columns (projection pushdown — a 2-column
+            # chart over an 80-column table decodes 2 columns)
+            df = await enhanced_dataset_service.load_dataset_data(
+                dataset_id,
+                user_id,
+                max_rows=body.limit,
+                columns=list(dict.fromkeys(body.fields + (body.group_by or []))),
+            )
+            if df is None or df.is_empty():
+                raise HTTPException(status_code=422, detail="Dataset is empty")
+
+            # Render (unfiltered charts may be served from the rollup cube)
+            chart_payload = await chart_render_service.render_chart(
+                df, config, dataset_id=dataset_id
+            )
+            await chart_render_cache.set(render_key, chart_payload)
 
         # Build response
         traces = chart_payload.get("traces", [])
@@ -99,14 +120,17 @@ async def render_chart(
                 f"Based on {point_intel.get('total_records', 0):,} records."
             )
 
-        return {
-            "traces": traces,
-            "layout": layout,
-            "explanation": explanation or "",
-            "fields": body.fields,
-            "chart_type": body.chart_type,
-            "metadata": metadata,
-        }
+        return encode_payload(
+            {
+                "traces": traces,
+                "layout": layout,
+                "explanation": explanation or "",
+                "fields": body.fields,
+                "chart_type": body.chart_type,
+                "metadata": metadata,
+            },
+            encoding,
+        )
 
     except HTTPException:
         raise
@@ -125,7 +149,13 @@ async def render_chart_preview(
     """
     Quick chart preview — accepts a chart_config with embedded data or a
     dataset_id + config, and returns Plotly traces without AI insights.
+    Accepts ``trace_encoding`` like ``/render``.
     """
+    try:
+        encoding = resolve_trace_encoding(body.get("trace_encoding"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         user_id = current_user["id"]
         dataset_id = body.get("dataset_id") or body.get("chart_config", {}).get("dataset_id")
@@ -138,14 +168,6 @@ async def render_chart_preview(
         if not dataset:
             raise HTTPException(status_code=404, detail="Dataset not found")
 
-        # Load data (preview limit)
-        limit = body.get("limit", 200)
-        df = await enhanced_dataset_service.load_dataset_data(
-            dataset_id, user_id, max_rows=limit
-        )
-        if df is None or df.is_empty():
-            raise HTTPException(status_code=422, detail="Dataset is empty")
-
         # Build config from body
         chart_config = body.get("chart_config", body)
         config = {
@@ -155,13 +177,33 @@ async def render_chart_preview(
             "title": chart_config.get("title", "Preview"),
         }
 
-        chart_payload = await chart_render_service.render_chart(df, config)
-
-        return {
-            "traces": chart_payload.get("traces", []),
-            "layout": chart_payload.get("layout", {}),
-            "fields": config["columns"],
-        }
+        limit = body.get("limit", 200)
+        render_key = chart_render_cache.key(
+            config, "light", dataset, scope={"limit": limit, "preview": True}
+        )
+        chart_payload = await chart_render_cache.get(render_key)
+        if chart_payload is None:
+            # Load data (preview limit, chart columns only)
+            df = await enhanced_dataset_service.load_dataset_data(
+                dataset_id,
+                user_id,
+                max_rows=limit,
+                columns=[c for c in config["columns"] if isinstance(c, str)],
+            )
+            if df is None or df.is_empty():
+                raise HTTPException(status_code=422, detail="Dataset is empty")
+
+            chart_payload = await chart_render_service.render_chart(df, config)
+            await chart_render_cache.set(render_key, chart_payload)
+
+        return encode_payload(
+            {
+                "traces": chart_payload.get("traces", []),
+                "layout": chart_payload.get("layout", {}),
+                "fields": config["columns"],
+            },
+            encoding,
+        )
 
     except HTTPException:
         raise
@@ -157,26 +157,24 @@ async def _download_google_sheet(
 async def _save_google_sheet_content(
     content: bytes,
     sheet_id: str,
-    user_id: str,
-) -> tuple[str, dict]:
+    content_hash: str,
+) -> dict:
     """
-    Save downloaded Google Sheet CSV content to permanent storage.
+    Save downloaded Google Sheet CSV content to the content-addressed store.
 
-    Returns ``(file_metadata_dict, content_hash)``.
+    Returns the file metadata dict. The caller must hold a reference on
+    ``content_hash`` (``content_store.acquire``).
     """
-    content_hash = _hashlib.sha256(content).hexdigest()
-
     temp_fd, temp_path = _tempfile.mkstemp(suffix=".csv")
     try:
         with _os.fdopen(temp_fd, "wb") as f:
             f.write(content)
 
-        file_metadata = await file_storage_service.save_file_from_path(
+        return await file_storage_service.save_file_to_content_store(
             temp_path,
             f"google-sheet-{sheet_id}.csv",
-            user_id,
+            content_hash,
         )
-        return file_metadata, content_hash
     except HTTPException:
         raise
     except Exception as e:
@@ -277,12 +275,8 @@ async def import_google_sheet(
         tier=gsheet_tier,
     )
 
-    # 2. Save to permanent storage + compute content hash
-    file_metadata, content_hash = await _save_google_sheet_content(
-        content, sheet_id, current_user["id"]
-    )
-
-    # 3. Duplicate detection (workspace-scoped read)
+    # 2. Duplicate detection (workspace-scoped read)
+    content_hash = _hashlib.sha256(content).hexdigest()
     db = get_database()
     from db.tenant_guard import tenant_scope_query
 
@@ -300,8 +294,6 @@ async def import_google_sheet(
             f"Duplicate Google Sheet detected for user {current_user['id']}: "
             f"existing dataset {existing['_id']}"
         )
-        # Clean up the file we just saved (it's a duplicate)
-        await file_storage_service.delete_file(file_metadata["file_path"])
         return {
             "success": True,
             "is_duplicate": True,
@@ -309,8 +301,18 @@ async def import_google_sheet(
             "message": "This Google Sheet has already been imported.",
         }
 
-    # 4. Create dataset and fire pipeline
+    # 3. Save to the content store (shared with identical imports elsewhere)
+    from services.datasets.content_store import content_store
+
     dataset_id = str(uuid.uuid4())
+    await content_store.acquire(content_hash, dataset_id)
+    try:
+        file_metadata = await _save_google_sheet_content(content, sheet_id, content_hash)
+    except Exception:
+        await content_store.release(content_hash, dataset_id)
+        raise
+
+    # 4. Create dataset and fire pipeline
     await _create_gsheet_dataset_doc(
         dataset_id=dataset_id,
         user_id=current_user["id"],
@@ -397,24 +399,74 @@ async def reimport_google_sheet(
         tier=gsheet_tier,
     )
 
-    # 2. Save to permanent storage (replaces old file)
-    file_metadata, content_hash = await _save_google_sheet_content(
-        content, sheet_id, current_user["id"]
-    )
+    # 2. Nothing changed since the last import: keep the processed dataset.
+    content_hash = _hashlib.sha256(content).hexdigest()
+    if content_hash == doc.get("content_hash") and doc.get("processing_status") == "completed":
+        logger.info(f"Google Sheet {sheet_id} unchanged for dataset {dataset_id}")
+        return {
+            "success": True,
+            "dataset_id": dataset_id,
+            "unchanged": True,
+            "message": "Google Sheet is unchanged. The dataset is up to date.",
+        }
+
+    # 3. Save to the content store and repoint the dataset record
+    #    (workspace-pinned write), then drop the reference to the old data.
+    from services.datasets.content_store import content_store
+
+    await content_store.acquire(content_hash, dataset_id)
+    try:
+        file_metadata = await _save_google_sheet_content(content, sheet_id, content_hash)
+    except Exception:
+        await content_store.release(content_hash, dataset_id)
+        raise
 
-    # 3. Update existing dataset record (workspace-pinned write)
     updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
     from db.tenant_guard import tenant_scope_query
+    from services.pipeline.incremental import try_append_refresh
 
+    db = get_database()
     wid = current_user.get("workspace_id", current_user["id"])
+    source_fields = {
+        "file_id": file_metadata["file_id"],
+        "file_path": file_metadata["file_path"],
+        "file_size": file_metadata["file_size"],
+        "content_hash": content_hash,
+        "updated_at": updated_at,
+        "sheet_url": sheet_url,
+        "sheet_id": sheet_id,
+    }
+
+    # 3a. Rows only appended to the sheet: merge them into the dataset
+    #     (no re-profiling, LLM calls or re-indexing), then repoint it.
+    appended = await try_append_refresh(
+        dataset_id, file_metadata["file_path"], current_user["id"], workspace_id=wid
+    )
+    if appended is not None:
+        await db.uploads.update_one(
+            tenant_scope_query("uploads", {"_id": dataset_id}, wid, current_user["id"]),
+            {"$set": source_fields},
+        )
+        old_hash = content_store.content_hash_of(doc.get("file_path"))
+        if old_hash and old_hash != content_hash:
+            await content_store.release(old_hash, dataset_id)
+        logger.info(
+            f"Google Sheet {sheet_id} re-imported incrementally for dataset {dataset_id} "
+            f"(+{appended['rows_appended']} rows)"
+        )
+        return {
+            "success": True,
+            "dataset_id": dataset_id,
+            "incremental": True,
+            "rows_appended": appended["rows_appended"],
+            "message": f"Google Sheet refreshed. {appended['rows_appended']} new rows added.",
+        }
+
     await db.uploads.update_one(
         tenant_scope_query("uploads", {"_id": dataset_id}, wid, current_user["id"]),
         {
             "$set": {
-                "file_id": file_metadata["file_id"],
-                "file_path": file_metadata["file_path"],
-                "file_size": file_metadata["file_size"],
-                "content_hash": content_hash,
+                **source_fields,
                 "is_processed": False,
                 "processing_status": "pending",
                 "processing_progress": 0,
@@ -422,13 +474,14 @@ async def reimport_google_sheet(
                     "insights_report": "pending",
                     "dashboard_design": "pending",
                 },
-                "updated_at": updated_at,
-                "sheet_url": sheet_url,
-                "sheet_id": sheet_id,
             }
         },
     )
 
+    old_hash = content_store.content_hash_of(doc.get("file_path"))
+    if old_hash and old_hash != content_hash:
+        await content_store.release(old_hash, dataset_id)
+
     # 4. Invalidate caches — data has changed, stale results must go
     from services.cache.dashboard_cache_service import dashboard_cache_service
     from services.query import query_cache as qcache
@@ -450,6 +503,20 @@ async def reimport_google_sheet(
     except Exception as cache_err:
         logger.warning(f"[Reimport] Query cache invalidation failed: {cache_err}")
 
+    try:
+        from services.query.dataset_catalog import dataset_catalog
+
+        dataset_catalog.invalidate(dataset_id)
+    except Exception as cache_err:
+        logger.warning(f"[Reimport] DuckDB catalog invalidation failed: {cache_err}")
+
+    try:
+        from services.query.rollups import rollup_store
+
+        rollup_store.invalidate(dataset_id)
+    except Exception as cache_err:
+        logger.warning(f"[Reimport] Rollup cube invalidation failed: {cache_err}")
+
     # 5. Fire background processing
     from services.pipeline.process import process_dataset
 
@@ -599,7 +666,13 @@ async def get_dataset_data(
     page_size: int = Query(100, ge=1, le=5000),
     current_user: dict = Depends(get_current_user),
 ):
-    """Return paginated dataset rows for dashboard and preview consumers."""
+    """Return paginated dataset rows for dashboard and preview consumers.
+
+    Rows come in the processed Parquet's order, which is clustered by
+    (month of the time column, top dimension, time) rather than upload
+    order (see ``services/datasets/parquet_layout.py``). Paging is stable:
+    the same page returns the same rows until the dataset is rewritten.
+    """
     result = await enhanced_dataset_service.get_dataset_data(
         dataset_id=dataset_id,
         user_id=current_user["id"],
@@ -624,7 +697,10 @@ async def get_dataset_preview(
     limit: int = Query(200, ge=1, le=2000),
     current_user: dict = Depends(get_current_user),
 ):
-    """Return a small row sample and inferred columns for fast table preview."""
+    """Return a small row sample and inferred columns for fast table preview.
+
+    The first page of ``/data``, so it shares that endpoint's row order.
+    """
     result = await enhanced_dataset_service.get_dataset_data(
         dataset_id=dataset_id,
         user_id=current_user["id"],
@@ -676,6 +752,20 @@ async def reprocess_dataset(
         except Exception as cache_err:
             logger.warning(f"[Reprocess] Query cache invalidation failed: {cache_err}")
 
+        try:
+            from services.query.dataset_catalog import dataset_catalog
+
+            dataset_catalog.invalidate(dataset_id)
+        except Exception as cache_err:
+            logger.warning(f"[Reprocess] DuckDB catalog invalidation failed: {cache_err}")
+
+        try:
+            from services.query.rollups import rollup_store
+
+            rollup_store.invalidate(dataset_id)
+        except Exception as cache_err:
+            logger.warning(f"[Reprocess] Rollup cube invalidation failed: {cache_err}")
+
         db = get_database()
         if db is not None:
             try:
@@ -717,6 +807,7 @@ async def reprocess_dataset(
                 dataset["file_path"],
                 current_user["id"],
                 workspace_id=current_user.get("workspace_id", current_user["id"]),
+                reuse_stored_results=False,
             )
         )
 
@@ -414,10 +414,11 @@ async def _run_and_store(
                 df=df,
                 limit=limit,
                 query_id=query_id,
+                dataset_id=dataset_id_internal,
             )
 
             # Cache successful results for subsequent identical queries
-            query_cache.set(dataset_id_internal, sql, limit, result)
+            query_cache.put(dataset_id_internal, sql, limit, result)
 
         if result.get("success"):
             await query_store.set_completed(
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Chart Hydration — Rows/Second per Chart Type
+=======================================================
+Hydrates one synthetic sales frame through ``hydrate.hydrate_chart`` once
+per chart type that ``hydrate._get_handler`` knows, plus the variants that
+take a different code path (auto-binned numeric x, group-by series,
+multi-y scatter), and reports input rows/second for each.
+
+The frame mixes the column shapes the handlers branch on: low- and
+high-cardinality categories, a date, integer and float measures with a
+few nulls, OHLC prices and lat/lon points.
+
+``--output`` saves the results as JSON; ``--compare`` prints each case's
+speedup against a saved run, so a change to a hydrator can be checked
+against the numbers from before it.
+
+Usage:
+    cd version2/backend
+    python benchmark/benchmark_chart_hydration.py
+    python benchmark/benchmark_chart_hydration.py --rows 1000000 --only scatter sankey
+    python benchmark/benchmark_chart_hydration.py --output before.json
+    python benchmark/benchmark_chart_hydration.py --compare before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from services.charts.chart_render_service import ChartRenderService  # noqa: E402
+from services.charts.hydrate import hydrate_chart  # noqa: E402
+
+REGIONS = ["North", "South", "East", "West", "Central"]
+SEGMENTS = [f"segment_{i:02d}" for i in range(12)]
+CHANNELS = ["web", "store", "partner", "phone"]
+COUNTRIES = ["United States", "Canada", "Mexico", "Brazil", "Germany", "France", "India", "Japan"]
+
+
+def _config(chart_type: str, columns: List[str], aggregation: str = "sum", **extra) -> Dict:
+    return {"chart_type": chart_type, "columns": columns, "aggregation": aggregation, **extra}
+
+
+# (label, config) — one per chart type in ``_get_handler`` (``violin_plot`` is
+# an alias of ``violin`` that ``ChartType`` doesn't accept), then path variants
+CASES: List[Tuple[str, Dict[str, Any]]] = [
+    ("bar", _config("bar", ["region", "revenue"])),
+    ("line", _config("line", ["order_date", "revenue"])),
+    ("pie", _config("pie", ["segment", "revenue"])),
+    ("histogram", _config("histogram", ["price"])),
+    ("box_plot", _config("box_plot", ["region", "price"])),
+    ("scatter", _config("scatter", ["price", "revenue"])),
+    ("heatmap", _config("heatmap", ["region", "segment", "revenue"])),
+    ("treemap", _config("treemap", ["region", "revenue"], group_by="segment")),
+    ("grouped_bar", _config("grouped_bar", ["region", "revenue", "cost"])),
+    ("stacked_bar", _config("stacked_bar", ["region", "revenue"], group_by="channel")),
+    ("area", _config("area", ["order_date", "revenue"])),
+    ("multi_line", _config("multi_line", ["order_date", "revenue"], group_by="region")),
+    ("stacked_area", _config("stacked_area", ["order_date", "revenue"], group_by="channel")),
+    ("radar", _config("radar", ["segment", "revenue"])),
+    ("bubble", _config("bubble", ["price", "revenue", "qty", "region"])),
+    ("waterfall", _config("waterfall", ["region", "revenue"])),
+    ("funnel", _config("funnel", ["channel", "revenue"])),
+    ("candlestick", _config("candlestick", ["order_date", "open", "high", "low", "close"])),
+    ("violin", _config("violin", ["region", "price"])),
+    ("sunburst", _config("sunburst", ["region", "revenue"], group_by="segment")),
+    ("gauge", _config("gauge", ["revenue"])),
+    ("bullet", _config("bullet", ["revenue", "cost"])),
+    ("choropleth", _config("choropleth", ["country", "revenue"])),
+    ("donut", _config("donut", ["channel", "revenue"])),
+    ("map", _config("map", ["lat", "lon", "revenue"])),
+    ("pictorial_bar", _config("pictorial_bar", ["segment", "revenue"])),
+    ("effect_scatter", _config("effect_scatter", ["price", "revenue"])),
+    ("graph", _config("graph", ["region", "segment", "revenue"])),
+    ("sankey", _config("sankey", ["channel", "segment", "revenue"])),
+    ("parallel", _config("parallel", ["price", "qty", "revenue", "region"])),
+    ("lines", _config("lines", ["order_date", "revenue"], group_by="channel")),
+    ("tree", _config("tree", ["region", "revenue"], group_by="segment")),
+    ("theme_river", _config("theme_river", ["order_date", "revenue", "cost"])),
+    # Code-path variants
+    ("bar (binned x)", _config("bar", ["price", "revenue"])),
+    ("line (binned x)", _config("line", ["price", "revenue"], "mean")),
+    ("scatter (by group)", _config("scatter", ["price", "revenue"], group_by="region")),
+    ("scatter (multi y)", _config("scatter", ["price", "revenue", "cost"])),
+    ("scatter (color)", _config("scatter", ["price", "revenue", "qty"])),
+    ("grouped_bar (by group)", _config("grouped_bar", ["segment", "revenue"], group_by="channel")),
+]
+
+
+def build_frame(n: int, seed: int = 42) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    price = rng.gamma(2.0, 40.0, n)
+    qty = rng.integers(1, 20, n)
+    revenue = price * qty
+    revenue[rng.random(n) < 0.01] = np.nan  # a few gaps, as real uploads have
+    open_ = 100 + np.cumsum(rng.normal(0, 1, n))
+    start = date(2020, 1, 1)
+    return pl.DataFrame(
+        {
+            "order_date": pl.date_range(
+                start, start + timedelta(days=n // 50), "1d", eager=True
+            ).sample(n, with_replacement=True, seed=seed),
+            "region": rng.choice(REGIONS, n),
+            "segment": rng.choice(SEGMENTS, n),
+            "channel": rng.choice(CHANNELS, n),
+            "country": rng.choice(COUNTRIES, n),
+            "price": price,
+            "qty": qty,
+            "revenue": revenue,
+            "cost": revenue * rng.uniform(0.4, 0.9, n),
+            "open": open_,
+            "high": open_ + rng.random(n),
+            "low": open_ - rng.random(n),
+            "close": open_ + rng.normal(0, 0.5, n),
+            "lat": rng.uniform(-60, 70, n),
+            "lon": rng.uniform(-180, 180, n),
+        }
+    ).with_columns(pl.col("revenue").fill_nan(None), pl.col("cost").fill_nan(None))
+
+
+def hydrate_case(df: pl.DataFrame, config: Dict[str, Any]):
+    """``hydrate_chart`` on a config parsed the way the render service does."""
+    return hydrate_chart(df, ChartRenderService()._parse_config(dict(config)))
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="chart types/labels to run (prefix match)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="JSON from an earlier --output run")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    df = build_frame(args.rows)
+    baseline = json.loads(Path(args.compare).read_text())["rows_per_second"] if args.compare else {}
+    cases = [
+        (label, config)
+        for label, config in CASES
+        if not args.only or any(label.startswith(prefix) for prefix in args.only)
+    ]
+
+    results: Dict[str, float] = {}
+    print(f"\n{args.rows:,} rows")
+    print(f"{'chart':<24} {'ms':>9} {'rows/s':>14} {'traces':>7} {'vs base':>8}")
+    for label, config in cases:
+        traces, _ = hydrate_case(df, config)
+        seconds = _best_of(lambda config=config: hydrate_case(df, config), args.repeat)
+        results[label] = args.rows / seconds
+        versus = f"{results[label] / baseline[label]:.1f}x" if label in baseline else ""
+        print(
+            f"{label:<24} {seconds * 1000:>9.1f} {results[label]:>14,.0f} "
+            f"{len(traces):>7} {versus:>8}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({"rows": args.rows, "rows_per_second": results}, indent=2)
+        )
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Database Table Extract — OFFSET vs Keyset vs Cursor vs Partitioned
+==============================================================================
+Extracts one table to Parquet through
+``services.databases.data_extractor.DataExtractor.stream_to_parquet`` four
+ways and reports rows/second:
+
+  - offset       — ``LIMIT n OFFSET k`` pages (what every extract used
+                   before; now only the fallback for tables without a key)
+  - keyset       — ``WHERE id > last ORDER BY id LIMIT n`` pages
+  - cursor       — one server-side cursor, ``fetchmany`` batches
+  - partitioned  — ``--partitions`` key ranges from
+                   ``SchemaDiscoveryService.plan_key_ranges``, one cursor
+                   each, streamed concurrently
+
+By default the source is a local stand-in: an on-disk SQLite table behind a
+``DatabaseConnector`` that issues the same query shapes as the PostgreSQL
+connector (SQLite, like Postgres, walks and discards every skipped row for
+OFFSET). An in-process database has no network, so ``--latency-ms`` adds a
+simulated round trip to every query and fetch — the cost a partitioned
+extract overlaps. Pass ``--dsn`` to run against a real PostgreSQL server
+instead; the table is created there as ``bench_extract`` and dropped
+afterwards.
+
+Usage:
+    cd version2/backend
+    python -m benchmark.benchmark_db_extract
+    python -m benchmark.benchmark_db_extract --rows 2000000 --batch 10000 --latency-ms 20
+    python -m benchmark.benchmark_db_extract --dsn postgresql://user:pw@localhost/db
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.databases.connectors.base import DatabaseConnector, rows_to_frame
+from services.databases.data_extractor import DataExtractor
+from services.databases.schema_discovery import SchemaDiscoveryService
+
+TABLE = "bench_extract"
+REGIONS = ["North", "South", "East", "West", "Central"]
+
+
+def _rows(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(1, n + 1):
+        yield (
+            i,
+            f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            REGIONS[i % len(REGIONS)],
+            round(rng.uniform(1, 5000), 2),
+            rng.randint(1, 40),
+        )
+
+
+class SQLiteStandIn(DatabaseConnector):
+    """Local stand-in for the PostgreSQL connector's extract paths."""
+
+    def __init__(self, path: str, keyed: bool = True, latency_ms: float = 0.0):
+        super().__init__({"host": "localhost", "database": "bench", "pool_size": 8})
+        self._path = path
+        self._keyed = keyed
+        self._latency = latency_ms / 1000
+        self._db: Optional[sqlite3.Connection] = None
+
+    async def connect(self) -> bool:
+        self._db = sqlite3.connect(self._path)
+        return True
+
+    async def disconnect(self) -> None:
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    async def _round_trip(self) -> None:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+    async def test_connection(self) -> Dict:
+        return {"success": True}
+
+    async def get_tables(self) -> List[str]:
+        return [TABLE]
+
+    async def get_foreign_keys(self) -> List[Dict]:
+        return []
+
+    async def get_table_schema(self, table_name: str) -> List[Dict]:
+        return []
+
+    async def extract_incremental(self, table_name, last_value, increment_column):
+        raise NotImplementedError
+
+    async def _fetch(self, sql: str, params=()) -> List[Dict]:
+        await self._round_trip()
+        cur = self._db.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    async def extract_data(self, table_name, columns=None, limit=None, offset=None):
+        return await self._fetch(f"SELECT * FROM {table_name} LIMIT ? OFFSET ?", (limit, offset or 0))
+
+    async def get_key_columns(self, table_name: str) -> List[str]:
+        return ["id"] if self._keyed else []
+
+    async def get_key_stats(self, table_name: str, key_column: str) -> Dict:
+        lo, hi = self._db.execute(f"SELECT min(id), max(id) FROM {table_name}").fetchone()
+        return {"min": lo, "max": hi, "rows": hi - lo + 1, "histogram": []}
+
+    async def extract_keyset(self, table_name, key_columns, after=None, limit=None, columns=None):
+        if after is None:
+            return await self._fetch(f"SELECT * FROM {table_name} ORDER BY id LIMIT ?", (limit,))
+        return await self._fetch(
+            f"SELECT * FROM {table_name} WHERE (id) > (?) ORDER BY id LIMIT ?", (*after, limit)
+        )
+
+    async def stream_batches(self, table_name, columns=None, batch_size=5000, limit=None,
+                             key_range=None):
+        lo = key_range.lower if key_range and key_range.lower is not None else -(2 ** 63)
+        hi = key_range.upper if key_range and key_range.upper is not None else 2 ** 63 - 1
+        # Each range gets its own connection, as it would from a pool
+        db = sqlite3.connect(self._path)
+        try:
+            cur = db.execute(
+                f"SELECT * FROM {table_name} WHERE id >= ? AND id < ? LIMIT ?",
+                (lo, hi, -1 if limit is None else limit),
+            )
+            names = [d[0] for d in cur.description]
+            while True:
+                await self._round_trip()
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows_to_frame(names, rows)
+        finally:
+            db.close()
+
+
+def _build_sqlite(path: str, rows: int) -> None:
+    db = sqlite3.connect(path)
+    db.execute(
+        f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, order_date TEXT, region TEXT, "
+        "amount REAL, units INTEGER)"
+    )
+    db.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?)", _rows(rows))
+    db.commit()
+    db.close()
+
+
+async def _build_postgres(dsn: str, rows: int):
+    import asyncpg
+
+    from services.databases.connectors.postgresql import PostgreSQLConnector
+
+    conn = await asyncpg.connect(dsn)
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"CREATE TABLE {TABLE} (id BIGINT PRIMARY KEY, order_date TEXT, region TEXT, "
+        "amount DOUBLE PRECISION, units INTEGER)"
+    )
+    await conn.copy_records_to_table(TABLE, records=list(_rows(rows)))
+    await conn.execute(f"ANALYZE {TABLE}")
+    await conn.close()
+
+    url = urlparse(dsn)
+    config = {
+        "host": url.hostname or "localhost",
+        "port": url.port or 5432,
+        "database": url.path.lstrip("/") or "postgres",
+        "username": url.username or "postgres",
+        "password": url.password or "",
+        "ssl_mode": "disable",
+        "pool_size": 8,
+    }
+
+    class _Unkeyed(PostgreSQLConnector):
+        async def get_key_columns(self, table_name):
+            return []
+
+    return PostgreSQLConnector(config), _Unkeyed(config)
+
+
+async def _drop_postgres(dsn: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.close()
+
+
+async def _time_extract(connector, mode: str, batch: int, out: Path, partitions: int = 1) -> float:
+    await connector.connect()
+    try:
+        start = time.perf_counter()
+        key_ranges = await SchemaDiscoveryService().plan_key_ranges(connector, TABLE, partitions)
+        written = await DataExtractor(
+            batch_size=batch, mode=mode, max_parallel_per_source=partitions
+        ).stream_to_parquet(connector, TABLE, str(out), key_ranges=key_ranges)
+        elapsed = time.perf_counter() - start
+    finally:
+        await connector.disconnect()
+    assert written == pl.scan_parquet(out).select(pl.len()).collect().item()
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument(
+        "--latency-ms", type=float, default=2.0,
+        help="simulated round trip per query/fetch (SQLite stand-in only)",
+    )
+    parser.add_argument("--dsn", help="PostgreSQL DSN; omit to use the SQLite stand-in")
+    parser.add_argument(
+        "--skip-offset", action="store_true",
+        help="skip the OFFSET run (it is quadratic; slow above a few million rows)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.dsn:
+            keyed, unkeyed = await _build_postgres(args.dsn, args.rows)
+            source = "PostgreSQL"
+        else:
+            db_path = str(tmp_dir / "source.db")
+            _build_sqlite(db_path, args.rows)
+            keyed = SQLiteStandIn(db_path, latency_ms=args.latency_ms)
+            unkeyed = SQLiteStandIn(db_path, keyed=False, latency_ms=args.latency_ms)
+            source = f"SQLite stand-in, {args.latency_ms:g} ms round trips"
+
+        runs = [
+            ("keyset", keyed, "keyset", 1),
+            ("cursor", keyed, "cursor", 1),
+            ("partitioned", keyed, "cursor", args.partitions),
+        ]
+        if not args.skip_offset:
+            runs.insert(0, ("offset", unkeyed, "keyset", 1))
+
+        print(f"\n{source}: {args.rows:,} rows, {args.batch:,}-row batches\n")
+        print(f"{'method':<12} {'seconds':>9} {'rows/s':>12} {'vs first':>10}")
+        baseline = None
+        try:
+            for label, connector, mode, partitions in runs:
+                seconds = await _time_extract(
+                    connector, mode, args.batch, tmp_dir / f"{label}.parquet", partitions
+                )
+                baseline = baseline or seconds
+                print(
+                    f"{label:<12} {seconds:>9.2f} {args.rows / seconds:>12,.0f} "
+                    f"{baseline / seconds:>9.1f}x"
+                )
+        finally:
+            if args.dsn:
+                await _drop_postgres(args.dsn)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
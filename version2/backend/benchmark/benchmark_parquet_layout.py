@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Clustered Parquet Layout vs Plain write_parquet
+==========================================================
+Compares the dataset file the pipeline used to write
+(``df.write_parquet(path, compression="zstd")``, upload row order) with
+``services.datasets.parquet_layout.write_dataset_parquet`` (clustered on
+time column + top dimension, DuckDB-sized row groups, sidecar index).
+
+Corpora come from ``benchmark/generate_datasets.py`` (generated on first
+run). Each dataset that has a time column is loaded with the pipeline
+loader, tiled to ``--rows`` rows with its dates spread over a few years,
+and written both ways. Per layout we time, in DuckDB and Polars:
+
+  - time slice — one month's total of the first numeric column (the shape
+    of a KPI period comparison)
+  - dimension filter — the same total for one value of the dimension
+    (the shape of a filtered chat query)
+
+Usage:
+    cd version2/backend
+    python -m benchmark.benchmark_parquet_layout
+    python -m benchmark.benchmark_parquet_layout --rows 5000000 --repeat 7
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import duckdb
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.generate_datasets import DATASETS_DIR, generate
+from services.datasets.parquet_layout import plan_layout, write_dataset_parquet
+from services.pipeline.load import coerce_numeric_columns, load_dataset
+
+
+def _tile(df: pl.DataFrame, rows: int, time_col: str, parse: bool) -> pl.DataFrame:
+    """Repeat ``df`` to ``rows`` rows, shifting each copy's dates by a week."""
+    copies = max(1, rows // max(len(df), 1))
+    ts = pl.col(time_col).str.to_datetime(strict=False) if parse else pl.col(time_col).cast(pl.Datetime)
+    frames = [
+        df.with_columns((ts + pl.duration(days=7 * i)).dt.date().alias(time_col))
+        for i in range(copies)
+    ]
+    # Shuffle: uploads are rarely in time order
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=42).head(rows)
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm the OS page cache for both layouts alike
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench_dataset(csv_path: Path, rows: int, repeat: int, workdir: Path) -> Optional[Dict[str, object]]:
+    df, _ = load_dataset(str(csv_path))
+    df, _, _ = coerce_numeric_columns(df)
+    layout = plan_layout(df)
+    measures = [c for c, t in df.schema.items() if t.is_numeric()]
+    if layout.time_column is None or not measures:
+        return None
+
+    df = _tile(df, rows, layout.time_column, layout.parse_time)
+    time_col, dim, measure = layout.time_column, layout.dimension, measures[0]
+
+    plain = workdir / f"{csv_path.stem}.plain.parquet"
+    clustered = workdir / f"{csv_path.stem}.clustered.parquet"
+    df.write_parquet(plain, compression="zstd")
+    write_dataset_parquet(df, clustered)
+
+    # One calendar month in the middle of the range
+    lo, hi = df[time_col].min(), df[time_col].max()
+    start = (lo + (hi - lo) / 2).replace(day=1)
+    end = pl.Series([start]).dt.month_end()[0]
+    time_where = f"\"{time_col}\" BETWEEN DATE '{start}' AND DATE '{end}'"
+    time_expr = pl.col(time_col).is_between(start, end)
+
+    wheres = {"time slice": (time_where, time_expr)}
+    if dim:
+        value = df[dim].mode().sort()[0]
+        escaped = str(value).replace("'", "''")
+        wheres["dimension filter"] = (
+            f"\"{dim}\" = '{escaped}' AND {time_where}",
+            (pl.col(dim) == value) & time_expr,
+        )
+
+    result: Dict[str, object] = {
+        "dataset": csv_path.stem,
+        "rows": len(df),
+        "sort": layout.sort_by,
+        "bytes": {"plain": plain.stat().st_size, "clustered": clustered.stat().st_size},
+        "queries": {},
+    }
+    con = duckdb.connect()
+    for label, (where, expr) in wheres.items():
+        timings = {}
+        for name, path in (("plain", plain), ("clustered", clustered)):
+            sql = f"SELECT SUM(\"{measure}\") FROM read_parquet('{path}') WHERE {where}"
+            timings[f"duckdb_{name}"] = _timed(lambda sql=sql: con.execute(sql).fetchall(), repeat)
+            timings[f"polars_{name}"] = _timed(
+                lambda path=path, expr=expr: (
+                    pl.scan_parquet(path).filter(expr).select(pl.col(measure).sum()).collect()
+                ),
+                repeat,
+            )
+        result["queries"][label] = timings
+    con.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows per tiled dataset")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query (median)")
+    parser.add_argument("--limit", type=int, default=0, help="max datasets (0 = all with a time column)")
+    args = parser.parse_args()
+
+    if not DATASETS_DIR.exists() or not any(DATASETS_DIR.glob("*.csv")):
+        generate(verbose=False)
+
+    workdir = Path(tempfile.mkdtemp(prefix="layout_bench_"))
+    results: List[Dict[str, object]] = []
+    try:
+        for csv_path in sorted(DATASETS_DIR.glob("*.csv")):
+            res = bench_dataset(csv_path, args.rows, args.repeat, workdir)
+            if res is None:
+                continue
+            results.append(res)
+            print(f"\n{res['dataset']}  ({res['rows']:,} rows, sort={res['sort']})")
+            print(
+                f"  size        plain {res['bytes']['plain'] / 1e6:8.1f} MB   "
+                f"clustered {res['bytes']['clustered'] / 1e6:8.1f} MB"
+            )
+            for label, t in res["queries"].items():
+                print(
+                    f"  {label:<16} duckdb {t['duckdb_plain']:7.1f} → {t['duckdb_clustered']:7.1f} ms"
+                    f"   polars {t['polars_plain']:7.1f} → {t['polars_clustered']:7.1f} ms"
+                )
+            if args.limit and len(results) >= args.limit:
+                break
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if not results:
+        print("No dataset with a time column found.")
+        return
+
+    print(f"\n{'=' * 72}")
+    for engine in ("duckdb", "polars"):
+        for label in ("time slice", "dimension filter"):
+            ratios = [
+                r["queries"][label][f"{engine}_plain"] / max(r["queries"][label][f"{engine}_clustered"], 1e-6)
+                for r in results
+                if label in r["queries"]
+            ]
+            if ratios:
+                print(f"  {engine:<7} {label:<17} median speedup {statistics.median(ratios):5.2f}×  (n={len(ratios)})")
+    print(f"{'=' * 72}")
+
+
+if __name__ == "__main__":
+    main()
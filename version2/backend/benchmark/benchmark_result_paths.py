@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DuckDB → Polars Result Materialisation Paths
+========================================================
+Compares the three ways a DuckDB result set can become a Polars DataFrame:
+
+  1. legacy   — ``fetchall()`` → one ``dict`` per row → ``pl.from_dicts``
+                (what executor / async_executor did before)
+  2. tuples   — ``fetchall()`` → ``pl.DataFrame(rows, orient="row")``
+                (the no-pyarrow fallback in ``fetch_polars``)
+  3. arrow    — ``cursor.pl()`` via DuckDB's Arrow export
+                (the default in ``fetch_polars`` when pyarrow is installed)
+
+Each path runs over result sets of increasing row count and three column
+mixes (numeric-only, string-heavy, mixed with dates), so the crossover
+between the paths is visible.
+
+Usage:
+    python benchmark/benchmark_result_paths.py
+    python benchmark/benchmark_result_paths.py --rows 1000 50000 200000 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import duckdb
+import polars as pl
+
+sys.path.insert(0, '.')
+
+from services.query.duckdb_helpers import arrow_available, fetch_polars
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# RESULT-SET SHAPES
+# ══════════════════════════════════════════════════════════════════════════
+
+# Each shape is a SELECT list over ``range(n)`` — DuckDB generates the data
+# itself so the benchmark measures only the result hand-off.
+SHAPES: Dict[str, str] = {
+    "numeric": (
+        "range AS id, random() * 1000 AS revenue, random() AS margin, "
+        "(range % 97)::INTEGER AS units"
+    ),
+    "strings": (
+        "range AS id, 'customer_' || (range % 5000)::VARCHAR AS customer, "
+        "'region_' || (range % 12)::VARCHAR AS region, md5(range::VARCHAR) AS hash"
+    ),
+    "mixed": (
+        "range AS id, random() * 1000 AS revenue, "
+        "'segment_' || (range % 8)::VARCHAR AS segment, "
+        "DATE '2020-01-01' + (range % 1500)::INTEGER AS order_date"
+    ),
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# RESULT PATHS
+# ══════════════════════════════════════════════════════════════════════════
+
+def path_legacy(cursor) -> pl.DataFrame:
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    records = [dict(zip(columns, row)) for row in rows]
+    return pl.from_dicts(records)
+
+
+def path_tuples(cursor) -> pl.DataFrame:
+    return fetch_polars(cursor, prefer_arrow=False)
+
+
+def path_arrow(cursor) -> pl.DataFrame:
+    return fetch_polars(cursor, prefer_arrow=True)
+
+
+def time_path(
+    conn: duckdb.DuckDBPyConnection,
+    sql: str,
+    fn: Callable,
+    repeat: int,
+) -> float:
+    """Median wall-clock milliseconds for execute + materialise."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn(conn.execute(sql))
+        samples.append((time.perf_counter() - start) * 1000)
+        assert df.height > 0
+    return statistics.median(samples)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# MAIN
+# ══════════════════════════════════════════════════════════════════════════
+
+def run_benchmark(row_counts: List[int], repeat: int) -> None:
+    paths: Dict[str, Callable] = {"legacy": path_legacy, "tuples": path_tuples}
+    if arrow_available():
+        paths["arrow"] = path_arrow
+
+    print("=" * 72)
+    print("  DuckDB → Polars result paths")
+    print("=" * 72)
+    print(f"  pyarrow available: {arrow_available()}  |  repeat: {repeat} (median)")
+    print()
+
+    conn = duckdb.connect(":memory:")
+    header = f"  {'shape':<9}{'rows':>10}" + "".join(f"{name:>12}" for name in paths)
+    header += f"{'speedup':>10}"
+    print(header)
+    print("  " + "─" * (len(header) - 2))
+
+    for shape, select_list in SHAPES.items():
+        for n in row_counts:
+            # Materialise once so every path reads the same table.
+            conn.execute(f"CREATE OR REPLACE TABLE bench AS SELECT {select_list} FROM range({n})")
+            sql = "SELECT * FROM bench"
+
+            timings = {name: time_path(conn, sql, fn, repeat) for name, fn in paths.items()}
+            best = min(timings.values())
+            line = f"  {shape:<9}{n:>10,}" + "".join(f"{timings[p]:>10.1f}ms" for p in paths)
+            line += f"{timings['legacy'] / best:>9.1f}×"
+            print(line)
+        print()
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 50_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
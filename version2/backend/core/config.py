@@ -35,6 +35,20 @@ class Settings:
     # Used to encrypt/decrypt stored database connection passwords via Fernet.
     # Generate with: python -c "import secrets; print(secrets.token_urlsafe(32))"
     DB_ENCRYPTION_KEY: str = os.getenv("DB_ENCRYPTION_KEY", "")
+    # How database table extracts read the source table:
+    #   "cursor" — one server-side cursor (one query, one snapshot)
+    #   "keyset" — key-ordered pages on the primary key / a unique index
+    #              (short queries, no long-lived transaction on the source)
+    # Either way batches are written to Parquet as they arrive.
+    DB_EXTRACT_MODE: str = os.getenv("DB_EXTRACT_MODE", "cursor")
+    # Cursor-mode extracts of tables with a single-column key and at least
+    # DB_EXTRACT_PARTITION_MIN_ROWS rows (planner estimate) are split into
+    # DB_EXTRACT_PARTITIONS key ranges (histogram or min/max) that stream
+    # concurrently; at most DB_EXTRACT_MAX_PARALLEL_PER_SOURCE ranges are
+    # read at once from one source database, across all running extracts.
+    DB_EXTRACT_PARTITIONS: int = int(os.getenv("DB_EXTRACT_PARTITIONS", "4"))
+    DB_EXTRACT_PARTITION_MIN_ROWS: int = int(os.getenv("DB_EXTRACT_PARTITION_MIN_ROWS", "200000"))
+    DB_EXTRACT_MAX_PARALLEL_PER_SOURCE: int = int(os.getenv("DB_EXTRACT_MAX_PARALLEL_PER_SOURCE", "4"))
 
     LLM_MAX_CONCURRENT_CALLS: int = int(os.getenv("LLM_MAX_CONCURRENT_CALLS", "5"))
     LLM_REQUEST_STAGGER_SECONDS: float = float(os.getenv("LLM_REQUEST_STAGGER_SECONDS", "1.5"))
@@ -450,6 +464,19 @@ class Settings:
     # ``services/datasets/size_limits.py``.
     # Default: 1024 MB. Tune per-environment via env var.
     PIPELINE_MAX_FILE_SIZE_MB: int = int(os.getenv("PIPELINE_MAX_FILE_SIZE_MB", "1024"))
+    # CSV uploads at least this large skip the eager loader and stream to
+    # Parquet in bounded memory (services/pipeline/stream_load.py). Type,
+    # header and coercion decisions use the first N rows. Later stages still
+    # hold the dataset as one frame, so this does not lift the ceiling above.
+    PIPELINE_STREAMING_INGEST_MB: int = int(os.getenv("PIPELINE_STREAMING_INGEST_MB", "64"))
+    PIPELINE_STREAMING_SAMPLE_ROWS: int = int(
+        os.getenv("PIPELINE_STREAMING_SAMPLE_ROWS", "50000")
+    )
+    # Spawned worker processes for the CPU-heavy pipeline stages (load,
+    # clean, profiling, intelligence), so a large upload cannot stall chat
+    # on the API event loop. Each concurrent pipeline run holds one; more
+    # uploads queue. 0 runs the stages on threads in the API process.
+    PIPELINE_WORKERS: int = int(os.getenv("PIPELINE_WORKERS", "2"))
 
     # -------------------------------------------------------------------------
     # Pricing-tier file size limits (MB)
@@ -563,6 +590,21 @@ class Settings:
     AQP_ENABLED: bool = os.getenv("AQP_ENABLED", "true").lower() == "true"
     # Default mode: "exact" | "approximate"
     AQP_DEFAULT_MODE: str = os.getenv("AQP_DEFAULT_MODE", "exact")
+    # Progressive execution (services/query/progressive.py): while the exact
+    # scan of a large dataset runs, the chat SQL is answered on the cached
+    # stratified sample and pushed over the user's WebSocket with bootstrap
+    # confidence intervals; the exact answer follows when the scan finishes.
+    PROGRESSIVE_QUERY_ENABLED: bool = (
+        os.getenv("PROGRESSIVE_QUERY_ENABLED", "true").lower() == "true"
+    )
+    # Only datasets with at least this many rows get an early estimate
+    PROGRESSIVE_MIN_ROWS: int = int(os.getenv("PROGRESSIVE_MIN_ROWS", "1000000"))
+    PROGRESSIVE_SAMPLE_ROWS: int = int(os.getenv("PROGRESSIVE_SAMPLE_ROWS", "10000"))
+    # Bootstrap resamples of the sample used for the confidence intervals
+    PROGRESSIVE_BOOTSTRAP_RESAMPLES: int = int(
+        os.getenv("PROGRESSIVE_BOOTSTRAP_RESAMPLES", "20")
+    )
+    PROGRESSIVE_CONFIDENCE: float = float(os.getenv("PROGRESSIVE_CONFIDENCE", "0.95"))
 
     # -------------------------------------------------------------------------
     # Async Query Execution Configuration
@@ -575,6 +617,20 @@ class Settings:
     QUERY_MAX_QUEUE: int = int(os.getenv("QUERY_MAX_QUEUE", "20"))
     # Per-connection DuckDB memory limit
     QUERY_MEMORY_LIMIT: str = os.getenv("QUERY_MEMORY_LIMIT", "2GB")
+    # Cost-aware admission (services/query/admission.py). Queries reserve their
+    # estimated memory from this process-wide budget before opening DuckDB;
+    # background work (pipeline, catalog/rollup builds) may hold at most the
+    # given fraction so interactive chat/editor queries always have headroom.
+    QUERY_MEMORY_BUDGET: str = os.getenv("QUERY_MEMORY_BUDGET", "8GB")
+    QUERY_BACKGROUND_BUDGET_FRACTION: float = float(
+        os.getenv("QUERY_BACKGROUND_BUDGET_FRACTION", "0.5")
+    )
+    # Smallest grant — DuckDB needs working room even for trivial queries.
+    QUERY_MIN_GRANT: str = os.getenv("QUERY_MIN_GRANT", "64MB")
+    # One more DuckDB thread per this many expected seconds of work.
+    QUERY_TARGET_SECONDS_PER_THREAD: float = float(
+        os.getenv("QUERY_TARGET_SECONDS_PER_THREAD", "0.5")
+    )
     # Hours before query results are auto-deleted by MongoDB TTL index
     QUERY_RESULT_TTL_HOURS: int = int(os.getenv("QUERY_RESULT_TTL_HOURS", "24"))
     # Max rows before query execution warns the user (default: 10,000)
@@ -586,6 +642,43 @@ class Settings:
     # Seconds before a cached query result expires (default: 5 minutes)
     # Set to 0 to disable caching
     QUERY_CACHE_TTL: int = int(os.getenv("QUERY_CACHE_TTL", "300"))
+    # Byte budget of the in-process LRU tier in front of the DiskCache
+    # (default: 64 MB per worker). Set to 0 to use the disk tier only.
+    QUERY_CACHE_MEMORY_MAX_BYTES: int = int(
+        os.getenv("QUERY_CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    # Dataset frames as memory-mapped Arrow IPC files (services/cache/frame_cache.py),
+    # shared by every worker on the host through the OS page cache. Byte
+    # budget for the whole directory (default: 4 GB); 0 disables the cache.
+    DATASET_FRAME_CACHE_DIR: str = os.getenv("DATASET_FRAME_CACHE_DIR", "./data/frame_cache")
+    DATASET_FRAME_CACHE_MAX_BYTES: int = int(
+        os.getenv("DATASET_FRAME_CACHE_MAX_BYTES", str(4 * 1024 * 1024 * 1024))
+    )
+    # Rendered chart payloads (services/cache/chart_render_cache.py), keyed by
+    # config, theme and dataset file version. Byte budget of the in-process
+    # LRU (default: 128 MB per worker; 0 disables it), plus an optional Redis
+    # tier shared across workers (defaults to REDIS_URL; empty disables it)
+    # whose entries expire after CHART_RENDER_CACHE_TTL seconds (default: 24h).
+    CHART_RENDER_CACHE_MAX_BYTES: int = int(
+        os.getenv("CHART_RENDER_CACHE_MAX_BYTES", str(128 * 1024 * 1024))
+    )
+    CHART_RENDER_CACHE_REDIS_URL: str = os.getenv(
+        "CHART_RENDER_CACHE_REDIS_URL", os.getenv("REDIS_URL", "")
+    )
+    CHART_RENDER_CACHE_TTL: int = int(os.getenv("CHART_RENDER_CACHE_TTL", "86400"))
+    # Content-addressed dataset store (services/datasets/content_store.py).
+    # Uploads and Google Sheet imports are stored once per SHA-256 under
+    # <dir>/<hash[:2]>/<hash>/ together with the canonical Parquet and every
+    # artifact derived from it, shared by all datasets with the same bytes.
+    CONTENT_STORE_DIR: str = os.getenv("CONTENT_STORE_DIR", "./uploads/content")
+    # Append-only refreshes (services/pipeline/incremental.py). Each processed
+    # dataset keeps its row fingerprints and mergeable column sketches under
+    # <dir>/<dataset_id>/; a re-import that only appends rows is merged into
+    # the existing Parquet instead of re-running the whole pipeline.
+    INCREMENTAL_REFRESH_ENABLED: bool = (
+        os.getenv("INCREMENTAL_REFRESH_ENABLED", "true").lower() == "true"
+    )
+    INCREMENTAL_STATE_DIR: str = os.getenv("INCREMENTAL_STATE_DIR", "./uploads/incremental")
 
     # -------------------------------------------------------------------------
     # DuckDB Connection Configuration (for direct file reads / in-memory queries)
@@ -600,6 +693,47 @@ class Settings:
     # Temp directory for DuckDB disk spillover (when queries exceed memory_limit).
     # Use a fast SSD-backed path. DuckDB creates the directory if it doesn't exist.
     DUCKDB_TEMP_DIRECTORY: str = os.getenv("DUCKDB_TEMP_DIRECTORY", "/tmp/duckdb_temp")
+    # Persistent per-dataset DuckDB catalog (services/query/dataset_catalog.py).
+    # The pipeline materialises each dataset once into <dir>/<dataset_id>.duckdb
+    # so chat queries read a native table instead of re-parsing the upload.
+    DUCKDB_CATALOG_ENABLED: bool = os.getenv("DUCKDB_CATALOG_ENABLED", "true").lower() == "true"
+    DUCKDB_CATALOG_DIR: str = os.getenv("DUCKDB_CATALOG_DIR", "./data/duckdb_catalog")
+    # Prepared statements for parameterized semantic SQL (services/query/prepared.py).
+    # Each dataset keeps up to N idle catalog cursors, and each cursor keeps up
+    # to M prepared query shapes (LRU) so repeated drill-downs skip planning.
+    DUCKDB_PREPARED_SESSIONS: int = int(os.getenv("DUCKDB_PREPARED_SESSIONS", "4"))
+    DUCKDB_PREPARED_STATEMENTS: int = int(os.getenv("DUCKDB_PREPARED_STATEMENTS", "64"))
+
+    # Pre-aggregated rollup cubes (services/query/rollups.py). After profiling
+    # the pipeline writes <dir>/<dataset_id>.parquet — dimensions × day bucket
+    # with SUM/COUNT/MIN/MAX per measure — and charts, KPIs and compiled
+    # semantic SQL are answered from it when the aggregation re-aggregates.
+    ROLLUP_ENABLED: bool = os.getenv("ROLLUP_ENABLED", "true").lower() == "true"
+    ROLLUP_DIR: str = os.getenv("ROLLUP_DIR", "./data/rollups")
+    # Dimension selection: at most N dimensions, each with at most this many
+    # distinct values (lowest-cardinality dimensions are picked first).
+    ROLLUP_MAX_DIMENSIONS: int = int(os.getenv("ROLLUP_MAX_DIMENSIONS", "4"))
+    ROLLUP_MAX_DIMENSION_CARDINALITY: int = int(
+        os.getenv("ROLLUP_MAX_DIMENSION_CARDINALITY", "200")
+    )
+    # A cube is kept only if it has at least this many times fewer rows
+    # than the dataset — otherwise it would not be cheaper to scan.
+    ROLLUP_MIN_REDUCTION: int = int(os.getenv("ROLLUP_MIN_REDUCTION", "10"))
+
+    # How line/area series longer than the chart's point budget are thinned
+    # (services/charts/downsampling.py):
+    #   "lttb" — Largest-Triangle-Three-Buckets, keeps the visual shape
+    #   "m4"   — first/last/min/max per x bucket, keeps the exact envelope
+    CHART_DOWNSAMPLE_METHOD: str = os.getenv("CHART_DOWNSAMPLE_METHOD", "lttb")
+
+    # Dataset Parquet layout (services/datasets/parquet_layout.py). Rows are
+    # clustered on the time column + top dimension so row-group min/max
+    # statistics let DuckDB/Polars skip most of the file on filtered scans.
+    # 122880 rows is DuckDB's own row group size (its unit of parallelism).
+    PARQUET_CLUSTERED_LAYOUT: bool = (
+        os.getenv("PARQUET_CLUSTERED_LAYOUT", "true").lower() == "true"
+    )
+    PARQUET_ROW_GROUP_ROWS: int = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "122880"))
 
     # Role-to-model mapping for BYOK auto-pick (per provider)
     # Maps each task role to the best model from a user's available set.
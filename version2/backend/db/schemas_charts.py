@@ -49,6 +49,10 @@ class ChartRenderRequest(BaseModel):
     to_date: Optional[str] = Field(default=None, alias="to", description="End date (ISO 8601, e.g. 2024-12-31)")
     granularity: Optional[str] = Field(default="day", description="Time granularity: hour | day | week | month")
     limit: Optional[int] = Field(default=10000, ge=1, le=100000, description="Max rows returned")
+    trace_encoding: Optional[str] = Field(
+        default="json",
+        description="Trace array encoding: json | bdata (typed base64 buffers, Plotly typed-array spec)",
+    )
 
     class Config(_Config):
         populate_by_name = True  # allow both alias and field name
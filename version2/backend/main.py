@@ -315,6 +315,14 @@ async def shutdown_event():
         await llm_router.http.aclose()
     await close_mongo_connection()
 
+    from services.query.dataset_catalog import dataset_catalog
+
+    dataset_catalog.close_all()
+
+    from services.pipeline.workers import pipeline_workers
+
+    pipeline_workers.shutdown()
+
 
 @app.get("/health", tags=["System"])
 async def health_check():
@@ -32,7 +32,6 @@ from .kpi_types import (
     _COUNT_RE,
     _DATE_FORMATS,
     _ID_RE,
-    _INTEGER_DTYPES,
     _NUMERIC_DTYPES,
     _RATE_RE,
     _TIME_RE,
@@ -187,49 +186,14 @@ class IntelligentKPIGenerator:
         if rows <= self.max_safe_rows:
             return df, False, None
 
-        # Stratified sampling
-        try:
-            cat_col = None
-            for col in df.columns:
-                dtype = df[col].dtype
-                if dtype in (pl.Utf8, pl.Categorical):
-                    n_unique = df[col].n_unique()
-                    if 2 <= n_unique <= min(100, rows // 10):
-                        cat_col = col
-                        break
-                elif dtype in _INTEGER_DTYPES:
-                    n_unique = df[col].n_unique()
-                    if 2 <= n_unique <= min(20, rows // 10):
-                        cat_col = col
-                        break
-
-            if cat_col:
-                n_categories = df[cat_col].n_unique()
-                samples_per_cat = max(self.max_safe_rows // n_categories, 2)
-
-                sampled_frames = []
-                for category in df[cat_col].unique().to_list():
-                    group = df.filter(pl.col(cat_col) == category)
-                    n_to_sample = min(samples_per_cat, len(group))
-                    if n_to_sample > 0:
-                        sampled_frames.append(group.sample(n=n_to_sample, seed=42))
-
-                if sampled_frames:
-                    sampled = pl.concat(sampled_frames)
-                    if len(sampled) < self.max_safe_rows * 0.9:
-                        remaining = self.max_safe_rows - len(sampled)
-                        extra = df.sample(n=min(remaining, len(df)), seed=42)
-                        sampled = pl.concat([sampled, extra])
-                    if len(sampled) > self.max_safe_rows:
-                        sampled = sampled.sample(n=self.max_safe_rows, seed=42)
-                    ratio = round(len(sampled) / rows, 4) if rows > 0 else None
-                    return sampled, True, ratio
-        except Exception as e:
-            logger.debug(f"[KPI] Stratified sampling failed, using random: {e}")
+        # Lazy import: services.datasets pulls in the dataset service stack.
+        from services.datasets.sampling import pick_stratify_column, stratified_sample
 
-        # Random fallback
-        sampled = df.sample(n=self.max_safe_rows, seed=42)
-        ratio = round(self.max_safe_rows / rows, 4) if rows > 0 else None
+        # Equal allocation over the first categorical (or low-cardinality
+        # integer code) column, topped up to about max_safe_rows.
+        cat_col = pick_stratify_column(df, include_integers=True)
+        sampled = stratified_sample(df, self.max_safe_rows, cat_col, allocation="equal", seed=42)
+        ratio = round(len(sampled) / rows, 4) if rows > 0 else None
         return sampled, True, ratio
 
     async def generate_intelligent_kpis(
@@ -407,9 +371,9 @@ class IntelligentKPIGenerator:
                 if is_synthetic:
                     value = profile.primary_value or 0
                 else:
-                    value = _compute_kpi_value(df, profile)
+                    value = _compute_kpi_value(df, profile, dataset_id=dataset_id)
                 comparison = _compute_comparison(df, profile, time_col, comparison_period)
-                sparkline = _compute_sparkline(df, profile, time_col)
+                sparkline = _compute_sparkline(df, profile, time_col, dataset_id=dataset_id)
                 fmt = _infer_format(profile, value)
                 icon = _infer_icon(profile)
                 subtitle = _build_subtitle(profile, len(df), time_col, domain)
@@ -417,7 +381,7 @@ class IntelligentKPIGenerator:
                 delta_dir = comparison["delta_direction"] if comparison else None
                 accent = _compute_accent_color(profile.importance, delta_dir, profile.polarity)
 
-                time_period = _detect_time_period(df, profile, time_col)
+                time_period = _detect_time_period(df, profile, time_col, dataset_id=dataset_id)
                 period_values = time_period.get("period_values", [])
 
                 baseline = _compute_rolling_baseline(period_values, window=3)
@@ -14,6 +14,8 @@ from typing import Any, Dict, List, Optional
 
 import polars as pl
 
+from services.query.rollups import rollup_router
+
 from .kpi_types import (
     _INTEGER_DTYPES,
     _NUMERIC_DTYPES,
@@ -25,8 +27,17 @@ from .kpi_types import (
 logger = logging.getLogger(__name__)
 
 
-def _compute_kpi_value(df: pl.DataFrame, profile: ColumnProfile) -> Any:
+def _compute_kpi_value(
+    df: pl.DataFrame, profile: ColumnProfile, dataset_id: Optional[str] = None
+) -> Any:
     try:
+        # Full-dataset answer from the rollup cube when the aggregation allows it
+        rolled = None
+        if dataset_id and profile.aggregation in ("sum", "mean", "max", "min"):
+            rolled = rollup_router.aggregate(dataset_id, [], profile.name, profile.aggregation)
+        if rolled is not None:
+            return round(float(rolled["value"][0]), 2) if len(rolled) else 0
+
         col = df[profile.name].drop_nulls()
         if len(col) == 0:
             return 0
@@ -46,6 +57,24 @@ def _compute_kpi_value(df: pl.DataFrame, profile: ColumnProfile) -> Any:
         return profile.primary_value or 0
 
 
+def _rollup_monthly(
+    dataset_id: Optional[str], profile: ColumnProfile, time_col: Optional[str]
+) -> Optional[pl.DataFrame]:
+    """Monthly mean of the KPI column from the rollup cube, as sorted ``_d``/``_v``.
+
+    ``None`` unless the cube is bucketed on the same time column.
+    """
+    cube = rollup_router.cube(dataset_id) if dataset_id else None
+    if cube is None or not time_col or cube.spec.time_column != time_col:
+        return None
+    monthly = rollup_router.aggregate(dataset_id, [], profile.name, "mean", time_grain="month")
+    if monthly is None:
+        return None
+    return monthly.select(
+        pl.col(time_col).cast(pl.Date).alias("_d"), pl.col("value").alias("_v")
+    ).sort("_d")
+
+
 def _find_time_column(df: pl.DataFrame) -> Optional[str]:
     for col in df.columns:
         if df[col].dtype in (pl.Date, pl.Datetime):
@@ -221,19 +250,22 @@ def _compute_sparkline(
     profile: ColumnProfile,
     time_col: Optional[str],
     max_points: int = 12,
+    dataset_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     col = profile.name
     try:
         if time_col and time_col in df.columns and df[time_col].dtype in (pl.Date, pl.Datetime):
             try:
-                binned = (
-                    df.sort(time_col)
-                    .with_columns(pl.col(time_col).cast(pl.Date).alias("_d"))
-                    .group_by_dynamic("_d", every="1mo")
-                    .agg(pl.col(col).mean().alias("_v"))
-                    .sort("_d")
-                    .tail(max_points)
-                )
+                binned = _rollup_monthly(dataset_id, profile, time_col)
+                if binned is None:
+                    binned = (
+                        df.sort(time_col)
+                        .with_columns(pl.col(time_col).cast(pl.Date).alias("_d"))
+                        .group_by_dynamic("_d", every="1mo")
+                        .agg(pl.col(col).mean().alias("_v"))
+                        .sort("_d")
+                    )
+                binned = binned.tail(max_points)
                 vals = binned["_v"].drop_nulls().to_list()
                 if len(vals) >= 3:
                     return {"data": [round(v, 2) for v in vals], "type": "time_series"}
@@ -257,7 +289,10 @@ def _compute_accent_color(importance: str, delta_direction: Optional[str], polar
 
 
 def _detect_time_period(
-    df: pl.DataFrame, profile: ColumnProfile, time_col: Optional[str]
+    df: pl.DataFrame,
+    profile: ColumnProfile,
+    time_col: Optional[str],
+    dataset_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     try:
         col = profile.name
@@ -270,13 +305,15 @@ def _detect_time_period(
 
         if time_col and time_col in df.columns and df[time_col].dtype in (pl.Date, pl.Datetime):
             try:
-                sorted_df = clean.sort(time_col)
-                binned = (
-                    sorted_df.with_columns(pl.col(time_col).cast(pl.Date).alias("_d"))
-                    .group_by_dynamic("_d", every="1mo")
-                    .agg(pl.col(col).mean().alias("_v"))
-                    .sort("_d")
-                )
+                binned = _rollup_monthly(dataset_id, profile, time_col)
+                if binned is None:
+                    sorted_df = clean.sort(time_col)
+                    binned = (
+                        sorted_df.with_columns(pl.col(time_col).cast(pl.Date).alias("_d"))
+                        .group_by_dynamic("_d", every="1mo")
+                        .agg(pl.col(col).mean().alias("_v"))
+                        .sort("_d")
+                    )
                 periods = binned.filter(pl.col("_v").is_not_null())
                 if len(periods) < 2:
                     return {}
@@ -5,6 +5,8 @@ Centralized cache services for Signal AI.
 
 Modules:
 - CacheService: General-purpose DataFrame caching (Redis + in-memory LRU)
+- DatasetFrameCache: Dataset frames as memory-mapped Arrow IPC, shared across workers
+- ChartRenderCache: Rendered chart payloads keyed by config + dataset version (memory LRU + Redis)
 - DashboardCacheService: Caches dashboard components (KPIs, charts, insights) in MongoDB
 - ResponseCache: LLM response caching with semantic similarity matching
 - SemanticCache: Query caching with sentence embeddings
@@ -13,6 +15,8 @@ Modules:
 """
 
 from .cache_service import cache_service, CacheService
+from .frame_cache import frame_cache, DatasetFrameCache
+from .chart_render_cache import chart_render_cache, ChartRenderCache
 from .dashboard_cache_service import dashboard_cache_service, DashboardCacheService
 from .response_cache import (
     response_cache,
@@ -33,6 +37,12 @@ __all__ = [
     # CacheService
     "cache_service",
     "CacheService",
+    # DatasetFrameCache
+    "frame_cache",
+    "DatasetFrameCache",
+    # ChartRenderCache
+    "chart_render_cache",
+    "ChartRenderCache",
     # DashboardCacheService
     "dashboard_cache_service",
     "DashboardCacheService",
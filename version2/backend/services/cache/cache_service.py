@@ -5,6 +5,10 @@ Cache Service for Signal AI
 Provides caching layer for DataFrames and other expensive-to-compute data.
 Uses Redis if available, falls back to in-memory LRU cache.
 
+Whole dataset frames go through ``services/cache/frame_cache.py`` instead
+(memory-mapped Arrow IPC shared by every worker); ``invalidate_dataset``
+clears both.
+
 Features:
 - DataFrame serialization/deserialization with Polars
 - TTL-based expiration
@@ -226,8 +230,11 @@ class CacheService:
             return False
     
     async def invalidate_dataset(self, dataset_id: str) -> None:
-        """Invalidate all cached data for a dataset."""
+        """Invalidate all cached data for a dataset, including mapped frames."""
+        from services.cache.frame_cache import frame_cache
+
         await self.delete(f"df:{dataset_id}")
+        frame_cache.invalidate(dataset_id)
         logger.info(f"Invalidated cache for dataset {dataset_id}")
     
     def stats(self) -> dict:
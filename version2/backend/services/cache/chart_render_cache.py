@@ -0,0 +1,289 @@
+"""
+Chart Render Cache — Hydrated chart payloads keyed by config and dataset version
+================================================================================
+Every render request used to reload the dataset frame and re-hydrate each
+chart from scratch, even when the same dashboard had just been drawn for
+another tab or another user. ``ChartConfigCache`` only remembers which
+charts to recommend, not what they look like.
+
+This cache stores the finished payload (traces, layout, metadata) of each
+render. On a hit the route skips both the frame load and hydration; a
+dashboard whose charts all hit never touches the dataset file.
+
+Keys
+----
+``chartrender:<sha256>`` over the canonical JSON (sorted keys) of:
+
+- **config** — the chart config as the route passes it to the renderer,
+  minus identity keys (``id``, ``user_id``, ``dataset_id`` …) that don't
+  change what is drawn. Two users' copies of one shared chart share a key.
+- **theme** — ``light`` / ``dark``.
+- **source + version** — the dataset's canonical file and its size/mtime
+  version (:func:`services.cache.frame_cache.source_version`). Mutations
+  and re-imports rewrite the file, so stale payloads are never reachable
+  and simply age out. Datasets read from S3 have no local version and
+  bypass the cache.
+- **scope** — whatever else the route rendered against: row cap,
+  cross-filters, preview mode.
+
+Tiers
+-----
+1. In-process LRU of the payload's JSON bytes, bounded in **bytes** by
+   ``CHART_RENDER_CACHE_MAX_BYTES``. A payload larger than a quarter of
+   the budget is not admitted. Hits decode a private copy, so callers may
+   mutate what they get back.
+2. Redis (``CHART_RENDER_CACHE_REDIS_URL``, optional), shared by every
+   worker and host, entries expire after ``CHART_RENDER_CACHE_TTL``. Hits
+   are promoted into the memory tier. Connection errors switch the tier
+   off for a minute instead of slowing every request.
+
+Usage
+-----
+    from services.cache.chart_render_cache import chart_render_cache
+
+    key = chart_render_cache.key(config, theme, dataset, scope={"limit": 5000})
+    payload = await chart_render_cache.get(key)
+    if payload is None:
+        payload = await chart_render_service.render_chart(df, config, theme)
+        await chart_render_cache.set(key, payload)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from services.cache.frame_cache import source_version
+from services.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "chartrender:"
+_REDIS_RETRY_SECONDS = 60.0
+
+# Config keys that identify a chart (or its owner) rather than describe it.
+_IDENTITY_KEYS = frozenset(
+    {"id", "_id", "user_id", "dataset_id", "workspace_id", "created_at", "updated_at"}
+)
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback for payload values (dates, NumPy scalars/arrays)."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+
+
+def dataset_version(dataset: Optional[Dict[str, Any]]) -> Optional[str]:
+    """``<path>@<version>`` of the file a dataset's renders are read from.
+
+    Mirrors the file choice of :func:`services.datasets.dataset_handle.open_dataset`
+    (pipeline Parquet, then the raw upload). ``None`` — don't cache — when
+    the dataset is read from S3 or has no file on disk.
+    """
+    if not dataset:
+        return None
+    if settings.S3_ENABLED and dataset.get("s3_parquet_key"):
+        return None
+    for field in ("parquet_path", "file_path"):
+        path = dataset.get(field)
+        if path and Path(path).exists():
+            version = source_version(str(path))
+            return f"{path}@{version}" if version else None
+    return None
+
+
+class _PayloadLRU:
+    """Thread-safe LRU of encoded payloads, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes // 4:
+            return
+        evicted = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, dropped = self._entries.popitem(last=False)
+                self.current_bytes -= len(dropped)
+                evicted += 1
+        if evicted:
+            metrics.incr("chart_render_cache_evictions_total", evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+class ChartRenderCache:
+    """Two-tier (memory LRU + optional Redis) cache of rendered chart payloads."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None,
+    ):
+        self._memory = _PayloadLRU(
+            settings.CHART_RENDER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.redis_url = settings.CHART_RENDER_CACHE_REDIS_URL if redis_url is None else redis_url
+        self.ttl = settings.CHART_RENDER_CACHE_TTL if ttl is None else ttl
+        self._redis = None
+        self._redis_down_until = 0.0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def key(
+        self,
+        chart_config: Dict[str, Any],
+        theme: str,
+        dataset: Optional[Dict[str, Any]],
+        scope: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """Cache key of one render, or ``None`` if the dataset can't be versioned."""
+        version = dataset_version(dataset)
+        if version is None:
+            return None
+        canonical = json.dumps(
+            {
+                "config": {k: v for k, v in chart_config.items() if k not in _IDENTITY_KEYS},
+                "theme": theme,
+                "dataset": version,
+                "scope": scope or {},
+            },
+            sort_keys=True,
+            default=str,
+            separators=(",", ":"),
+        )
+        return _KEY_PREFIX + hashlib.sha256(canonical.encode()).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    def _redis_client(self):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+
+                self._redis = aioredis.from_url(
+                    self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+                )
+            except ImportError:
+                logger.warning("[RenderCache] redis package not installed, memory tier only")
+                self.redis_url = None
+                return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"[RenderCache] Redis unavailable, memory tier only for now: {e}")
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_SECONDS
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached payload for ``key`` (a fresh copy), or ``None``."""
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: List[Optional[str]]) -> List[Optional[Dict[str, Any]]]:
+        """Cached payloads for ``keys``, in order (one Redis round trip for
+        everything the memory tier misses)."""
+        found: List[Optional[bytes]] = [
+            self._memory.get(key) if key else None for key in keys
+        ]
+        hits = sum(data is not None for data in found)
+        if hits:
+            metrics.incr("chart_render_cache_memory_hits_total", hits)
+
+        missing = [i for i, key in enumerate(keys) if key and found[i] is None]
+        client = self._redis_client() if missing else None
+        if client is not None:
+            try:
+                remote = await client.mget([keys[i] for i in missing])
+            except Exception as e:
+                self._redis_failed(e)
+                remote = []
+            for i, data in zip(missing, remote):
+                if data is not None:
+                    found[i] = data
+                    self._memory.set(keys[i], data)
+                    metrics.incr("chart_render_cache_redis_hits_total")
+
+        misses = sum(1 for key, data in zip(keys, found) if key and data is None)
+        if misses:
+            metrics.incr("chart_render_cache_misses_total", misses)
+        return [json.loads(data) if data is not None else None for data in found]
+
+    async def set(self, key: Optional[str], payload: Dict[str, Any]) -> None:
+        """Store a rendered payload in both tiers (no-op without a key)."""
+        if not key:
+            return
+        try:
+            data = _encode(payload)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"[RenderCache] payload not cacheable: {e}")
+            return
+        self._memory.set(key, data)
+        client = self._redis_client()
+        if client is not None:
+            try:
+                await client.set(key, data, ex=self.ttl)
+            except Exception as e:
+                self._redis_failed(e)
+        logger.debug(f"[RenderCache] SET {key[len(_KEY_PREFIX):][:12]} ({len(data):,} bytes)")
+
+    def clear(self) -> None:
+        """Drop this process's memory tier (Redis entries expire via TTL)."""
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._memory),
+            "bytes": self._memory.current_bytes,
+            "max_bytes": self._memory.max_bytes,
+            "redis": bool(self.redis_url),
+        }
+
+
+# Singleton instance
+chart_render_cache = ChartRenderCache()
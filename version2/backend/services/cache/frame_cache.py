@@ -0,0 +1,225 @@
+"""
+Frame Cache — Memory-mapped dataset frames shared by every worker
+=================================================================
+Dataset frames used to be cached by ``CacheService.set_dataframe``, which
+``pickle.dumps`` the whole frame into Redis or into the per-process LRU.
+Every hit paid a full deserialisation and a private copy of the data in
+each uvicorn worker. The QUIS loader also built a new ``CacheService()``
+per call, so its in-memory tier never hit.
+
+This cache writes each frame once, as an uncompressed Arrow IPC file.
+Hits are ``pl.read_ipc(..., memory_map=True)``: the columns point into
+the mapped file, so a hit costs milliseconds regardless of size. Every
+worker on the host maps the same OS page-cache pages instead of holding
+its own copy.
+
+Layout
+------
+``<DATASET_FRAME_CACHE_DIR>/<dataset_id>.<variant>.<version>.arrow``
+
+- **variant** — hash of a caller-chosen tag, for frames derived from the
+  dataset (e.g. the per-tenant QUIS sample). ``base`` for the dataset
+  itself.
+- **version** — size and mtime of the source file (the dataset Parquet).
+  A mutation or re-import rewrites that file, so the next lookup misses
+  and the stale version is removed when the new one is written.
+  :meth:`DatasetFrameCache.invalidate` drops a dataset's entries eagerly.
+
+Files are written to a temp name and renamed into place, so a reader
+never maps a partial file. Deleting a file another worker has mapped is
+safe — the pages live until that worker drops the frame.
+
+Eviction
+--------
+The directory is bounded in **bytes** by
+``DATASET_FRAME_CACHE_MAX_BYTES``. Hits touch the file's mtime; after
+each write the least recently used files are removed until the total
+fits. A frame larger than half the budget is not cached.
+
+Usage
+-----
+    from services.cache.frame_cache import frame_cache
+
+    df = frame_cache.get(dataset_id, parquet_path)
+    if df is None:
+        df = pl.read_parquet(parquet_path)
+        frame_cache.put(dataset_id, parquet_path, df)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+
+from core.config import settings
+from services.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".arrow"
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _variant_tag(variant: str) -> str:
+    if not variant:
+        return "base"
+    return hashlib.sha1(variant.encode()).hexdigest()[:12]
+
+
+def source_version(source_path: str) -> Optional[str]:
+    """Version of the file a frame was read from (``None`` if it is gone)."""
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        return None
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+class DatasetFrameCache:
+    """Byte-bounded, version-keyed Arrow IPC cache of dataset frames."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.DATASET_FRAME_CACHE_DIR)
+        self.max_bytes = (
+            settings.DATASET_FRAME_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        # Serialises eviction within this process; across workers the
+        # operations are all idempotent file renames/unlinks.
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _prefix(self, dataset_id: str, variant: str = "") -> str:
+        return f"{_UNSAFE.sub('_', dataset_id)}.{_variant_tag(variant)}."
+
+    def _path(self, dataset_id: str, variant: str, version: str) -> Path:
+        return self.directory / f"{self._prefix(dataset_id, variant)}{version}{_SUFFIX}"
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Lookup / store
+    # ─────────────────────────────────────────────────────────────────────
+
+    def get(self, dataset_id: str, source_path: str, variant: str = "") -> Optional[pl.DataFrame]:
+        """Map the cached frame for the current version of *source_path*."""
+        if not self.enabled:
+            return None
+        version = source_version(source_path)
+        if version is None:
+            return None
+        path = self._path(dataset_id, variant, version)
+        try:
+            df = pl.read_ipc(path, memory_map=True)
+        except FileNotFoundError:
+            metrics.incr("frame_cache_misses_total")
+            return None
+        except Exception as e:
+            logger.warning("[FrameCache] Unreadable entry %s (%s) — dropping", path.name, e)
+            path.unlink(missing_ok=True)
+            metrics.incr("frame_cache_misses_total")
+            return None
+        try:
+            os.utime(path)  # LRU recency, visible to every worker
+        except OSError:
+            pass
+        metrics.incr("frame_cache_hits_total")
+        return df
+
+    def put(self, dataset_id: str, source_path: str, df: pl.DataFrame, variant: str = "") -> bool:
+        """Cache *df* as read from the current version of *source_path*."""
+        if not self.enabled:
+            return False
+        version = source_version(source_path)
+        if version is None:
+            return False
+        size = df.estimated_size()
+        if size > self.max_bytes // 2:
+            logger.info(
+                "[FrameCache] %s not cached: %.1f MB exceeds half the budget",
+                dataset_id,
+                size / (1024 * 1024),
+            )
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(dataset_id, variant, version)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            # Uncompressed: compressed IPC buffers cannot be memory-mapped.
+            # One record batch: read_ipc rechunks (copies) multi-batch files.
+            df.rechunk().write_ipc(tmp, compression="uncompressed")
+            os.replace(tmp, path)
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning("[FrameCache] Write failed for %s: %s", dataset_id, e)
+            return False
+
+        # Older versions of the same frame are unreachable now.
+        for stale in self.directory.glob(f"{self._prefix(dataset_id, variant)}*{_SUFFIX}"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        self._evict()
+        return True
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Invalidation / eviction
+    # ─────────────────────────────────────────────────────────────────────
+
+    def invalidate(self, dataset_id: str) -> int:
+        """Remove every cached frame (all variants, all versions) of a dataset."""
+        if not self.directory.exists():
+            return 0
+        removed = 0
+        for path in self.directory.glob(f"{_UNSAFE.sub('_', dataset_id)}.*{_SUFFIX}"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        if removed:
+            metrics.incr("frame_cache_invalidations_total")
+        return removed
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # evicted by another worker
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+        if evicted:
+            metrics.incr("frame_cache_evictions_total", evicted)
+            logger.debug("[FrameCache] Evicted %d frames", evicted)
+
+    def stats(self) -> dict:
+        entries = self._entries() if self.directory.exists() else []
+        return {
+            "directory": str(self.directory),
+            "items": len(entries),
+            "size_mb": sum(size for _, size, _ in entries) / (1024 * 1024),
+            "max_size_mb": self.max_bytes / (1024 * 1024),
+        }
+
+
+# Module-level singleton
+frame_cache = DatasetFrameCache()
@@ -0,0 +1,179 @@
+"""
+Shared Aggregation Plan
+=======================
+Batches the group-by aggregations a dashboard's charts need into one Polars
+``collect_all``.
+
+A dashboard renders many charts over the same frame, and most of them are a
+single ``group_by(x).agg(f(y))`` — often the same one twice (a bar and a pie
+of revenue by region). ``AggregationPlan`` collects those requests up front,
+deduplicates them, merges every aggregation of the same ``x × y`` pair into
+one group-by, and runs all the group-bys as one batch of lazy queries on the
+Polars thread pool. The per-column statistics every chart recomputes over
+the same frame — row counts per x for point intelligence, cardinalities for
+semantic types — ride along in the same batch.
+
+While the plan is active, ``hydrate._safe_aggregate`` and those consumers
+answer from it instead of recomputing, so the handlers themselves are
+unchanged; anything the plan didn't cover is computed exactly as before.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import polars as pl
+
+from db.schemas_dashboard import AggregationType
+
+logger = logging.getLogger(__name__)
+
+_active_plan: ContextVar[Optional["AggregationPlan"]] = ContextVar(
+    "aggregation_plan", default=None
+)
+
+
+def aggregation_expr(value_col: str, agg: AggregationType) -> pl.Expr:
+    """The Polars expression for one chart aggregation of ``value_col``."""
+    if agg == AggregationType.COUNT:
+        return pl.count()
+    if agg == AggregationType.SUM:
+        return pl.sum(value_col)
+    if agg == AggregationType.MEAN:
+        return pl.mean(value_col)
+    if agg == AggregationType.MEDIAN:
+        return pl.median(value_col)
+    if agg == AggregationType.STD:
+        return pl.std(value_col)
+    if agg == AggregationType.PERCENTILE_25:
+        return pl.col(value_col).quantile(0.25)
+    if agg == AggregationType.PERCENTILE_75:
+        return pl.col(value_col).quantile(0.75)
+    if agg == AggregationType.MAX:
+        return pl.max(value_col)
+    if agg == AggregationType.MIN:
+        return pl.min(value_col)
+    if agg == AggregationType.NUNIQUE:
+        return pl.n_unique(value_col)
+    return pl.first(value_col)
+
+
+class AggregationPlan:
+    """Deduplicated, batched ``(x, y, agg)`` aggregations over one frame.
+
+    Results have the shape ``_safe_aggregate`` builds before sorting: one row
+    per non-null ``x`` with columns ``x`` and ``y``, over the rows where both
+    ``x`` and ``y`` are non-null.
+    """
+
+    def __init__(self, frame: pl.DataFrame):
+        self.frame = frame
+        self._requested: Dict[Tuple[str, str], List[str]] = {}
+        self._results: Dict[Tuple[str, str, str], pl.DataFrame] = {}
+        self._row_count_cols: Dict[str, Optional[pl.DataFrame]] = {}
+        self._distinct_cols: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(aggs) for aggs in self._requested.values())
+
+    def add(self, group_col: str, value_col: str, agg: AggregationType) -> None:
+        aggs = self._requested.setdefault((group_col, value_col), [])
+        agg = getattr(agg, "value", agg)
+        if agg not in aggs:
+            aggs.append(agg)
+
+    def add_row_counts(self, col: str) -> None:
+        """Plan ``frame.group_by(col).len()``."""
+        self._row_count_cols.setdefault(col, None)
+
+    def add_distinct_counts(self, cols: Iterable[str]) -> None:
+        """Plan ``frame[col].n_unique()`` for each column."""
+        for col in cols:
+            self._distinct_cols.setdefault(col, None)
+
+    def collect(self) -> None:
+        """Run every planned query in one ``collect_all``.
+
+        On failure the plan stays empty and each chart aggregates on its own.
+        """
+        pairs = list(self._requested.items())
+        count_cols = list(self._row_count_cols)
+        distinct_cols = list(self._distinct_cols)
+        lazy = self.frame.lazy()
+        queries = [
+            lazy.filter(pl.col(x).is_not_null() & pl.col(y).is_not_null())
+            .group_by(x)
+            .agg([aggregation_expr(y, agg).alias(f"_agg{i}") for i, agg in enumerate(aggs)])
+            for (x, y), aggs in pairs
+        ]
+        queries += [lazy.group_by(col).len() for col in count_cols]
+        if distinct_cols:
+            queries.append(lazy.select(pl.col(col).n_unique() for col in distinct_cols))
+        if not queries:
+            return
+        try:
+            frames = pl.collect_all(queries)
+        except Exception as e:
+            logger.warning(f"[AggPlan] batched aggregation failed, charts aggregate alone: {e}")
+            return
+
+        for ((x, y), aggs), frame in zip(pairs, frames):
+            for i, agg in enumerate(aggs):
+                self._results[(x, y, agg)] = frame.select(
+                    pl.col(x).alias("x"), pl.col(f"_agg{i}").alias("y")
+                )
+        for col, frame in zip(count_cols, frames[len(pairs):]):
+            self._row_count_cols[col] = frame
+        if distinct_cols:
+            self._distinct_cols.update(frames[-1].row(0, named=True))
+        logger.info(
+            f"[AggPlan] {len(self)} aggregation(s) in {len(pairs)} group-by(s), "
+            f"{len(count_cols)} row count(s), {len(distinct_cols)} distinct count(s) "
+            f"in one batch over {len(self.frame)} rows"
+        )
+
+    def lookup(
+        self, df: pl.DataFrame, group_col: str, value_col: str, agg: AggregationType
+    ) -> Optional[pl.DataFrame]:
+        """The planned result, or ``None`` if ``df`` isn't the planned frame
+        (a handler filtered, binned or sorted it) or the aggregation wasn't
+        planned."""
+        if df is not self.frame:
+            return None
+        return self._results.get((group_col, value_col, getattr(agg, "value", agg)))
+
+    def row_counts(self, df: pl.DataFrame, col: str) -> Optional[pl.DataFrame]:
+        return self._row_count_cols.get(col) if df is self.frame else None
+
+    def n_unique(self, df: pl.DataFrame, col: str) -> Optional[int]:
+        return self._distinct_cols.get(col) if df is self.frame else None
+
+    @contextmanager
+    def active(self) -> Iterator["AggregationPlan"]:
+        """Make this plan visible to the ``planned_*`` lookups in this context."""
+        token = _active_plan.set(self)
+        try:
+            yield self
+        finally:
+            _active_plan.reset(token)
+
+
+def planned_aggregate(
+    df: pl.DataFrame, group_col: str, value_col: str, agg: AggregationType
+) -> Optional[pl.DataFrame]:
+    """The active plan's result for this aggregation, if it has one."""
+    plan = _active_plan.get()
+    return plan.lookup(df, group_col, value_col, agg) if plan is not None else None
+
+
+def planned_row_counts(df: pl.DataFrame, col: str) -> Optional[pl.DataFrame]:
+    """The active plan's ``df.group_by(col).len()``, if it has one."""
+    plan = _active_plan.get()
+    return plan.row_counts(df, col) if plan is not None else None
+
+
+def planned_n_unique(df: pl.DataFrame, col: str) -> Optional[int]:
+    """The active plan's ``df[col].n_unique()``, if it has one."""
+    plan = _active_plan.get()
+    return plan.n_unique(df, col) if plan is not None else None
@@ -19,7 +19,7 @@ Version: 2.1 (Production + Intelligence)
 import logging
 import asyncio
 import math
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 import polars as pl
 
@@ -28,13 +28,17 @@ from services.charts.hydrate import (
     hydrate_chart,
     HydrationError,
     aggregate_sampling_metadata,
+    plan_chart_aggregations,
 )
+from services.charts.aggregation_plan import AggregationPlan, planned_row_counts
 from services.charts.semantic_types import (
     infer_semantic_types,
     apply_auto_layout,
+    semantic_columns,
 )
-from db.schemas_dashboard import ChartConfig, ChartType, ComponentType
+from db.schemas_dashboard import AggregationType, ChartConfig, ChartType, ComponentType
 from services.datasets.enhanced_dataset_service import enhanced_dataset_service
+from services.query.rollups import rollup_router
 
 logger = logging.getLogger(__name__)
 
@@ -151,7 +155,9 @@ class ChartRenderService:
             record_counts = {}
             try:
                 if x_col in df.columns:
-                    counts = df.group_by(x_col).len()
+                    counts = planned_row_counts(df, x_col)
+                    if counts is None:
+                        counts = df.group_by(x_col).len()
                     for row in counts.iter_rows():
                         record_counts[str(row[0])] = row[1]
             except Exception:
@@ -651,20 +657,105 @@ class ChartRenderService:
 
         return " · ".join(parts)
 
+    # Single-series chart types whose only aggregation is
+    # ``_safe_aggregate(df, x, y, agg)`` — answerable from a rollup cube.
+    ROLLUP_CHART_TYPES = {"bar", "line", "area", "pie", "donut"}
+
+    def _rollup_frame(
+        self,
+        dataset_id: Optional[str],
+        config: ChartConfig,
+        chart_config: Dict[str, Any],
+        loaded_rows: Optional[int] = None,
+    ) -> Optional[Tuple[pl.DataFrame, ChartConfig, int]]:
+        """Pre-aggregated stand-in for the chart's DataFrame, from the rollup cube.
+
+        Returns ``(frame, config, source_rows)`` where ``frame`` has one row
+        per x value with ``y`` already aggregated over the whole dataset, and
+        ``config`` re-applies cleanly to single rows (COUNT becomes SUM of the
+        counts). ``None`` when the chart can't be answered exactly — filtered
+        or date-ranged charts, multi-series charts, non-re-aggregable
+        aggregations, columns the cube doesn't hold, or a caller frame of
+        ``loaded_rows`` that was capped below the dataset's row count (the
+        cube covers every row, the capped frame doesn't).
+        """
+        # ``granularity`` is not in the list: hydration never reads it, and
+        # /render sends one ("day") with every chart.
+        if not dataset_id or any(chart_config.get(key) for key in ("filters", "from", "to")):
+            return None
+        chart_type = getattr(config.chart_type, "value", config.chart_type)
+        if chart_type not in self.ROLLUP_CHART_TYPES or config.group_by or len(config.columns) != 2:
+            return None
+
+        x, y = config.columns
+        agg = getattr(config.aggregation, "value", config.aggregation)
+        cube = rollup_router.cube(dataset_id)
+        if cube is None or x == y or agg not in ("sum", "count", "mean", "min", "max"):
+            return None
+        if loaded_rows is not None and loaded_rows < cube.source_rows:
+            return None
+        # A numeric x may be auto-binned by the handler, which re-aggregates
+        # the pre-aggregated rows — fine for SUM/MIN/MAX, wrong for MEAN.
+        if agg == "mean" and x in cube.frame.columns and cube.frame.schema[x].is_numeric():
+            return None
+
+        grouped = rollup_router.aggregate(dataset_id, [x], y, agg)
+        if grouped is None:
+            return None
+        if agg == "count":
+            config = config.model_copy(update={"aggregation": AggregationType.SUM})
+        return grouped.rename({"value": y}), config, cube.source_rows
+
     async def render_chart(
-        self, df: pl.DataFrame, chart_config: Dict[str, Any], theme: str = "light"
+        self,
+        df: pl.DataFrame,
+        chart_config: Dict[str, Any],
+        theme: str = "light",
+        dataset_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Main rendering method: DataFrame + config → Plotly chart.
 
+        Hydration and rendering are CPU-bound, so they run in a worker
+        thread rather than on the event loop.
+
         Args:
             df: Polars DataFrame with data
             chart_config: Chart configuration dict
             theme: Visual theme ("light" or "dark")
+            dataset_id: Dataset the (unfiltered) ``df`` was loaded from. When
+                given, compatible charts hydrate from the dataset's rollup
+                cube instead of re-aggregating ``df``.
 
         Returns:
             Dict with Plotly chart data, layout, and metadata
         """
+        return await asyncio.to_thread(
+            self._render_chart_sync, df, chart_config, theme, dataset_id
+        )
+
+    def _prepare_chart(
+        self,
+        chart_config: Dict[str, Any],
+        dataset_id: Optional[str],
+        loaded_rows: Optional[int] = None,
+    ) -> Tuple[ChartConfig, Optional[Tuple[pl.DataFrame, ChartConfig, int]]]:
+        """Parse a chart config and route it to the rollup cube if it can be."""
+        if not chart_config:
+            raise ValueError("Chart config is required")
+        config = self._parse_config(chart_config)
+        return config, self._rollup_frame(dataset_id, config, chart_config, loaded_rows)
+
+    def _render_chart_sync(
+        self,
+        df: pl.DataFrame,
+        chart_config: Dict[str, Any],
+        theme: str = "light",
+        dataset_id: Optional[str] = None,
+        prepared: Optional[Tuple[ChartConfig, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Synchronous body of ``render_chart``; ``prepared`` is a
+        ``_prepare_chart`` result computed ahead of time."""
         start_time = datetime.now(timezone.utc).replace(tzinfo=None)
 
         try:
@@ -672,14 +763,9 @@ class ChartRenderService:
             if df is None or df.is_empty():
                 raise ValueError("DataFrame is empty")
 
-            if not chart_config:
-                raise ValueError("Chart config is required")
-
-            # Parse chart config
-            config = self._parse_config(chart_config)
-
-            # Validate config against DataFrame (now permissive - no longer raises)
-            # Validation is now handled inside hydrate_chart with graceful degradation
+            # Parse chart config (validation against the DataFrame is
+            # permissive and happens inside hydrate_chart)
+            config, routed = prepared or self._prepare_chart(chart_config, dataset_id, len(df))
 
             # Handle both string and enum types for chart_type
             chart_type_str = (
@@ -688,9 +774,15 @@ class ChartRenderService:
                 else config.chart_type
             )
 
-            # Hydrate: DataFrame → Plotly traces
+            # Hydrate: DataFrame → Plotly traces (from the rollup cube when
+            # the chart's aggregation can be answered from it exactly)
             logger.info(f"Hydrating {chart_type_str} chart...")
-            traces, rows_used = hydrate_chart(df, config)
+            if routed is not None:
+                rollup_df, rollup_config, source_rows = routed
+                traces, _ = hydrate_chart(rollup_df, rollup_config)
+                rows_used = source_rows
+            else:
+                traces, rows_used = hydrate_chart(df, config)
 
             if not traces:
                 raise HydrationError("No traces generated")
@@ -713,6 +805,7 @@ class ChartRenderService:
                 "columns": config.columns,
                 "chart_type": chart_type_str,
                 "render_time_ms": (datetime.now(timezone.utc).replace(tzinfo=None) - start_time).total_seconds() * 1000,
+                "rollup": routed is not None,
             }
 
             # ── Honest sampling metadata ──
@@ -806,7 +899,7 @@ class ChartRenderService:
             df = await enhanced_dataset_service.load_dataset_data(ds_id, user_id)
 
             # Now render the chart with the loaded dataframe
-            return await self.render_chart(df, chart_config)  # ← was: render_chart(df, config)
+            return await self.render_chart(df, chart_config, dataset_id=ds_id)
 
         except Exception as e:
             logger.error(f"✗ Failed to render chart from config: {e}")
@@ -817,23 +910,21 @@ class ChartRenderService:
         df: pl.DataFrame,
         chart_configs: List[Dict[str, Any]],
         theme: str = "light",
+        dataset_id: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Render multiple charts in parallel.
+        Render multiple charts with one shared aggregation pass.
 
         Args:
             df: Polars DataFrame
             chart_configs: List of chart configurations
             theme: Visual theme
+            dataset_id: Dataset ``df`` was loaded from (enables rollup routing)
 
         Returns:
-            List of rendered charts
+            List of rendered charts (failed charts are dropped)
         """
-        logger.info(f"Rendering {len(chart_configs)} charts in parallel...")
-
-        tasks = [self.render_chart(df, config, theme) for config in chart_configs]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await self.render_dashboard(df, chart_configs, theme, dataset_id)
 
         # Filter out errors
         charts = []
@@ -846,6 +937,96 @@ class ChartRenderService:
         logger.info(f"✓ Rendered {len(charts)}/{len(chart_configs)} charts successfully")
         return charts
 
+    async def render_dashboard(
+        self,
+        df: pl.DataFrame,
+        chart_configs: List[Dict[str, Any]],
+        theme: str = "light",
+        dataset_id: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Render every chart of a dashboard over one frame, off the event loop.
+
+        The group-by aggregations all the charts need are planned together,
+        deduplicated (a bar and a pie of the same x × y × agg share one) and
+        run as a single batch of lazy queries with ``pl.collect_all``; the
+        per-type hydrators then pick their results up from the plan. The
+        whole batch runs in one worker thread, so a dashboard costs about
+        its distinct aggregations rather than one full pass per chart.
+
+        Returns:
+            One entry per config, in order: the rendered chart, or the
+            exception that chart raised.
+        """
+        logger.info(f"Rendering {len(chart_configs)} charts with a shared aggregation plan...")
+        return await asyncio.to_thread(
+            self._render_dashboard_sync, df, chart_configs, theme, dataset_id
+        )
+
+    def _render_dashboard_sync(
+        self,
+        df: pl.DataFrame,
+        chart_configs: List[Dict[str, Any]],
+        theme: str,
+        dataset_id: Optional[str],
+    ) -> List[Any]:
+        plan = AggregationPlan(df)
+        prepared: List[Any] = []
+        for chart_config in chart_configs:
+            try:
+                config, routed = self._prepare_chart(
+                    chart_config, dataset_id, len(df) if df is not None else None
+                )
+            except Exception as e:
+                prepared.append(e)
+                continue
+            prepared.append((config, routed))
+            if df is not None and not df.is_empty():
+                try:
+                    self._plan_chart(plan, df, config, chart_config, routed is None)
+                except Exception as e:
+                    logger.debug(f"Aggregation planning skipped for one chart: {e}")
+        plan.collect()
+
+        results: List[Any] = []
+        with plan.active():
+            for chart_config, ready in zip(chart_configs, prepared):
+                if isinstance(ready, Exception):
+                    self._error_count += 1
+                    results.append(ready)
+                    continue
+                try:
+                    results.append(
+                        self._render_chart_sync(
+                            df, chart_config, theme, dataset_id, prepared=ready
+                        )
+                    )
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    def _plan_chart(
+        self,
+        plan: AggregationPlan,
+        df: pl.DataFrame,
+        config: ChartConfig,
+        chart_config: Dict[str, Any],
+        hydrates_from_df: bool,
+    ) -> None:
+        """Add what rendering this chart computes over ``df`` to ``plan``:
+        the hydrator's aggregations (unless the chart hydrates from the
+        rollup cube), point-intelligence record counts and the semantic-type
+        cardinalities."""
+        if hydrates_from_df:
+            for x, y, agg in plan_chart_aggregations(df, config):
+                plan.add(x, y, agg)
+        columns = chart_config.get("columns") or []
+        if len(columns) >= 2 and columns[0] in df.columns:
+            plan.add_row_counts(columns[0])
+        plan.add_distinct_counts(
+            c for c in semantic_columns(chart_config) if isinstance(c, str) and c in df.columns
+        )
+
     def _normalize_chart_type(self, chart_type_str: str) -> str:
         """
         Normalize chart type names from various formats to valid ChartType values.
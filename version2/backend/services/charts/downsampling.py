@@ -0,0 +1,118 @@
+"""
+Series Downsampling
+===================
+Vectorised point selection for long line/area series, straight from Polars
+Series buffers (no ``to_list()``):
+
+- LTTB (Largest-Triangle-Three-Buckets) — keeps the point per bucket that
+  forms the largest triangle with the previously kept point and the next
+  bucket's average. Preserves the visual shape of the series.
+- M4 — keeps the first, last, minimum and maximum point of each x-range
+  bucket, so the drawn min/max envelope is exact at the chart's resolution.
+
+Both return the sorted positions of the kept points; callers gather rows by
+position, so x/y values and dtypes come through untouched.
+"""
+
+from typing import Any, Sequence
+
+import numpy as np
+import polars as pl
+
+
+def x_coordinates(x: pl.Series) -> np.ndarray:
+    """Float64 coordinates for the triangle/bucket geometry of ``x``.
+
+    Numeric and temporal columns use their (physical) values; anything that
+    is not numeric — category labels, date strings — falls back to the
+    point's position, which keeps the order and a valid geometry.
+    """
+    if x.dtype.is_numeric() or x.dtype.is_temporal():
+        coords = x.to_physical().cast(pl.Float64)
+        if coords.null_count() == 0:
+            return coords.to_numpy()
+    elif x.dtype == pl.Utf8:
+        coords = x.cast(pl.Float64, strict=False)
+        if coords.null_count() == 0:
+            return coords.to_numpy()
+    return np.arange(len(x), dtype=np.float64)
+
+
+def y_values(y: pl.Series) -> np.ndarray:
+    """Float64 ``y`` with gaps filled from the neighbouring points (geometry only)."""
+    y = y.cast(pl.Float64)
+    if y.null_count() or y.is_nan().any():
+        y = y.fill_nan(None).fill_null(strategy="forward").fill_null(strategy="backward")
+    return y.fill_null(0.0).to_numpy()
+
+
+def list_coordinates(x: Sequence[Any]) -> np.ndarray:
+    """``x_coordinates`` for a plain list (dates, datetimes and labels → position)."""
+    try:
+        return np.asarray(x, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(x), dtype=np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions of the ``threshold`` points LTTB keeps.
+
+    The bucket bounds and next-bucket averages are computed for all buckets
+    at once; only the pick itself, which depends on the previous pick, walks
+    the buckets — over NumPy slices, not Python values.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3 or n < 3:
+        return np.arange(n)
+
+    # Bucket i spans [edges[i], edges[i + 1]); the first and last points
+    # are always kept, so the final bucket's neighbour is the last point.
+    every = (n - 2) / (threshold - 2)
+    edges = np.minimum((np.arange(threshold) * every).astype(np.int64) + 1, n)
+
+    # Average of every bucket after the first — the "next bucket" of each
+    # bucket the loop picks from.
+    counts = np.diff(edges[1:])
+    avg_x = np.add.reduceat(x[: edges[-1]], edges[1:-1]) / counts
+    avg_y = np.add.reduceat(y[: edges[-1]], edges[1:-1]) / counts
+
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[i] - ay))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
+
+
+def m4_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions of the first/last/min/max point of ``threshold // 4``
+    equal-width x buckets (index buckets when ``x`` is not ascending)."""
+    n = len(x)
+    width = threshold // 4
+    if threshold >= n or width < 1:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span > 0 and np.all(x[1:] >= x[:-1]):
+        buckets = np.minimum(((x - x[0]) * (width / span)).astype(np.int64), width - 1)
+    else:
+        buckets = np.arange(n) * width // n
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    ends = np.append(starts[1:], n)
+
+    position = np.arange(n)
+    lows = np.repeat(np.minimum.reduceat(y, starts), ends - starts)
+    highs = np.repeat(np.maximum.reduceat(y, starts), ends - starts)
+    first_low = np.minimum.reduceat(np.where(y == lows, position, n), starts)
+    first_high = np.minimum.reduceat(np.where(y == highs, position, n), starts)
+    return np.unique(np.concatenate([starts, ends - 1, first_low, first_high]))
+
+
+def downsample_indices(x: pl.Series, y: pl.Series, threshold: int, method: str = "lttb") -> np.ndarray:
+    """Positions of the points to keep from an (x, y) series pair."""
+    pick = m4_indices if method == "m4" else lttb_indices
+    return pick(x_coordinates(x), y_values(y), threshold)
@@ -10,7 +10,6 @@ Unified Chart Hydration Service — Production Version 2.0
 
 import polars as pl
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Any, Tuple
 import logging
 import time
@@ -24,6 +23,9 @@ from db.schemas_dashboard import (
     TableConfig,
 )
 from services.charts.chart_definitions import CHART_DEFINITIONS_BY_ID
+from services.charts.aggregation_plan import aggregation_expr, planned_aggregate
+from services.charts.downsampling import downsample_indices, list_coordinates, lttb_indices
+from core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,18 @@ MULTI_SERIES_COLORS = [
 ]
 MAX_GROUP_SERIES = 5
 
+# Aggregations that need a numeric value column (``_safe_aggregate`` casts)
+NUMERIC_AGGREGATIONS = {
+    "SUM",
+    "MEAN",
+    "MAX",
+    "MIN",
+    "MEDIAN",
+    "STD",
+    "PERCENTILE_25",
+    "PERCENTILE_75",
+}
+
 
 def _get_col_format(col_name: str) -> str:
     """Helper to detect enterprise format for a column name."""
@@ -96,20 +110,26 @@ def _auto_bin_numeric_col(df: pl.DataFrame, col: str, n_bins: int = 7) -> pl.Dat
     def fmt(x):
         return str(int(x)) if float(x) == int(float(x)) else f"{x:.1f}"
 
-    def label(v):
-        if v is None:
-            return None
-        for i in range(len(edges) - 1):
-            lo, hi = edges[i], edges[i + 1]
-            if lo <= v < hi or (i == len(edges) - 2 and v <= hi):
-                return f"{fmt(lo)}–{fmt(hi)}"
-        return f"{fmt(edges[-2])}+"
+    # Bin i is [edges[i], edges[i+1]); the last bin also takes its upper
+    # edge and anything below the first edge, and values past the last
+    # edge (or NaN) get an open-ended "+" bin.
+    last = len(edges) - 2
+    labels = [f"{fmt(edges[i])}–{fmt(edges[i + 1])}" for i in range(last + 1)]
+    labels.append(f"{fmt(edges[-2])}+")
+
+    values = df[col].cast(pl.Float64).fill_null(np.nan).to_numpy()
+    edge_arr = np.asarray(edges)
+    idx = np.searchsorted(edge_arr, values, side="right") - 1
+    codes = np.where(idx < 0, last, idx)
+    codes = np.where(idx == last + 1, np.where(values == edge_arr[-1], last, last + 1), codes)
 
-    bin_labels = [label(v) for v in df[col].to_list()]
+    bin_labels = pl.Series(col, labels, dtype=pl.Utf8).gather(codes)
     # Build an ordering map so bins sort naturally (not alphabetically)
-    order_map = {label(edges[i]): i for i in range(len(edges) - 1)}
+    order_map = {labels[i]: i for i in range(last + 1)}
 
-    df = df.with_columns(pl.Series(col, bin_labels, dtype=pl.Utf8))
+    df = df.with_columns(
+        pl.when(df[col].is_null()).then(None).otherwise(bin_labels).alias(col)
+    )
     logger.info(f"Auto-binned '{col}': {len(edges) - 1} bins from {min_val:.1f} to {max_val:.1f}")
     return df, order_map
 
@@ -143,64 +163,30 @@ def _lttb_downsample(x: List[Any], y: List[Any], threshold: int) -> Tuple[List[A
     n = len(x)
     if threshold >= n or threshold < 3 or n < 3:
         return x, y
+    picked = lttb_indices(list_coordinates(x), np.asarray(y, dtype=np.float64), threshold)
+    return [x[k] for k in picked], [y[k] for k in picked]
 
-    # Numeric coordinate per point for triangle geometry (fallback: index).
-    x_num: List[float] = []
-    for k, xv in enumerate(x):
-        try:
-            x_num.append(float(xv))
-        except (TypeError, ValueError):
-            x_num.append(float(k))
-
-    sampled_x: List[Any] = [x[0]]
-    sampled_y: List[Any] = [y[0]]
-
-    every = (n - 2) / (threshold - 2)
-    a = 0  # index of the last chosen point
-
-    for i in range(threshold - 2):
-        # ── Average point of the NEXT bucket (defines triangle height) ──
-        next_start = int((i + 1) * every) + 1
-        next_end = min(int((i + 2) * every) + 1, n)
-        avg_x = 0.0
-        avg_y = 0.0
-        if next_start < next_end:
-            for k in range(next_start, next_end):
-                avg_x += x_num[k]
-                avg_y += float(y[k])
-            count = next_end - next_start
-            avg_x /= count
-            avg_y /= count
-        else:
-            avg_x = x_num[a]
-            avg_y = float(y[a])
-
-        # ── Points in the CURRENT bucket ──
-        range_start = int(i * every) + 1
-        range_end = min(int((i + 1) * every) + 1, n)
-
-        point_a_x = x_num[a]
-        point_a_y = float(y[a])
-
-        max_area = -1.0
-        chosen = a
-        for k in range(range_start, range_end):
-            # Triangle area between (a), (k), and the next-bucket average
-            area = abs(
-                (point_a_x - avg_x) * (float(y[k]) - point_a_y)
-                - (point_a_x - x_num[k]) * (avg_y - point_a_y)
-            )
-            if area > max_area:
-                max_area = area
-                chosen = k
 
-        sampled_x.append(x[chosen])
-        sampled_y.append(y[chosen])
-        a = chosen
+def _downsample_df(
+    agg_df: pl.DataFrame, max_points: int, method: str | None = None
+) -> Tuple[pl.DataFrame, int, str]:
+    """
+    Downsample a 2-column (x, y) aggregated polars DataFrame to at most
+    ``max_points`` rows, straight from the column buffers.
 
-    sampled_x.append(x[n - 1])
-    sampled_y.append(y[n - 1])
-    return sampled_x, sampled_y
+    ``method`` is "lttb" (shape-preserving) or "m4" (first/last/min/max per
+    x bucket — exact min/max envelope); defaults to
+    ``settings.CHART_DOWNSAMPLE_METHOD``.
+
+    Returns (downsampled_df, original_count, method). No-op when already
+    within limit.
+    """
+    method = method or settings.CHART_DOWNSAMPLE_METHOD
+    n = len(agg_df)
+    if n <= max_points:
+        return agg_df, n, method
+    picked = downsample_indices(agg_df["x"], agg_df["y"], max_points, method)
+    return agg_df[picked], n, method
 
 
 def _lttb_downsample_df(
@@ -211,11 +197,8 @@ def _lttb_downsample_df(
 
     Returns (downsampled_df, original_count). No-op when already within limit.
     """
-    n = len(agg_df)
-    if n <= max_points:
-        return agg_df, n
-    sx, sy = _lttb_downsample(agg_df["x"].to_list(), agg_df["y"].to_list(), max_points)
-    return pl.DataFrame({"x": sx, "y": sy}), n
+    sampled, n, _ = _downsample_df(agg_df, max_points, "lttb")
+    return sampled, n
 
 
 def aggregate_sampling_metadata(traces: List[Dict[str, Any]]) -> Dict[str, Any] | None:
@@ -300,17 +283,12 @@ def _safe_aggregate(
     if group_col not in df.columns or value_col not in df.columns:
         raise HydrationError(f"Missing agg cols: {group_col}, {value_col}")
 
+    planned = planned_aggregate(df, group_col, value_col, agg)
+    if planned is not None:
+        return _sort_aggregate(planned, sort_mode) if not planned.is_empty() else pl.DataFrame()
+
     agg_upper = agg.value.upper() if hasattr(agg, "value") else str(agg).upper()
-    if agg_upper in {
-        "SUM",
-        "MEAN",
-        "MAX",
-        "MIN",
-        "MEDIAN",
-        "STD",
-        "PERCENTILE_25",
-        "PERCENTILE_75",
-    }:
+    if agg_upper in NUMERIC_AGGREGATIONS:
         if df[value_col].dtype not in NUMERIC_DTYPES:
             # Attempt automatic cast — handles numeric values stored as strings
             original_dtype = df[value_col].dtype
@@ -345,31 +323,12 @@ def _safe_aggregate(
     if data.is_empty():
         return pl.DataFrame()
 
-    if agg == AggregationType.COUNT:
-        expr = pl.count()
-    elif agg == AggregationType.SUM:
-        expr = pl.sum(value_col)
-    elif agg == AggregationType.MEAN:
-        expr = pl.mean(value_col)
-    elif agg == AggregationType.MEDIAN:
-        expr = pl.median(value_col)
-    elif agg == AggregationType.STD:
-        expr = pl.std(value_col)
-    elif agg == AggregationType.PERCENTILE_25:
-        expr = pl.col(value_col).quantile(0.25)
-    elif agg == AggregationType.PERCENTILE_75:
-        expr = pl.col(value_col).quantile(0.75)
-    elif agg == AggregationType.MAX:
-        expr = pl.max(value_col)
-    elif agg == AggregationType.MIN:
-        expr = pl.min(value_col)
-    elif agg == AggregationType.NUNIQUE:
-        expr = pl.n_unique(value_col)
-    else:
-        expr = pl.first(value_col)
-
-    agg_df = data.group_by(group_col).agg(expr)
+    agg_df = data.group_by(group_col).agg(aggregation_expr(value_col, agg))
     agg_df = agg_df.rename({group_col: "x", agg_df.columns[-1]: "y"})
+    return _sort_aggregate(agg_df, sort_mode)
+
+
+def _sort_aggregate(agg_df: pl.DataFrame, sort_mode: str) -> pl.DataFrame:
     if sort_mode == "x_asc":
         agg_df = agg_df.sort("x", descending=False)
     elif sort_mode == "x_desc":
@@ -734,6 +693,51 @@ def _get_handler(chart_type: str):
     return handlers.get(chart_type, _hydrate_fallback)
 
 
+def plan_chart_aggregations(df: pl.DataFrame, config: ChartConfig) -> List[Tuple[str, str, Any]]:
+    """
+    The ``(x, y, agg)`` aggregations ``hydrate_chart`` will run through
+    ``_safe_aggregate`` on ``df`` itself, for an ``AggregationPlan``.
+
+    Mirrors the handlers conservatively: charts whose handler bins, sorts,
+    splits by group or casts the frame first are left out and aggregate on
+    their own, exactly as before.
+    """
+    chart_type = getattr(config.chart_type, "value", config.chart_type)
+    columns = config.columns or []
+    if len(columns) < 2 or any(c not in df.columns for c in columns[:2]):
+        return []
+    x = columns[0]
+    group_col = _resolve_group_by(config)
+    grouped = bool(group_col and group_col in df.columns)
+
+    if chart_type == "grouped_bar":
+        # Multi-metric mode only: one bar series per numeric y column
+        y_cols = [c for c in columns[1:] if c in df.columns and df[c].dtype in NUMERIC_DTYPES]
+        if grouped or len(y_cols) < 2:
+            return []
+        y_cols = y_cols[:MAX_GROUP_SERIES]
+    elif chart_type in ("bar", "stacked_bar", "line", "area"):
+        if grouped or _should_auto_bin(df, x):
+            return []
+        if chart_type in ("line", "area") and df[x].dtype in TEMPORAL_DTYPES:
+            return []  # the line handler sorts the frame first
+        y_cols = [columns[1]]
+    elif chart_type == "radar":
+        y_cols = [columns[1]] if df[columns[1]].dtype in NUMERIC_DTYPES else []
+    elif chart_type in ("pie", "donut", "waterfall", "funnel", "choropleth"):
+        y_cols = [columns[1]]
+    else:
+        return []
+
+    agg = config.aggregation
+    agg_upper = str(getattr(agg, "value", agg)).upper()
+    return [
+        (x, y, agg)
+        for y in y_cols
+        if y != x and (df[y].dtype in NUMERIC_DTYPES or agg_upper not in NUMERIC_AGGREGATIONS)
+    ]
+
+
 def _resolve_group_by(config):
     """Safely extract the first group_by column from a config."""
     gb = getattr(config, "group_by", None)
@@ -770,13 +774,20 @@ def _build_grouped_bar_traces(df, x_col, y_col, group_col, config):
         df.group_by(x_col)
         .agg(pl.count().alias("_cnt"))
         .sort("_cnt", descending=True)
-        .head(20)[x_col]
-        .to_list()
+        .head(20)
+        .select(pl.col(x_col).alias("x"))
+    )
+    x_labels = [str(c) for c in top_x["x"].to_list()]
+
+    # One pass splits the top groups' rows (a null group gets no rows)
+    group_frame = df.select(list(dict.fromkeys([group_col, x_col, y_col])))
+    partitions = group_frame.filter(pl.col(group_col).is_in(top_groups)).partition_by(
+        group_col, as_dict=True
     )
 
     traces = []
     for i, grp_val in enumerate(top_groups):
-        grp_df = df.filter(pl.col(group_col) == grp_val)
+        grp_df = partitions.get((grp_val,), group_frame.clear())
         try:
             agg_df = _safe_aggregate(grp_df, x_col, y_col, config.aggregation)
         except HydrationError:
@@ -784,13 +795,26 @@ def _build_grouped_bar_traces(df, x_col, y_col, group_col, config):
                 agg_df = _safe_aggregate(grp_df, x_col, y_col, AggregationType.COUNT)
             except HydrationError:
                 continue
-        agg_map = {str(row["x"]): row["y"] for row in agg_df.iter_rows(named=True)}
-        y_vals = [agg_map.get(str(cat), 0) for cat in top_x]
+        # The group's value at each top-x category (0 where it has none)
+        if agg_df.is_empty():
+            y_vals = [0] * len(top_x)
+        else:
+            y_vals = (
+                top_x.join(
+                    agg_df.with_columns(pl.lit(True).alias("_hit")),
+                    on="x",
+                    how="left",
+                    maintain_order="left",
+                )
+                .select(pl.when(pl.col("_hit")).then(pl.col("y")).otherwise(0))
+                .to_series()
+                .to_list()
+            )
         traces.append(
             {
                 "type": "bar",
                 "name": str(grp_val),
-                "x": [str(c) for c in top_x],
+                "x": x_labels,
                 "y": y_vals,
                 "marker": {"color": MULTI_SERIES_COLORS[i % len(MULTI_SERIES_COLORS)]},
                 "_axis_metadata": {
@@ -847,11 +871,11 @@ def _build_multi_line_traces(df, x_col, y_col, group_col, config, max_points=100
         total_pts = len(agg_df)
         sampled_meta = None
         if total_pts > max_points:
-            agg_df, _ = _lttb_downsample_df(agg_df, max_points)
+            agg_df, _, method = _downsample_df(agg_df, max_points)
             sampled_meta = {
                 "original_count": total_pts,
                 "shown": len(agg_df),
-                "method": "lttb",
+                "method": method,
             }
         x_data = agg_df["x"].to_list()
         if x_is_year:
@@ -935,7 +959,7 @@ def _hydrate_bar(df, config):
         agg_df = (
             agg_df.with_columns(
                 pl.col("x")
-                .map_elements(lambda v: bin_order_map.get(v, 999), return_dtype=pl.Int32)
+                .replace_strict(bin_order_map, default=999, return_dtype=pl.Int32)
                 .alias("_bin_order")
             )
             .sort("_bin_order")
@@ -993,7 +1017,7 @@ def _hydrate_line(df, config):
         agg_df = (
             agg_df.with_columns(
                 pl.col("x")
-                .map_elements(lambda v: bin_order_map_line.get(v, 999), return_dtype=pl.Int32)
+                .replace_strict(bin_order_map_line, default=999, return_dtype=pl.Int32)
                 .alias("_bin_order")
             )
             .sort("_bin_order")
@@ -1003,9 +1027,10 @@ def _hydrate_line(df, config):
     # Downsample line charts via LTTB — preserves the shape (peaks/troughs)
     # far better than every-nth-point sampling.
     total_points = len(agg_df)
+    method = None
     if total_points > MAX_LINE_POINTS:
-        agg_df, _ = _lttb_downsample_df(agg_df, MAX_LINE_POINTS)
-        logger.info(f"Line chart downsampled via LTTB: {total_points} → {len(agg_df)} points")
+        agg_df, _, method = _downsample_df(agg_df, MAX_LINE_POINTS)
+        logger.info(f"Line chart downsampled via {method}: {total_points} → {len(agg_df)} points")
 
     # Detect numeric years (e.g., 2012) to prevent Plotly from misinterpreting them as Unix epoch seconds (1970)
     x_is_year = False
@@ -1042,7 +1067,7 @@ def _hydrate_line(df, config):
         trace["_sampled"] = {
             "original_count": total_points,
             "shown": len(agg_df),
-            "method": "lttb",
+            "method": method,
         }
     return [trace]
 
@@ -1174,18 +1199,16 @@ def _build_scatter_multi_y(df, config, numeric_cols):
         if len(df_clean) > max_points:
             df_clean = df_clean.sample(n=max_points, seed=42)
 
-        pairs = [(row[x_col], row[y_col]) for row in df_clean.iter_rows(named=True)]
-        if not pairs:
+        if df_clean.is_empty():
             continue
-        xs, ys = zip(*pairs)
         color = MULTI_SERIES_COLORS[i % len(MULTI_SERIES_COLORS)]
         traces.append(
             {
                 "type": "scatter",
                 "mode": "markers",
                 "name": y_col,
-                "x": list(xs),
-                "y": list(ys),
+                "x": df_clean[x_col].to_list(),
+                "y": df_clean[y_col].to_list(),
                 "marker": {"color": color, "size": 6},
                 "_axis_metadata": {
                     "x": {"format": _get_col_format(x_col)},
@@ -1215,24 +1238,30 @@ def _build_scatter_by_group(df, config, group_col):
         return []
 
     max_points = 500
+    # One pass splits the top groups' points; a null group matches no filter
+    partitions = (
+        df.filter(pl.col(group_col).is_in(top_groups))
+        .select(list(dict.fromkeys([group_col, x_col, y_col])))
+        .partition_by(group_col, as_dict=True)
+    )
     traces = []
     for i, grp_val in enumerate(top_groups):
-        grp_df = df.filter(pl.col(group_col) == grp_val).select([x_col, y_col]).drop_nulls()
+        if (grp_val,) not in partitions:
+            continue
+        grp_df = partitions[(grp_val,)].select([x_col, y_col]).drop_nulls()
+        if grp_df.is_empty():
+            continue
         if len(grp_df) > max_points:
             grp_df = grp_df.sample(n=max_points, seed=42)
 
-        pairs = [(row[x_col], row[y_col]) for row in grp_df.iter_rows(named=True)]
-        if not pairs:
-            continue
-        xs, ys = zip(*pairs)
         color = MULTI_SERIES_COLORS[i % len(MULTI_SERIES_COLORS)]
         traces.append(
             {
                 "type": "scatter",
                 "mode": "markers",
                 "name": str(grp_val),
-                "x": list(xs),
-                "y": list(ys),
+                "x": grp_df[x_col].to_list(),
+                "y": grp_df[y_col].to_list(),
                 "marker": {"color": color, "size": 6},
                 "_axis_metadata": {
                     "x": {"format": _get_col_format(x_col)},
@@ -1245,6 +1274,31 @@ def _build_scatter_by_group(df, config, group_col):
     return traces
 
 
+def _drop_missing(df: pl.DataFrame, cols: List[str]) -> pl.DataFrame:
+    """``df[cols]`` without rows where any of them is null or NaN."""
+    points = df.select(list(dict.fromkeys(cols))).drop_nulls()
+    float_cols = [c for c in points.columns if points[c].dtype in (pl.Float32, pl.Float64)]
+    if float_cols:
+        points = points.filter(*[~pl.col(c).is_nan() for c in float_cols])
+    return points
+
+
+def _jittered(values: pl.Series, rng: np.random.Generator) -> List[Any]:
+    """``values`` as a list, spread by a small uniform jitter when they are
+    low-cardinality whole numbers (which would otherwise plot as stripes)."""
+    n_unique = values.n_unique()
+    head = values.head(100)
+    if not (
+        n_unique < len(values) * 0.3
+        and values.dtype in NUMERIC_DTYPES
+        and (head.cast(pl.Float64) == head.cast(pl.Float64).floor()).all()
+    ):
+        return values.to_list()
+    jitter_scale = max(0.2, (values.max() - values.min()) / n_unique * 0.15)
+    arr = values.to_numpy().astype(np.float64)
+    return (arr + rng.uniform(-jitter_scale, jitter_scale, len(arr))).tolist()
+
+
 def _hydrate_scatter(df, config):
     MAX_SCATTER_POINTS = 2000
 
@@ -1268,20 +1322,15 @@ def _hydrate_scatter(df, config):
         logger.info(f"Scatter chart sampled: {total_rows:,} → {MAX_SCATTER_POINTS} points")
 
     if color:
-        triples = [
-            (xv, yv, cv)
-            for xv, yv, cv in zip(df[x], df[y], df[color])
-            if pd.notna(xv) and pd.notna(yv) and pd.notna(cv)
-        ]
-        if not triples:
+        points = _drop_missing(df, [x, y, color])
+        if points.is_empty():
             return []
-        xs, ys, cs = zip(*triples)
         trace = {
             "type": "scatter",
             "mode": "markers",
-            "x": list(xs),
-            "y": list(ys),
-            "marker": {"color": list(cs)},
+            "x": points[x].to_list(),
+            "y": points[y].to_list(),
+            "marker": {"color": points[color].to_list()},
             "name": config.title or f"{y} vs {x}",
             "_axis_metadata": {
                 "x": {"format": _get_col_format(x)},
@@ -1290,26 +1339,14 @@ def _hydrate_scatter(df, config):
             },
         }
     else:
-        pairs = [(xv, yv) for xv, yv in zip(df[x], df[y]) if pd.notna(xv) and pd.notna(yv)]
-        if not pairs:
+        points = _drop_missing(df, [x, y])
+        if points.is_empty():
             return []
-        xs, ys = zip(*pairs)
-        xs_list, ys_list = list(xs), list(ys)
 
         # Add jitter when axis values are low-cardinality integers (vertical stripes problem)
         rng = np.random.default_rng(42)
-        x_unique = len(set(xs_list))
-        if x_unique < len(xs_list) * 0.3 and all(
-            isinstance(v, (int, float)) and float(v) == int(float(v)) for v in xs_list[:100]
-        ):
-            jitter_scale = max(0.2, (max(xs_list) - min(xs_list)) / x_unique * 0.15)
-            xs_list = [v + rng.uniform(-jitter_scale, jitter_scale) for v in xs_list]
-        y_unique = len(set(ys_list))
-        if y_unique < len(ys_list) * 0.3 and all(
-            isinstance(v, (int, float)) and float(v) == int(float(v)) for v in ys_list[:100]
-        ):
-            jitter_scale = max(0.2, (max(ys_list) - min(ys_list)) / y_unique * 0.15)
-            ys_list = [v + rng.uniform(-jitter_scale, jitter_scale) for v in ys_list]
+        xs_list = _jittered(points[x], rng)
+        ys_list = _jittered(points[y], rng)
 
         trace = {
             "type": "scatter",
@@ -1615,11 +1652,11 @@ def _hydrate_multi_line(df, config):
         total_points = len(agg_df)
         sampled_meta = None
         if total_points > MAX_LINE_POINTS:
-            agg_df, _ = _lttb_downsample_df(agg_df, MAX_LINE_POINTS)
+            agg_df, _, method = _downsample_df(agg_df, MAX_LINE_POINTS)
             sampled_meta = {
                 "original_count": total_points,
                 "shown": len(agg_df),
-                "method": "lttb",
+                "method": method,
             }
 
         x_data = agg_df["x"].to_list()
@@ -1686,6 +1723,7 @@ def _hydrate_stacked_area(df, config):
         total_points = len(agg_df)
         sampled_meta = None
         if total_points > MAX_LINE_POINTS:
+            # LTTB keeps every series the same length for the running sum
             agg_df, _ = _lttb_downsample_df(agg_df, MAX_LINE_POINTS)
             sampled_meta = {
                 "original_count": total_points,
@@ -2265,24 +2303,23 @@ def _hydrate_sankey(df, config):
     if flow_df.is_empty():
         return []
 
-    # Build node list (deduplicated, in order of appearance)
-    all_nodes = []
-    seen = set()
-    for row in flow_df.iter_rows(named=True):
-        for col in [src_col, tgt_col]:
-            name = str(row[col])
-            if name not in seen:
-                seen.add(name)
-                all_nodes.append(name)
-
-    node_map = {name: i for i, name in enumerate(all_nodes)}
-
-    # Build links
-    source_indices, target_indices, values = [], [], []
-    for row in flow_df.iter_rows(named=True):
-        source_indices.append(node_map[str(row[src_col])])
-        target_indices.append(node_map[str(row[tgt_col])])
-        values.append(float(row["flow_value"]))
+    # Node labels: deduplicated, in order of appearance (source, target,
+    # source, … down the flows); links index into them
+    links = flow_df.select(
+        pl.col(src_col).cast(pl.Utf8).fill_null("None").alias("source"),
+        pl.col(tgt_col).cast(pl.Utf8).fill_null("None").alias("target"),
+        pl.col("flow_value").cast(pl.Float64),
+    )
+    nodes = (
+        links.select(pl.concat_list("source", "target").alias("node"))
+        .explode("node")["node"]
+        .unique(maintain_order=True)
+    )
+    all_nodes = nodes.to_list()
+    node_ids = pl.Series(range(len(nodes)), dtype=pl.Int64)
+    source_indices = links["source"].replace_strict(nodes, node_ids).to_list()
+    target_indices = links["target"].replace_strict(nodes, node_ids).to_list()
+    values = links["flow_value"].to_list()
 
     return [{
         "type": "sankey",
@@ -27,6 +27,8 @@ from typing import Any, Dict, List, Optional
 
 import polars as pl
 
+from services.charts.aggregation_plan import planned_n_unique
+
 logger = logging.getLogger(__name__)
 
 
@@ -298,23 +300,7 @@ def infer_semantic_types(
     overrides: Dict[str, str] = chart_config.get("semantic_types") or {}
     results: Dict[str, SemanticType] = {}
 
-    # Columns of interest: all config columns plus group_by columns
-    columns = list(chart_config.get("columns") or [])
-    group_by = chart_config.get("group_by") or []
-    if isinstance(group_by, str):
-        group_by = [group_by]
-    for g in group_by:
-        if g not in columns:
-            columns.append(g)
-    # x / y / color short-form keys
-    for k in ("x", "y", "color", "size", "labels", "values", "z"):
-        v = chart_config.get(k)
-        if isinstance(v, str) and v not in columns:
-            columns.append(v)
-        elif isinstance(v, list):
-            columns.extend(c for c in v if isinstance(c, str) and c not in columns)
-
-    for col in columns:
+    for col in semantic_columns(chart_config):
         if not isinstance(col, str) or col not in df.columns:
             continue
         # AI-declared override wins
@@ -329,7 +315,9 @@ def infer_semantic_types(
             sample = df[col].drop_nulls().head(5).to_list()
         except Exception:
             sample = []
-        cardinality = df[col].n_unique()
+        cardinality = planned_n_unique(df, col)
+        if cardinality is None:
+            cardinality = df[col].n_unique()
         results[col] = infer_column_semantic_type(
             col_name=col,
             dtype=dtype,
@@ -340,6 +328,26 @@ def infer_semantic_types(
     return results
 
 
+def semantic_columns(chart_config: Dict[str, Any]) -> List[Any]:
+    """The columns ``infer_semantic_types`` looks at for a chart config."""
+    # Columns of interest: all config columns plus group_by columns
+    columns = list(chart_config.get("columns") or [])
+    group_by = chart_config.get("group_by") or []
+    if isinstance(group_by, str):
+        group_by = [group_by]
+    for g in group_by:
+        if g not in columns:
+            columns.append(g)
+    # x / y / color short-form keys
+    for k in ("x", "y", "color", "size", "labels", "values", "z"):
+        v = chart_config.get(k)
+        if isinstance(v, str) and v not in columns:
+            columns.append(v)
+        elif isinstance(v, list):
+            columns.extend(c for c in v if isinstance(c, str) and c not in columns)
+    return columns
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # FORMAT SPECS (Plotly layout hints)
 # ═══════════════════════════════════════════════════════════════════════
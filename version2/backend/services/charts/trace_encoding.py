@@ -0,0 +1,196 @@
+"""
+Trace Encoding
+==============
+Opt-in compact wire format for the numeric arrays of hydrated traces.
+
+The hydrators build traces as Python lists, and the JSON response writes
+every float as text: a 100k-point scatter or a wide parallel-coordinates
+chart becomes a multi-megabyte body that takes longer to serialise than
+to hydrate. With the ``bdata`` encoding each long numeric array is sent
+as a typed binary buffer instead, in Plotly's typed-array spec::
+
+    {"dtype": "f8", "bdata": "<base64 little-endian bytes>"}
+    {"dtype": "i2", "bdata": "...", "shape": "35,35"}    # 2-D, e.g. heatmap z
+
+Plotly.js (2.28+) reads these natively; other clients decode them with
+``decode_traces`` semantics: ``base64 → typed array (→ reshape)``.
+
+What is encoded
+---------------
+- Arrays of at least ``MIN_ENCODED_LENGTH`` numbers, at any depth of a
+  trace (``x``, ``y``, ``z``, ``marker.color``, ``dimensions[i].values`` …),
+  and rectangular 2-D numeric arrays.
+- Integers use the narrowest of ``i1/u1/i2/u2/i4/u4`` that holds them,
+  otherwise ``f8``; floats are always ``f8``, so values are bit-identical
+  to the JSON path. ``None`` gaps in numeric arrays become NaN, which
+  Plotly draws as the same gap.
+- Strings, dates, booleans, mixed arrays, short arrays and ``_``-prefixed
+  metadata keys stay as they are.
+
+Usage
+-----
+    from services.charts.trace_encoding import encode_payload, resolve_trace_encoding
+
+    encoding = resolve_trace_encoding(body.get("trace_encoding"))   # "json" | "bdata"
+    return encode_payload(chart_payload, encoding)
+"""
+
+import base64
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+TRACE_ENCODINGS = ("json", "bdata")
+
+# Shorter arrays gain little and stay readable as plain JSON.
+MIN_ENCODED_LENGTH = 64
+
+_INT_DTYPES = (
+    ("i1", np.int8),
+    ("u1", np.uint8),
+    ("i2", np.int16),
+    ("u2", np.uint16),
+    ("i4", np.int32),
+    ("u4", np.uint32),
+)
+_MAX_EXACT_FLOAT = 2**53
+
+
+def resolve_trace_encoding(requested: Optional[str]) -> str:
+    """Validated trace encoding for a request (``json`` when not given).
+
+    Raises:
+        ValueError: for an encoding this server doesn't produce.
+    """
+    encoding = (requested or "json").lower()
+    if encoding not in TRACE_ENCODINGS:
+        raise ValueError(
+            f"Unsupported trace_encoding {requested!r} "
+            f"(expected one of: {', '.join(TRACE_ENCODINGS)})"
+        )
+    return encoding
+
+
+def _numeric_array(values: list) -> Optional[np.ndarray]:
+    """``values`` as a NumPy array if it is a (rectangular) array of numbers."""
+    try:
+        arr = np.asarray(values)
+    except ValueError:  # ragged nested lists
+        return None
+    if arr.dtype.kind == "O":
+        # Numbers with None gaps → float64 with NaN; anything else stays JSON
+        if arr.ndim != 1 or not all(
+            v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+            for v in values
+        ):
+            return None
+        # Same guard as the integer path: float64 would round these ints
+        if any(isinstance(v, int) and abs(v) > _MAX_EXACT_FLOAT for v in values):
+            return None
+        arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if arr.dtype.kind not in "iuf" or arr.ndim not in (1, 2):
+        return None
+    return arr
+
+
+def encode_array(values: list) -> Optional[Dict[str, str]]:
+    """Typed-array spec for ``values``, or ``None`` to keep it as JSON."""
+    if not values:
+        return None
+    first = values[0][0] if isinstance(values[0], list) and values[0] else values[0]
+    if isinstance(first, (str, bool)):
+        return None
+    size = len(values) * (len(values[0]) if isinstance(values[0], list) else 1)
+    if size < MIN_ENCODED_LENGTH:
+        return None
+    arr = _numeric_array(values)
+    if arr is None:
+        return None
+
+    if arr.dtype.kind in "iu":
+        lo, hi = int(arr.min()), int(arr.max())
+        for dtype, np_type in _INT_DTYPES:
+            info = np.iinfo(np_type)
+            if info.min <= lo and hi <= info.max:
+                code, arr = dtype, arr.astype(np_type)
+                break
+        else:
+            if max(-lo, hi) > _MAX_EXACT_FLOAT:
+                return None  # beyond float64's exact range; JSON keeps every digit
+            code, arr = "f8", arr.astype(np.float64)
+    else:
+        code, arr = "f8", arr.astype(np.float64)
+
+    raw = arr.astype(arr.dtype.newbyteorder("<"), copy=False).tobytes()
+    spec = {"dtype": code, "bdata": base64.b64encode(raw).decode("ascii")}
+    if arr.ndim == 2:
+        spec["shape"] = f"{arr.shape[0]},{arr.shape[1]}"
+    return spec
+
+
+def decode_array(spec: Dict[str, str]) -> list:
+    """The list a typed-array spec was encoded from (NaN where it had ``None``)."""
+    dtype = np.dtype(spec["dtype"]).newbyteorder("<")
+    arr = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=dtype)
+    if "shape" in spec:
+        arr = arr.reshape([int(n) for n in spec["shape"].split(",")])
+    return arr.tolist()
+
+
+def _is_typed_array(value: Any) -> bool:
+    return isinstance(value, dict) and "bdata" in value and "dtype" in value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return encode_trace(value)
+    if isinstance(value, list) and value:
+        spec = encode_array(value)
+        if spec is not None:
+            return spec
+        if all(isinstance(v, dict) for v in value):  # e.g. parcoords dimensions
+            return [encode_trace(v) for v in value]
+    return value
+
+
+def encode_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of ``trace`` with its long numeric arrays as typed buffers."""
+    return {
+        key: value if key.startswith("_") else _encode_value(value)
+        for key, value in trace.items()
+    }
+
+
+def encode_traces(traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [encode_trace(t) if isinstance(t, dict) else t for t in traces]
+
+
+def _decode_value(value: Any) -> Any:
+    if _is_typed_array(value):
+        return decode_array(value)
+    if isinstance(value, dict):
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def decode_traces(traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Plain-list traces from ``encode_traces`` output."""
+    return [_decode_value(t) for t in traces]
+
+
+def encode_payload(payload: Dict[str, Any], encoding: str) -> Dict[str, Any]:
+    """Copy of a chart payload (or response body) with its ``traces`` /
+    ``data`` in ``encoding``, tagged with ``trace_encoding``.
+
+    The JSON encoding returns ``payload`` unchanged.
+    """
+    if encoding == "json" or not isinstance(payload, dict):
+        return payload
+    encoded = dict(payload)
+    for key in ("traces", "data"):
+        if isinstance(encoded.get(key), list):
+            encoded[key] = encode_traces(encoded[key])
+    encoded["trace_encoding"] = encoding
+    return encoded
@@ -451,24 +451,18 @@ async def _call_ai_for_suggestions(
 # ═══════════════════════════════════════════════════════════════════════════
 
 
-async def suggest_cleaning_actions(
+def detect_cleaning_candidates(
     df: pl.DataFrame,
     profiling_result: Any | None = None,
     existing_manifest: list[dict[str, Any]] | None = None,
-    column_metadata: list[dict[str, Any]] | None = None,
-    user_id: str | None = None,
-) -> list[dict[str, Any]]:
-    """Run Stage 1.6 suggestion pipeline and return new manifest entries.
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Tier A suggestions and Tier B candidates — the part that reads *df*.
 
-    Args:
-        df: Cleaned DataFrame (post-Stage 1.5, with renamed columns).
-        profiling_result: RawProfilingResult from the profiling engine.
-        existing_manifest: Manifest entries from Stage 1.5 normalization.
-        column_metadata: Column metadata list for AI context.
-        user_id: Optional user ID for cost tracking.
+    Synchronous, so the pipeline can run it in its worker process next to
+    the frame and pass the result to :func:`suggest_cleaning_actions`.
 
     Returns:
-        List of suggestion dicts to append to the cleaning manifest.
+        ``(tier_a_suggestions, tier_b_candidates)``
     """
     suggestions: list[dict[str, Any]] = []
 
@@ -491,9 +485,37 @@ async def suggest_cleaning_actions(
     except Exception as e:
         logger.warning("[CleaningSuggester] Tier A constant detection failed: %s", e)
 
-    # ── Tier B: AI-assisted (batched, cheap model) ─────────────────────
-    candidates = _build_tier_b_candidates(df, profiling_result, existing_manifest)
+    return suggestions, _build_tier_b_candidates(df, profiling_result, existing_manifest)
+
+
+async def suggest_cleaning_actions(
+    df: pl.DataFrame | None = None,
+    profiling_result: Any | None = None,
+    existing_manifest: list[dict[str, Any]] | None = None,
+    column_metadata: list[dict[str, Any]] | None = None,
+    user_id: str | None = None,
+    detected: tuple[list[dict[str, Any]], list[dict[str, Any]]] | None = None,
+) -> list[dict[str, Any]]:
+    """Run Stage 1.6 suggestion pipeline and return new manifest entries.
 
+    Args:
+        df: Cleaned DataFrame (post-Stage 1.5, with renamed columns).
+            Not needed when ``detected`` is given.
+        profiling_result: RawProfilingResult from the profiling engine.
+        existing_manifest: Manifest entries from Stage 1.5 normalization.
+        column_metadata: Column metadata list for AI context.
+        user_id: Optional user ID for cost tracking.
+        detected: :func:`detect_cleaning_candidates` output, computed
+            elsewhere (the pipeline worker).
+
+    Returns:
+        List of suggestion dicts to append to the cleaning manifest.
+    """
+    if detected is None:
+        detected = detect_cleaning_candidates(df, profiling_result, existing_manifest)
+    suggestions, candidates = list(detected[0]), detected[1]
+
+    # ── Tier B: AI-assisted (batched, cheap model) ─────────────────────
     if candidates:
         logger.info(
             "[CleaningSuggester] Tier B: %d candidates for AI review",
@@ -584,4 +606,4 @@ async def suggest_cleaning_actions(
     return deduped
 
 
-__all__ = ["suggest_cleaning_actions"]
+__all__ = ["detect_cleaning_candidates", "suggest_cleaning_actions"]
@@ -47,6 +47,8 @@ from typing import Any
 import polars as pl
 
 from db.database import get_database
+from services.datasets.content_store import content_store
+from services.datasets.parquet_layout import write_dataset_parquet
 from services.pipeline.date_fixer import apply_date_coercion
 from services.pipeline.category_fixer import apply_merge_values
 from services.pipeline.unpivot_fixer import apply_unpivot
@@ -327,18 +329,11 @@ def execute_mutation(
 
 def _atomic_write_parquet(df: pl.DataFrame, parquet_path: str) -> None:
     """Write parquet atomically (tmp file + os.replace) so a crash never
-    leaves a truncated file that downstream readers would happily load."""
-    tmp_path = f"{parquet_path}.tmp"
-    df.write_parquet(tmp_path, compression="zstd")
-    try:
-        Path(tmp_path).replace(parquet_path)
-    except OSError:
-        # replace failed — clean up the tmp file and re-raise
-        try:
-            Path(tmp_path).unlink(missing_ok=True)
-        except OSError:
-            pass
-        raise
+    leaves a truncated file that downstream readers would happily load.
+
+    Goes through the dataset layout writer so a mutated file keeps the
+    clustered row order, row-group size and min/max sidecar index."""
+    write_dataset_parquet(df, parquet_path)
 
 
 def _load_active_dataframe(doc: dict) -> tuple[pl.DataFrame, str, str]:
@@ -351,23 +346,17 @@ def _load_active_dataframe(doc: dict) -> tuple[pl.DataFrame, str, str]:
     Returns ``(df, data_path, file_type)``. Raises ``ValueError`` when no
     file is available.
     """
-    parquet_path = doc.get("parquet_path")
-    file_path = doc.get("file_path")
-
-    if parquet_path and Path(parquet_path).exists():
-        return pl.read_parquet(parquet_path), str(parquet_path), "parquet"
-
-    if file_path and Path(file_path).exists():
-        from services.pipeline.load import load_dataset
+    from services.datasets.dataset_handle import open_dataset
 
-        df, meta = load_dataset(str(file_path))
-        file_type = meta.get("file_type") or Path(file_path).suffix.lstrip(".").lower()
-        return df, str(file_path), file_type
-
-    raise ValueError(
-        "Dataset file not found on disk — cannot apply the cleaning action. "
-        "The dataset may need to be re-uploaded or re-processed."
-    )
+    try:
+        handle = open_dataset(str(doc.get("_id", "")), doc)
+    except FileNotFoundError:
+        raise ValueError(
+            "Dataset file not found on disk — cannot apply the cleaning action. "
+            "The dataset may need to be re-uploaded or re-processed."
+        )
+    # Mutations rewrite whole columns, so every column is read.
+    return handle.collect(), handle.path, handle.file_type
 
 
 async def _refresh_downstream(
@@ -388,23 +377,58 @@ async def _refresh_downstream(
       3. Update uploads doc (metadata, counts, domain, manifest)
       4. Refresh dataset_profiles / dataset_intelligence collections
       5. Re-index RAG chunks (MongoDB + FAISS + BM25) from fresh metadata
-      6. Invalidate dataframe / insights / dashboard caches
+      6. Invalidate dataframe / insights / dashboard caches (the query
+         result cache is invalidated with the catalog rebuild in step 1)
       7. Release the mutation_lock and record mutation_status
     """
     db = get_database()
     mutation_warnings: list[str] = []
     try:
         # ── 1. Atomic parquet write ─────────────────────────────────────
-        if data_path.endswith(".parquet"):
-            _atomic_write_parquet(df, data_path)
-            logger.info("[Mutation] Parquet rewritten for %s", dataset_id[:8])
-        else:
+        loaded_path = data_path
+        if not data_path.endswith(".parquet"):
             # Fallback path loaded from the raw file — write a parquet
             # alongside it so downstream readers keep using the fast path.
-            fallback_parquet = data_path.rsplit(".", 1)[0] + ".parquet"
-            _atomic_write_parquet(df, fallback_parquet)
-            data_path = fallback_parquet
-            logger.info("[Mutation] Parquet created for %s (was raw-only)", dataset_id[:8])
+            data_path = data_path.rsplit(".", 1)[0] + ".parquet"
+        if content_store.owns(data_path):
+            # Shared with every dataset of the same content: copy on write.
+            data_path = content_store.private_parquet_path(dataset_id)
+            Path(data_path).parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write_parquet(df, data_path)
+        if data_path == loaded_path:
+            logger.info("[Mutation] Parquet rewritten for %s", dataset_id[:8])
+        else:
+            logger.info("[Mutation] Parquet created for %s at %s", dataset_id[:8], data_path)
+
+        # Rebuild the persistent DuckDB catalog from the mutated parquet so
+        # chat SQL never reads the pre-mutation table. The rebuilds scan
+        # the file and wait for admission, so they run on the executor.
+        loop = asyncio.get_running_loop()
+        try:
+            from services.query.dataset_catalog import dataset_catalog
+
+            dataset_catalog.invalidate(dataset_id)
+            await loop.run_in_executor(None, dataset_catalog.build, dataset_id, data_path)
+        except Exception as e:
+            mutation_warnings.append(f"DuckDB catalog rebuild failed: {str(e)[:200]}")
+            logger.warning("[Mutation] Catalog rebuild failed for %s: %s", dataset_id[:8], e)
+
+        # Cached SQL results were computed on the pre-mutation table
+        try:
+            from services.query import query_cache as qcache
+
+            qcache.invalidate_dataset(dataset_id)
+        except Exception as e:
+            logger.debug("[Mutation] query cache invalidation skipped: %s", e)
+
+        # Same for the rollup cube (rebuilt with its previous spec; a
+        # failure just leaves charts/KPIs on the base data).
+        try:
+            from services.query.rollups import rollup_store
+
+            await loop.run_in_executor(None, rollup_store.rebuild, dataset_id, data_path)
+        except Exception as e:
+            logger.warning("[Mutation] Rollup rebuild failed for %s: %s", dataset_id[:8], e)
 
         # ── 2. Deterministic re-profile ─────────────────────────────────
         from services.profiling.engine import profiling_engine
@@ -458,6 +482,7 @@ async def _refresh_downstream(
                     "domain": domain_info["domain"],
                     "domain_confidence": domain_info["confidence"],
                     "cleaning_manifest": manifest,
+                    "parquet_path": data_path,
                     "updated_at": datetime.now(timezone.utc).replace(tzinfo=None),
                 }
             },
@@ -5,14 +5,67 @@ Includes comprehensive security features
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Dict, Any, Optional, Sequence
+from datetime import date, datetime, timezone
+import json
 import logging
 import time
 import re
 
+import polars as pl
+
 logger = logging.getLogger(__name__)
 
+# Largest page a connector returns per query / cursor fetch
+MAX_BATCH_ROWS = 10000
+
+_PLAIN = (str, int, float, bool)
+
+
+@dataclass(frozen=True)
+class KeyRange:
+    """A slice of a table by one key column: ``lower <= column < upper``.
+
+    A ``None`` bound is open, so the first and last range of a partition
+    plan also catch rows outside the (possibly stale) statistics.
+    """
+
+    column: str
+    lower: Any = None
+    upper: Any = None
+
+
+def rows_to_frame(names: Sequence[str], rows: Sequence[Sequence[Any]]) -> pl.DataFrame:
+    """
+    Build a DataFrame from row tuples, one column at a time.
+
+    Values are converted the way ``schema_discovery._flatten_document``
+    converts them (dates → ISO strings, lists/dicts → JSON, anything else
+    non-scalar → str), so a cursor batch yields the same frame as the
+    per-row dict path it replaces.
+    """
+    data = {}
+    for name, values in zip(names, zip(*rows) if rows else [() for _ in names]):
+        kinds = {type(v) for v in values if v is not None}
+        if kinds and not all(issubclass(k, _PLAIN) for k in kinds):
+            values = [_to_scalar(v) for v in values]
+        data[name] = pl.Series(name, values, strict=False)
+    return pl.DataFrame(data)
+
+
+def _to_scalar(v: Any) -> Any:
+    if v is None or isinstance(v, _PLAIN):
+        return v
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, (list, tuple, dict)):
+        try:
+            return json.dumps(v, default=str)
+        except (TypeError, ValueError):
+            return str(v)
+    return str(v)
+
 
 class SecurityValidator:
     """Security validation utilities for database operations"""
@@ -363,6 +416,91 @@ class DatabaseConnector(ABC):
         """
         pass
 
+    async def get_key_columns(self, table_name: str) -> List[str]:
+        """
+        Get the columns of the primary key, or else of a unique index over
+        NOT NULL columns, of a table/collection
+
+        Keyset pagination orders and seeks on these columns, so every row
+        is visited exactly once. Connectors that cannot tell return [].
+
+        Args:
+            table_name: Name of the table/collection
+
+        Returns:
+            Key column names in index order, or [] if there is no usable key
+        """
+        return []
+
+    async def extract_keyset(
+        self,
+        table_name: str,
+        key_columns: List[str],
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract the next page in key order (``WHERE key > after``)
+
+        Unlike ``LIMIT … OFFSET …`` the database seeks straight to the page
+        through the key's index, so every page costs the same.
+
+        Args:
+            table_name: Name of the table/collection
+            key_columns: Columns from ``get_key_columns``
+            after: Key values of the last row of the previous page (None for the first page)
+            limit: Maximum number of rows to return
+            columns: List of column names to extract (None for all); key
+                columns are always included
+
+        Returns:
+            List of dictionaries representing rows, in key order
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support keyset pagination")
+
+    async def get_key_stats(self, table_name: str, key_column: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the statistics a partitioned extract splits a key column on
+
+        Args:
+            table_name: Name of the table/collection
+            key_column: A column from ``get_key_columns``
+
+        Returns:
+            ``{"min", "max", "rows", "histogram"}`` — min/max of the key,
+            the planner's row estimate and, where the database keeps one,
+            an equi-depth histogram (sorted bound values) of the key; or
+            None if the connector cannot tell
+        """
+        return None
+
+    def stream_batches(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 5000,
+        limit: Optional[int] = None,
+        key_range: Optional[KeyRange] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Stream a whole table/collection through one server-side cursor
+
+        Rows are fetched ``batch_size`` at a time and yielded as DataFrames,
+        so memory stays bounded by one batch and the table is read once.
+
+        Args:
+            table_name: Name of the table/collection
+            columns: List of column names to extract (None for all)
+            batch_size: Rows per fetch and per yielded frame
+            limit: Stop after this many rows (None for the whole table)
+            key_range: Only stream the rows in this key range
+
+        Yields:
+            One DataFrame per fetched batch
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support cursor streaming")
+
     def _log_operation_start(self, operation: str, params: Dict[str, Any]) -> float:
         """Log start of operation and return start time"""
         return time.time()
@@ -3,9 +3,11 @@ MongoDB Database Connector
 Implements DatabaseConnector for MongoDB databases with full security
 """
 
-from typing import Optional, Any, List, Dict
-from .base import DatabaseConnector, SecurityValidator
+from typing import AsyncIterator, Optional, Any, List, Dict, Sequence
+from .base import MAX_BATCH_ROWS, DatabaseConnector, KeyRange, SecurityValidator
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+import polars as pl
 import asyncio
 import time
 import logging
@@ -335,6 +337,139 @@ class MongoDBConnector(DatabaseConnector):
             self._log_operation_end("extract_data", {"collection": table_name}, start_time, False, error_msg)
             raise
 
+    async def get_key_columns(self, table_name: str) -> List[str]:
+        """Every MongoDB collection has a unique index on _id"""
+        if not self.security_validator.validate_identifier(table_name, "table"):
+            raise ValueError(f"Invalid collection name: {table_name}")
+        return ["_id"]
+
+    async def extract_keyset(
+        self,
+        table_name: str,
+        key_columns: List[str],
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Extract the next page of a MongoDB collection in _id order"""
+        start_time = self._log_operation_start("extract_keyset", {"collection": table_name, "key": key_columns})
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid collection name: {table_name}")
+
+            if key_columns != ["_id"]:
+                raise ValueError("MongoDB keyset pagination runs on _id")
+
+            safe_limit = self.security_validator.sanitize_limit(limit, default=1000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._database:
+                raise RuntimeError("Not connected to database")
+
+            projection = None
+            if columns:
+                for col in columns:
+                    if not self.security_validator.validate_identifier(col, "column"):
+                        raise ValueError(f"Invalid field name: {col}")
+                projection = {col: 1 for col in columns}  # _id stays: it is the key
+
+            query: Dict[str, Any] = {}
+            if after is not None:
+                # Pages hand back _id as a string; seek on the ObjectId it came from
+                last = after[0]
+                if isinstance(last, str) and ObjectId.is_valid(last):
+                    last = ObjectId(last)
+                query = {"_id": {"$gt": last}}
+
+            cursor = self._database[table_name].find(query, projection).sort("_id", 1).limit(safe_limit)
+            result = await cursor.to_list(length=safe_limit)
+
+            for doc in result:
+                if '_id' in doc:
+                    doc['_id'] = str(doc['_id'])
+
+            self._log_operation_end("extract_keyset", {"collection": table_name, "rows_returned": len(result)}, start_time, True)
+            return result
+
+        except Exception as e:
+            error_msg = f"Error extracting keyset page: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("extract_keyset", {"collection": table_name}, start_time, False, error_msg)
+            raise
+
+    async def stream_batches(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 5000,
+        limit: Optional[int] = None,
+        key_range: Optional[KeyRange] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """Stream a MongoDB collection (or one _id range of it) through one batched cursor"""
+        from ..schema_discovery import _flatten_document
+
+        start_time = self._log_operation_start("stream_batches", {"collection": table_name, "columns": columns})
+        total = 0
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid collection name: {table_name}")
+
+            safe_batch = self.security_validator.sanitize_limit(batch_size, default=5000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._database:
+                raise RuntimeError("Not connected to database")
+
+            projection = None
+            if columns:
+                for col in columns:
+                    if not self.security_validator.validate_identifier(col, "column"):
+                        raise ValueError(f"Invalid field name: {col}")
+                projection = {col: 1 for col in columns}
+                projection['_id'] = 0
+
+            # batch_size sets the getMore size, so each to_list() below is
+            # one round trip on the same server-side cursor.
+            query: Dict[str, Any] = {}
+            if key_range:
+                if key_range.column != "_id":
+                    raise ValueError("MongoDB key ranges run on _id")
+                bounds = {}
+                if key_range.lower is not None:
+                    bounds["$gte"] = key_range.lower
+                if key_range.upper is not None:
+                    bounds["$lt"] = key_range.upper
+                if bounds:
+                    query = {"_id": bounds}
+
+            cursor = self._database[table_name].find(query, projection, batch_size=safe_batch)
+            if limit is not None:
+                cursor = cursor.limit(max(int(limit), 0))
+
+            try:
+                while True:
+                    docs = await cursor.to_list(length=safe_batch)
+                    if not docs:
+                        break
+                    for doc in docs:
+                        if '_id' in doc:
+                            doc['_id'] = str(doc['_id'])
+                    total += len(docs)
+                    # Documents differ in shape: infer over the whole batch
+                    yield pl.from_dicts(
+                        [_flatten_document(d) for d in docs], infer_schema_length=None
+                    )
+            finally:
+                await cursor.close()
+
+            self._log_operation_end("stream_batches", {"collection": table_name, "rows_returned": total}, start_time, True)
+
+        except Exception as e:
+            error_msg = f"Error streaming data: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("stream_batches", {"collection": table_name, "rows_returned": total}, start_time, False, error_msg)
+            raise
+
     async def extract_incremental(
         self, table_name: str, last_value: Any, increment_column: str
     ) -> List[Dict[str, Any]]:
@@ -3,9 +3,10 @@ MySQL Database Connector
 Implements DatabaseConnector for MySQL databases with full security
 """
 
-from typing import Optional, Any, List, Dict
-from .base import DatabaseConnector, SecurityValidator
+from typing import AsyncIterator, Optional, Any, List, Dict, Sequence
+from .base import MAX_BATCH_ROWS, DatabaseConnector, KeyRange, SecurityValidator, rows_to_frame
 import aiomysql
+import polars as pl
 import asyncio
 import time
 import logging
@@ -401,6 +402,212 @@ class MySQLConnector(DatabaseConnector):
             self._log_operation_end("extract_data", {"table": table_name}, start_time, False, error_msg)
             raise
 
+    async def get_key_columns(self, table_name: str) -> List[str]:
+        """Get the primary key, or the narrowest unique NOT NULL index, of a MySQL table"""
+        if not self.security_validator.validate_identifier(table_name, "table"):
+            raise ValueError(f"Invalid table name: {table_name}")
+
+        if not self._pool:
+            raise RuntimeError("Not connected to database")
+
+        query = """
+            SELECT s.INDEX_NAME AS index_name, s.COLUMN_NAME AS column_name,
+                   s.SUB_PART AS sub_part, c.IS_NULLABLE AS is_nullable
+            FROM information_schema.STATISTICS s
+            JOIN information_schema.COLUMNS c
+              ON c.TABLE_SCHEMA = s.TABLE_SCHEMA AND c.TABLE_NAME = s.TABLE_NAME
+             AND c.COLUMN_NAME = s.COLUMN_NAME
+            WHERE s.TABLE_SCHEMA = DATABASE() AND s.TABLE_NAME = %s AND s.NON_UNIQUE = 0
+            ORDER BY s.INDEX_NAME, s.SEQ_IN_INDEX
+        """
+
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(query, (table_name,))
+                rows = await cur.fetchall()
+
+        indexes: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            indexes.setdefault(row['index_name'], []).append(row)
+
+        # Nullable columns break the ordering and prefix indexes (SUB_PART)
+        # only cover part of a value, so neither can drive a keyset scan.
+        usable = [
+            (name, [part['column_name'] for part in parts])
+            for name, parts in indexes.items()
+            if all(part['is_nullable'] == 'NO' and part['sub_part'] is None for part in parts)
+        ]
+        if not usable:
+            return []
+        usable.sort(key=lambda item: (item[0] != 'PRIMARY', len(item[1])))
+        return usable[0][1]
+
+    async def extract_keyset(
+        self,
+        table_name: str,
+        key_columns: List[str],
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Extract the next page of a MySQL table in key order"""
+        start_time = self._log_operation_start("extract_keyset", {"table": table_name, "key": key_columns})
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid table name: {table_name}")
+
+            if not key_columns:
+                raise ValueError("Keyset pagination needs at least one key column")
+
+            for col in [*key_columns, *(columns or [])]:
+                if not self.security_validator.validate_identifier(col, "column"):
+                    raise ValueError(f"Invalid column name: {col}")
+
+            safe_limit = self.security_validator.sanitize_limit(limit, default=1000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._pool:
+                raise RuntimeError("Not connected to database")
+
+            column_clause = "*"
+            if columns:
+                selected = columns + [k for k in key_columns if k not in columns]
+                column_clause = ", ".join(f"`{col}`" for col in selected)
+
+            key_clause = ", ".join(f"`{col}`" for col in key_columns)
+            params: List[Any] = []
+            where = ""
+            if after is not None:
+                # Row-value comparison; InnoDB range-scans the key's index
+                params = list(after)
+                placeholders = ", ".join(["%s"] * len(params))
+                where = f"WHERE ({key_clause}) > ({placeholders})"
+            params.append(safe_limit)
+
+            query = f"SELECT {column_clause} FROM `{table_name}` {where} ORDER BY {key_clause} LIMIT %s"
+
+            async with self._pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cur:
+                    await cur.execute(query, params)
+                    rows = await cur.fetchall()
+                    result = list(rows)
+
+            self._log_operation_end("extract_keyset", {"table": table_name, "rows_returned": len(result)}, start_time, True)
+            return result
+
+        except Exception as e:
+            error_msg = f"Error extracting keyset page: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("extract_keyset", {"table": table_name}, start_time, False, error_msg)
+            raise
+
+    async def get_key_stats(self, table_name: str, key_column: str) -> Optional[Dict[str, Any]]:
+        """Get min/max and the InnoDB row estimate of a key column
+
+        MySQL 8 histograms are only kept for columns someone ran
+        ``ANALYZE TABLE … UPDATE HISTOGRAM`` on (and never for indexed
+        ones), so partitions are split on min/max alone.
+        """
+        if not self.security_validator.validate_identifier(table_name, "table"):
+            raise ValueError(f"Invalid table name: {table_name}")
+
+        if not self.security_validator.validate_identifier(key_column, "column"):
+            raise ValueError(f"Invalid column name: {key_column}")
+
+        if not self._pool:
+            raise RuntimeError("Not connected to database")
+
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"SELECT MIN(`{key_column}`) AS lo, MAX(`{key_column}`) AS hi FROM `{table_name}`"
+                )
+                bounds = await cur.fetchone()
+                await cur.execute(
+                    """
+                    SELECT TABLE_ROWS AS table_rows FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                    """,
+                    (table_name,),
+                )
+                estimate = await cur.fetchone()
+
+        if not bounds or bounds['lo'] is None:
+            return None
+
+        return {
+            "min": bounds['lo'],
+            "max": bounds['hi'],
+            "rows": int((estimate or {}).get('table_rows') or 0),
+            "histogram": [],
+        }
+
+    async def stream_batches(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 5000,
+        limit: Optional[int] = None,
+        key_range: Optional[KeyRange] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """Stream a MySQL table (or one key range of it) through an unbuffered server-side cursor (SSCursor)"""
+        start_time = self._log_operation_start("stream_batches", {"table": table_name, "columns": columns})
+        total = 0
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid table name: {table_name}")
+
+            if columns:
+                for col in columns:
+                    if not self.security_validator.validate_identifier(col, "column"):
+                        raise ValueError(f"Invalid column name: {col}")
+
+            if key_range and not self.security_validator.validate_identifier(key_range.column, "column"):
+                raise ValueError(f"Invalid column name: {key_range.column}")
+
+            safe_batch = self.security_validator.sanitize_limit(batch_size, default=5000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._pool:
+                raise RuntimeError("Not connected to database")
+
+            column_clause = ", ".join(f"`{col}`" for col in columns) if columns else "*"
+            query = f"SELECT {column_clause} FROM `{table_name}`"
+            params: List[Any] = []
+            conditions: List[str] = []
+            if key_range and key_range.lower is not None:
+                conditions.append(f"`{key_range.column}` >= %s")
+                params.append(key_range.lower)
+            if key_range and key_range.upper is not None:
+                conditions.append(f"`{key_range.column}` < %s")
+                params.append(key_range.upper)
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            if limit is not None:
+                # Closing an SSCursor drains the rest of the result set, so
+                # the row cap goes to the server rather than the loop.
+                query += " LIMIT %s"
+                params.append(max(int(limit), 0))
+
+            async with self._pool.acquire() as conn:
+                async with conn.cursor(aiomysql.SSCursor) as cur:
+                    await cur.execute(query, params)
+                    names = [d[0] for d in cur.description]
+                    while True:
+                        rows = await cur.fetchmany(safe_batch)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        yield rows_to_frame(names, rows)
+
+            self._log_operation_end("stream_batches", {"table": table_name, "rows_returned": total}, start_time, True)
+
+        except Exception as e:
+            error_msg = f"Error streaming data: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("stream_batches", {"table": table_name, "rows_returned": total}, start_time, False, error_msg)
+            raise
+
     async def extract_incremental(
         self, table_name: str, last_value: Any, increment_column: str
     ) -> List[Dict[str, Any]]:
@@ -3,9 +3,13 @@ PostgreSQL Database Connector
 Implements DatabaseConnector for PostgreSQL databases with full security
 """
 
-from typing import Optional, Any, List, Dict, Union
-from .base import DatabaseConnector, SecurityValidator
+from typing import AsyncIterator, Optional, Any, List, Dict, Sequence, Union
+from .base import MAX_BATCH_ROWS, DatabaseConnector, KeyRange, SecurityValidator, rows_to_frame
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
 import asyncpg
+import polars as pl
 import asyncio
 import time
 import logging
@@ -13,6 +17,27 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _parse_like(sample: Any, values: List[str]) -> List[Any]:
+    """Parse pg_stats histogram bounds (text) into the type of ``sample``.
+
+    Returns [] for key types we do not know how to parse back.
+    """
+    if isinstance(sample, bool):
+        return []
+    if isinstance(sample, datetime):
+        parse = datetime.fromisoformat
+    elif isinstance(sample, date):
+        parse = date.fromisoformat
+    elif isinstance(sample, (int, float, Decimal, str, UUID)):
+        parse = type(sample)
+    else:
+        return []
+    try:
+        return [parse(v) for v in values]
+    except (TypeError, ValueError):
+        return []
+
+
 class PostgreSQLConnector(DatabaseConnector):
     """PostgreSQL database connector implementation with security features"""
 
@@ -380,6 +405,212 @@ class PostgreSQLConnector(DatabaseConnector):
             self._log_operation_end("extract_data", {"table": table_name}, start_time, False, error_msg)
             raise
 
+    async def get_key_columns(self, table_name: str) -> List[str]:
+        """Get the primary key, or the narrowest unique NOT NULL index, of a PostgreSQL table"""
+        if not self.security_validator.validate_identifier(table_name, "table"):
+            raise ValueError(f"Invalid table name: {table_name}")
+
+        if not self._pool:
+            raise RuntimeError("Not connected to database")
+
+        schema = self.config.get('schema', 'public')
+
+        # Plain (non-partial, non-expression) unique indexes, primary key
+        # first; INCLUDE columns are not part of the key.
+        query = """
+            SELECT array_agg(a.attname ORDER BY k.ord) AS cols
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+            WHERE n.nspname = $1 AND c.relname = $2
+              AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL
+              AND k.ord <= i.indnkeyatts
+            GROUP BY i.indexrelid, i.indisprimary
+            HAVING bool_and(a.attnotnull)
+            ORDER BY i.indisprimary DESC, count(*) ASC
+            LIMIT 1
+        """
+
+        async with self._pool.acquire() as conn:
+            cols = await conn.fetchval(query, schema, table_name)
+
+        return list(cols or [])
+
+    async def extract_keyset(
+        self,
+        table_name: str,
+        key_columns: List[str],
+        after: Optional[Sequence[Any]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Extract the next page of a PostgreSQL table in key order"""
+        start_time = self._log_operation_start("extract_keyset", {"table": table_name, "key": key_columns})
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid table name: {table_name}")
+
+            if not key_columns:
+                raise ValueError("Keyset pagination needs at least one key column")
+
+            for col in [*key_columns, *(columns or [])]:
+                if not self.security_validator.validate_identifier(col, "column"):
+                    raise ValueError(f"Invalid column name: {col}")
+
+            safe_limit = self.security_validator.sanitize_limit(limit, default=1000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._pool:
+                raise RuntimeError("Not connected to database")
+
+            column_clause = "*"
+            if columns:
+                selected = columns + [k for k in key_columns if k not in columns]
+                column_clause = ", ".join(f'"{col}"' for col in selected)
+
+            key_clause = ", ".join(f'"{col}"' for col in key_columns)
+            params: List[Any] = []
+            where = ""
+            if after is not None:
+                # Row-value comparison seeks on the (composite) key's index
+                params = list(after)
+                placeholders = ", ".join(f"${i}" for i in range(1, len(params) + 1))
+                where = f"WHERE ({key_clause}) > ({placeholders})"
+            params.append(safe_limit)
+
+            query = (
+                f'SELECT {column_clause} FROM "{table_name}" {where} '
+                f'ORDER BY {key_clause} LIMIT ${len(params)}'
+            )
+
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(query, *params)
+                result = [dict(row) for row in rows]
+
+            self._log_operation_end("extract_keyset", {"table": table_name, "rows_returned": len(result)}, start_time, True)
+            return result
+
+        except Exception as e:
+            error_msg = f"Error extracting keyset page: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("extract_keyset", {"table": table_name}, start_time, False, error_msg)
+            raise
+
+    async def get_key_stats(self, table_name: str, key_column: str) -> Optional[Dict[str, Any]]:
+        """Get min/max, the planner's row estimate and the pg_stats histogram of a key column"""
+        if not self.security_validator.validate_identifier(table_name, "table"):
+            raise ValueError(f"Invalid table name: {table_name}")
+
+        if not self.security_validator.validate_identifier(key_column, "column"):
+            raise ValueError(f"Invalid column name: {key_column}")
+
+        if not self._pool:
+            raise RuntimeError("Not connected to database")
+
+        schema = self.config.get('schema', 'public')
+
+        async with self._pool.acquire() as conn:
+            # Both ends come straight off the key's btree
+            bounds = await conn.fetchrow(
+                f'SELECT min("{key_column}") AS lo, max("{key_column}") AS hi FROM "{table_name}"'
+            )
+            rows = await conn.fetchval(
+                """
+                SELECT c.reltuples::bigint
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = $1 AND c.relname = $2
+                """,
+                schema, table_name,
+            )
+            # anyarray has no client-side type; read it as text and parse
+            # each bound back into the key's own type below.
+            histogram = await conn.fetchval(
+                """
+                SELECT histogram_bounds::text::text[]
+                FROM pg_stats
+                WHERE schemaname = $1 AND tablename = $2 AND attname = $3
+                """,
+                schema, table_name, key_column,
+            )
+
+        if bounds is None or bounds['lo'] is None:
+            return None
+
+        return {
+            "min": bounds['lo'],
+            "max": bounds['hi'],
+            # -1 (PG 14+) / 0: never vacuumed or analysed
+            "rows": max(int(rows or 0), 0),
+            "histogram": _parse_like(bounds['lo'], histogram or []),
+        }
+
+    async def stream_batches(
+        self,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 5000,
+        limit: Optional[int] = None,
+        key_range: Optional[KeyRange] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """Stream a PostgreSQL table (or one key range of it) through a server-side cursor"""
+        start_time = self._log_operation_start("stream_batches", {"table": table_name, "columns": columns})
+        total = 0
+
+        try:
+            if not self.security_validator.validate_identifier(table_name, "table"):
+                raise ValueError(f"Invalid table name: {table_name}")
+
+            if columns:
+                for col in columns:
+                    if not self.security_validator.validate_identifier(col, "column"):
+                        raise ValueError(f"Invalid column name: {col}")
+
+            if key_range and not self.security_validator.validate_identifier(key_range.column, "column"):
+                raise ValueError(f"Invalid column name: {key_range.column}")
+
+            safe_batch = self.security_validator.sanitize_limit(batch_size, default=5000, max_limit=MAX_BATCH_ROWS)
+
+            if not self._pool:
+                raise RuntimeError("Not connected to database")
+
+            column_clause = ", ".join(f'"{col}"' for col in columns) if columns else "*"
+            query = f'SELECT {column_clause} FROM "{table_name}"'
+            params: List[Any] = []
+            conditions: List[str] = []
+            if key_range and key_range.lower is not None:
+                params.append(key_range.lower)
+                conditions.append(f'"{key_range.column}" >= ${len(params)}')
+            if key_range and key_range.upper is not None:
+                params.append(key_range.upper)
+                conditions.append(f'"{key_range.column}" < ${len(params)}')
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            if limit is not None:
+                params.append(max(int(limit), 0))
+                query += f" LIMIT ${len(params)}"
+
+            async with self._pool.acquire() as conn:
+                # asyncpg cursors only live inside a transaction; read-only
+                # keeps one consistent snapshot for the whole table.
+                async with conn.transaction(readonly=True):
+                    cursor = await conn.cursor(query, *params)
+                    while True:
+                        rows = await cursor.fetch(safe_batch)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        yield rows_to_frame(list(rows[0].keys()), rows)
+
+            self._log_operation_end("stream_batches", {"table": table_name, "rows_returned": total}, start_time, True)
+
+        except Exception as e:
+            error_msg = f"Error streaming data: {str(e)}"
+            logger.error(error_msg)
+            self._log_operation_end("stream_batches", {"table": table_name, "rows_returned": total}, start_time, False, error_msg)
+            raise
+
     async def extract_incremental(
         self, table_name: str, last_value: Any, increment_column: str
     ) -> List[Dict[str, Any]]:
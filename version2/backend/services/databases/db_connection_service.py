@@ -13,7 +13,6 @@ import base64
 import hashlib
 import logging
 import re
-import shutil
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -179,7 +178,11 @@ def _decrypt(ciphertext: str) -> str:
 class DatabaseConnectionService:
 
     def __init__(self):
-        self._extractor = DataExtractor(batch_size=5000)
+        self._extractor = DataExtractor(
+            batch_size=5000,
+            mode=settings.DB_EXTRACT_MODE,
+            max_parallel_per_source=settings.DB_EXTRACT_MAX_PARALLEL_PER_SOURCE,
+        )
         self._schema_svc = SchemaDiscoveryService()
 
     # ------------------------------------------------------------------
@@ -313,17 +316,27 @@ class DatabaseConnectionService:
         dataset_name: Optional[str],
         row_limit: int,
         workspace_id: Optional[str] = None,
+        refresh_of: Optional[Dict[str, Any]] = None,
     ) -> Dict:
         """
         Extract rows from the connected DB, save as Parquet, create a dataset
         record, and fire the Celery processing pipeline.
 
-        **Streaming:** For table extracts, chunks of 5 000 rows are fetched via
-        ``extract_paginated`` and written to temporary Parquet fragments that
-        are then concatenated — no OOM for large tables.
+        **Refresh:** With ``refresh_of`` (the existing dataset doc), an extract
+        that only appends rows to that dataset is merged into it in place
+        (``services/pipeline/incremental.py``) and no new dataset is created.
+
+        **Streaming:** Table extracts go through
+        ``DataExtractor.stream_to_parquet`` — a server-side cursor (or keyset
+        pages, ``DB_EXTRACT_MODE``) yields 5 000-row batches that are written
+        to Parquet as they arrive. No OFFSET re-scans, no OOM for large tables.
+        Large tables with a single-column key are split into key ranges
+        (``plan_key_ranges``) that are pulled concurrently over pooled
+        connections and merged into one Parquet file.
 
-        **Nested documents:** Every row is passed through ``_flatten_document``
-        so nested MongoDB/JSON columns survive as dot-notation keys.
+        **Nested documents:** Rows are flattened by ``_flatten_document`` (SQL
+        cursor batches get the same conversions column-wise) so nested
+        MongoDB/JSON columns survive as dot-notation keys.
 
         **Schema hash:** A stable ``schema_hash`` (sha256 of column-name→type)
         is stored on the dataset record for drift detection.
@@ -344,58 +357,56 @@ class DatabaseConnectionService:
                 parquet_path = str(DB_EXTRACT_DIR / f"{dataset_id}.parquet")
                 df.write_parquet(parquet_path, compression="zstd")
                 total_rows = len(df)
+                columns = df.columns
             else:
-                # ── Table extract — streaming via pagination ──
-                chunk_dir = DB_EXTRACT_DIR / f"{dataset_id}_chunks"
-                chunk_dir.mkdir(parents=True, exist_ok=True)
-
-                total_rows = 0
-                chunk_files: List[str] = []
-
-                async for batch in self._extractor.extract_paginated(
-                    connector, table_name=table_name, page_size=5000
-                ):
-                    if not batch:
-                        break
-                    if total_rows >= row_limit:
-                        break
-                    remaining = row_limit - total_rows
-                    if len(batch) > remaining:
-                        batch = batch[:remaining]
-
-                    flat_batch = [_flatten_document(r) for r in batch]
-                    chunk_df = pl.from_dicts(flat_batch)
-
-                    chunk_path = str(chunk_dir / f"chunk_{total_rows:08d}.parquet")
-                    chunk_df.write_parquet(chunk_path, compression="zstd")
-                    chunk_files.append(chunk_path)
-
-                    total_rows += len(batch)
-
+                # ── Table extract — streamed batch by batch to Parquet ──
+                parquet_path = str(DB_EXTRACT_DIR / f"{dataset_id}.parquet")
+                key_ranges = None
+                if self._extractor.mode == "cursor":
+                    # Large keyed tables: pull key ranges concurrently
+                    key_ranges = await self._schema_svc.plan_key_ranges(
+                        connector,
+                        table_name,
+                        partitions=settings.DB_EXTRACT_PARTITIONS,
+                        limit=row_limit,
+                        min_rows=settings.DB_EXTRACT_PARTITION_MIN_ROWS,
+                    )
+                total_rows = await self._extractor.stream_to_parquet(
+                    connector, table_name, parquet_path, limit=row_limit, key_ranges=key_ranges
+                )
                 if total_rows == 0:
-                    shutil.rmtree(chunk_dir, ignore_errors=True)
                     raise ValueError("No data returned from the database query")
-
-                final_parquet_path = str(DB_EXTRACT_DIR / f"{dataset_id}.parquet")
-                if len(chunk_files) == 1:
-                    df = chunk_df
-                    df.write_parquet(final_parquet_path, compression="zstd")
-                else:
-                    dfs = [pl.read_parquet(f) for f in chunk_files]
-                    df = pl.concat(dfs, how="vertical_relaxed")
-                    df.write_parquet(final_parquet_path, compression="zstd")
-                parquet_path = final_parquet_path
-
-                shutil.rmtree(chunk_dir, ignore_errors=True)
+                columns = list(pl.read_parquet_schema(parquet_path))
 
             schema_hash = hashlib.sha256(
-                json.dumps(sorted(df.columns)).encode()
+                json.dumps(sorted(columns)).encode()
             ).hexdigest()[:16]
 
             db = get_database()
             final_name = dataset_name or f"{conn_doc['name']} — {table_name or 'custom query'}"
             wid = workspace_id or user_id  # tenant tag — personal workspace fallback
 
+            # ── Re-extract that only appended rows: merge in place ──
+            if refresh_of is not None:
+                from services.pipeline.incremental import try_append_refresh
+
+                appended = await try_append_refresh(
+                    refresh_of["_id"], parquet_path, user_id, workspace_id=wid
+                )
+                if appended is not None:
+                    Path(parquet_path).unlink(missing_ok=True)
+                    await self._touch(conn_id)
+                    return {
+                        "dataset_id": refresh_of["_id"],
+                        "task_id": refresh_of["_id"],
+                        "rows_extracted": total_rows,
+                        "rows_appended": appended["rows_appended"],
+                        "incremental": True,
+                        "name": refresh_of.get("name", final_name),
+                        "schema_hash": schema_hash,
+                        "message": f"{appended['rows_appended']} new rows merged into the dataset.",
+                    }
+
             await db.uploads.insert_one({
                 "_id": dataset_id,
                 "user_id": user_id,
@@ -593,6 +604,9 @@ class DatabaseConnectionService:
         Re-extract a DB-sourced dataset from its original source.
         Deletes the old Parquet file, creates a new snapshot, fires the
         Celery pipeline, and returns the new dataset info.
+
+        When the source only gained rows, they are merged into the existing
+        dataset instead and its own id is returned (``incremental: True``).
         """
         from services.datasets.enhanced_dataset_service import enhanced_dataset_service
 
@@ -619,7 +633,14 @@ class DatabaseConnectionService:
             dataset_name=f"{old_name} (re-extracted)",
             row_limit=row_limit,
             workspace_id=dataset.get("workspace_id", user_id),
+            refresh_of=dataset,
         )
+        if result.get("incremental"):
+            logger.info(
+                f"Re-extracted dataset {dataset_id} incrementally "
+                f"(+{result['rows_appended']} rows)"
+            )
+            return result
 
         # Delete the old Parquet file (best-effort — not a failure if it fails)
         old_path = dataset.get("file_path")
@@ -5,7 +5,7 @@ Includes security validation and comprehensive error handling
 """
 
 from typing import TYPE_CHECKING, Dict, List, Any, Optional
-from .connectors.base import DatabaseConnector, SecurityValidator
+from .connectors.base import DatabaseConnector, KeyRange, SecurityValidator
 import hashlib
 import json
 import time
@@ -66,6 +66,37 @@ def _coerce_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return [_flatten_document(r) for r in rows]
 
 
+def _split_points(stats: Dict[str, Any], partitions: int, share: float) -> List[Any]:
+    """
+    Interior split points for ``partitions`` key ranges over the first
+    ``share`` of the rows, strictly increasing and above the key's minimum.
+    """
+    lo, hi = stats.get("min"), stats.get("max")
+    histogram = stats.get("histogram") or []
+    fractions = [share * i / partitions for i in range(1, partitions)]
+
+    if len(histogram) >= 2:
+        # Equi-depth: bound i sits at the i/(n-1) quantile of the rows
+        last = len(histogram) - 1
+        candidates = [histogram[round(f * last)] for f in fractions]
+    elif (
+        isinstance(lo, (int, float)) and isinstance(hi, (int, float))
+        and not isinstance(lo, bool) and not isinstance(hi, bool)
+    ):
+        span = hi - lo
+        candidates = [lo + span * f for f in fractions]
+        if isinstance(lo, int) and isinstance(hi, int):
+            candidates = [int(c) for c in candidates]
+    else:
+        return []
+
+    points: List[Any] = []
+    for c in candidates:
+        if c > lo and (not points or c > points[-1]):
+            points.append(c)
+    return points
+
+
 class SchemaDiscoveryService:
     """Discovers and manages database schema information"""
 
@@ -226,6 +257,64 @@ class SchemaDiscoveryService:
 
         return schema
 
+    async def plan_key_ranges(
+        self,
+        connector: DatabaseConnector,
+        table_name: str,
+        partitions: int,
+        limit: Optional[int] = None,
+        min_rows: int = 0,
+    ) -> List[KeyRange]:
+        """
+        Split a table into key ranges that can be extracted concurrently
+
+        Split points come from the key's equi-depth histogram when the
+        database keeps one (so skewed keys still give even ranges) and
+        from a linear split of min/max for numeric keys otherwise. With a
+        ``limit`` only the share of the key space that should hold that
+        many rows is split; the last range is open-ended and is capped by
+        the limit like a single-stream extract.
+
+        Args:
+            connector: Database connector instance
+            table_name: Name of the table/collection
+            partitions: Number of ranges wanted
+            limit: Rows the extract will keep (None for the whole table)
+            min_rows: Tables estimated below this are not worth splitting
+
+        Returns:
+            Ranges in key order, or [] to extract in one stream (no
+            single-column key, no usable statistics, or a small table)
+        """
+        if partitions < 2:
+            return []
+
+        try:
+            key_columns = await connector.get_key_columns(table_name)
+            if len(key_columns) != 1:
+                return []
+            stats = await connector.get_key_stats(table_name, key_columns[0])
+        except Exception as e:
+            logger.warning(f"Could not read key statistics for {table_name}: {e}")
+            return []
+
+        rows = (stats or {}).get("rows") or 0
+        if not stats or rows < max(min_rows, 1):
+            return []
+
+        share = min(1.0, limit / rows) if limit else 1.0
+        points = _split_points(stats, partitions, share)
+        if not points:
+            return []
+
+        bounds = [None, *points, None]
+        ranges = [KeyRange(key_columns[0], lo, hi) for lo, hi in zip(bounds, bounds[1:])]
+        logger.info(
+            f"Planned {len(ranges)} key ranges on {table_name}.{key_columns[0]} "
+            f"(~{rows} rows, {'histogram' if stats.get('histogram') else 'min/max'})"
+        )
+        return ranges
+
     def _get_cache_key(self, connector: DatabaseConnector, suffix: str) -> str:
         """Generate a cache key based on connector config and suffix"""
         # Remove password from config for security in cache key
@@ -0,0 +1,267 @@
+"""
+Content Store — Content-addressed dataset files and derived artifacts
+=====================================================================
+``upload_dataset`` already hashed every upload, but only to answer 409 for
+an exact duplicate in the same workspace. Every other upload of the same
+bytes got its own raw file, Parquet copy, samples, DuckDB catalog, rollup
+cube and vector entries. A re-upload in another workspace, or a Google
+Sheet re-import that changed nothing, re-ran the whole pipeline.
+
+This store keeps each distinct upload once, in a directory named by its
+SHA-256. The pipeline writes the canonical Parquet next to the raw file,
+so the path-keyed artifacts follow it into the same directory without any
+change to their writers: sampled Parquet (``sampling.cached_sample``),
+the Parquet min/max sidecar, and so on.
+
+Layout
+------
+``<CONTENT_STORE_DIR>/<hash[:2]>/<hash>/``
+
+- ``data.<ext>`` — the uploaded bytes
+- ``data.parquet`` — canonical Parquet written by the pipeline, plus its
+  samples and sidecars
+- ``derived.json`` — the pipeline's results: the uploads-doc fields,
+  profile and intelligence. Written after a successful run.
+- ``catalog.duckdb``, ``rollup.parquet``, ``rollup.json`` — hard links to
+  the DuckDB catalog and rollup cube built for that run. Both stores
+  rebuild with tmp + rename, which breaks the link, so a rebuild for one
+  dataset never changes another's.
+
+When a dataset whose file lives here is processed and ``derived.json``
+exists, :func:`services.pipeline.process.process_dataset` adopts the
+stored results instead of re-running the stages. That takes milliseconds.
+
+References
+----------
+Datasets point into the store through their ``file_path``. The
+``content_blobs`` collection records which dataset ids reference each
+hash. Deleting the last reference removes the directory. Mutations never
+write here: the cleaning engine copies the dataset to a private Parquet
+(:meth:`ContentStore.private_parquet_path`) before rewriting it.
+
+Usage
+-----
+    from services.datasets.content_store import content_store
+
+    await content_store.acquire(content_hash, dataset_id)
+    raw_path = content_store.adopt(temp_path, content_hash, "csv")
+    ...
+    await content_store.release(content_hash, dataset_id)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of derived.json changes; older records are ignored
+# and the dataset is processed normally.
+DERIVED_FORMAT = 1
+
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Place *source* at *target* atomically, sharing blocks when possible."""
+    tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(source, tmp)
+    except OSError:  # other filesystem, or links unsupported
+        shutil.copy2(source, tmp)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class ContentStore:
+    """Per-hash directories of raw uploads and everything derived from them."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.CONTENT_STORE_DIR)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Paths
+    # ─────────────────────────────────────────────────────────────────────
+
+    def blob_dir(self, content_hash: str) -> Path:
+        if not _HASH.match(content_hash):
+            raise ValueError(f"Not a SHA-256 hex digest: {content_hash!r}")
+        return self.directory / content_hash[:2] / content_hash
+
+    def content_hash_of(self, path: Optional[str]) -> Optional[str]:
+        """The hash whose directory holds *path*, or ``None`` if it is not in the store."""
+        if not path:
+            return None
+        try:
+            relative = Path(path).resolve().relative_to(self.directory.resolve())
+        except ValueError:
+            return None
+        parts = relative.parts
+        if len(parts) >= 3 and _HASH.match(parts[1]):
+            return parts[1]
+        return None
+
+    def owns(self, path: Optional[str]) -> bool:
+        return self.content_hash_of(path) is not None
+
+    def private_parquet_path(self, dataset_id: str) -> str:
+        """Where a dataset's own Parquet goes once it diverges from the shared one."""
+        return str(self.directory / "private" / f"{_UNSAFE.sub('_', dataset_id)}.parquet")
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Raw files
+    # ─────────────────────────────────────────────────────────────────────
+
+    def adopt(self, source_path: str, content_hash: str, ext: str) -> str:
+        """Move *source_path* into the store and return the stored raw path.
+
+        If these bytes are already stored, *source_path* is deleted and the
+        existing file is returned.
+        """
+        blob = self.blob_dir(content_hash)
+        target = blob / f"data.{ext.lower().lstrip('.')}"
+        if target.exists():
+            Path(source_path).unlink(missing_ok=True)
+            return str(target)
+        blob.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        shutil.move(source_path, tmp)
+        os.replace(tmp, target)
+        logger.info("[ContentStore] Stored %s (%s)", content_hash[:12], target.name)
+        return str(target)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Derived results
+    # ─────────────────────────────────────────────────────────────────────
+
+    def save_derived(
+        self,
+        raw_path: str,
+        record: dict[str, Any],
+        artifacts: Optional[dict[str, str]] = None,
+    ) -> bool:
+        """Record a successful pipeline run over *raw_path* for reuse.
+
+        *artifacts* maps a stored file name (``catalog.duckdb``) to the file
+        built for this run. Missing artifacts are skipped.
+        """
+        content_hash = self.content_hash_of(raw_path)
+        if content_hash is None:
+            return False
+        blob = self.blob_dir(content_hash)
+        for name, path in (artifacts or {}).items():
+            stored = blob / name
+            if path and Path(path).exists():
+                try:
+                    _link_or_copy(Path(path), stored)
+                except OSError as e:
+                    logger.warning("[ContentStore] Could not store %s: %s", name, e)
+            else:
+                stored.unlink(missing_ok=True)  # never pair new results with old artifacts
+
+        target = blob / "derived.json"
+        tmp = target.with_name(f"derived.{uuid.uuid4().hex[:8]}.tmp")
+        payload = {
+            **record,
+            "format": DERIVED_FORMAT,
+            "artifacts": sorted(n for n in (artifacts or {}) if (blob / n).exists()),
+            "saved_at": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+        }
+        try:
+            tmp.write_text(json.dumps(payload, default=str))
+            os.replace(tmp, target)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning("[ContentStore] Could not save derived results: %s", e)
+            return False
+        return True
+
+    def load_derived(self, raw_path: str) -> Optional[dict[str, Any]]:
+        """The stored pipeline results for *raw_path*, if they are still usable."""
+        content_hash = self.content_hash_of(raw_path)
+        if content_hash is None:
+            return None
+        blob = self.blob_dir(content_hash)
+        try:
+            record = json.loads((blob / "derived.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if record.get("format") != DERIVED_FORMAT:
+            return None
+        parquet_path = record.get("fields", {}).get("parquet_path")
+        if parquet_path and not Path(parquet_path).exists():
+            return None
+        return record
+
+    def restore_artifact(self, raw_path: str, name: str, target: Path) -> bool:
+        """Link the stored artifact *name* to *target*. False if it is not stored."""
+        content_hash = self.content_hash_of(raw_path)
+        if content_hash is None:
+            return False
+        stored = self.blob_dir(content_hash) / name
+        if not stored.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _link_or_copy(stored, target)
+        return True
+
+    # ─────────────────────────────────────────────────────────────────────
+    # References
+    # ─────────────────────────────────────────────────────────────────────
+
+    @property
+    def _collection(self):
+        from db.database import get_database
+
+        return get_database().content_blobs
+
+    async def acquire(self, content_hash: str, dataset_id: str) -> None:
+        """Record that *dataset_id* references *content_hash*.
+
+        Call before :meth:`adopt`, so the hash is never unreferenced while
+        a new file is being moved in.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        await self._collection.update_one(
+            {"_id": content_hash},
+            {
+                "$addToSet": {"refs": dataset_id},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+
+    async def release(self, content_hash: str, dataset_id: str) -> bool:
+        """Drop *dataset_id*'s reference. Removes the files with the last one.
+
+        Returns True when the directory was removed.
+        """
+        collection = self._collection
+        await collection.update_one({"_id": content_hash}, {"$pull": {"refs": dataset_id}})
+        unreferenced = await collection.find_one_and_delete(
+            {"_id": content_hash, "refs": {"$size": 0}}
+        )
+        if unreferenced is None:
+            return False
+        shutil.rmtree(self.blob_dir(content_hash), ignore_errors=True)
+        logger.info("[ContentStore] Removed unreferenced %s", content_hash[:12])
+        return True
+
+
+# Module-level singleton
+content_store = ContentStore()
@@ -0,0 +1,223 @@
+"""
+Dataset Handle — One lazy, version-pinned way to read a dataset
+===============================================================
+Datasets were loaded four different ways: ``load_dataset_data``, the QUIS
+loader, the mutation engine, and the legacy ``dataset_loader``. All four
+materialised every column. A bar chart over 2 of 80 columns paid for all
+80.
+
+A :class:`DatasetHandle` wraps the dataset's canonical file (the
+pipeline Parquet, or the raw upload for legacy datasets that have none).
+Callers say which columns and rows they need, and Polars pushes both
+down into the Parquet reader: unread columns are never decoded, and row
+groups whose min/max statistics miss the predicate are skipped. The
+clustered layout (``parquet_layout.py``) makes those skips likely.
+Memory per request scales with the columns used, not the table width.
+
+Version pinning
+---------------
+A handle records the file's version (size + mtime, as the frame cache
+does) when opened. Mutations and re-imports replace the file atomically,
+so if the version has changed by the time the handle is scanned,
+:class:`DatasetVersionChanged` is raised instead of silently mixing two
+versions in one request. Callers reopen the handle.
+
+Metadata
+--------
+Schema and row count come from the Parquet footer. They are cached per
+(path, version), so opening a handle for a known version touches no
+file data.
+
+Usage
+-----
+    from services.datasets.dataset_handle import open_dataset
+
+    handle = open_dataset(dataset_id, dataset_doc)
+    df = handle.collect(["region", "revenue"], pl.col("year") == 2024)
+    lf = handle.scan(["order_date", "revenue"])   # keep composing lazily
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import polars as pl
+
+from services.cache.frame_cache import source_version
+
+logger = logging.getLogger(__name__)
+
+_METADATA_CACHE_SIZE = 256
+
+
+class DatasetVersionChanged(RuntimeError):
+    """The dataset file was replaced after the handle was opened."""
+
+
+@dataclass(frozen=True)
+class DatasetMetadata:
+    schema: dict[str, pl.DataType]
+    num_rows: int
+
+
+_metadata: OrderedDict[tuple[str, str], DatasetMetadata] = OrderedDict()
+_metadata_lock = threading.Lock()
+
+
+def _cached_metadata(path: str, version: str) -> Optional[DatasetMetadata]:
+    with _metadata_lock:
+        meta = _metadata.get((path, version))
+        if meta is not None:
+            _metadata.move_to_end((path, version))
+        return meta
+
+
+def _store_metadata(path: str, version: str, meta: DatasetMetadata) -> None:
+    with _metadata_lock:
+        _metadata[(path, version)] = meta
+        while len(_metadata) > _METADATA_CACHE_SIZE:
+            _metadata.popitem(last=False)
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """A dataset's canonical file at one version."""
+
+    dataset_id: str
+    path: str
+    file_type: str
+    version: str
+    schema: dict[str, pl.DataType]
+    num_rows: int
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.schema)
+
+    @property
+    def is_parquet(self) -> bool:
+        return self.file_type == "parquet"
+
+    def _check_version(self) -> None:
+        current = source_version(self.path)
+        if current != self.version:
+            raise DatasetVersionChanged(
+                f"Dataset {self.dataset_id} changed since it was opened "
+                f"({self.version} → {current})"
+            )
+
+    def project(self, columns: Optional[Sequence[str]]) -> list[str]:
+        """The requested columns that exist, in table order.
+
+        Unknown names are dropped. If none is known, every column is
+        returned, so callers validate against the real schema as before.
+        """
+        if not columns:
+            return self.columns
+        wanted = set(columns)
+        known = [c for c in self.schema if c in wanted]
+        return known or self.columns
+
+    def scan(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        predicate: Optional[pl.Expr] = None,
+    ) -> pl.LazyFrame:
+        """Lazy frame over the pinned version with projection + predicate.
+
+        The predicate may reference columns outside ``columns``.
+        """
+        self._check_version()
+        if self.is_parquet:
+            lf = pl.scan_parquet(self.path)
+        else:
+            # Legacy datasets without a pipeline Parquet: the raw upload is
+            # read whole with the pipeline loader (encoding/delimiter
+            # detection), so only the Parquet path is truly lazy.
+            from services.pipeline.load import load_dataset
+
+            lf = load_dataset(self.path)[0].lazy()
+        if predicate is not None:
+            lf = lf.filter(predicate)
+        projection = self.project(columns)
+        if len(projection) < len(self.schema):
+            lf = lf.select(projection)
+        return lf
+
+    def collect(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        predicate: Optional[pl.Expr] = None,
+        limit: Optional[int] = None,
+    ) -> pl.DataFrame:
+        """Materialise only ``columns`` of the rows matching ``predicate``."""
+        lf = self.scan(columns, predicate)
+        if limit:
+            lf = lf.head(limit)
+        return lf.collect()
+
+    def page(self, offset: int, limit: int) -> pl.DataFrame:
+        """Rows ``[offset, offset + limit)`` in file order.
+
+        For a processed dataset the file order is the clustered layout of
+        ``parquet_layout`` (time month, dimension, time), not upload order.
+
+        On the Parquet the slice is pushed into the reader, which uses the
+        footer's per-row-group row counts to decode only the row groups
+        that hold the page, so a page deep in the table costs about the
+        same as the first one.
+        """
+        return self.scan().slice(offset, limit).collect()
+
+
+def _read_metadata(path: str, file_type: str) -> DatasetMetadata:
+    if file_type == "parquet":
+        schema = dict(pl.read_parquet_schema(path))
+        num_rows = pl.scan_parquet(path).select(pl.len()).collect().item()
+        return DatasetMetadata(schema=schema, num_rows=num_rows)
+
+    from services.pipeline.load import load_dataset
+
+    df, _ = load_dataset(path)
+    return DatasetMetadata(schema=dict(df.schema), num_rows=df.height)
+
+
+def open_dataset(dataset_id: str, doc: dict) -> DatasetHandle:
+    """Handle on the dataset's canonical file (Parquet first, then the upload).
+
+    Raises ``FileNotFoundError`` when neither file is on disk.
+    """
+    parquet_path = doc.get("parquet_path")
+    file_path = doc.get("file_path")
+    if parquet_path and Path(parquet_path).exists():
+        path, file_type = str(parquet_path), "parquet"
+    elif file_path and Path(file_path).exists():
+        path, file_type = str(file_path), Path(file_path).suffix.lstrip(".").lower()
+    else:
+        raise FileNotFoundError(f"No data file on disk for dataset {dataset_id}")
+
+    version = source_version(path)
+    if version is None:
+        raise FileNotFoundError(f"No data file on disk for dataset {dataset_id}")
+
+    meta = _cached_metadata(path, version)
+    if meta is None:
+        meta = _read_metadata(path, file_type)
+        _store_metadata(path, version, meta)
+
+    return DatasetHandle(
+        dataset_id=dataset_id,
+        path=path,
+        file_type=file_type,
+        version=version,
+        schema=meta.schema,
+        num_rows=meta.num_rows,
+    )
+
+
+__all__ = ["DatasetHandle", "DatasetMetadata", "DatasetVersionChanged", "open_dataset"]
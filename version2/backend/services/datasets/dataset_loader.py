@@ -18,6 +18,13 @@ from datetime import datetime, timezone
 import logging
 
 from core.config import settings
+from services.datasets.sampling import (  # noqa: F401 — re-exported for existing callers
+    SAMPLE_CACHE_VERSION,
+    load_cached_sample,
+    sample_cache_path,
+    store_sample,
+    stratified_sample,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -95,90 +102,25 @@ async def load_dataset_sample(
     Returns:
         Polars DataFrame (full dataset if < max_rows, sample otherwise)
     """
-    # Check for cached sample first
-    sample_path = f"{file_path}.sample_{max_rows}.parquet"
-
-    if use_cache and os.path.exists(sample_path):
-        try:
-            # Verify cache is newer than source
-            if os.path.getmtime(sample_path) > os.path.getmtime(file_path):
-                logger.debug(f"Loading cached sample: {sample_path}")
-                return pl.read_parquet(sample_path)
-        except Exception as e:
-            logger.warning(f"Cache read failed, will regenerate: {e}")
+    # Cached samples are keyed by the source file's version, so a
+    # rewritten file never serves a stale sample.
+    if use_cache:
+        cached = load_cached_sample(file_path, max_rows)
+        if cached is not None:
+            logger.debug(f"Loading cached sample for {file_path}")
+            return cached
 
-    # Load full dataset
     df = await load_dataset(file_path)
-
-    # If small enough, return as-is
     if len(df) <= max_rows:
         return df
 
     logger.info(f"Dataset has {len(df)} rows, creating {max_rows}-row sample")
-
-    # Smart sampling: maintain category distribution if possible
-    sampled = await _create_stratified_sample(df, max_rows, stratify_column)
-
-    # Cache for future use
+    sampled = stratified_sample(df, max_rows, stratify_column)
     if use_cache:
-        try:
-            sampled.write_parquet(sample_path)
-            logger.info(f"Cached sample to {sample_path}")
-        except Exception as e:
-            logger.warning(f"Failed to cache sample: {e}")
-
+        store_sample(file_path, max_rows, sampled)
     return sampled
 
 
-async def _create_stratified_sample(
-    df: pl.DataFrame, max_rows: int, stratify_column: Optional[str] = None
-) -> pl.DataFrame:
-    """
-    Create a stratified sample maintaining category distributions.
-
-    If no stratify_column is specified, automatically selects the
-    best categorical column for stratification.
-    """
-    # Find categorical columns for stratification
-    if stratify_column and stratify_column in df.columns:
-        cat_col = stratify_column
-    else:
-        cat_cols = [c for c in df.columns if df[c].dtype == pl.Utf8 and df[c].n_unique() < 100]
-        cat_col = cat_cols[0] if cat_cols else None
-
-    if cat_col:
-        try:
-            # Calculate samples per category
-            n_categories = df[cat_col].n_unique()
-            samples_per_cat = max(max_rows // n_categories, 1)
-
-            # Sample from each category using concrete integer sizes
-            sampled_frames = []
-            for category in df[cat_col].unique().to_list():
-                group = df.filter(pl.col(cat_col) == category)
-                n = min(samples_per_cat, len(group))
-                sampled_frames.append(group.sample(n=n, seed=42))
-            sampled = pl.concat(sampled_frames) if sampled_frames else df.sample(n=0)
-
-            # If we got too few, top up with random rows from df
-            if len(sampled) < max_rows * 0.9:
-                remaining = max_rows - len(sampled)
-                additional = df.sample(n=min(remaining, len(df)), seed=42)
-                sampled = pl.concat([sampled, additional])
-
-            # If we got too many, trim
-            if len(sampled) > max_rows:
-                sampled = sampled.sample(n=max_rows)
-
-            return sampled
-
-        except Exception as e:
-            logger.warning(f"Stratified sampling failed, using random: {e}")
-
-    # Fallback to random sampling
-    return df.sample(n=max_rows)
-
-
 # -----------------------------------------------------------
 # ENTERPRISE: Fast Metadata Access
 # -----------------------------------------------------------
@@ -408,6 +350,7 @@ def load_dataset_s3_lazy(
     s3_url: str,
     max_rows: int | None = None,
     max_cols: int | None = None,
+    columns: list[str] | None = None,
 ) -> pl.LazyFrame:
     """Read a parquet file from S3 into a **lazy** Polars frame.
 
@@ -422,6 +365,9 @@ def load_dataset_s3_lazy(
         If set, only the first *max_rows* rows are scanned (pushdown).
     max_cols:
         If set, only the first *max_cols* columns are projected.
+    columns:
+        If set, only these columns are projected (unknown names are
+        ignored); takes precedence over *max_cols*.
 
     Returns
     -------
@@ -430,7 +376,10 @@ def load_dataset_s3_lazy(
     opts = _get_s3_storage_options()
     lf = pl.scan_parquet(s3_url, storage_options=opts)
 
-    if max_cols is not None:
+    known = [c for c in lf.collect_schema().names() if c in set(columns)] if columns else []
+    if known:
+        lf = lf.select(known)
+    elif max_cols is not None:
         cols = lf.collect_schema().names()[:max_cols]
         lf = lf.select(cols)
 
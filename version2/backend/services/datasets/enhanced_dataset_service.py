@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 import hashlib
 import tempfile
@@ -7,6 +8,8 @@ import logging
 from typing import List, Dict, Optional
 from pathlib import Path
 
+import polars as pl
+
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import JSONResponse
 from bson import ObjectId
@@ -17,7 +20,9 @@ from core.config import settings
 from utils.json_encoder import ensure_json_serializable
 from services.datasets.file_storage_service import file_storage_service
 from services.datasets.faiss_vector_service import faiss_vector_service
-from services.cache import cache_service
+from services.cache.frame_cache import frame_cache
+from services.datasets.content_store import content_store
+from services.datasets.dataset_handle import DatasetHandle, open_dataset
 
 # Note: process_dataset_task imported lazily to avoid circular imports
 from services.datasets import dataset_loader
@@ -233,13 +238,19 @@ class EnhancedDatasetService:
                     },
                 )
 
-            # Move temp file to permanent storage
-            file_metadata = await file_storage_service.save_file_from_path(
-                temp_path, file.filename, user_id
-            )
-            temp_path = None  # File has been moved, don't delete in finally
-
+            # Move temp file into the content-addressed store. Bytes already
+            # uploaded elsewhere are stored once, and the pipeline reuses
+            # their processed results instead of re-running.
             dataset_id = str(uuid.uuid4())
+            await content_store.acquire(content_hash, dataset_id)
+            try:
+                file_metadata = await file_storage_service.save_file_to_content_store(
+                    temp_path, file.filename, content_hash
+                )
+            except Exception:
+                await content_store.release(content_hash, dataset_id)
+                raise
+            temp_path = None  # File has been moved, don't delete in finally
 
             dataset_doc = {
                 "_id": dataset_id,
@@ -465,7 +476,15 @@ class EnhancedDatasetService:
         try:
             dataset = await self.get_dataset(dataset_id, user_id)
 
-            if dataset.get("file_path"):
+            # Files in the content store may be shared: drop this dataset's
+            # reference (the last one removes them) and its private Parquet.
+            content_hash = content_store.content_hash_of(dataset.get("file_path"))
+            if content_hash:
+                await content_store.release(content_hash, dataset_id)
+                parquet_path = dataset.get("parquet_path")
+                if parquet_path and not content_store.owns(parquet_path):
+                    await file_storage_service.delete_file(parquet_path)
+            elif dataset.get("file_path"):
                 await file_storage_service.delete_file(dataset["file_path"])
 
             # Clean up S3 parquet if present
@@ -478,6 +497,20 @@ class EnhancedDatasetService:
                 except Exception as e:
                     logger.warning(f"S3 delete failed for {s3_key}: {e}")
 
+            # Drop the persistent DuckDB catalog file, rollup cube, mapped
+            # frames and the append-refresh baseline
+            try:
+                from services.pipeline.incremental import discard_baseline
+                from services.query.dataset_catalog import dataset_catalog
+                from services.query.rollups import rollup_store
+
+                dataset_catalog.invalidate(dataset_id)
+                rollup_store.invalidate(dataset_id)
+                frame_cache.invalidate(dataset_id)
+                discard_baseline(dataset_id)
+            except Exception as e:
+                logger.warning(f"DuckDB catalog delete failed for {dataset_id}: {e}")
+
             # Cascade delete: conversations
             await self.db.conversations.delete_many({"dataset_id": dataset_id, "user_id": user_id})
 
@@ -529,9 +562,23 @@ class EnhancedDatasetService:
         try:
             dataset = await self.get_dataset(dataset_id, user_id)
             offset = (page - 1) * page_size
-            data, total_rows = await file_storage_service.get_paginated_file_data(
-                dataset["file_path"], limit=page_size, offset=offset
-            )
+
+            # Pages come from the canonical Parquet: the slice reads only the
+            # row groups covering the page, and the total is the footer row
+            # count cached per file version. The raw upload is paged only
+            # until the pipeline has written the Parquet.
+            parquet_path = dataset.get("parquet_path")
+            if parquet_path and Path(parquet_path).exists():
+                loop = asyncio.get_running_loop()
+                handle = await loop.run_in_executor(None, open_dataset, dataset_id, dataset)
+                page_df = await loop.run_in_executor(None, handle.page, offset, page_size)
+                # Starlette's JSON encoder rejects NaN
+                page_df = page_df.with_columns(pl.col(pl.Float32, pl.Float64).fill_nan(None))
+                data, total_rows = page_df.to_dicts(), handle.num_rows
+            else:
+                data, total_rows = await file_storage_service.get_paginated_file_data(
+                    dataset["file_path"], limit=page_size, offset=offset
+                )
 
             return {
                 "data": data,
@@ -553,18 +600,19 @@ class EnhancedDatasetService:
         user_id: str,
         max_rows: int | None = None,
         max_cols: int | None = None,
+        columns: list[str] | None = None,
     ):
         """Load a dataset as a Polars DataFrame.
 
         **S3 path** (when ``settings.S3_ENABLED`` and the dataset has a
         ``s3_parquet_key``):
             Reads parquet from S3 lazily with optional row/column pruning.
-            Skips the Redis pickle cache entirely (DataFrames can be large).
+            Skips the frame cache entirely (DataFrames can be large).
 
-        **Local path** (legacy fallback):
-            1. Redis cache (fastest)
-            2. Local parquet file
-            3. Original CSV/Excel file
+        **Local path**: a :class:`DatasetHandle` on the local Parquet, or the
+        original CSV/Excel/JSON when there is none. Full loads are served
+        from the memory-mapped frame cache (``services/cache/frame_cache.py``),
+        keyed by the version of that file.
 
         Parameters
         ----------
@@ -572,11 +620,12 @@ class EnhancedDatasetService:
             If set, only the first *max_rows* rows are returned (S3 path only).
         max_cols:
             If set, only the first *max_cols* columns are returned (S3 path only).
+        columns:
+            If set, only these columns are read (projection pushdown; the
+            frame cache is bypassed). Unknown names are ignored; if none is
+            known, every column is returned.
         """
-        import polars as pl
-
         dataset = await self.get_dataset(dataset_id, user_id)
-        file_path = dataset.get("file_path")
         s3_key = dataset.get("s3_parquet_key")
 
         # ── S3 path (lazy, pruned, no Redis pickle cache) ────────────────
@@ -585,7 +634,9 @@ class EnhancedDatasetService:
                 s3_url = f"s3://{settings.SUPABASE_BUCKET_NAME}/{s3_key}"
                 max_rows = max_rows or settings.AGENT_MAX_CONTEXT_ROWS
                 max_cols = max_cols or settings.AGENT_MAX_CONTEXT_COLS
-                lf = load_dataset_s3_lazy(s3_url, max_rows=max_rows, max_cols=max_cols)
+                lf = load_dataset_s3_lazy(
+                    s3_url, max_rows=max_rows, max_cols=max_cols, columns=columns
+                )
                 df = lf.collect()
                 logger.info(
                     "Loaded dataset %s from S3 (%s rows × %s cols)",
@@ -597,63 +648,67 @@ class EnhancedDatasetService:
             except Exception as e:
                 logger.warning("S3 load failed for %s, falling back to local: %s", dataset_id, e)
 
-        # ── Local path (legacy) ────────────────────────────────────────────
-        cache_key = f"df:{dataset_id}"
-
+        # ── Local path ───────────────────────────────────────────────────
+        # The canonical file (pipeline Parquet, else the raw upload) behind
+        # a version-pinned handle. With ``columns`` only those are decoded;
+        # full loads go through the frame cache, keyed by the same version.
+        loop = asyncio.get_running_loop()
         try:
-            cached_df = await cache_service.get_dataframe(cache_key)
-            if cached_df is not None:
-                logger.debug(f"Cache hit for dataset {dataset_id}")
-                return cached_df
-        except Exception as e:
-            logger.warning(f"Cache read failed for {dataset_id}: {e}")
+            handle = await loop.run_in_executor(None, open_dataset, dataset_id, dataset)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Dataset file not found on disk.")
+        except ValueError as e:  # unsupported legacy upload format
+            raise HTTPException(status_code=400, detail=str(e))
 
         try:
-            if not file_path:
-                raise HTTPException(status_code=404, detail="Dataset file not found.")
+            if columns:
+                df = await loop.run_in_executor(None, handle.collect, columns)
+                logger.info(
+                    "Loaded %d of %d columns for dataset %s (%s rows)",
+                    df.width,
+                    len(handle.schema),
+                    dataset_id,
+                    f"{df.height:,}",
+                )
+                return df
 
-            parquet_path = dataset.get("parquet_path")
-            df = None
+            try:
+                cached_df = frame_cache.get(dataset_id, handle.path)
+                if cached_df is not None:
+                    logger.debug(f"Cache hit for dataset {dataset_id}")
+                    return cached_df
+            except Exception as e:
+                logger.warning(f"Cache read failed for {dataset_id}: {e}")
 
-            if parquet_path and Path(parquet_path).exists():
-                try:
-                    df = pl.read_parquet(parquet_path)
-                    logger.info(f"Loaded Parquet for dataset {dataset_id} ({len(df):,} rows)")
-                except Exception as e:
-                    logger.warning(f"Parquet read failed, falling back to original: {e}")
-                    df = None
-
-            if df is None:
-                path = Path(file_path)
-                if not path.exists():
-                    raise HTTPException(status_code=404, detail="Dataset file not found on disk.")
-
-                file_ext = path.suffix.lower()
-                if file_ext == ".csv":
-                    df = pl.read_csv(file_path, infer_schema_length=10000)
-                elif file_ext in [".xlsx", ".xls"]:
-                    df = pl.read_excel(file_path)
-                elif file_ext == ".json":
-                    df = pl.read_json(file_path)
-                else:
-                    raise HTTPException(
-                        status_code=400, detail=f"Unsupported file format: {file_ext}"
-                    )
+            df = await loop.run_in_executor(None, handle.collect)
+            logger.info(f"Loaded {handle.file_type} for dataset {dataset_id} ({len(df):,} rows)")
 
             try:
-                await cache_service.set_dataframe(cache_key, df, ttl=3600)
-                logger.debug(f"Cached DataFrame for dataset {dataset_id}")
+                if await loop.run_in_executor(
+                    None, frame_cache.put, dataset_id, handle.path, df
+                ):
+                    logger.debug(f"Cached DataFrame for dataset {dataset_id}")
             except Exception as e:
                 logger.warning(f"Cache write failed for {dataset_id}: {e}")
 
             return df
 
-        except HTTPException:
-            raise
         except Exception as e:
-            logger.error(f"Failed to load dataset from {file_path}: {e}")
+            logger.error(f"Failed to load dataset from {handle.path}: {e}")
             raise HTTPException(status_code=500, detail=f"Could not load dataset: {str(e)}")
 
+    async def open_dataset_handle(self, dataset_id: str, user_id: str) -> DatasetHandle:
+        """Ownership-checked :class:`DatasetHandle` for lazy, column-pruned reads.
+
+        Raises ``HTTPException(404)`` when no data file is on disk.
+        """
+        dataset = await self.get_dataset(dataset_id, user_id)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, open_dataset, dataset_id, dataset)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Dataset file not found on disk.")
+
     async def auto_index_dataset_to_vector_db(self, dataset_id: str, user_id: str) -> bool:
         """
         Automatically index a dataset to vector database after processing.
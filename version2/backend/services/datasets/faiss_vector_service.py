@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import json
 import pickle
@@ -240,6 +241,107 @@ class FAISSVectorService:
             logger.error(f"Failed to add dataset {dataset_id} to vector DB: {e}")
             return False
 
+    async def clone_dataset_vectors(
+        self,
+        source_id: str,
+        dataset_id: str,
+        user_id: str,
+        workspace_id: str | None = None,
+    ) -> bool:
+        """Give *dataset_id* copies of *source_id*'s vector entries without re-embedding.
+
+        Used when a dataset adopts the stored results for identical content
+        (``services/datasets/content_store.py``). Copies the dataset-level
+        entry and, if the source has been chunk-indexed, its RAG chunks
+        (MongoDB + per-dataset FAISS file). Returns False when the source
+        has no dataset-level entry.
+        """
+        self._ensure_initialized()
+        if not self.enable_vector_search or self.dataset_index is None:
+            return False
+
+        try:
+            self._ensure_locks()
+            async with self._dataset_index_lock:
+                source = next(
+                    (
+                        (idx, meta)
+                        for idx, meta in self.dataset_metadata.items()
+                        if meta.get("dataset_id") == source_id
+                    ),
+                    None,
+                )
+                if source is None:
+                    return False
+                if not any(
+                    meta.get("dataset_id") == dataset_id for meta in self.dataset_metadata.values()
+                ):
+                    idx, meta = source
+                    vector = self.dataset_index.reconstruct(int(idx)).reshape(1, -1)
+                    self.dataset_index.add(vector)
+                    self.dataset_metadata[self.dataset_index.ntotal - 1] = {
+                        **meta,
+                        "dataset_id": dataset_id,
+                        "user_id": user_id,
+                        "workspace_id": workspace_id or user_id,
+                        "added_at": datetime.now().isoformat(),
+                    }
+                    self._dataset_dirty = True
+                    self._persist_dataset_index()
+
+            await self._clone_dataset_chunks(source_id, dataset_id, user_id)
+            logger.info(f"Cloned vector entries of dataset {source_id} to {dataset_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to clone vectors of {source_id} to {dataset_id}: {e}")
+            return False
+
+    async def _clone_dataset_chunks(self, source_id: str, dataset_id: str, user_id: str) -> None:
+        """Copy *source_id*'s on-disk chunk index (if any) to *dataset_id*."""
+        index_path = self._chunk_index_path(source_id)
+        meta_path = self._chunk_metadata_path(source_id)
+        if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+            return  # not chunk-indexed yet; indexed on demand like any dataset
+
+        index = await asyncio.to_thread(faiss.read_index, index_path)
+        with open(meta_path, "rb") as f:
+            source_metadata = pickle.load(f)
+
+        now = datetime.now()
+        metadata = {}
+        for i, meta in source_metadata.items():
+            chunk_id = hashlib.md5(f"{dataset_id}:{meta.get('chunk_id')}".encode()).hexdigest()[:16]
+            metadata[i] = {
+                **meta,
+                "chunk_id": chunk_id,
+                "dataset_id": dataset_id,
+                "user_id": user_id,
+                "indexed_at": now.isoformat(),
+            }
+
+        await self.chunks_collection.delete_many({"dataset_id": dataset_id})
+        if metadata:
+            await self.chunks_collection.insert_many(
+                [
+                    {
+                        "chunk_id": meta["chunk_id"],
+                        "dataset_id": dataset_id,
+                        "user_id": user_id,
+                        "chunk_type": meta.get("chunk_type"),
+                        "content": meta.get("content", ""),
+                        "metadata": meta.get("metadata", {}),
+                        "created_at": now,
+                        "expire_at": None,
+                    }
+                    for meta in metadata.values()
+                ]
+            )
+
+        self._atomic_write(index, self._chunk_index_path(dataset_id), is_faiss=True)
+        self._atomic_write(metadata, self._chunk_metadata_path(dataset_id), is_faiss=False)
+        self._chunk_indices[dataset_id] = index
+        self._chunk_metadata[dataset_id] = metadata
+
     async def add_query_to_history(self, query: str, dataset_id: str, user_id: str) -> bool:
         """Add query to history index with thread-safe locking."""
         self._ensure_initialized()
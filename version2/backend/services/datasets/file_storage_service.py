@@ -208,10 +208,50 @@ class FileStorageService:
             logger.error(f"Failed to move file for user {user_id}: {e}")
             raise HTTPException(status_code=500, detail="Could not save the uploaded file.")
 
+    async def save_file_to_content_store(
+        self, source_path: str, filename: str, content_hash: str
+    ) -> Dict[str, Any]:
+        """Validates a temp file and moves it into the content-addressed store.
+
+        Identical bytes are stored once (``services/datasets/content_store.py``);
+        the returned ``file_path`` may already be shared with other datasets.
+        """
+        from services.datasets.content_store import content_store
+
+        try:
+            file_ext = filename.split(".")[-1].lower() if "." in filename else ""
+            if file_ext not in self.allowed_extensions:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File type not supported. Allowed types: {', '.join(self.allowed_extensions)}",
+                )
+
+            self._check_content_magic(source_path, file_ext)
+            if file_ext == "csv":
+                self._check_csv_formula_injection(source_path)
+
+            file_size = Path(source_path).stat().st_size
+            file_path = content_store.adopt(source_path, content_hash, file_ext)
+            return {
+                "file_id": content_hash,
+                "file_path": file_path,
+                "file_size": file_size,
+                "file_extension": file_ext,
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to store file {content_hash[:12]}: {e}")
+            raise HTTPException(status_code=500, detail="Could not save the uploaded file.")
+
     async def get_paginated_file_data(
         self, file_path: str, limit: int, offset: int
     ) -> Tuple[List[Dict], int]:
-        """Reads a file and returns paginated data and total row count using Polars."""
+        """Reads a file and returns paginated data and total row count using Polars.
+
+        Only used for the raw upload before the pipeline has written the
+        dataset Parquet; ``get_dataset_data`` pages the Parquet otherwise.
+        """
         try:
             path_obj = Path(file_path)
             if not path_obj.exists():
@@ -219,25 +259,18 @@ class FileStorageService:
                 return [], 0
 
             # Polars' lazy scanning is extremely efficient for getting row counts from CSVs.
+            # The page is a slice of the same scan: read_csv(skip_rows=...) skips
+            # lines *before* the header, which made a data row the header.
             if ".csv" in file_path:
                 try:
-                    total_rows = pl.scan_csv(file_path).select(pl.count()).collect().item()
-                    df = pl.read_csv(file_path, skip_rows=offset, n_rows=limit)
+                    lf = pl.scan_csv(file_path)
+                    total_rows = lf.select(pl.len()).collect().item()
+                    df = lf.slice(offset, limit).collect()
                 except Exception as e:
                     try:
-                        total_rows = (
-                            pl.scan_csv(file_path, encoding="utf8-lossy", ignore_errors=True)
-                            .select(pl.count())
-                            .collect()
-                            .item()
-                        )
-                        df = pl.read_csv(
-                            file_path,
-                            skip_rows=offset,
-                            n_rows=limit,
-                            encoding="utf8-lossy",
-                            ignore_errors=True,
-                        )
+                        lf = pl.scan_csv(file_path, encoding="utf8-lossy", ignore_errors=True)
+                        total_rows = lf.select(pl.len()).collect().item()
+                        df = lf.slice(offset, limit).collect()
                     except Exception as e2:
                         logger.error(f"Polars failed to read CSV {file_path}: {e} / {e2}")
                         return [], 0
@@ -0,0 +1,460 @@
+"""
+Parquet Layout — Clustered dataset files with a row-group min/max index
+======================================================================
+The pipeline used to write each dataset with a bare
+``df.write_parquet(path)``: upload row order, Polars' default row groups
+and footer statistics that span the whole value range in every group.
+A filtered chat query or a time-sliced KPI comparison therefore had to
+decode every row group.
+
+Layout
+------
+:func:`write_dataset_parquet` writes the final dataset Parquet as:
+
+- **clustered rows** — sorted by (month of the time column, top dimension,
+  time column), so each row group covers a narrow time range and, within
+  a month, a narrow run of dimension values
+- **row groups of** ``PARQUET_ROW_GROUP_ROWS`` rows — DuckDB's own row
+  group size, the unit of its parallel scans and zonemap pruning, and
+  large enough for Polars' scans to stay sequential
+- **a sidecar index** ``<path>.layout.json`` — per row group, the row count
+  and min/max/null count of every scalar column
+
+DuckDB and Polars skip row groups using the Parquet footer statistics;
+clustering is what makes those statistics selective, so filtered scans
+prune without any help from this module. The sidecar records the sort
+keys so rewrites keep them, and per-group statistics readable without
+opening the file (the streaming ingest takes its null counts from it).
+The catalog table built from the file inherits the clustered order, so
+its zonemaps benefit too.
+
+Upload row order is not kept. Everything that reads rows "in file
+order" shows the clustered order: the ``/datasets/{id}/data`` pages and
+previews, and ``head()``-style samples. That order is fixed once the
+file is written, so pages stay stable until the dataset is rewritten.
+
+The time column is the first Date/Datetime column, or else the first
+string column whose sampled values parse as datetimes (CSV uploads keep
+dates as strings). The dimension is the lowest-cardinality string column
+with 2..``ROLLUP_MAX_DIMENSION_CARDINALITY`` distinct values — the same
+rule the rollup planner ranks dimensions by.
+
+Usage
+-----
+    from services.datasets.parquet_layout import LayoutIndex, write_dataset_parquet
+
+    layout = write_dataset_parquet(df, parquet_path)
+    # or, for a file too large to hold in memory:
+    cluster_parquet_file(unsorted_path, parquet_path, plan_layout(sample))
+
+    index = LayoutIndex.load(parquet_path)
+    nulls = sum(g["stats"]["revenue"]["nulls"] for g in index.row_groups)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import duckdb
+import polars as pl
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".layout.json"
+INDEX_VERSION = 1
+
+# Rows sampled when testing whether a string column holds dates.
+_TIME_SAMPLE_ROWS = 500
+# Share of sampled non-null values that must parse for a string time column.
+_TIME_PARSE_THRESHOLD = 0.9
+
+_STRING_DTYPES = (pl.Utf8, pl.Categorical, pl.Enum)
+
+
+def index_path(parquet_path: str | Path) -> Path:
+    """Sidecar index path for a dataset Parquet file."""
+    return Path(f"{parquet_path}{INDEX_SUFFIX}")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Planning
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class ParquetLayout:
+    """Sort keys and row-group size chosen for a dataset file."""
+
+    time_column: Optional[str] = None
+    dimension: Optional[str] = None
+    row_group_rows: int = 122_880
+    # True when the time column is a string that has to be parsed to sort.
+    parse_time: bool = False
+
+    @property
+    def sort_by(self) -> list[str]:
+        return [c for c in (self.time_column, self.dimension) if c]
+
+    def sort_exprs(self) -> list[pl.Expr]:
+        """Clustering key: month bucket, then dimension, then exact time."""
+        exprs: list[pl.Expr] = []
+        time_expr = None
+        if self.time_column:
+            time_expr = pl.col(self.time_column)
+            if self.parse_time:
+                time_expr = time_expr.str.to_datetime(strict=False)
+            exprs.append(time_expr.dt.truncate("1mo"))
+        if self.dimension:
+            exprs.append(pl.col(self.dimension))
+        if time_expr is not None:
+            exprs.append(time_expr)
+        return exprs
+
+    def sort_sql(self) -> list[str]:
+        """:meth:`sort_exprs` as DuckDB ORDER BY terms."""
+        terms: list[str] = []
+        time_sql = None
+        if self.time_column:
+            time_sql = _quote(self.time_column)
+            if self.parse_time:
+                time_sql = f"TRY_CAST({time_sql} AS TIMESTAMP)"
+            terms.append(f"date_trunc('month', {time_sql}) NULLS LAST")
+        if self.dimension:
+            terms.append(f"{_quote(self.dimension)} NULLS LAST")
+        if time_sql is not None:
+            terms.append(f"{time_sql} NULLS LAST")
+        return terms
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _looks_temporal(series: pl.Series) -> bool:
+    sample = series.drop_nulls().head(_TIME_SAMPLE_ROWS)
+    if len(sample) == 0:
+        return False
+    try:
+        parsed = sample.str.to_datetime(strict=False)
+    except Exception:
+        return False
+    return parsed.null_count() <= len(sample) * (1 - _TIME_PARSE_THRESHOLD)
+
+
+def plan_layout(df: pl.DataFrame, row_group_rows: Optional[int] = None) -> ParquetLayout:
+    """Pick the time column and top dimension to cluster ``df`` on."""
+    layout = ParquetLayout(row_group_rows=row_group_rows or settings.PARQUET_ROW_GROUP_ROWS)
+    if not settings.PARQUET_CLUSTERED_LAYOUT or df.is_empty():
+        return layout
+
+    for name, dtype in df.schema.items():
+        if dtype in (pl.Date, pl.Datetime):
+            layout.time_column = name
+            break
+    if layout.time_column is None:
+        for name, dtype in df.schema.items():
+            if dtype == pl.Utf8 and _looks_temporal(df[name]):
+                layout.time_column = name
+                layout.parse_time = True
+                break
+
+    max_card = settings.ROLLUP_MAX_DIMENSION_CARDINALITY
+    best: Optional[tuple[int, str]] = None
+    for name, dtype in df.schema.items():
+        if name == layout.time_column or not isinstance(dtype, _STRING_DTYPES):
+            continue
+        unique = df[name].n_unique()
+        if 2 <= unique <= max_card and (best is None or unique < best[0]):
+            best = (unique, name)
+    if best is not None:
+        layout.dimension = best[1]
+    return layout
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Writing
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def _stat_value(raw: Optional[str], dtype: pl.DataType) -> Any:
+    """Parquet footer statistic (DuckDB renders them as text) → JSON value."""
+    if raw is None:
+        return None
+    try:
+        if dtype == pl.Boolean:
+            return raw == "true"
+        if dtype.is_integer():
+            return int(raw)
+        if dtype.is_numeric():
+            value = float(raw)
+            return None if value != value else value
+    except ValueError:
+        return None
+    if dtype in (pl.Datetime, pl.Time):
+        # ISO form, as datetime.isoformat() renders it
+        return raw.replace(" ", "T", 1)
+    return raw
+
+
+def _row_group_stats(parquet_path: Path, schema: pl.Schema) -> list[dict[str, Any]]:
+    """Per-row-group row count and min/max/null count read from the footer.
+
+    Read back from the written file rather than recomputed, so the index
+    describes the row groups readers actually see.
+    """
+    safe = str(parquet_path).replace("'", "''")
+    with duckdb.connect() as conn:
+        rows = conn.execute(
+            f"SELECT row_group_id, row_group_num_rows, path_in_schema, "
+            f"stats_min_value, stats_max_value, stats_null_count "
+            f"FROM parquet_metadata('{safe}') ORDER BY row_group_id"
+        ).fetchall()
+
+    groups: dict[int, dict[str, Any]] = {}
+    for rg, num_rows, column, lo, hi, nulls in rows:
+        group = groups.setdefault(rg, {"rows": num_rows, "stats": {}})
+        dtype = schema.get(column)
+        if dtype is None or not (
+            dtype.is_numeric()
+            or dtype in (pl.Date, pl.Datetime, pl.Time, pl.Boolean)
+            or isinstance(dtype, _STRING_DTYPES)
+        ):
+            continue
+        group["stats"][column] = {
+            "min": _stat_value(lo, dtype),
+            "max": _stat_value(hi, dtype),
+            "nulls": nulls,
+        }
+    return [groups[rg] for rg in sorted(groups)]
+
+
+def write_index(parquet_path: str | Path, layout: ParquetLayout) -> Optional[Path]:
+    """Write the ``.layout.json`` sidecar for an already-written file."""
+    path = Path(parquet_path)
+    sidecar = index_path(path)
+    try:
+        schema = pl.read_parquet_schema(path)
+        stat = path.stat()
+        payload = {
+            "version": INDEX_VERSION,
+            "file_size": stat.st_size,
+            "file_mtime_ns": stat.st_mtime_ns,
+            "time_column": layout.time_column,
+            "dimension": layout.dimension,
+            "parse_time": layout.parse_time,
+            "row_group_rows": layout.row_group_rows,
+            "row_groups": _row_group_stats(path, schema),
+        }
+        tmp_sidecar = sidecar.with_name(sidecar.name + ".tmp")
+        tmp_sidecar.write_text(json.dumps(payload, default=str))
+        tmp_sidecar.replace(sidecar)
+        return sidecar
+    except Exception as e:
+        logger.warning("[Layout] Index write failed for %s (%s)", path.name, e)
+        sidecar.unlink(missing_ok=True)
+        return None
+
+
+def write_dataset_parquet(
+    df: pl.DataFrame,
+    parquet_path: str | Path,
+    layout: Optional[ParquetLayout] = None,
+) -> ParquetLayout:
+    """Write ``df`` clustered, with tuned row groups and a sidecar index.
+
+    The Parquet is written to a temp file and moved into place, so a crash
+    never leaves a truncated file for readers. The sidecar is written
+    after the move; :meth:`LayoutIndex.load` rejects a sidecar whose file
+    size/mtime no longer match, so a stale index is never trusted.
+
+    Args:
+        df: The dataset to write.
+        parquet_path: Destination file.
+        layout: Sort keys to use; planned with :func:`plan_layout` when
+            omitted.
+
+    Returns:
+        The layout the file was written with.
+    """
+    path = Path(parquet_path)
+    if layout is None:
+        layout = plan_layout(df)
+
+    sort_exprs = layout.sort_exprs()
+    if sort_exprs:
+        try:
+            df = df.sort(sort_exprs, nulls_last=True, maintain_order=True)
+        except Exception as e:
+            logger.warning("[Layout] Clustering skipped for %s (%s)", path.name, e)
+            layout = ParquetLayout(row_group_rows=layout.row_group_rows)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    df.write_parquet(
+        tmp_path,
+        compression="zstd",
+        statistics=True,
+        row_group_size=layout.row_group_rows,
+    )
+    try:
+        tmp_path.replace(path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    write_index(path, layout)
+
+    logger.info(
+        "[Layout] %s: %d rows, sort=%s, row_group_rows=%d",
+        path.name,
+        len(df),
+        layout.sort_by or "none",
+        layout.row_group_rows,
+    )
+    return layout
+
+
+def append_dataset_parquet(
+    parquet_path: str | Path,
+    rows: pl.DataFrame,
+    target_path: str | Path | None = None,
+) -> ParquetLayout:
+    """Write the dataset Parquet plus ``rows`` to ``target_path``.
+
+    The existing rows are streamed through unchanged. The new ones are
+    sorted by the file's own clustering keys and go after them, so a
+    table that grows in time order stays clustered. The sort keys come
+    from the sidecar index, or are planned from ``rows`` if it is stale.
+    ``target_path`` defaults to ``parquet_path`` (replaced atomically).
+    """
+    source = Path(parquet_path)
+    path = Path(target_path or parquet_path)
+    index = LayoutIndex.load(source)
+    layout = index.layout if index is not None else plan_layout(rows)
+
+    sort_exprs = layout.sort_exprs()
+    if sort_exprs:
+        try:
+            rows = rows.sort(sort_exprs, nulls_last=True, maintain_order=True)
+        except Exception as e:
+            logger.warning("[Layout] Clustering of appended rows skipped (%s)", e)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        pl.concat([pl.scan_parquet(source), rows.lazy()], how="vertical").sink_parquet(
+            tmp_path,
+            compression="zstd",
+            statistics=True,
+            row_group_size=layout.row_group_rows,
+        )
+        tmp_path.replace(path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    write_index(path, layout)
+    logger.info("[Layout] %s: appended %d rows", path.name, len(rows))
+    return layout
+
+
+def cluster_parquet_file(
+    source_path: str | Path,
+    parquet_path: str | Path,
+    layout: ParquetLayout,
+    dataset_id: Optional[str] = None,
+) -> ParquetLayout:
+    """Rewrite an on-disk Parquet into the clustered layout, out of core.
+
+    The streaming ingest's counterpart of :func:`write_dataset_parquet`:
+    the rows never enter Python. DuckDB sorts within its admission grant
+    and spills to ``DUCKDB_TEMP_DIRECTORY`` when the sort outgrows it, so
+    memory stays bounded whatever the file size. String time columns sort
+    by ``TRY_CAST(... AS TIMESTAMP)`` — ISO dates cluster, anything DuckDB
+    cannot cast sorts last.
+    """
+    from services.query.admission import QueryPriority, admission_controller, source_bytes_for
+    from services.query.duckdb_helpers import create_duckdb_connection
+
+    path = Path(parquet_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    safe_source = str(source_path).replace("'", "''")
+    safe_tmp = str(tmp_path).replace("'", "''")
+    select = f"SELECT * FROM read_parquet('{safe_source}')"
+    order = layout.sort_sql()
+    if order:
+        select += " ORDER BY " + ", ".join(order)
+
+    try:
+        with create_duckdb_connection() as conn:
+            conn.execute("SET preserve_insertion_order = true")
+            with admission_controller.admitted(
+                conn,
+                select,
+                source_bytes=source_bytes_for(str(source_path)),
+                priority=QueryPriority.BACKGROUND,
+                dataset_id=dataset_id,
+            ):
+                conn.execute(
+                    f"COPY ({select}) TO '{safe_tmp}' "
+                    f"(FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {layout.row_group_rows})"
+                )
+        tmp_path.replace(path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    write_index(path, layout)
+    logger.info(
+        "[Layout] %s: clustered out of core, sort=%s, row_group_rows=%d",
+        path.name,
+        layout.sort_by or "none",
+        layout.row_group_rows,
+    )
+    return layout
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Index
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class LayoutIndex:
+    """Sidecar min/max index of a dataset Parquet written by this module."""
+
+    layout: ParquetLayout
+    row_groups: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, parquet_path: str | Path) -> Optional["LayoutIndex"]:
+        """Read the sidecar; ``None`` when missing, unreadable or stale."""
+        sidecar = index_path(parquet_path)
+        try:
+            data = json.loads(sidecar.read_text())
+            stat = os.stat(parquet_path)
+        except (OSError, ValueError):
+            return None
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("file_size") != stat.st_size
+            or data.get("file_mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+        layout = ParquetLayout(
+            time_column=data.get("time_column"),
+            dimension=data.get("dimension"),
+            row_group_rows=data.get("row_group_rows") or settings.PARQUET_ROW_GROUP_ROWS,
+            parse_time=bool(data.get("parse_time")),
+        )
+        return cls(layout=layout, row_groups=data.get("row_groups") or [])
+
+    @property
+    def num_rows(self) -> int:
+        return sum(g["rows"] for g in self.row_groups)
@@ -0,0 +1,314 @@
+"""
+Sampling — One vectorised sampler for loader, profiler, KPIs and QUIS
+=====================================================================
+The dataset loader, the profiling engine and the KPI generator each had
+their own stratified sampler. Each looped over the categories calling
+``df.filter(pl.col(c) == category)`` once per value, which costs
+O(rows × categories). QUIS drew its own unseeded-per-dataset random
+sample of the fully materialised frame.
+
+Every sampler here is a single vectorised pass built on one idea: each
+row gets a pseudo-random key ``hash(row_index, seed)``.
+
+- **reservoir** — the ``n`` rows with the smallest keys (bottom-k). On a
+  ``LazyFrame`` with ``N`` rows, the streaming engine first keeps only the
+  rows whose key falls below ``ceil(k / N) · 2^64`` — about ``k``, a
+  slightly oversampled ``n`` — and bottom-k runs on those survivors, so
+  the full table is never materialised.
+- **stratified** — rows ranked by key within their stratum
+  (``rank().over(column)``), kept while the rank is within the stratum's
+  quota. ``proportional`` quotas keep each stratum's share with at least
+  one row per stratum, so the sample is self-weighting
+  (``progressive.py`` relies on this). ``equal`` quotas give every
+  stratum the same number of rows (the profiler's OOM guard).
+- **time-aware** — stratified on equal-width buckets of a time column, so
+  every part of the period is represented in proportion.
+
+The same seed gives the same sample of the same data.
+:func:`cached_sample` stores samples next to their source file, keyed by
+the source version (size + mtime, as the frame cache does). A rewritten
+dataset never serves a stale sample, and older versions are removed.
+
+Usage
+-----
+    from services.datasets.sampling import representative_sample, reservoir_sample
+
+    sample = representative_sample(df, 10_000)                  # auto strategy
+    sample = reservoir_sample(handle.scan(), 100_000, seed=7)   # lazy, bounded
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from pathlib import Path
+from typing import Callable, Literal, Optional, Union
+
+import polars as pl
+
+from services.cache.frame_cache import source_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 42
+# Bump to invalidate every cached sample file.
+SAMPLE_CACHE_VERSION = "v3"
+# Strata for auto-picked stratification columns and time buckets.
+MAX_STRATA = 100
+TIME_BUCKETS = 50
+
+_KEY = "__sample_key"
+_INTEGER_DTYPES = (
+    pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64,
+)
+
+Frame = Union[pl.DataFrame, pl.LazyFrame]
+Allocation = Literal["proportional", "equal"]
+
+
+def _sample_key(seed: int) -> pl.Expr:
+    """Deterministic pseudo-random key per row."""
+    return pl.int_range(pl.len(), dtype=pl.UInt64).hash(seed).alias(_KEY)
+
+
+def _row_key(row_index: str, seed: int) -> pl.Expr:
+    """:func:`_sample_key` computed from a row-index column.
+
+    ``pl.int_range(pl.len())`` needs the whole frame; hashing an index
+    column gives the same keys and streams.
+    """
+    return pl.col(row_index).cast(pl.UInt64).hash(seed).alias(_KEY)
+
+
+def _oversample(n: int) -> int:
+    """Expected survivors of the key pre-filter for an ``n``-row sample.
+
+    Survivors are binomial around this mean; six standard deviations of
+    headroom make falling short of ``n`` vanishingly rare (it is still
+    handled, by an unfiltered pass).
+    """
+    return n + 6 * math.isqrt(n) + 64
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Samplers
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def reservoir_sample(
+    frame: Frame, n: int, seed: int = DEFAULT_SEED, num_rows: Optional[int] = None
+) -> pl.DataFrame:
+    """``n`` uniformly random rows (all rows if there are fewer), in file order.
+
+    A ``LazyFrame`` is sampled in one streaming pass with memory bounded
+    by the sample, not the table. ``num_rows`` is the frame's row count
+    when the caller already knows it (a dataset handle or Parquet
+    footer); otherwise it is counted first, which Parquet answers from
+    metadata.
+    """
+    if isinstance(frame, pl.DataFrame):
+        return (
+            frame.with_columns(_sample_key(seed))
+            .with_row_index("__sample_row")
+            .bottom_k(n, by=_KEY)
+            .sort("__sample_row")
+            .drop(_KEY, "__sample_row")
+        )
+
+    if num_rows is None:
+        num_rows = frame.select(pl.len()).collect().item()
+    keyed = frame.with_row_index("__sample_row").with_columns(_row_key("__sample_row", seed))
+    if num_rows <= n:
+        return keyed.drop(_KEY, "__sample_row").collect(engine="streaming")
+
+    k = _oversample(n)
+    if k < num_rows:
+        threshold = min(-(-k * 2**64 // num_rows), 2**64 - 1)
+        survivors = keyed.filter(pl.col(_KEY) <= pl.lit(threshold, dtype=pl.UInt64)).collect(
+            engine="streaming"
+        )
+        if len(survivors) >= n:
+            return (
+                survivors.bottom_k(n, by=_KEY).sort("__sample_row").drop(_KEY, "__sample_row")
+            )
+        logger.debug("[Sampling] Key pre-filter kept %d < %d rows; full pass", len(survivors), n)
+    return (
+        keyed.bottom_k(n, by=_KEY)
+        .sort("__sample_row")
+        .drop(_KEY, "__sample_row")
+        .collect(engine="streaming")
+    )
+
+
+def stratified_sample(
+    df: pl.DataFrame,
+    n: int,
+    column: Optional[str] = None,
+    allocation: Allocation = "proportional",
+    seed: int = DEFAULT_SEED,
+) -> pl.DataFrame:
+    """About ``n`` rows with every value of ``column`` represented.
+
+    ``column`` defaults to :func:`pick_stratify_column`; without one this
+    is a reservoir sample. Proportional quotas round each stratum's share
+    and keep at least one row, so the total can differ from ``n`` by up
+    to the number of strata. It is topped up or trimmed by key to within
+    10% of ``n`` (a trim never drops a stratum's last row).
+    """
+    if len(df) <= n:
+        return df
+    column = column if column in df.columns else pick_stratify_column(df)
+    if column is None:
+        return reservoir_sample(df, n, seed)
+
+    if allocation == "equal":
+        strata = max(df[column].n_unique(), 1)
+        quota = pl.lit(max(n // strata, 2), dtype=pl.Int64)
+    else:
+        quota = (pl.len().over(column) * (n / len(df))).round().clip(lower_bound=1)
+
+    keyed = df.with_columns(_sample_key(seed))
+    rank = pl.col(_KEY).rank("ordinal").over(column)
+    picked = rank <= quota
+    sample = keyed.filter(picked)
+
+    if len(sample) < n * 0.9:
+        top_up = keyed.filter(~picked).bottom_k(n - len(sample), by=_KEY)
+        sample = pl.concat([sample, top_up])
+    elif len(sample) > n:
+        # Trim the highest keys, but keep each stratum's first row.
+        first = sample.filter(pl.col(_KEY).rank("ordinal").over(column) == 1)
+        rest = sample.filter(pl.col(_KEY).rank("ordinal").over(column) > 1)
+        sample = pl.concat([first, rest.bottom_k(max(n - len(first), 0), by=_KEY)])
+    return sample.drop(_KEY)
+
+
+def time_aware_sample(
+    df: pl.DataFrame,
+    n: int,
+    time_column: str,
+    buckets: int = TIME_BUCKETS,
+    seed: int = DEFAULT_SEED,
+) -> pl.DataFrame:
+    """About ``n`` rows spread over the whole range of ``time_column``.
+
+    Rows are stratified on ``buckets`` equal-width slices of the period
+    (proportional quotas), so a burst of recent rows cannot crowd out
+    the quiet months.
+    """
+    if len(df) <= n:
+        return df
+    t = pl.col(time_column).to_physical().cast(pl.Float64)
+    span = (t.max() - t.min()).clip(lower_bound=1)
+    bucket = ((t - t.min()) / span * (buckets - 1)).floor().fill_null(-1).alias("__time_bucket")
+    return stratified_sample(df.with_columns(bucket), n, "__time_bucket", seed=seed).drop(
+        "__time_bucket"
+    )
+
+
+def pick_stratify_column(df: pl.DataFrame, include_integers: bool = False) -> Optional[str]:
+    """First string/categorical column with 2..MAX_STRATA values.
+
+    With ``include_integers``, low-cardinality integer codes (≤ 20 values)
+    qualify too. A column must have at most one value per 10 rows.
+    """
+    limit = min(MAX_STRATA, max(len(df) // 10, 2))
+    for name, dtype in df.schema.items():
+        if dtype in (pl.Utf8, pl.Categorical):
+            if 2 <= df[name].n_unique() <= limit:
+                return name
+        elif include_integers and dtype in _INTEGER_DTYPES:
+            if 2 <= df[name].n_unique() <= min(20, limit):
+                return name
+    return None
+
+
+def representative_sample(
+    df: pl.DataFrame,
+    n: int,
+    column: Optional[str] = None,
+    allocation: Allocation = "proportional",
+    include_integers: bool = False,
+    seed: int = DEFAULT_SEED,
+) -> pl.DataFrame:
+    """Stratified on ``column`` (or an auto-picked one), else time-aware, else reservoir."""
+    if len(df) <= n:
+        return df
+    column = column if column in df.columns else pick_stratify_column(df, include_integers)
+    if column is not None:
+        return stratified_sample(df, n, column, allocation, seed)
+    time_column = next((c for c, t in df.schema.items() if t.is_temporal() and t != pl.Time), None)
+    if time_column is not None:
+        return time_aware_sample(df, n, time_column, seed=seed)
+    return reservoir_sample(df, n, seed)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Per-version sample cache
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def sample_cache_path(source_path: str, n: int, version: Optional[str] = None) -> str:
+    """Location of the cached ``n``-row sample of *source_path* at *version*."""
+    version = version or source_version(source_path) or "missing"
+    return f"{source_path}.sample_{SAMPLE_CACHE_VERSION}_{n}.{version}.parquet"
+
+
+def load_cached_sample(source_path: str, n: int) -> Optional[pl.DataFrame]:
+    """The cached ``n``-row sample of the current version, or ``None``."""
+    version = source_version(source_path)
+    if version is None:
+        return None
+    path = Path(sample_cache_path(source_path, n, version))
+    if not path.exists():
+        return None
+    try:
+        return pl.read_parquet(path)
+    except Exception as e:
+        logger.warning("[Sampling] Cached sample %s unreadable, rebuilding: %s", path.name, e)
+        path.unlink(missing_ok=True)
+        return None
+
+
+def store_sample(source_path: str, n: int, sample: pl.DataFrame) -> None:
+    """Cache *sample* for the current version and drop older versions' samples."""
+    version = source_version(source_path)
+    if version is None:
+        return
+    path = Path(sample_cache_path(source_path, n, version))
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        sample.write_parquet(tmp)
+        tmp.replace(path)
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        logger.warning("[Sampling] Failed to cache sample %s: %s", path.name, e)
+        return
+    prefix = f"{Path(source_path).name}.sample_{SAMPLE_CACHE_VERSION}_{n}."
+    for stale in path.parent.glob(f"{prefix}*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def cached_sample(source_path: str, n: int, build: Callable[[], pl.DataFrame]) -> pl.DataFrame:
+    """The cached sample of the current version of *source_path*, else ``build()``."""
+    sample = load_cached_sample(source_path, n)
+    if sample is None:
+        sample = build()
+        store_sample(source_path, n, sample)
+    return sample
+
+
+__all__ = [
+    "DEFAULT_SEED",
+    "SAMPLE_CACHE_VERSION",
+    "cached_sample",
+    "load_cached_sample",
+    "pick_stratify_column",
+    "representative_sample",
+    "reservoir_sample",
+    "sample_cache_path",
+    "store_sample",
+    "stratified_sample",
+    "time_aware_sample",
+]
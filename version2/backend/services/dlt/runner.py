@@ -139,6 +139,7 @@ class DltRunResult:
         name: str,
         schema_hash: str,
         message: str,
+        rows_appended: Optional[int] = None,
     ):
         self.dataset_id = dataset_id
         self.task_id = task_id
@@ -146,9 +147,15 @@ class DltRunResult:
         self.name = name
         self.schema_hash = schema_hash
         self.message = message
+        # Set when a re-extract was merged into the existing dataset
+        self.rows_appended = rows_appended
+
+    @property
+    def incremental(self) -> bool:
+        return self.rows_appended is not None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        result = {
             "dataset_id": self.dataset_id,
             "task_id": self.task_id,
             "rows_extracted": self.rows_extracted,
@@ -156,6 +163,9 @@ class DltRunResult:
             "schema_hash": self.schema_hash,
             "message": self.message,
         }
+        if self.incremental:
+            result.update(incremental=True, rows_appended=self.rows_appended)
+        return result
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────
@@ -225,6 +235,7 @@ class DltRunner:
         incremental: bool = True,
         row_limit: int = DEFAULT_ROW_LIMIT,
         workspace_id: str | None = None,
+        refresh_of: dict[str, Any] | None = None,
     ) -> DltRunResult:
         """
         Run a dlt pipeline synchronously (blocking the coroutine until done).
@@ -240,6 +251,9 @@ class DltRunner:
             row_limit: Maximum rows to include in the output dataset.
             workspace_id: Tenant (workspace) for the resulting dataset. Falls
                           back to ``user_id`` (personal workspace) when omitted.
+            refresh_of: Existing dataset doc being re-extracted. If the new
+                        extract only appends rows to it, they are merged into
+                        that dataset and no new one is created.
 
         Returns:
             DltRunResult with dataset_id, rows_extracted, etc.
@@ -324,6 +338,31 @@ class DltRunner:
 
                 rows_extracted = min(len(df), row_limit)
                 schema_hash = _compute_schema_hash(df)
+                wid = workspace_id or user_id  # tenant tag — personal workspace fallback
+
+                # ── 7b. Re-extract that only appended rows: merge in place ──
+                if refresh_of is not None:
+                    from services.pipeline.incremental import try_append_refresh
+
+                    appended = await try_append_refresh(
+                        refresh_of["_id"], final_parquet_path, user_id, workspace_id=wid
+                    )
+                    if appended is not None:
+                        Path(final_parquet_path).unlink(missing_ok=True)
+                        if breaker is not None:
+                            breaker.record_success()
+                        dataset_id = refresh_of["_id"]  # audited below
+                        return DltRunResult(
+                            dataset_id=dataset_id,
+                            task_id=dataset_id,
+                            rows_extracted=rows_extracted,
+                            name=refresh_of.get("name", ""),
+                            schema_hash=schema_hash,
+                            message=(
+                                f"{appended['rows_appended']} new rows merged into the dataset."
+                            ),
+                            rows_appended=appended["rows_appended"],
+                        )
 
                 # ── 8. Create dataset record in MongoDB ────────────────────
                 final_name = (
@@ -332,7 +371,6 @@ class DltRunner:
                 )
 
                 db = get_database()
-                wid = workspace_id or user_id  # tenant tag — personal workspace fallback
                 await db.uploads.insert_one({
                     "_id": dataset_id,
                     "user_id": user_id,
@@ -484,7 +522,9 @@ class DltRunner:
 
         Looks up the dataset's ``source_db`` metadata stored during the
         original extract, then re-runs the dlt pipeline with the same
-        configuration. The old Parquet file is replaced.
+        configuration. The old Parquet file is replaced, unless the source
+        only gained rows: those are merged into the existing dataset and its
+        own id is returned (``incremental``).
 
         Args:
             user_id: Owner of the dataset.
@@ -521,7 +561,11 @@ class DltRunner:
             dataset_name=f"{old_name} (re-extracted)",
             incremental=old_incremental,
             row_limit=old_row_limit,
+            workspace_id=dataset.get("workspace_id", user_id),
+            refresh_of=dataset,
         )
+        if result.incremental:
+            return result
 
         # Delete the old Parquet file (best-effort)
         old_path = dataset.get("file_path")
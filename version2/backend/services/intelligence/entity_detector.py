@@ -161,7 +161,6 @@ class EntityDetector:
 
         # Detect grain from entity columns
         entity_cols = [c.name for c in result.columns if self.ENTITY_ID_SUFFIX.search(c.name)]
-        entities, _ = self.detect(result, df)  # noqa: F811 — recursive call for entities
 
         grain = "unknown"
         if entity_cols and time_cols:
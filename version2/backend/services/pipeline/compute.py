@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Optional
 
@@ -6,6 +7,7 @@ import pandas as pd
 import polars as pl
 
 from db.schemas_pipeline import ComputeResult, PrimitiveSpec, PrimitiveType
+from services.query.admission import QueryPriority, admission_controller
 from services.query.duckdb_helpers import create_duckdb_connection
 
 logger = logging.getLogger(__name__)
@@ -202,11 +204,19 @@ def _run_sql(df: pl.DataFrame, sql: str) -> tuple[list[dict], Optional[str]]:
         except ModuleNotFoundError:
             pandas_df = pd.DataFrame(df.to_dicts())
         conn = create_duckdb_connection()
-        conn.register("data", pandas_df)
-        cursor = conn.execute(sql.strip())
-        cols = [d[0] for d in cursor.description]
-        rows = [dict(zip(cols, r)) for r in cursor.fetchall()]
-        conn.close()
+        try:
+            conn.register("data", pandas_df)
+            with admission_controller.admitted(
+                conn,
+                sql.strip(),
+                source_bytes=int(df.estimated_size()),
+                priority=QueryPriority.BACKGROUND,
+            ):
+                cursor = conn.execute(sql.strip())
+                cols = [d[0] for d in cursor.description]
+                rows = [dict(zip(cols, r)) for r in cursor.fetchall()]
+        finally:
+            conn.close()
         return rows, None
     except Exception as exc:
         return [], str(exc)
@@ -438,7 +448,8 @@ def compute(spec: PrimitiveSpec, df: pl.DataFrame) -> ComputeResult:
 
 
 async def compute_all(specs: list[PrimitiveSpec], df: pl.DataFrame) -> list[ComputeResult]:
+    # compute() blocks on admission and DuckDB: keep it off the event loop
     results = []
     for spec in specs:
-        results.append(compute(spec, df))
+        results.append(await asyncio.to_thread(compute, spec, df))
     return results
@@ -234,30 +234,28 @@ def load_dataset(file_path: str):
     return df, load_metadata
 
 
-def coerce_numeric_columns(
+def detect_numeric_columns(
     df: pl.DataFrame,
     sample_size: int = 200,
     threshold: float = 0.80,
     min_sample: int = 5,
     track_failures: bool = True,
-) -> tuple[pl.DataFrame, list[str], dict[str, dict[str, Any]]]:
-    """Attempt to coerce string columns that look numeric to Float64.
+) -> tuple[list[str], dict[str, dict[str, Any]]]:
+    """Pick the string columns of *df* whose sampled values parse as numbers.
 
-    For each candidate column, a sample of non-null values is parsed via
-    ``try_parse_numeric``.  If >= *threshold* parse successfully, the full
-    column is coerced with an expression pipeline that handles currency
-    symbols, parenthetical negatives, thousand separators, etc.
+    The decision half of :func:`coerce_numeric_columns`: for each candidate
+    column, a sample of non-null values is parsed via ``try_parse_numeric``
+    and the column qualifies when >= *threshold* parse. The streaming
+    ingest runs this once on a sample and applies
+    :func:`numeric_coercion_expr` to every batch.
 
     Returns:
-        (df, coerced_column_names, coercion_audit)
-
-        *coercion_audit* is ``{col_name: {"sample_failures": [...], ...}}``
-        and is empty when *track_failures* is False or no columns coerce.
+        (coerced_column_names, coercion_audit) — the audit holds the sample
+        failures per column (empty when *track_failures* is False).
     """
     coercion_audit: dict[str, dict[str, Any]] = {}
     coerce_cols: list[str] = []
 
-    # ── First pass: detect candidate columns + collect failure samples ──
     for col in df.columns:
         if df[col].dtype not in (pl.Utf8, pl.String):
             continue
@@ -281,6 +279,54 @@ def coerce_numeric_columns(
                     "sample_failure_rate": round(failure_count / len(sample), 4),
                 }
 
+    return coerce_cols, coercion_audit
+
+
+def numeric_coercion_expr(col: str) -> pl.Expr:
+    """String→Float64 expression handling currency symbols, parenthetical
+    negatives, thousand separators and decimal commas."""
+    return (
+        pl.col(col)
+        .str.strip_chars()
+        .str.replace_all(r"^\((.+)\)$", r"-$1")
+        .str.replace_all(r"[£$€¥₹₩₪₨฿]", "")
+        .str.replace_all(r"\s+[A-Z]{2,4}$", "")
+        .str.replace_all(r"%$", "")
+        .str.replace_all(r"(\d) (\d)", r"$1$2")
+        .str.replace_all(r"\.(\d{3})", "█TEMP█$1")
+        .str.replace_all(r",", ".")
+        .str.replace_all(r"█TEMP█", ",")
+        .str.replace_all(r",(\d{3})([^0-9]|$)", r"$1$2")
+        .str.strip_chars()
+        .cast(pl.Float64, strict=False)
+        .alias(col)
+    )
+
+
+def coerce_numeric_columns(
+    df: pl.DataFrame,
+    sample_size: int = 200,
+    threshold: float = 0.80,
+    min_sample: int = 5,
+    track_failures: bool = True,
+) -> tuple[pl.DataFrame, list[str], dict[str, dict[str, Any]]]:
+    """Attempt to coerce string columns that look numeric to Float64.
+
+    For each candidate column, a sample of non-null values is parsed via
+    ``try_parse_numeric``.  If >= *threshold* parse successfully, the full
+    column is coerced with an expression pipeline that handles currency
+    symbols, parenthetical negatives, thousand separators, etc.
+
+    Returns:
+        (df, coerced_column_names, coercion_audit)
+
+        *coercion_audit* is ``{col_name: {"sample_failures": [...], ...}}``
+        and is empty when *track_failures* is False or no columns coerce.
+    """
+    coerce_cols, coercion_audit = detect_numeric_columns(
+        df, sample_size, threshold, min_sample, track_failures
+    )
+
     if not coerce_cols:
         return df, coerce_cols, coercion_audit
 
@@ -290,25 +336,7 @@ def coerce_numeric_columns(
         pre_null_counts = {col: df[col].null_count() for col in coerce_cols}
 
     # ── Apply coercion expressions ──────────────────────────────────────
-    coerce_exprs = []
-    for col in coerce_cols:
-        expr = (
-            pl.col(col)
-            .str.strip_chars()
-            .str.replace_all(r"^\((.+)\)$", r"-$1")
-            .str.replace_all(r"[£$€¥₹₩₪₨฿]", "")
-            .str.replace_all(r"\s+[A-Z]{2,4}$", "")
-            .str.replace_all(r"%$", "")
-            .str.replace_all(r"(\d) (\d)", r"$1$2")
-            .str.replace_all(r"\.(\d{3})", "█TEMP█$1")
-            .str.replace_all(r",", ".")
-            .str.replace_all(r"█TEMP█", ",")
-            .str.replace_all(r",(\d{3})([^0-9]|$)", r"$1$2")
-            .str.strip_chars()
-            .cast(pl.Float64, strict=False)
-            .alias(col)
-        )
-        coerce_exprs.append(expr)
+    coerce_exprs = [numeric_coercion_expr(col) for col in coerce_cols]
 
     df = df.with_columns(coerce_exprs)
 
@@ -347,4 +375,11 @@ def coerce_numeric_columns(
     return df, coerce_cols, coercion_audit
 
 
-__all__ = ["load_dataset", "coerce_numeric_columns", "detect_encoding", "detect_delimiter"]
+__all__ = [
+    "load_dataset",
+    "coerce_numeric_columns",
+    "detect_numeric_columns",
+    "numeric_coercion_expr",
+    "detect_encoding",
+    "detect_delimiter",
+]
@@ -42,22 +42,33 @@ from db.tenant_guard import (
     assert_doc_workspace,
     resolve_workspace_id,
 )
-from services.profiling.engine import profiling_engine
-from services.intelligence.engine import intelligence_engine
 from services.intelligence.domain_detector_llm import llm_domain_detector
+from services.datasets.content_store import content_store
 from services.datasets.faiss_vector_service import faiss_vector_service
-from services.pipeline.clean import calculate_quality_metrics, clean_dataframe
-from services.pipeline.load import coerce_numeric_columns, load_dataset
-from services.pipeline.helpers import convert_types_for_json, extract_sample_rows
+from services.datasets.parquet_layout import write_dataset_parquet
+from services.pipeline.clean import calculate_quality_metrics
+from services.pipeline.stream_load import should_stream, stream_load_to_parquet
+from services.pipeline.helpers import convert_types_for_json
+from services.pipeline.incremental import capture_baseline, discard_baseline
 from services.pipeline.normalize import normalize_column_names
-from services.pipeline.structural_fixers import apply_structural_fixers
 from services.pipeline.date_fixer import detect_date_candidates
 from services.pipeline.category_fixer import detect_category_merges
 from services.pipeline.unpivot_fixer import detect_unpivot_candidates
 from services.pipeline.tracker import PipelineTracker
-from services.cleaning.column_suggester import suggest_cleaning_actions
+from services.pipeline.workers import (
+    FrameInfo,
+    WorkerLease,
+    clean_stage,
+    load_stage,
+    pipeline_workers,
+    preview_stage,
+    profile_stage,
+)
+from services.cleaning.column_suggester import detect_cleaning_candidates, suggest_cleaning_actions
 from services.intelligence.dataset_memo import DatasetMemo, DatasetMemoCache
 from services.storage.s3_service import s3_storage
+from services.query.dataset_catalog import dataset_catalog
+from services.query.rollups import plan_rollup, rollup_store
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -126,6 +137,7 @@ async def process_dataset(
     file_path: str,
     user_id: str = "unknown",
     workspace_id: str | None = None,
+    reuse_stored_results: bool = True,
 ) -> dict:
     """
     Process a dataset: load → clean → metadata → profile → save → index.
@@ -150,6 +162,10 @@ async def process_dataset(
         user_id:    Owner of the dataset.
         workspace_id: The tenant (workspace) this dataset belongs to.
                       Defaults to ``user_id`` (personal workspace) when omitted.
+        reuse_stored_results: When the file is in the content store and
+                      identical bytes were processed before, adopt those
+                      results instead of running the stages. Reprocessing
+                      passes False.
 
     Returns:
         dict with processing result summary.
@@ -325,8 +341,36 @@ async def process_dataset(
         workspace_id=wid,
     )
 
+    # A reprocess must never serve the previous run's DuckDB catalog
+    # or rollup cube.
+    try:
+        dataset_catalog.invalidate(dataset_id)
+        rollup_store.invalidate(dataset_id)
+    except Exception as e:
+        logger.debug("  Catalog invalidation skipped: %s", e)
+
+    # ── Content-addressed reuse ─────────────────────────────────────────
+    # The same bytes were processed before (a re-upload, another workspace,
+    # an unchanged sheet re-import): adopt the stored results instead of
+    # re-running every stage.
+    if reuse_stored_results:
+        stored = content_store.load_derived(file_path)
+        if stored is not None:
+            try:
+                result = await _adopt_stored_results(
+                    db, dataset_id, user_id, wid, file_path, stored
+                )
+            except Exception as e:
+                logger.warning("  Stored results not adopted (%s) — processing normally", e)
+            else:
+                try:
+                    await _notify("completed")
+                except Exception:
+                    pass
+                return result
+
     # Shared variables — set by closure in _run_pipeline_stages()
-    df_clean: pl.DataFrame | None = None
+    clean_info: FrameInfo | None = None
     column_metadata: list[dict] = []
     unified_profiling = None
     unified_intelligence = None
@@ -341,15 +385,21 @@ async def process_dataset(
     coercion_audit: dict[str, dict[str, Any]] = {}
     cleaning_manifest: list[dict[str, Any]] = []
 
-    async def _run_pipeline_stages() -> dict:
-        """Execute all Tier 1 pipeline stages.
+    async def _run_pipeline_stages(timeout: float) -> dict:
+        """Execute all Tier 1 pipeline stages within *timeout* seconds.
 
-        Extracted as an inner coroutine so that ``asyncio.wait_for`` can
-        enforce a hard timeout on the entire processing body. All shared
-        variables are captured by closure from the outer scope.
+        The run holds one pipeline worker process for its CPU-heavy
+        stages. Waiting for a free worker does not count against the
+        timeout; ``asyncio.wait_for`` bounds the stages themselves, and a
+        timeout cancels the await and kills the worker with it.
         """
+        async with pipeline_workers.lease() as lease:
+            return await asyncio.wait_for(_run_stages(lease), timeout=timeout)
+
+    async def _run_stages(lease: WorkerLease) -> dict:
+        """Stage bodies; shared variables are captured by closure."""
         # Allow Python to rebind closure variables
-        nonlocal df_clean, column_metadata, unified_profiling
+        nonlocal clean_info, column_metadata, unified_profiling
         nonlocal unified_intelligence, sanitized_metadata, sample_rows
         nonlocal parquet_path, s3_parquet_key, original_rows, duplicates_removed, load_metadata
         nonlocal null_sentinel_audit, coercion_audit, cleaning_manifest
@@ -391,52 +441,67 @@ async def process_dataset(
                 limit_mb,
             )
 
-            df, load_metadata = load_dataset(file_path)
-
-            if df.is_empty():
-                raise ValueError("Dataset is empty")
-            if len(df.columns) == 0:
-                raise ValueError("Dataset has no columns")
-
-            # ── Structural fixers (silent, deterministic, logged) ──────
-            # Title-row detection + TOTAL-row removal run before coercion
-            # so every downstream read (parquet, DuckDB, chat) sees clean
-            # data. Entries are marked applied/settled in the manifest.
-            # A fixer failure must never fail the upload — fall back to the
-            # un-fixed dataframe and continue.
-            structural_entries = []
-            try:
-                df, structural_entries = apply_structural_fixers(df)
-                if structural_entries:
-                    logger.info(
-                        "  Structural fixers applied: %d (header/total-row)",
-                        len(structural_entries),
+            # ── Streaming ingest for large CSVs ──────────────────────
+            # Transcodes in chunks, decides header shift / coercion on a
+            # sample and sinks the clustered Parquet batch by batch, so the
+            # *ingest* no longer scales with the CSV (no decoded string, no
+            # eager parse). The later stages still work on the dataset as
+            # one frame, read from the Parquet in the worker, so overall
+            # peak memory is bounded by the dataset's in-memory size and
+            # PIPELINE_MAX_FILE_SIZE_MB stays the memory guard.
+            parquet_path = file_path.rsplit(".", 1)[0] + ".parquet"
+            streamed = None
+            if should_stream(file_path):
+                try:
+                    loop = asyncio.get_running_loop()
+                    streamed = await loop.run_in_executor(
+                        None, stream_load_to_parquet, file_path, parquet_path, dataset_id
                     )
-            except Exception as e:
-                logger.warning("  Structural fixers skipped (%s) — continuing", e)
-
-            df, coerce_cols, coercion_audit = coerce_numeric_columns(
-                df,
-                track_failures=True,
-            )
-
-            original_rows = len(df)
-            schema = df.schema
+                except Exception as e:
+                    logger.warning("  Streaming ingest failed (%s) — loading eagerly", e)
+
+            if streamed is not None:
+                load_metadata = streamed.load_metadata
+                structural_entries = streamed.structural_entries
+                coercion_audit = streamed.coercion_audit
+                if streamed.rows == 0:
+                    raise ValueError("Dataset is empty")
+                # The clean stage reads the file in the worker; the API
+                # process never holds the raw frame.
+                df_ref = parquet_path
+                original_rows = streamed.rows
+                schema = pl.scan_parquet(parquet_path).collect_schema()
+            else:
+                # Load → structural fixers (title row, TOTAL row) → numeric
+                # coercion, in the worker. The frame stays there as "df" for
+                # the clean stage (only its shape comes back); a fixer
+                # failure falls back to the un-fixed frame (see load_stage).
+                raw_info, load_metadata, structural_entries, coercion_audit = await lease.run(
+                    load_stage, file_path, keep="df"
+                )
+                df_ref = lease.ref("df")
+                original_rows = len(raw_info)
+                schema = raw_info.schema
 
             logger.info(f"  Loaded: {original_rows:,} rows × {len(schema):,} cols")
 
             # ── Immediate Parquet conversion ─────────────────────────
             # DuckDB reads Parquet 5-10x faster than CSV. Converting at
             # load time makes all downstream reads (SQL, DuckDB executor,
-            # sample cache) use the fast Parquet path.
+            # sample cache) use the fast Parquet path. The file is clustered
+            # on the time column + top dimension with DuckDB-sized row
+            # groups, so filtered scans skip most of it.
             #
             # The parquet_path is saved to MongoDB immediately so the
             # DuckDB executor can use it even while the pipeline is still
             # running (e.g., for the first AI chat query).
-            parquet_path = file_path.rsplit(".", 1)[0] + ".parquet"
             try:
-                df.write_parquet(parquet_path, compression="zstd")
-                logger.info(f"  Parquet saved: {parquet_path}")
+                if streamed is None:
+                    # Sorted and written in the worker, next to the frame
+                    layout = await lease.run(write_dataset_parquet, df_ref, parquet_path)
+                else:
+                    layout = streamed.layout
+                logger.info(f"  Parquet saved: {parquet_path} (sorted by {layout.sort_by or 'none'})")
 
                 # Upload to S3 if enabled
                 # NOTE: S3 upload runs in a thread executor to avoid
@@ -445,8 +510,13 @@ async def process_dataset(
                 # the entire pipeline while waiting on network I/O.
                 if settings.S3_ENABLED:
                     try:
+                        # Content-store files are all named "data": key
+                        # those by dataset so deletes stay per dataset.
                         s3_parquet_key = s3_storage.generate_parquet_key(
-                            user_id, Path(parquet_path).stem
+                            user_id,
+                            dataset_id
+                            if content_store.owns(parquet_path)
+                            else Path(parquet_path).stem,
                         )
                         loop = asyncio.get_running_loop()
                         await asyncio.wait_for(
@@ -478,23 +548,20 @@ async def process_dataset(
                 parquet_path = None
                 s3_parquet_key = None
 
-            df_lazy = df.lazy()
-
         # ── Stage 2: Clean ───────────────────────────────────────────────
         async with tracker.stage("cleaning", "Cleaning Data"):
-            df_clean, null_sentinel_audit = clean_dataframe(
-                df_lazy,
-                schema,
-                deduplicate=False,
-                track_sentinels=True,
+            clean_info, null_sentinel_audit = await lease.run(
+                clean_stage, df_ref, keep="df_clean"
             )
-            cleaned_rows = len(df_clean)
+            cleaned_rows = len(clean_info)
             duplicates_removed = 0  # Dedup is opt-in (not applied by default)
             logger.info("  Deduplication skipped (opt-in — use UI toggle to enable)")
 
         # ── Stage 3: Column Name Normalization (deterministic, no LLM) ────
         async with tracker.stage("normalizing", "Normalizing Column Names"):
-            df_clean, normalized_entries = normalize_column_names(df_clean)
+            clean_info, normalized_entries = await lease.run(
+                normalize_column_names, lease.ref("df_clean"), keep="df_clean"
+            )
             # Structural fixer entries (applied silently at ingest) come
             # first, then the reviewable rename entries.
             cleaning_manifest = (structural_entries or []) + (normalized_entries or [])
@@ -507,15 +574,49 @@ async def process_dataset(
                 # Overwrite parquet with renamed columns
                 if parquet_path:
                     try:
-                        df_clean.write_parquet(parquet_path, compression="zstd")
+                        await lease.run(
+                            write_dataset_parquet, lease.ref("df_clean"), parquet_path
+                        )
                         logger.info("  Updated Parquet with normalized column names")
                     except Exception as e:
                         logger.warning(f"  Parquet update after normalization failed: {e}")
 
+            # ── Persistent DuckDB catalog ────────────────────────────
+            # Materialise the final Parquet once into a native DuckDB table
+            # so chat queries stop re-parsing the upload per question. Runs
+            # in a thread executor (heavy I/O); failure is non-critical —
+            # the executor falls back to direct file reads.
+            if parquet_path:
+                try:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(
+                        None, dataset_catalog.build, dataset_id, parquet_path
+                    )
+                except Exception as e:
+                    logger.warning("  DuckDB catalog build skipped (%s) — continuing", e)
+
+            # ── Baseline for append-only refreshes ───────────────────
+            # Row fingerprints + column sketches, so a re-import that only
+            # adds rows can be merged in (services/pipeline/incremental.py).
+            # Streamed and structurally fixed files are always reprocessed.
+            discard_baseline(dataset_id)
+            if parquet_path and streamed is None and not structural_entries:
+                try:
+                    await lease.run(
+                        capture_baseline,
+                        dataset_id,
+                        df_ref,
+                        lease.ref("df_clean") if cleaning_manifest else df_ref,
+                        parquet_path,
+                        cleaned=bool(cleaning_manifest),
+                    )
+                except Exception as e:
+                    logger.warning("  Incremental baseline skipped (%s) — continuing", e)
+
         # ── Stage 4: Date type-coercion proposals (deterministic, no LLM) ──
         async with tracker.stage("date_detection", "Detecting Date Columns"):
             try:
-                date_proposals = detect_date_candidates(df_clean)
+                date_proposals = await lease.run(detect_date_candidates, lease.ref("df_clean"))
                 if date_proposals:
                     cleaning_manifest = (cleaning_manifest or []) + date_proposals
                     logger.info(
@@ -528,7 +629,7 @@ async def process_dataset(
         # ── Stage 4b: Category merge proposals (deterministic, no LLM) ──
         async with tracker.stage("category_detection", "Detecting Dirty Categories"):
             try:
-                category_proposals = detect_category_merges(df_clean)
+                category_proposals = await lease.run(detect_category_merges, lease.ref("df_clean"))
                 if category_proposals:
                     cleaning_manifest = (cleaning_manifest or []) + category_proposals
                     logger.info(
@@ -541,7 +642,7 @@ async def process_dataset(
         # ── Stage 4c: Unpivot proposals (deterministic, no LLM) ────────
         async with tracker.stage("unpivot_detection", "Detecting Pivoted Columns"):
             try:
-                unpivot_proposals = detect_unpivot_candidates(df_clean)
+                unpivot_proposals = await lease.run(detect_unpivot_candidates, lease.ref("df_clean"))
                 if unpivot_proposals:
                     cleaning_manifest = (cleaning_manifest or []) + unpivot_proposals
                     logger.info(
@@ -554,8 +655,10 @@ async def process_dataset(
         # ── Stage 5: Unified Profiling (deterministic, no LLM) ──────────
         async with tracker.stage("profiling", "Profiling Data"):
             try:
-                unified_profiling = profiling_engine.run(
-                    df_clean,
+                # Profiling + intelligence layer on top of its facts
+                unified_profiling, unified_intelligence = await lease.run(
+                    profile_stage,
+                    lease.ref("df_clean"),
                     file_type=file_path.split(".")[-1].lower(),
                 )
                 # Try to attach filename from the dataset doc
@@ -569,9 +672,6 @@ async def process_dataset(
                     datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
                 )
 
-                # Intelligence layer on top of profiling facts
-                unified_intelligence = intelligence_engine.run(unified_profiling, df=df_clean)
-
                 logger.info(
                     "  Unified: %d cols, %d entities, %d domain candidates",
                     len(unified_profiling.columns),
@@ -592,9 +692,10 @@ async def process_dataset(
                     )
                     from services.semantic.assumption_store import assumption_store
 
-                    det_assumptions = run_deterministic_pass(
+                    det_assumptions = await lease.run(
+                        run_deterministic_pass,
                         unified_profiling,
-                        df_clean,
+                        lease.ref("df_clean"),
                         dataset_id,
                         wid,
                         user_id=user_id,
@@ -613,6 +714,21 @@ async def process_dataset(
                 unified_profiling = None
                 unified_intelligence = None
 
+            # ── Rollup cube ──────────────────────────────────────────
+            # Pre-aggregate measures by low-cardinality dimensions × day
+            # so dashboard charts and KPIs stop re-scanning the dataset.
+            # Needs the intelligence roles; failure is non-critical —
+            # every caller falls back to the base data.
+            if parquet_path and unified_profiling and unified_intelligence:
+                try:
+                    spec = plan_rollup(unified_profiling, unified_intelligence)
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(
+                        None, rollup_store.build, dataset_id, parquet_path, spec
+                    )
+                except Exception as e:
+                    logger.warning("  Rollup cube build skipped (%s) — continuing", e)
+
             # ── Derive column_metadata from profiling (replaces Stage 3) ─
             if unified_profiling:
                 try:
@@ -625,35 +741,32 @@ async def process_dataset(
                     logger.warning(f"  Metadata derivation failed: {e}")
                     column_metadata = []
             else:
-                # Fallback: minimal metadata from DataFrame directly
                 logger.warning("  Profiling failed — building fallback metadata from DataFrame")
-                column_metadata = []
-                for col in df_clean.columns:
-                    col_data = df_clean[col]
-                    column_metadata.append(
-                        {
-                            "name": col,
-                            "type": str(col_data.dtype),
-                            "null_count": col_data.null_count(),
-                            "null_percentage": round(col_data.null_count() / len(df_clean) * 100, 2)
-                            if len(df_clean) > 0
-                            else 0,
-                            "unique_count": col_data.n_unique(),
-                        }
-                    )
 
-            # Extract sample rows (available from df_clean regardless of profiling)
-            sample_rows = extract_sample_rows(df_clean, n=5)
+            # Sample rows (regardless of profiling) and, when profiling
+            # failed, minimal metadata — both read the frame in the worker
+            fallback_metadata, sample_rows = await lease.run(
+                preview_stage, lease.ref("df_clean"), fallback_metadata=not unified_profiling
+            )
+            if not unified_profiling:
+                column_metadata = fallback_metadata
 
         # ── Stage 6: AI-Assisted Column Suggestions (Stage 1.6) ─────────
         async with tracker.stage("column_suggestions", "Analyzing Column Quality"):
             try:
+                # Column statistics in the worker; only the LLM call here
+                detected = await lease.run(
+                    detect_cleaning_candidates,
+                    lease.ref("df_clean"),
+                    unified_profiling,
+                    cleaning_manifest,
+                )
                 ai_suggestions = await suggest_cleaning_actions(
-                    df=df_clean,
                     profiling_result=unified_profiling,
                     existing_manifest=cleaning_manifest,
                     column_metadata=column_metadata,
                     user_id=user_id,
+                    detected=detected,
                 )
                 if ai_suggestions:
                     cleaning_manifest = (cleaning_manifest or []) + ai_suggestions
@@ -675,8 +788,8 @@ async def process_dataset(
             pipeline_memo = DatasetMemo(
                 dataset_id=dataset_id,
                 user_id=user_id,
-                row_count=len(df_clean) if df_clean is not None else 0,
-                column_count=len(df_clean.columns) if df_clean is not None else 0,
+                row_count=len(clean_info) if clean_info is not None else 0,
+                column_count=len(clean_info.columns) if clean_info is not None else 0,
                 domain_name=domain_info.get("domain", "general"),
                 domain_confidence=domain_info.get("confidence", 0.5),
                 domain_method=domain_info.get("method", "deterministic"),
@@ -686,7 +799,7 @@ async def process_dataset(
             # Optional LLM enrichment (runs only if deterministic was successful)
             if unified_profiling and unified_intelligence:
                 try:
-                    llm_result = await llm_domain_detector.detect(unified_profiling, df_clean)
+                    llm_result = await llm_domain_detector.detect(unified_profiling)
                     if llm_result.llm_verdict:
                         unified_intelligence.domain.llm_verdict = llm_result.llm_verdict
                         if llm_result.top_candidate:
@@ -710,8 +823,8 @@ async def process_dataset(
                         pipeline_memo = DatasetMemo(
                             dataset_id=dataset_id,
                             user_id=user_id,
-                            row_count=len(df_clean) if df_clean is not None else 0,
-                            column_count=len(df_clean.columns) if df_clean is not None else 0,
+                            row_count=len(clean_info) if clean_info is not None else 0,
+                            column_count=len(clean_info.columns) if clean_info is not None else 0,
                             domain_name=domain_info.get("domain", "general"),
                             domain_confidence=domain_info.get("confidence", 0.5),
                             domain_method=domain_info.get("method", "llm"),
@@ -741,7 +854,8 @@ async def process_dataset(
                 "detected_delimiter": load_metadata.get("detected_delimiter", ","),
             }
 
-            data_quality = calculate_quality_metrics(
+            data_quality = await lease.run(
+                calculate_quality_metrics,
                 column_metadata,
                 original_rows,
                 duplicates_removed,
@@ -781,7 +895,7 @@ async def process_dataset(
             final_metadata: dict[str, Any] = {
                 "dataset_overview": {
                     "total_rows": cleaned_rows,
-                    "total_columns": len(df_clean.columns),
+                    "total_columns": len(clean_info.columns),
                     "original_rows": original_rows,
                     "file_type": file_path.split(".")[-1].lower(),
                 },
@@ -817,7 +931,7 @@ async def process_dataset(
                 "is_processed": True,
                 "processing_status": "saving",
                 "row_count": cleaned_rows,
-                "column_count": len(df_clean.columns),
+                "column_count": len(clean_info.columns),
                 "domain": domain_info["domain"],
                 "domain_confidence": domain_info["confidence"],
                 "updated_at": datetime.now(timezone.utc).replace(tzinfo=None),
@@ -901,6 +1015,36 @@ async def process_dataset(
             },
         )
 
+        # ── Keep the results with the content-addressed file ────────────
+        # Later datasets with the same bytes adopt them in milliseconds.
+        if content_store.owns(parquet_path):
+            try:
+                content_store.save_derived(
+                    file_path,
+                    {
+                        "source_dataset_id": dataset_id,
+                        "pipeline_version": "3.1-separated",
+                        "fields": {
+                            k: update_fields[k]
+                            for k in (
+                                "metadata",
+                                "row_count",
+                                "column_count",
+                                "domain",
+                                "domain_confidence",
+                                "parquet_path",
+                                "cleaning_manifest",
+                            )
+                            if k in update_fields
+                        },
+                        "profile": profile_dict,
+                        "intelligence": intelligence_dict,
+                    },
+                    artifacts=_stored_artifacts(dataset_id),
+                )
+            except Exception as e:
+                logger.warning("  Content store update skipped (%s) — continuing", e)
+
         logger.info("╔══════════════════════════════════════════════════════╗")
         logger.info(f"║ TIER 1 COMPLETED: {dataset_id:<33} ║")
         logger.info("╚══════════════════════════════════════════════════════╝")
@@ -915,7 +1059,7 @@ async def process_dataset(
             "[PERF] Tier 1 pipeline complete (%s): %d rows × %d cols → %s%s",
             dataset_id[:8],
             cleaned_rows,
-            len(df_clean.columns),
+            len(clean_info.columns),
             domain_info["domain"],
             " (LLM enriched)"
             if unified_intelligence and unified_intelligence.domain.method == "llm"
@@ -955,7 +1099,7 @@ async def process_dataset(
             "progress": 100,
             "dataset_id": dataset_id,
             "rows": cleaned_rows,
-            "columns": len(df_clean.columns),
+            "columns": len(clean_info.columns),
             "domain": domain_info["domain"],
             "quality": data_quality.get("completeness", 0),
         }
@@ -983,10 +1127,7 @@ async def process_dataset(
             timeout_sec,
             _size_mb,
         )
-        result = await asyncio.wait_for(
-            _run_pipeline_stages(),
-            timeout=timeout_sec,
-        )
+        result = await _run_pipeline_stages(timeout_sec)
         return result
     except asyncio.TimeoutError:
         logger.error("╔══════════════════════════════════════════════════════╗")
@@ -1055,6 +1196,113 @@ async def process_dataset(
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+def _stored_artifacts(dataset_id: str) -> dict[str, str]:
+    """Per-dataset files kept in the content store, by stored name."""
+    rollup = rollup_store.path_for(dataset_id)
+    return {
+        "catalog.duckdb": str(dataset_catalog.path_for(dataset_id)),
+        "rollup.json": str(rollup.with_suffix(".json")),
+        "rollup.parquet": str(rollup),
+    }
+
+
+async def _adopt_stored_results(
+    db: Any,
+    dataset_id: str,
+    user_id: str,
+    wid: str,
+    file_path: str,
+    stored: dict[str, Any],
+) -> dict:
+    """Complete *dataset_id* from the content store's results for its file.
+
+    Writes the uploads fields, profile and intelligence documents, links
+    the stored catalog and rollup cube, and copies the vector entries of
+    the dataset that produced them. Raises if the record is incomplete;
+    the caller then runs the pipeline.
+    """
+    fields = stored["fields"]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    source_id = stored.get("source_dataset_id")
+
+    for name, target in _stored_artifacts(dataset_id).items():
+        if name in stored.get("artifacts", []):
+            content_store.restore_artifact(file_path, name, Path(target))
+
+    for collection, key in (
+        ("dataset_profiles", "profile"),
+        ("dataset_intelligence", "intelligence"),
+    ):
+        if stored.get(key):
+            db[collection].update_one(
+                {"dataset_id": dataset_id},
+                {
+                    "$set": {
+                        "dataset_id": dataset_id,
+                        "user_id": user_id,
+                        "workspace_id": wid,
+                        key: stored[key],
+                        "pipeline_version": stored.get("pipeline_version"),
+                        "updated_at": now,
+                    }
+                },
+                upsert=True,
+            )
+
+    db.uploads.update_one(
+        {"_id": dataset_id},
+        {
+            "$set": {
+                **fields,
+                "workspace_id": wid,
+                "is_processed": True,
+                "processing_status": "completed",
+                "current_stage_label": "Ready",
+                "processing_progress": 100,
+                "artifact_status.dashboard_design": "ready",
+                "artifact_status.insights_report": "ready",
+                "derived_from": source_id,
+                "updated_at": now,
+            }
+        },
+    )
+
+    # Vector entries: copy the source's embeddings; embed afresh in the
+    # background only if the source is gone.
+    cloned = False
+    if source_id and source_id != dataset_id:
+        cloned = await faiss_vector_service.clone_dataset_vectors(
+            source_id, dataset_id, user_id=user_id, workspace_id=wid
+        )
+    if not cloned:
+        asyncio.create_task(
+            faiss_vector_service.add_dataset_to_vector_db(
+                dataset_id=dataset_id,
+                dataset_metadata=fields.get("metadata", {}),
+                user_id=user_id,
+                workspace_id=wid,
+            )
+        )
+
+    logger.info(
+        "[ContentStore] %s adopted stored results of %s (%s rows)",
+        dataset_id[:8],
+        (source_id or "?")[:8],
+        fields.get("row_count"),
+    )
+    quality = fields.get("metadata", {}).get("data_quality", {})
+    return {
+        "status": "success",
+        "progress": 100,
+        "dataset_id": dataset_id,
+        "rows": fields.get("row_count", 0),
+        "columns": fields.get("column_count", 0),
+        "domain": fields.get("domain", "general"),
+        "quality": quality.get("completeness", 0),
+        "reused": True,
+    }
+
+
 def _build_domain_info(unified_profiling: Any, unified_intelligence: Any) -> dict[str, Any]:
     """
     Build the ``domain_info`` dict from unified profiling + intelligence results.
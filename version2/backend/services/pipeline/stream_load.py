@@ -0,0 +1,263 @@
+"""
+Streaming Load — Out-of-core CSV → Parquet ingest for large uploads
+===================================================================
+``load_dataset`` reads a CSV eagerly, and for non-UTF-8 files first decodes
+the whole file into one Python string. Peak memory is several times the
+file size, which is what keeps ``PIPELINE_MAX_FILE_SIZE_MB`` low.
+
+Uploads of at least ``PIPELINE_STREAMING_INGEST_MB`` take this path
+instead. The ingest's memory is bounded by the chunk, sample and batch
+sizes, not by the file. Only the ingest: the pipeline's later stages
+(clean, profile, intelligence) still load the written Parquet as one
+frame, so ``PIPELINE_MAX_FILE_SIZE_MB`` remains the guard on a run's
+peak memory.
+
+1. **Transcode** — non-UTF-8 files are decoded with an incremental decoder
+   in ``_TRANSCODE_CHUNK_BYTES`` chunks into a UTF-8 temp file.
+2. **Sample** — the first ``PIPELINE_STREAMING_SAMPLE_ROWS`` rows of the
+   lazy scan drive every decision: title-row shift
+   (``shift_header_row``), numeric coercion (``detect_numeric_columns``)
+   and the clustering layout (``plan_layout``).
+3. **Totals** — one streaming aggregation returns the row count, the last
+   rows and each numeric column's sum, which is all ``find_total_rows``
+   needs to spot a trailing TOTAL row.
+4. **Write** — the scan, with the header shift, TOTAL-row filter and
+   coercion expressions applied per batch, is sunk to Parquet by the
+   streaming engine, then clustered out of core by
+   ``cluster_parquet_file``.
+
+The result carries the same manifest entries and coercion audit the eager
+path produces, so ``process_dataset`` treats both alike.
+
+Usage
+-----
+    from services.pipeline.stream_load import should_stream, stream_load_to_parquet
+
+    if should_stream(file_path):
+        result = stream_load_to_parquet(file_path, parquet_path, dataset_id)
+        # process_dataset hands result.parquet_path to the worker's clean_stage
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import polars as pl
+
+from core.config import settings
+from services.datasets.parquet_layout import (
+    LayoutIndex,
+    ParquetLayout,
+    cluster_parquet_file,
+    plan_layout,
+)
+from services.pipeline.load import (
+    detect_delimiter,
+    detect_encoding,
+    detect_numeric_columns,
+    numeric_coercion_expr,
+)
+from services.pipeline.structural_fixers import (
+    find_total_rows,
+    shift_header_row,
+    total_row_entries,
+)
+
+logger = logging.getLogger(__name__)
+
+_TRANSCODE_CHUNK_BYTES = 8 * 1024 * 1024
+# Trailing rows checked for a TOTAL marker (same as drop_total_rows).
+_TOTAL_SCAN_LAST = 5
+_UTF8_ENCODINGS = ("utf-8", "utf8", "ascii", "us-ascii")
+
+
+@dataclass
+class StreamLoadResult:
+    """What the streaming ingest wrote and decided."""
+
+    parquet_path: str
+    rows: int
+    columns: list[str]
+    load_metadata: dict[str, Any]
+    structural_entries: list[dict[str, Any]] = field(default_factory=list)
+    coerce_cols: list[str] = field(default_factory=list)
+    coercion_audit: dict[str, dict[str, Any]] = field(default_factory=dict)
+    layout: Optional[ParquetLayout] = None
+
+
+def should_stream(file_path: str) -> bool:
+    """Whether *file_path* is a CSV large enough for the streaming ingest."""
+    if not file_path.lower().endswith(".csv"):
+        return False
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return False
+    return size >= settings.PIPELINE_STREAMING_INGEST_MB * 1024 * 1024
+
+
+def transcode_to_utf8(file_path: str, encoding: str, target_path: str) -> str:
+    """Re-encode *file_path* to UTF-8 chunk by chunk; returns *target_path*.
+
+    Undecodable bytes become U+FFFD, as with the eager path's
+    ``errors="replace"``.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(file_path, "rb") as src, open(target_path, "w", encoding="utf-8") as dst:
+        while True:
+            chunk = src.read(_TRANSCODE_CHUNK_BYTES)
+            if not chunk:
+                dst.write(decoder.decode(b"", final=True))
+                break
+            dst.write(decoder.decode(chunk))
+    return target_path
+
+
+def _scan(source: str, delimiter: str, skip_rows_after_header: int = 0) -> pl.LazyFrame:
+    # Same reader options as load_dataset, so both paths infer alike.
+    return pl.scan_csv(
+        source,
+        separator=delimiter,
+        infer_schema_length=10000,
+        ignore_errors=True,
+        skip_rows_after_header=skip_rows_after_header,
+    )
+
+
+def stream_load_to_parquet(
+    file_path: str,
+    parquet_path: str,
+    dataset_id: Optional[str] = None,
+) -> StreamLoadResult:
+    """Ingest a CSV into the dataset Parquet without materialising it.
+
+    Args:
+        file_path: The uploaded CSV.
+        parquet_path: Destination dataset Parquet (clustered, indexed).
+        dataset_id: For the admission cost history of the clustering sort.
+
+    Returns:
+        A :class:`StreamLoadResult`; raises ``ValueError`` for an empty file.
+    """
+    encoding, enc_confidence = detect_encoding(file_path)
+    delimiter = detect_delimiter(file_path, encoding)
+    load_metadata: dict[str, Any] = {
+        "detected_encoding": encoding,
+        "detected_encoding_confidence": round(enc_confidence, 2),
+        "detected_delimiter": delimiter,
+        "file_type": "csv",
+        "streamed": True,
+    }
+
+    utf8_path = f"{parquet_path}.utf8.csv"
+    unsorted_path = f"{parquet_path}.unsorted"
+    source = file_path
+    try:
+        if encoding.lower() not in _UTF8_ENCODINGS:
+            source = transcode_to_utf8(file_path, encoding, utf8_path)
+            logger.info("  Transcoded CSV from %s to UTF-8 in chunks", encoding)
+
+        # ── Sample pass: every decision is made on the head ───────────
+        sample_rows = settings.PIPELINE_STREAMING_SAMPLE_ROWS
+        lf = _scan(source, delimiter)
+        sample = lf.head(sample_rows).collect()
+        if sample.is_empty() or sample.width == 0:
+            raise ValueError("Dataset is empty")
+
+        structural_entries: list[dict[str, Any]] = []
+        shifted, header_entries = shift_header_row(sample)
+        if header_entries:
+            # Title rows sit between the CSV header and the real header row;
+            # skip them (and the real header) and rename to the real names.
+            skip = header_entries[0]["from_row"] + 1
+            lf = _scan(source, delimiter, skip_rows_after_header=skip)
+            lf = lf.rename(dict(zip(lf.collect_schema().names(), shifted.columns)))
+            sample = lf.head(sample_rows).collect()
+            structural_entries.extend(header_entries)
+
+        # ── Totals pass: row count, tail and numeric sums in one scan ──
+        # String null counts ride along for the coercion audit.
+        schema = lf.collect_schema()
+        numeric_cols = [name for name, dtype in schema.items() if dtype.is_numeric()]
+        string_cols = [name for name, dtype in schema.items() if dtype == pl.String]
+        height, tail, sums, nulls = pl.collect_all(
+            [
+                lf.select(pl.len()),
+                lf.tail(_TOTAL_SCAN_LAST),
+                lf.select([pl.col(c).sum() for c in numeric_cols]),
+                lf.select([pl.col(c).null_count() for c in string_cols]),
+            ],
+            engine="streaming",
+        )
+        rows = height.item()
+        drop_indices: list[int] = []
+        if rows >= 3:
+            totals = sums.row(0, named=True) if numeric_cols else {}
+            drop_indices = find_total_rows(tail, rows - tail.height, totals)
+        if drop_indices:
+            lf = (
+                lf.with_row_index("__row")
+                .filter(~pl.col("__row").is_in(drop_indices))
+                .drop("__row")
+            )
+            rows -= len(drop_indices)
+            structural_entries.extend(total_row_entries(drop_indices))
+
+        # ── Per-batch coercion decided on the sample ──────────────────
+        coerce_cols, coercion_audit = detect_numeric_columns(sample)
+        if coerce_cols:
+            lf = lf.with_columns([numeric_coercion_expr(c) for c in coerce_cols])
+            sample = sample.with_columns([numeric_coercion_expr(c) for c in coerce_cols])
+            logger.info(
+                "  Numeric coercion (streamed): %d columns promoted String→Float64",
+                len(coerce_cols),
+            )
+
+        # ── Write batch by batch, then cluster out of core ─────────────
+        lf.sink_parquet(
+            unsorted_path,
+            compression="zstd",
+            row_group_size=settings.PARQUET_ROW_GROUP_ROWS,
+            engine="streaming",
+        )
+        layout = plan_layout(sample)
+        cluster_parquet_file(unsorted_path, parquet_path, layout, dataset_id=dataset_id)
+
+        # Full-column parse failures: nulls after (from the footer index)
+        # minus nulls before (from the totals pass).
+        index = LayoutIndex.load(parquet_path)
+        if index is not None and string_cols:
+            null_before = nulls.row(0, named=True)
+            for col in coerce_cols:
+                after = sum(g["stats"].get(col, {}).get("nulls") or 0 for g in index.row_groups)
+                failures = after - (null_before.get(col) or 0)
+                if failures > 0 and col in coercion_audit:
+                    coercion_audit[col]["full_column_parse_failures"] = int(failures)
+    finally:
+        Path(utf8_path).unlink(missing_ok=True)
+        Path(unsorted_path).unlink(missing_ok=True)
+
+    logger.info(
+        "  Streamed: %s rows × %d cols → %s",
+        f"{rows:,}",
+        len(sample.columns),
+        parquet_path,
+    )
+    return StreamLoadResult(
+        parquet_path=parquet_path,
+        rows=rows,
+        columns=list(sample.columns),
+        load_metadata=load_metadata,
+        structural_entries=structural_entries,
+        coerce_cols=coerce_cols,
+        coercion_audit=coercion_audit,
+        layout=layout,
+    )
+
+
+__all__ = ["StreamLoadResult", "should_stream", "stream_load_to_parquet", "transcode_to_utf8"]
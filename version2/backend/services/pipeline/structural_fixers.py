@@ -190,46 +190,41 @@ def _matches_column_total(row_value: float | None, column_total: float | None) -
     return abs(row_value - other_sum) / max(abs(other_sum), 1.0) < 1e-4
 
 
-def drop_total_rows(
-    df: pl.DataFrame,
-    scan_last: int = 5,
-) -> Tuple[pl.DataFrame, List[Dict[str, Any]]]:
+def find_total_rows(
+    tail: pl.DataFrame,
+    offset: int,
+    column_totals: Dict[str, float | None],
+) -> List[int]:
     """
-    Drop trailing summary rows that carry a TOTAL-like marker and whose
-    numeric values match the column totals (so real data rows are never
-    misidentified). Returns ``(df, manifest_entries)``.
-    """
-    if df.height < 3:
-        return df, []
+    Row indices (``offset`` + position in *tail*) of TOTAL rows.
 
-    numeric_cols = [c for c in df.columns if df[c].dtype.is_numeric()]
-    start = max(0, df.height - scan_last)
+    The decision half of :func:`drop_total_rows`, split out so the
+    streaming ingest can feed it the last rows and the per-column sums
+    from one aggregation pass instead of a materialised frame.
+    *column_totals* maps every numeric column to its full-column sum.
+    """
     drop_indices: List[int] = []
-
-    for idx in range(start, df.height):
-        row = df.row(idx)
+    for pos in range(tail.height):
+        row = tail.row(pos)
         if not any(_is_total_marker(v) for v in row):
             continue
 
         # Every numeric column must satisfy the TOTAL invariant.
         valid = True
-        for c in numeric_cols:
-            row_val = _numeric_value(row[df.columns.index(c)])
-            column_total = df[c].sum()
+        for c, column_total in column_totals.items():
+            row_val = _numeric_value(row[tail.columns.index(c)])
             col_total_f = float(column_total) if column_total is not None else None
             if not _matches_column_total(row_val, col_total_f):
                 valid = False
                 break
         if valid:
-            drop_indices.append(idx)
+            drop_indices.append(offset + pos)
+    return drop_indices
 
-    if not drop_indices:
-        return df, []
 
-    drop_set = set(drop_indices)
-    df = df.filter(~pl.int_range(0, df.height).is_in(list(drop_set)))
-
-    entries = [
+def total_row_entries(drop_indices: List[int]) -> List[Dict[str, Any]]:
+    """Manifest entries for the TOTAL rows at *drop_indices*."""
+    return [
         {
             "action_type": "drop_row",
             "target_columns": [],
@@ -245,7 +240,34 @@ def drop_total_rows(
         }
         for idx in drop_indices
     ]
-    return df, entries
+
+
+def drop_total_rows(
+    df: pl.DataFrame,
+    scan_last: int = 5,
+) -> Tuple[pl.DataFrame, List[Dict[str, Any]]]:
+    """
+    Drop trailing summary rows that carry a TOTAL-like marker and whose
+    numeric values match the column totals (so real data rows are never
+    misidentified). Returns ``(df, manifest_entries)``.
+    """
+    if df.height < 3:
+        return df, []
+
+    numeric_cols = [c for c in df.columns if df[c].dtype.is_numeric()]
+    start = max(0, df.height - scan_last)
+    tail = df.slice(start)
+    if not any(_is_total_marker(v) for row in tail.iter_rows() for v in row):
+        return df, []
+
+    column_totals = {c: df[c].sum() for c in numeric_cols}
+    drop_indices = find_total_rows(tail, start, column_totals)
+    if not drop_indices:
+        return df, []
+
+    drop_set = set(drop_indices)
+    df = df.filter(~pl.int_range(0, df.height).is_in(list(drop_set)))
+    return df, total_row_entries(drop_indices)
 
 
 # ── Orchestrator ────────────────────────────────────────────────────────────
@@ -269,4 +291,6 @@ __all__ = [
     "apply_structural_fixers",
     "shift_header_row",
     "drop_total_rows",
+    "find_total_rows",
+    "total_row_entries",
 ]
@@ -0,0 +1,368 @@
+"""
+Pipeline Workers — CPU-heavy stages in worker processes
+=======================================================
+``process_dataset`` runs as an ``asyncio.create_task`` inside the API
+process. Its load, clean, profiling and intelligence stages are
+synchronous, CPU-bound and mostly pure Python, so while a large file is
+processing every chat WebSocket on that worker stalls. Moving them to a
+thread would free the event loop but not the GIL.
+
+How it works
+------------
+A :class:`PipelineWorkerPool` keeps up to ``PIPELINE_WORKERS`` spawned
+processes. Each pipeline run leases one worker for its whole run:
+
+- ``await lease.run(fn, *args)`` pickles the call to the worker, and a
+  thread of the default executor waits for the reply. The event loop
+  only awaits a future.
+- ``keep="df_clean"`` stores the returned frame in the worker (the
+  first item when the stage returns a tuple) and sends back only its
+  :class:`FrameInfo` (row count and schema). ``lease.ref("df_clean")``
+  passes the frame to later stages, so a dataset never crosses the
+  process boundary: the Parquet write, previews and cleaning statistics
+  run in the worker too.
+- If the awaiting task is cancelled, for example by
+  ``process_dataset``'s ``asyncio.wait_for`` timeout, the worker is
+  killed (and reaped on a thread) and replaced. Timed-out work stops
+  burning CPU, and the caller still sees ``asyncio.TimeoutError`` as
+  before. The timeout starts once the lease is held, so a run queued
+  behind busy workers is not timed out before it starts.
+
+``PipelineTracker`` stages wrap the ``await`` exactly as they wrapped the
+inline calls, so stage reporting is unchanged. With
+``PIPELINE_WORKERS=0`` the stages run on the default thread executor in
+the API process instead. This mode is for tests and single-core
+deployments.
+
+Usage
+-----
+    from services.pipeline.workers import load_stage, pipeline_workers
+
+    async with pipeline_workers.lease() as lease:
+        async with tracker.stage("loading", "Loading Dataset"):
+            info, meta, entries, audit = await lease.run(load_stage, file_path, keep="df")
+            layout = await lease.run(write_dataset_parquet, lease.ref("df"), parquet_path)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional
+
+import polars as pl
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+@dataclass(frozen=True)
+class FrameRef:
+    """A value kept in a worker by an earlier ``run(..., keep=name)``."""
+
+    name: str
+
+
+@dataclass(frozen=True)
+class FrameInfo:
+    """What the API process gets back in place of a kept frame."""
+
+    height: int
+    schema: dict[str, pl.DataType]
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.schema)
+
+    def __len__(self) -> int:
+        return self.height
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died (killed, OOM, segfault) mid-call."""
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Stage functions — top-level so they pickle by reference
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def load_stage(file_path: str) -> tuple[pl.DataFrame, dict, list, dict]:
+    """Eager load → structural fixers → numeric coercion.
+
+    Returns ``(df, load_metadata, structural_entries, coercion_audit)``.
+    A fixer failure never fails the upload — the un-fixed frame is used.
+    """
+    from services.pipeline.load import coerce_numeric_columns, load_dataset
+    from services.pipeline.structural_fixers import apply_structural_fixers
+
+    df, load_metadata = load_dataset(file_path)
+
+    if df.is_empty():
+        raise ValueError("Dataset is empty")
+    if len(df.columns) == 0:
+        raise ValueError("Dataset has no columns")
+
+    structural_entries: list = []
+    try:
+        df, structural_entries = apply_structural_fixers(df)
+        if structural_entries:
+            logger.info(
+                "  Structural fixers applied: %d (header/total-row)",
+                len(structural_entries),
+            )
+    except Exception as e:
+        logger.warning("  Structural fixers skipped (%s) — continuing", e)
+
+    df, _, coercion_audit = coerce_numeric_columns(df, track_failures=True)
+    return df, load_metadata, structural_entries, coercion_audit
+
+
+def clean_stage(df: pl.DataFrame | str) -> tuple[pl.DataFrame, dict]:
+    """``clean_dataframe`` without dedup; returns ``(df_clean, sentinel_audit)``.
+
+    ``df`` may be the path of a streamed-ingest Parquet, read here so the
+    raw frame only ever exists in the worker.
+    """
+    from services.pipeline.clean import clean_dataframe
+
+    if isinstance(df, str):
+        df = pl.read_parquet(df)
+    return clean_dataframe(df.lazy(), df.schema, deduplicate=False, track_sentinels=True)
+
+
+def preview_stage(df: pl.DataFrame, fallback_metadata: bool = False) -> tuple[list, list]:
+    """``(column_metadata, sample_rows)`` for the dataset document.
+
+    The column metadata normally comes from profiling; with
+    ``fallback_metadata`` (profiling failed) a minimal one is built from
+    the frame, otherwise it is empty.
+    """
+    from services.pipeline.helpers import extract_sample_rows
+
+    column_metadata = []
+    if fallback_metadata:
+        for col in df.columns:
+            col_data = df[col]
+            column_metadata.append(
+                {
+                    "name": col,
+                    "type": str(col_data.dtype),
+                    "null_count": col_data.null_count(),
+                    "null_percentage": round(col_data.null_count() / len(df) * 100, 2)
+                    if len(df) > 0
+                    else 0,
+                    "unique_count": col_data.n_unique(),
+                }
+            )
+    return column_metadata, extract_sample_rows(df, n=5)
+
+
+def profile_stage(df: pl.DataFrame, file_type: str) -> tuple[Any, Any]:
+    """Unified profiling plus the intelligence layer on top of it."""
+    from services.intelligence.engine import intelligence_engine
+    from services.profiling.engine import profiling_engine
+
+    profiling = profiling_engine.run(df, file_type=file_type)
+    return profiling, intelligence_engine.run(profiling, df=df)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Worker process
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def _resolve(value: Any, store: dict[str, Any]) -> Any:
+    return store[value.name] if isinstance(value, FrameRef) else value
+
+
+def _keep(result: Any, name: Optional[str], store: dict[str, Any]) -> Any:
+    """Store the kept frame; returns *result* with a :class:`FrameInfo` in its place."""
+    if name is None:
+        return result
+    frame = result[0] if isinstance(result, tuple) else result
+    store[name] = frame
+    info = FrameInfo(len(frame), dict(frame.schema)) if isinstance(frame, pl.DataFrame) else frame
+    return (info, *result[1:]) if isinstance(result, tuple) else info
+
+
+def _worker_main(conn: Any) -> None:
+    """Serve ``(fn, args, kwargs, keep)`` calls until the pipe closes."""
+    logging.basicConfig(level=logging.INFO, format=_LOG_FORMAT)
+    store: dict[str, Any] = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        if message == "reset":
+            store.clear()
+            continue
+        fn, args, kwargs, keep = message
+        try:
+            args = [_resolve(a, store) for a in args]
+            kwargs = {k: _resolve(v, store) for k, v in kwargs.items()}
+            reply = ("ok", _keep(fn(*args, **kwargs), keep, store))
+        except BaseException as exc:  # noqa: BLE001 — everything goes back to the caller
+            reply = ("err", exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:  # result or exception did not pickle
+            conn.send(("err", RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class PipelineWorker:
+    """One spawned worker process and the pipe to it."""
+
+    def __init__(self, ctx: Any):
+        self._conn, child = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main, args=(child,), name="pipeline-worker", daemon=True
+        )
+        self._process.start()
+        child.close()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.is_alive()
+
+    def call(self, fn: Callable, args: tuple, kwargs: dict, keep: Optional[str]) -> Any:
+        """Blocking round trip; run on a thread, never on the event loop."""
+        with self._lock:
+            try:
+                self._conn.send((fn, args, kwargs, keep))
+                status, payload = self._conn.recv()
+            except (EOFError, OSError, BrokenPipeError) as exc:
+                raise WorkerCrashed(f"pipeline worker exited ({exc})") from exc
+        if status == "err":
+            raise payload
+        return payload
+
+    def reset(self) -> None:
+        """Drop every value kept for the previous lease."""
+        try:
+            self._conn.send("reset")
+        except (OSError, BrokenPipeError):
+            pass
+
+    def kill(self) -> None:
+        """Kill the process and reap it. Blocks up to 5 s: run on a thread."""
+        # The pipe is left open: a call blocked in recv() on another thread
+        # sees EOF once the process is gone, instead of a closed handle.
+        self._process.kill()
+        self._process.join(timeout=5)
+
+    def close(self) -> None:
+        try:
+            self._conn.send(None)
+            self._process.join(timeout=5)
+        except (OSError, BrokenPipeError):
+            pass
+        if self._process.is_alive():
+            self._process.kill()
+        self._conn.close()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Pool + lease
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class WorkerLease:
+    """One pipeline run's handle on a worker (or on the inline executor)."""
+
+    def __init__(self, worker: Optional[PipelineWorker]):
+        self._worker = worker
+        self._store: dict[str, Any] = {}  # inline mode only
+        self.broken = False
+
+    @staticmethod
+    def ref(name: str) -> FrameRef:
+        return FrameRef(name)
+
+    async def run(self, fn: Callable, *args: Any, keep: Optional[str] = None, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` off the event loop and return its result."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None:
+            return await loop.run_in_executor(
+                None, functools.partial(self._run_inline, fn, args, kwargs, keep)
+            )
+        try:
+            return await loop.run_in_executor(
+                None, self._worker.call, fn, args, kwargs, keep
+            )
+        except asyncio.CancelledError:
+            # wait_for timeout / task cancel: stop the CPU work with it.
+            logger.warning("[Workers] Stage %s cancelled — killing worker", fn.__name__)
+            self.broken = True
+            await asyncio.to_thread(self._worker.kill)
+            raise
+        except WorkerCrashed:
+            self.broken = True
+            raise
+
+    def _run_inline(self, fn: Callable, args: tuple, kwargs: dict, keep: Optional[str]) -> Any:
+        args = tuple(_resolve(a, self._store) for a in args)
+        kwargs = {k: _resolve(v, self._store) for k, v in kwargs.items()}
+        return _keep(fn(*args, **kwargs), keep, self._store)
+
+
+class PipelineWorkerPool:
+    """Leases spawned worker processes to pipeline runs, one run per worker."""
+
+    def __init__(self, size: Optional[int] = None):
+        self._size = settings.PIPELINE_WORKERS if size is None else size
+        self._idle: list[PipelineWorker] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ids = itertools.count(1)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[WorkerLease]:
+        """Hold a worker for one pipeline run; waits while all are busy."""
+        if self._size <= 0:
+            yield WorkerLease(None)
+            return
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._size)
+        async with self._semaphore:
+            worker = self._idle.pop() if self._idle else None
+            if worker is None or not worker.alive:
+                loop = asyncio.get_running_loop()
+                worker = await loop.run_in_executor(None, PipelineWorker, self._ctx)
+                logger.info("[Workers] Started pipeline worker #%d", next(self._ids))
+            lease = WorkerLease(worker)
+            try:
+                yield lease
+            finally:
+                if lease.broken or not worker.alive:
+                    await asyncio.to_thread(worker.kill)
+                else:
+                    worker.reset()
+                    self._idle.append(worker)
+
+    def shutdown(self) -> None:
+        """Stop idle workers (leased ones are killed when their lease ends)."""
+        while self._idle:
+            self._idle.pop().close()
+
+
+# Module-level singleton
+pipeline_workers = PipelineWorkerPool()
@@ -67,6 +67,20 @@ _DATE_FORMATS = [
 ]
 
 
+# ── Cardinality Levels ────────────────────────────────────────────────────────
+
+
+def cardinality_level(ratio: float) -> str:
+    """Bucket a unique / non-null ratio into very_high | high | medium | low."""
+    if ratio >= 0.95:
+        return "very_high"
+    if ratio >= 0.5:
+        return "high"
+    if ratio >= 0.1:
+        return "medium"
+    return "low"
+
+
 class ColumnProfiler:
     """Profiles a single column or an entire DataFrame — pure facts only."""
 
@@ -115,21 +129,12 @@ class ColumnProfiler:
         non_null = max(total_count - null_count, 1)
         cardinality_ratio = unique_count / non_null
 
-        if cardinality_ratio >= 0.95:
-            level = "very_high"
-        elif cardinality_ratio >= 0.5:
-            level = "high"
-        elif cardinality_ratio >= 0.1:
-            level = "medium"
-        else:
-            level = "low"
-
         return CardinalityInfo(
             unique_count=unique_count,
             total_count=total_count,
             null_count=null_count,
             cardinality_ratio=round(cardinality_ratio, 4),
-            cardinality_level=level,
+            cardinality_level=cardinality_level(cardinality_ratio),
         )
 
     # ── Pattern Detection ─────────────────────────────────────────────────
@@ -17,7 +17,7 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-from typing import Optional
+from typing import Iterable, Optional
 
 import polars as pl
 
@@ -89,6 +89,19 @@ def coerce_string_columns(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
+# ── Schema Hash ───────────────────────────────────────────────────────────────
+
+
+def compute_schema_hash(columns: Iterable[tuple[str, str]]) -> str:
+    """Deterministic hash of ``(name, dtype)`` pairs, in column order.
+
+    ``compute_schema_hash((n, str(t)) for n, t in df.schema.items())``
+    hashes a frame the way the profiler hashes its column profiles.
+    """
+    raw = json.dumps([(name, dtype) for name, dtype in columns])
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
 class ProfilingEngine:
     """Orchestrates all profiling sub-engines.
 
@@ -133,35 +146,16 @@ class ProfilingEngine:
             f"downsampling to {self.max_safe_rows:,} for OOM safety"
         )
 
-        # Stratified sampling by first categorical column
-        try:
-            for col in df.columns:
-                dtype = df[col].dtype
-                if dtype in (pl.Utf8, pl.Categorical):
-                    n_unique = df[col].n_unique()
-                    if 2 <= n_unique <= min(100, rows // 10):
-                        n_categories = n_unique
-                        samples_per_cat = max(self.max_safe_rows // n_categories, 2)
-                        sampled_frames = []
-                        for category in df[col].unique().to_list():
-                            group = df.filter(pl.col(col) == category)
-                            n_to_sample = min(samples_per_cat, len(group))
-                            if n_to_sample > 0:
-                                sampled_frames.append(group.sample(n=n_to_sample, seed=42))
-                        if sampled_frames:
-                            sampled = pl.concat(sampled_frames)
-                            if len(sampled) > self.max_safe_rows:
-                                sampled = sampled.sample(n=self.max_safe_rows, seed=42)
-                            return sampled
-        except Exception:
-            pass
+        # Lazy import: services.datasets pulls in the dataset service stack.
+        from services.datasets.sampling import stratified_sample
 
-        return df.sample(n=self.max_safe_rows, seed=42)
+        # Equal allocation over the first categorical column, so rare
+        # categories still get enough rows to profile.
+        return stratified_sample(df, self.max_safe_rows, allocation="equal", seed=42)
 
     def _compute_schema_hash(self, profiles: list[RawColumnProfile]) -> str:
         """Deterministic hash of column names + types."""
-        raw = json.dumps([(c.name, c.dtype) for c in profiles])
-        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+        return compute_schema_hash((c.name, c.dtype) for c in profiles)
 
     def run(self, df: pl.DataFrame, file_type: str = "unknown") -> RawProfilingResult:
         """Run all profiling engines and return a unified result.
@@ -0,0 +1,585 @@
+"""
+Cost-aware query admission
+==========================
+Admits DuckDB work against one process-wide memory budget instead of a
+fixed slot count, and lets interactive queries overtake background ones.
+
+Why
+---
+``QueryConcurrencyController`` and the shared thread pool cap *how many*
+queries run, and every connection was opened with the full
+``DUCKDB_MEMORY_LIMIT`` — four 2 GB grants whether the query was a
+``COUNT(*)`` or a billion-row sort. One heavy pipeline or editor query
+could take the memory that chat needed, and nothing ordered the queue.
+
+How
+---
+:class:`CostModel` estimates a query's footprint before it runs:
+
+- **EXPLAIN** — ``EXPLAIN (FORMAT JSON)`` on the query's own connection.
+  Blocking operators (hash aggregates, sorts, windows, hash-join build
+  sides) hold state proportional to their estimated cardinality × row
+  width; streaming operators hold almost nothing. Row width comes from
+  the source size divided by the scan estimate.
+- **Source size** — when no plan is available, a keyword heuristic over
+  the scanned bytes (in-memory frame size or file size).
+- **History** — observed wall time per (dataset, SQL fingerprint), and a
+  doubled memory estimate after a query hits DuckDB's out-of-memory error.
+
+:class:`AdmissionController` grants that memory from
+``QUERY_MEMORY_BUDGET``. Waiters are served in priority order
+(interactive before background), FIFO within a class; background work
+may never hold more than ``QUERY_BACKGROUND_BUDGET_FRACTION`` of the
+budget, so chat always has headroom. When the caller owns its
+connection, the grant becomes that connection's ``memory_limit`` and
+``threads`` — DuckDB spills to disk rather than exceed it.
+
+Usage
+-----
+    from services.query.admission import QueryPriority, admission_controller
+
+    with admission_controller.admitted(conn, sql, source_bytes=n,
+                                       priority=QueryPriority.BACKGROUND):
+        conn.execute(sql)
+
+    cost = cost_model.estimate(sql, source_bytes=n, dataset_id=ds)
+    async with admission_controller.admit(cost, QueryPriority.INTERACTIVE) as grant:
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+import duckdb
+
+from core.config import settings
+from services.observability import metrics
+from services.query.sql_normalizer import sql_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+_SIZE_RE = re.compile(r"^\s*([\d.]+)\s*([KMGT]?i?B)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {
+    "": 1, "B": 1, "KB": 1e3, "MB": 1e6, "GB": 1e9, "TB": 1e12,
+    "KIB": 1024, "MIB": 1024**2, "GIB": 1024**3, "TIB": 1024**4,
+}
+
+# Operators whose state grows with their input (or output, for aggregates).
+_AGGREGATES = {"HASH_GROUP_BY", "PERFECT_HASH_GROUP_BY"}
+_SORTS = {"ORDER_BY", "WINDOW", "STREAMING_WINDOW"}
+_JOINS = {"HASH_JOIN", "NESTED_LOOP_JOIN", "PIECEWISE_MERGE_JOIN", "IE_JOIN"}
+# Keyword fallback when EXPLAIN is unavailable: each blocking clause adds
+# this fraction of the scanned bytes on top of the streaming baseline.
+_BLOCKING_KEYWORDS = re.compile(
+    r"\b(GROUP\s+BY|DISTINCT|ORDER\s+BY|JOIN|OVER\s*\()", re.IGNORECASE
+)
+_HASH_OVERHEAD = 2.0
+# Parquet decompresses to roughly this multiple of its on-disk size.
+_PARQUET_EXPANSION = 3.0
+# Single-thread scan throughput used for the CPU estimate without history.
+_SCAN_BYTES_PER_SECOND = 400 * _MB
+_HISTORY_SIZE = 1024
+_HISTORY_ALPHA = 0.3
+
+
+def parse_size(text: str) -> int:
+    """Parse a DuckDB-style size (``"2GB"``, ``"512MiB"``) into bytes."""
+    match = _SIZE_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Unrecognised size: {text!r}")
+    unit = (match.group(2) or "").upper()
+    return int(float(match.group(1)) * _SIZE_UNITS[unit])
+
+
+def source_bytes_for(path: Optional[str]) -> int:
+    """Approximate in-memory bytes of scanning the file at *path*."""
+    if not path:
+        return 0
+    try:
+        size = Path(path).stat().st_size
+    except OSError:
+        return 0
+    if Path(path).suffix.lower() in (".parquet", ".pq"):
+        return int(size * _PARQUET_EXPANSION)
+    return size
+
+
+class QueryPriority(IntEnum):
+    """Admission classes — lower value is served first."""
+
+    INTERACTIVE = 0  # chat, semantic layer, SQL editor
+    BACKGROUND = 1   # pipeline stages, catalog / rollup builds
+
+
+@dataclass(frozen=True)
+class QueryCost:
+    """Estimated footprint of one query."""
+
+    memory_bytes: int
+    cpu_seconds: float
+    source: str  # "explain" | "heuristic" | "history"
+
+
+@dataclass(frozen=True)
+class Grant:
+    """Memory and threads reserved for one admitted query."""
+
+    memory_bytes: int
+    threads: int
+    priority: QueryPriority
+
+    @property
+    def memory_limit(self) -> str:
+        """The grant as a DuckDB ``memory_limit`` value."""
+        return f"{max(1, self.memory_bytes // _MB)}MB"
+
+    def apply(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Cap a connection the caller owns exclusively to this grant."""
+        conn.execute(f"SET memory_limit = '{self.memory_limit}'")
+        conn.execute(f"SET threads = {self.threads}")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Cost model
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class _History:
+    cpu_seconds: float
+    memory_bytes: int
+    plan_memory: Optional[int] = None
+
+
+class CostModel:
+    """Estimate query cost from EXPLAIN, source size and history."""
+
+    def __init__(self) -> None:
+        self._history: OrderedDict[tuple[str, str], _History] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def estimate(
+        self,
+        sql: str,
+        *,
+        source_bytes: int,
+        dataset_id: Optional[str] = None,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ) -> QueryCost:
+        """Estimate *sql*'s memory and CPU footprint.
+
+        *conn* — a connection on which ``data`` is queryable — enables the
+        EXPLAIN-based memory model; its result is remembered per SQL
+        fingerprint so repeats skip the EXPLAIN.
+        """
+        key = self._key(sql, dataset_id)
+        with self._lock:
+            past = self._history.get(key)
+
+        source = "heuristic"
+        memory = None
+        if past is not None and past.plan_memory is not None:
+            memory, source = past.plan_memory, "explain"
+        elif conn is not None:
+            memory = self._plan_memory(conn, sql, source_bytes)
+            if memory is not None:
+                source = "explain"
+                self._remember(key, plan_memory=memory)
+        if memory is None:
+            blocking = len(_BLOCKING_KEYWORDS.findall(sql))
+            memory = int(source_bytes * (0.25 + 0.5 * blocking))
+
+        cpu = source_bytes / _SCAN_BYTES_PER_SECOND
+        if past is not None:
+            # Observed runs override the model: wall time directly, memory
+            # only upwards (it is raised after out-of-memory failures).
+            cpu = past.cpu_seconds or cpu
+            if past.memory_bytes > memory:
+                memory, source = past.memory_bytes, "history"
+
+        floor = parse_size(settings.QUERY_MIN_GRANT)
+        return QueryCost(memory_bytes=max(floor, memory), cpu_seconds=cpu, source=source)
+
+    def record(
+        self,
+        sql: str,
+        dataset_id: Optional[str],
+        *,
+        elapsed: float,
+        granted_bytes: int,
+        out_of_memory: bool = False,
+    ) -> None:
+        """Feed an observed execution back into the history."""
+        key = self._key(sql, dataset_id)
+        with self._lock:
+            past = self._history.get(key)
+            cpu = elapsed if past is None or not past.cpu_seconds else (
+                _HISTORY_ALPHA * elapsed + (1 - _HISTORY_ALPHA) * past.cpu_seconds
+            )
+            memory = past.memory_bytes if past is not None else 0
+            if out_of_memory:
+                memory = max(memory, granted_bytes * 2)
+            plan_memory = past.plan_memory if past is not None else None
+            self._store(key, _History(cpu, memory, plan_memory))
+
+    # ── Internals ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _key(sql: str, dataset_id: Optional[str]) -> tuple[str, str]:
+        return (dataset_id or "", sql_fingerprint(sql))
+
+    def _remember(self, key: tuple[str, str], *, plan_memory: int) -> None:
+        with self._lock:
+            past = self._history.get(key) or _History(0.0, 0)
+            past.plan_memory = plan_memory
+            self._store(key, past)
+
+    def _store(self, key: tuple[str, str], entry: _History) -> None:
+        self._history[key] = entry
+        self._history.move_to_end(key)
+        while len(self._history) > _HISTORY_SIZE:
+            self._history.popitem(last=False)
+
+    @staticmethod
+    def _plan_memory(
+        conn: duckdb.DuckDBPyConnection, sql: str, source_bytes: int
+    ) -> Optional[int]:
+        try:
+            row = conn.execute(f"EXPLAIN (FORMAT JSON) {sql.strip().rstrip(';')}").fetchone()
+            plan = json.loads(row[1])
+        except (duckdb.Error, TypeError, ValueError, IndexError) as exc:
+            logger.debug("[Admission] EXPLAIN unavailable: %s", exc)
+            return None
+        roots = plan if isinstance(plan, list) else [plan]
+        return plan_memory(roots, source_bytes)
+
+
+def plan_memory(roots: list[dict[str, Any]], source_bytes: int) -> int:
+    """Memory held by blocking operators in an ``EXPLAIN (FORMAT JSON)`` tree."""
+
+    def cardinality(node: dict[str, Any]) -> int:
+        value = (node.get("extra_info") or {}).get("Estimated Cardinality")
+        try:
+            return int(str(value).replace(",", ""))
+        except (TypeError, ValueError):
+            # ORDER_BY and friends omit it — they emit what they consume.
+            return max((cardinality(c) for c in node.get("children", [])), default=0)
+
+    def leaf_rows(node: dict[str, Any]) -> int:
+        children = node.get("children") or []
+        if not children:
+            return cardinality(node)
+        return sum(leaf_rows(c) for c in children)
+
+    scanned = sum(leaf_rows(root) for root in roots)
+    row_width = source_bytes / scanned if scanned else 0.0
+
+    def walk(node: dict[str, Any]) -> float:
+        name = str(node.get("name", "")).strip().upper()
+        children = node.get("children") or []
+        held = 0.0
+        if name in _AGGREGATES:
+            held = cardinality(node) * row_width * _HASH_OVERHEAD
+        elif name in _SORTS:
+            held = cardinality(node) * row_width
+        elif name in _JOINS and children:
+            # DuckDB builds the hash table on the right-hand child.
+            held = cardinality(children[-1]) * row_width * _HASH_OVERHEAD
+        return held + sum(walk(c) for c in children)
+
+    # Scans stream vector by vector, but their buffers still need room.
+    streaming = min(source_bytes, 64 * _MB)
+    return int(streaming + sum(walk(root) for root in roots))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Admission controller
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    memory: int = field(default=0, compare=False)
+    wake: Callable[[], None] = field(default=lambda: None, compare=False)
+    granted: bool = field(default=False, compare=False)
+
+
+class AdmissionController:
+    """Grant query memory from a shared budget, interactive work first.
+
+    Thread-safe, and usable from both worker threads (:meth:`admit_sync`,
+    :meth:`admitted`) and coroutines (:meth:`admit`, :meth:`acquire`)
+    against the same budget — chat runs DuckDB in agent threads, the SQL
+    editor from the event loop, and pipeline stages in executors.
+
+    The blocking forms refuse to run on an event loop thread: an async
+    holder's grant is released by that loop, so blocking it would wait
+    out ``QUERY_TIMEOUT`` for a release that cannot happen.
+
+    Parameters
+    ----------
+    budget_bytes:
+        Total memory grantable at once. Falls back to
+        ``settings.QUERY_MEMORY_BUDGET``.
+    background_fraction:
+        Share of the budget background work may hold. Falls back to
+        ``settings.QUERY_BACKGROUND_BUDGET_FRACTION``.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        background_fraction: Optional[float] = None,
+    ):
+        self._budget = budget_bytes or parse_size(settings.QUERY_MEMORY_BUDGET)
+        fraction = (
+            settings.QUERY_BACKGROUND_BUDGET_FRACTION
+            if background_fraction is None
+            else background_fraction
+        )
+        self._background_cap = int(self._budget * fraction)
+        self._in_use = 0
+        self._background_in_use = 0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def grant_for(self, cost: QueryCost, priority: QueryPriority) -> Grant:
+        """Size the grant for *cost*: memory clamped to what can ever be
+        admitted, threads from the expected CPU time."""
+        cap = self._budget if priority == QueryPriority.INTERACTIVE else self._background_cap
+        memory = min(cost.memory_bytes, max(cap, 1))
+        max_threads = settings.DUCKDB_THREADS
+        if priority == QueryPriority.BACKGROUND:
+            max_threads = max(1, max_threads // 2)
+        wanted = math.ceil(cost.cpu_seconds / settings.QUERY_TARGET_SECONDS_PER_THREAD)
+        return Grant(memory_bytes=memory, threads=max(1, min(max_threads, wanted)), priority=priority)
+
+    # ── Acquisition ─────────────────────────────────────────────────────────
+
+    @contextmanager
+    def admit_sync(
+        self,
+        cost: QueryCost,
+        priority: QueryPriority,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Grant]:
+        """Block until *cost* fits the budget; release on exit.
+
+        Raises:
+            TimeoutError: When not admitted within *timeout* seconds
+                (default ``settings.QUERY_TIMEOUT``).
+            RuntimeError: When called on a running event loop's thread.
+        """
+        if _on_event_loop():
+            raise RuntimeError(
+                "admit_sync() would block the event loop; await admit() or run "
+                "the query in a worker thread"
+            )
+        grant = self.grant_for(cost, priority)
+        event = threading.Event()
+        waiter = self._enqueue(grant, event.set)
+        start = time.perf_counter()
+        if not event.wait(settings.QUERY_TIMEOUT if timeout is None else timeout):
+            if not self._withdraw(waiter):
+                # Granted between the timeout and the withdrawal.
+                self._release(grant)
+            raise TimeoutError("Query was not admitted before the timeout")
+        self._observe_wait(waiter, start)
+        try:
+            yield grant
+        finally:
+            self._release(grant)
+
+    @asynccontextmanager
+    async def admit(self, cost: QueryCost, priority: QueryPriority) -> AsyncIterator[Grant]:
+        """Async :meth:`admit_sync`; cancellation withdraws the request."""
+        grant = await self.acquire(cost, priority)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    async def acquire(self, cost: QueryCost, priority: QueryPriority) -> Grant:
+        """Wait for *cost* to fit; the caller must :meth:`release` the grant.
+
+        For grants that must outlive the awaiting coroutine — e.g. released
+        when a worker thread actually finishes, not when its awaiter is
+        cancelled. Cancellation while waiting withdraws the request.
+        """
+        grant = self.grant_for(cost, priority)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(grant, wake)
+        start = time.perf_counter()
+        try:
+            await future
+        except BaseException:
+            if not self._withdraw(waiter):
+                self._release(grant)
+            raise
+        self._observe_wait(waiter, start)
+        return grant
+
+    def release(self, grant: Grant) -> None:
+        """Return an :meth:`acquire` grant to the budget. Thread-safe."""
+        self._release(grant)
+
+    @contextmanager
+    def admitted(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        sql: str,
+        *,
+        source_bytes: int,
+        priority: QueryPriority,
+        dataset_id: Optional[str] = None,
+        exclusive: bool = True,
+    ) -> Iterator[Grant]:
+        """Estimate, admit and time one statement on *conn*.
+
+        With ``exclusive`` (the caller owns *conn*'s database instance) the
+        grant is applied as the connection's memory and thread limits.
+        Shared catalog cursors pass ``exclusive=False``: a ``SET`` there
+        would change every reader of that dataset.
+        """
+        cost = cost_model.estimate(sql, source_bytes=source_bytes, dataset_id=dataset_id, conn=conn)
+        with self.admit_sync(cost, priority) as grant:
+            if exclusive:
+                grant.apply(conn)
+            start = time.perf_counter()
+            try:
+                yield grant
+            except duckdb.Error as exc:
+                cost_model.record(
+                    sql,
+                    dataset_id,
+                    elapsed=time.perf_counter() - start,
+                    granted_bytes=grant.memory_bytes,
+                    out_of_memory=is_out_of_memory(exc),
+                )
+                raise
+            cost_model.record(
+                sql,
+                dataset_id,
+                elapsed=time.perf_counter() - start,
+                granted_bytes=grant.memory_bytes,
+            )
+
+    # ── Internals ───────────────────────────────────────────────────────────
+
+    def _enqueue(self, grant: Grant, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(int(grant.priority), next(self._seq), grant.memory_bytes, wake)
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+            ready = self._grant_ready()
+        if not waiter.granted:
+            metrics.incr("query_admission_queued_total")
+            logger.debug(
+                "[Admission] Queued %s query (%d MB; %d/%d MB in use)",
+                grant.priority.name.lower(),
+                waiter.memory // _MB,
+                self._in_use // _MB,
+                self._budget // _MB,
+            )
+        for w in ready:
+            w.wake()
+        return waiter
+
+    def _grant_ready(self) -> list[_Waiter]:
+        """Admit waiters from the head of the queue while they fit.
+
+        Strict order — a waiter that does not fit blocks those behind it,
+        so a large query is never starved by a stream of small ones.
+        Caller holds the lock.
+        """
+        ready: list[_Waiter] = []
+        while self._waiters:
+            head = self._waiters[0]
+            if self._in_use and self._in_use + head.memory > self._budget:
+                break
+            background = head.priority == QueryPriority.BACKGROUND
+            if (
+                background
+                and self._background_in_use
+                and self._background_in_use + head.memory > self._background_cap
+            ):
+                break
+            heapq.heappop(self._waiters)
+            self._in_use += head.memory
+            if background:
+                self._background_in_use += head.memory
+            head.granted = True
+            ready.append(head)
+        return ready
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Remove a waiter that gave up. False if it was already granted."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            ready = self._grant_ready()
+        for w in ready:
+            w.wake()
+        return True
+
+    def _release(self, grant: Grant) -> None:
+        with self._lock:
+            self._in_use -= grant.memory_bytes
+            if grant.priority == QueryPriority.BACKGROUND:
+                self._background_in_use -= grant.memory_bytes
+            ready = self._grant_ready()
+        for w in ready:
+            w.wake()
+
+    @staticmethod
+    def _observe_wait(waiter: _Waiter, start: float) -> None:
+        name = QueryPriority(waiter.priority).name.lower()
+        metrics.observe(f"query_admission_wait_seconds_{name}", time.perf_counter() - start)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def is_out_of_memory(exc: BaseException) -> bool:
+    """True for DuckDB's out-of-memory failures (type name varies by version)."""
+    return "out of memory" in str(exc).lower() or type(exc).__name__ == "OutOfMemoryException"
+
+
+# Module-level singletons
+cost_model = CostModel()
+admission_controller = AdmissionController()
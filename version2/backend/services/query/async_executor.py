@@ -10,7 +10,8 @@ async-query-execution design:
 
 - #1: **No query timeout** → ``asyncio.wait_for`` + ``SET statement_timeout``
 - #2: **No cancellation**  → ``task.cancel()`` raises ``CancelledError``
-       in the coroutine; ``finally`` block closes DuckDB.
+       in the coroutine, which interrupts the DuckDB connection; its
+       memory grant is released once the worker thread has returned.
 - #3: **Sync blocking HTTP** → ``run_in_executor`` frees the event loop.
 """
 
@@ -18,6 +19,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from functools import partial
@@ -28,13 +30,27 @@ import pandas as pd
 import polars as pl
 
 from core.config import settings
-from services.query.duckdb_helpers import create_duckdb_connection
+from services.query.admission import (
+    Grant,
+    QueryCost,
+    QueryPriority,
+    admission_controller,
+    cost_model,
+    is_out_of_memory,
+)
+from services.query.dataset_catalog import dataset_catalog
+from services.query.duckdb_helpers import (
+    arrow_available,
+    create_duckdb_connection,
+    fetch_polars,
+)
 from services.query.executor import SQLValidator
 
 logger = logging.getLogger(__name__)
 
 # ── Shared thread pool ─────────────────────────────────────────────────────
-#   - 4 workers × 2 GB per-connection = max 8 GB concurrent DuckDB RAM
+#   - Bounds parallelism only; memory is granted per query from
+#     QUERY_MEMORY_BUDGET by services/query/admission.py
 #   - Tune via env: QUERY_MAX_WORKERS
 _thread_pool: ThreadPoolExecutor | None = None
 
@@ -78,29 +94,81 @@ async def cancel_query(query_id: str) -> bool:
 # ── Core sync function (runs in thread pool) ──────────────────────────────
 
 
+class _RunningQuery:
+    """The connection of one in-flight query, so the loop can interrupt it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conn: duckdb.DuckDBPyConnection | None = None
+        self._interrupted = False
+
+    def attach(self, conn: duckdb.DuckDBPyConnection) -> None:
+        with self._lock:
+            self._conn = conn
+            if self._interrupted:
+                conn.interrupt()
+
+    def detach(self) -> None:
+        with self._lock:
+            self._conn = None
+
+    def interrupt(self) -> None:
+        """Stop the query (or stop it before it starts). Thread-safe."""
+        with self._lock:
+            self._interrupted = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+def _estimate_cost(sql: str, source_bytes: int, dataset_id: str | None) -> QueryCost:
+    """Estimate *sql*'s cost, EXPLAINing it on the dataset catalog if built.
+
+    The editor runs on the loaded frame, but the catalog holds the same
+    table, so its plan (and cardinality estimates) carry over.
+    """
+    sql = sql.replace("`", '"')
+    with dataset_catalog.cursor(dataset_id) as cur:
+        return cost_model.estimate(
+            sql, source_bytes=source_bytes, dataset_id=dataset_id, conn=cur
+        )
+
+
 def _execute_in_duckdb(
     sql: str,
     limit: int,
-    pandas_df: pd.DataFrame,
+    data_source: Any,
+    grant: Grant | None = None,
+    dataset_id: str | None = None,
+    running: _RunningQuery | None = None,
 ) -> dict[str, Any]:
     """Execute SQL in DuckDB inside the thread pool.
 
     This function is deliberately synchronous — it runs inside
     ``run_in_executor`` so the event loop is never blocked.
 
-    ``pandas_df`` is bound via ``functools.partial`` at submission
-    time so each concurrent query gets its own DataFrame reference
-    with no shared global state.
+    ``data_source`` (a pyarrow Table, or a pandas DataFrame when pyarrow
+    is missing) is bound via ``functools.partial`` at submission time so
+    each concurrent query gets its own reference with no shared global
+    state. ``grant`` — the query's admission — sizes the connection.
+    ``running`` exposes the connection to the awaiting coroutine, which
+    interrupts it on timeout or cancellation.
     """
     # Normalize backtick quoting to DuckDB-compatible double-quote quoting.
     sql = sql.replace("`", '"')
+    # Wrap user SQL in a LIMIT subquery.
+    result_sql = f"SELECT * FROM ({sql.rstrip(';')}) AS _q LIMIT {limit}"
 
     start = datetime.now(UTC)
 
-    conn = create_duckdb_connection(
-        memory_limit=settings.QUERY_MEMORY_LIMIT,
-        threads=min(settings.QUERY_MAX_WORKERS, 4),
-    )
+    if grant is not None:
+        conn = create_duckdb_connection(memory_limit=grant.memory_limit, threads=grant.threads)
+    else:
+        conn = create_duckdb_connection(
+            memory_limit=settings.QUERY_MEMORY_LIMIT,
+            threads=min(settings.QUERY_MAX_WORKERS, 4),
+        )
+    if running is not None:
+        running.attach(conn)
     try:
         # ── Statement-level timeout ─────────────────────────────────────
         # DuckDB doesn't support statement_timeout via config dictionary,
@@ -111,18 +179,20 @@ def _execute_in_duckdb(
             pass
         conn.execute("SET max_expression_depth = 50")
 
-        conn.register("data", pandas_df)
-
-        # Wrap user SQL in a LIMIT subquery.
-        result_sql = f"SELECT * FROM ({sql.rstrip(';')}) AS _q LIMIT {limit}"
+        conn.register("data", data_source)
 
-        cursor = conn.execute(result_sql)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        records: list[dict[str, Any]] = [dict(zip(columns, row)) for row in rows]
+        # Result buffers come back through Arrow (or the column-wise tuple
+        # fallback); the only per-row objects are the JSON records below.
+        result_df = fetch_polars(conn.execute(result_sql))
+        columns = result_df.columns
+        records: list[dict[str, Any]] = result_df.to_dicts()
         elapsed = int((datetime.now(UTC) - start).total_seconds() * 1000)
 
         logger.info("[AsyncExecutor] DuckDB returned %d rows in %d ms", len(records), elapsed)
+        if grant is not None:
+            cost_model.record(
+                result_sql, dataset_id, elapsed=elapsed / 1000, granted_bytes=grant.memory_bytes
+            )
 
         return {
             "success": True,
@@ -137,6 +207,14 @@ def _execute_in_duckdb(
         elapsed = int((datetime.now(UTC) - start).total_seconds() * 1000)
         error_msg = str(e)
         logger.error("[AsyncExecutor] DuckDB error: %s", error_msg)
+        if grant is not None:
+            cost_model.record(
+                result_sql,
+                dataset_id,
+                elapsed=elapsed / 1000,
+                granted_bytes=grant.memory_bytes,
+                out_of_memory=is_out_of_memory(e),
+            )
         return {
             "success": False,
             "columns": [],
@@ -146,6 +224,8 @@ def _execute_in_duckdb(
             "error": error_msg,
         }
     finally:
+        if running is not None:
+            running.detach()
         conn.close()
 
 
@@ -159,6 +239,8 @@ async def execute_sql_async(
     df: pl.DataFrame,
     limit: int = 1000,
     query_id: str | None = None,
+    dataset_id: str | None = None,
+    priority: QueryPriority = QueryPriority.INTERACTIVE,
 ) -> dict[str, Any]:
     """Execute SQL asynchronously by offloading to a thread pool.
 
@@ -172,6 +254,11 @@ async def execute_sql_async(
         Maximum number of rows to return.
     query_id:
         Optional tracking ID for cancellation support.
+    dataset_id:
+        Optional dataset id — enables EXPLAIN-based costing on the catalog
+        and per-dataset cost history.
+    priority:
+        Admission class; see ``services/query/admission.py``.
 
     Returns
     -------
@@ -190,15 +277,17 @@ async def execute_sql_async(
             "error": f"SQL validation failed: {error}",
         }
 
-    # ── 2. Convert Polars → Pandas (DuckDB's native format) ────────────────
+    # ── 2. Hand the frame to DuckDB ────────────────────────────────────────
+    #   pyarrow present → ``to_arrow()`` shares Polars' buffers (zero-copy).
+    #   Otherwise fall back to the Polars → Pandas conversion.
     try:
-        pandas_df = df.to_pandas()
+        data_source = df.to_arrow() if arrow_available() else df.to_pandas()
     except ModuleNotFoundError as exc:
         if exc.name == "pyarrow":
             logger.warning(
                 "pyarrow not installed; falling back to dict-based Polars→Pandas conversion."
             )
-            pandas_df = pd.DataFrame(df.to_dicts())
+            data_source = pd.DataFrame(df.to_dicts())
         else:
             raise
     except Exception as exc:
@@ -211,16 +300,36 @@ async def execute_sql_async(
             "error": f"DataFrame conversion failed: {exc}",
         }
 
-    # ── 3. Submit to thread pool with partial binding ──────────────────────
-    #   ``functools.partial`` binds ``pandas_df`` at call time so each
-    #   concurrent query gets its own copy — no shared global state.
+    # ── 3. Admit against the memory budget, then submit to the pool ────────
+    #   The wait for admission counts toward the query timeout.
+    #   ``functools.partial`` binds ``data_source`` at call time so each
+    #   concurrent query gets its own reference — no shared global state.
+    #   The grant is released when the worker thread returns, not when this
+    #   coroutine is timed out or cancelled: DuckDB holds the memory until
+    #   then. Cancellation interrupts the connection so that is soon.
     loop = asyncio.get_running_loop()
     pool = _get_pool()
-    bound_fn = partial(_execute_in_duckdb, sql, limit, pandas_df)
+
+    async def _admitted_run() -> dict[str, Any]:
+        limited_sql = f"SELECT * FROM ({sql.rstrip(';')}) AS _q LIMIT {limit}"
+        cost = await loop.run_in_executor(
+            pool, partial(_estimate_cost, limited_sql, int(df.estimated_size()), dataset_id)
+        )
+        grant = await admission_controller.acquire(cost, priority)
+        running = _RunningQuery()
+        work = pool.submit(
+            _execute_in_duckdb, sql, limit, data_source, grant, dataset_id, running
+        )
+        work.add_done_callback(lambda _: admission_controller.release(grant))
+        try:
+            return await asyncio.wrap_future(work)
+        except asyncio.CancelledError:
+            running.interrupt()
+            raise
 
     try:
         result: dict[str, Any] = await asyncio.wait_for(
-            loop.run_in_executor(pool, bound_fn),
+            _admitted_run(),
             timeout=settings.QUERY_TIMEOUT,
         )
         return result
@@ -0,0 +1,353 @@
+"""
+DatasetCatalog — Persistent per-dataset DuckDB database files
+=============================================================
+Materialises each processed dataset once into a native DuckDB table
+so chat queries stop re-parsing the raw upload on every request.
+
+Why a catalog
+-------------
+Before the catalog, every ``execute_sql`` / ``_estimate_row_count`` call
+opened a fresh in-memory connection and registered::
+
+    CREATE VIEW data AS SELECT * FROM read_csv_auto('<upload>.csv')
+
+so a single chat question parsed the whole CSV at least twice (COUNT(*)
+estimate + real query). On multi-GB uploads that is several seconds of
+sniffing and parsing per question.
+
+Now the pipeline builds ``<DUCKDB_CATALOG_DIR>/<dataset_id>.duckdb`` once
+from the canonical Parquet:
+
+- ``data``           — typed native table (DuckDB keeps per-row-group
+                       zonemaps, and ``ANALYZE`` refreshes column stats)
+- ``_catalog_meta``  — source path, size, mtime and build timestamp
+
+Read paths get cursors from a pooled **read-only** connection per
+dataset. Reprocessing and cleaning mutations call :meth:`invalidate`,
+which closes the pooled connection and deletes the file; the next
+build replaces it atomically (tmp file + ``os.replace``).
+
+Usage
+-----
+    from services.query.dataset_catalog import dataset_catalog
+
+    dataset_catalog.build(dataset_id, parquet_path)
+
+    with dataset_catalog.cursor(dataset_id) as cur:
+        if cur is not None:
+            cur.execute("SELECT COUNT(*) FROM data").fetchone()
+
+Parameterized semantic SQL uses :meth:`session` instead: a pooled
+long-lived cursor that keeps its prepared statements between requests
+(see ``services/query/prepared.py``).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+import duckdb
+
+from core.config import settings
+from services.query.admission import QueryPriority, admission_controller, source_bytes_for
+from services.query.prepared import PreparedSession
+
+logger = logging.getLogger(__name__)
+
+# Extensions DuckDB can ingest natively; everything else is skipped and the
+# executor keeps using its DataFrame registration fallback.
+_READERS: dict[str, str] = {
+    ".parquet": "read_parquet",
+    ".pq": "read_parquet",
+    ".csv": "read_csv_auto",
+}
+
+
+class DatasetCatalog:
+    """Build, pool and invalidate per-dataset DuckDB database files.
+
+    Thread-safe: the pool is guarded by a lock, and each caller gets its
+    own ``cursor()`` (DuckDB cursors are independent connections to the
+    same database instance and safe to use from separate threads).
+
+    Parameters
+    ----------
+    catalog_dir:
+        Directory holding the ``<dataset_id>.duckdb`` files.
+        Falls back to ``settings.DUCKDB_CATALOG_DIR``.
+    """
+
+    def __init__(self, catalog_dir: Optional[str] = None):
+        self._catalog_dir = Path(catalog_dir or settings.DUCKDB_CATALOG_DIR)
+        # dataset_id → (connection, catalog mtime when opened)
+        self._pool: dict[str, tuple[duckdb.DuckDBPyConnection, float]] = {}
+        # dataset_id → idle prepared-statement sessions on the pooled connection
+        self._sessions: dict[str, list[PreparedSession]] = {}
+        self._lock = threading.Lock()
+
+    # ── Paths ───────────────────────────────────────────────────────────────
+
+    def path_for(self, dataset_id: str) -> Path:
+        """Return the on-disk location of *dataset_id*'s catalog file."""
+        safe_id = "".join(ch for ch in str(dataset_id) if ch.isalnum() or ch in "-_")
+        return self._catalog_dir / f"{safe_id}.duckdb"
+
+    def has(self, dataset_id: str) -> bool:
+        """True when a built catalog file exists for *dataset_id*."""
+        return settings.DUCKDB_CATALOG_ENABLED and self.path_for(dataset_id).exists()
+
+    # ── Build ───────────────────────────────────────────────────────────────
+
+    def build(self, dataset_id: str, source_path: str) -> Optional[Path]:
+        """Materialise *source_path* into a native DuckDB table.
+
+        Synchronous and CPU/IO heavy — async callers should run it via
+        ``run_in_executor``. Any pooled connection for the dataset is
+        closed first so the file can be replaced.
+
+        Returns the catalog path, or ``None`` when the catalog is disabled,
+        the source format is unsupported, or the build failed (callers
+        fall back to direct file reads).
+        """
+        if not settings.DUCKDB_CATALOG_ENABLED:
+            return None
+
+        ext = Path(source_path).suffix.lower()
+        reader = _READERS.get(ext)
+        if reader is None:
+            logger.debug("[Catalog] Unsupported source format '%s' — skipping", ext)
+            return None
+
+        target = self.path_for(dataset_id)
+        tmp_target = target.with_suffix(".duckdb.tmp")
+        start = time.perf_counter()
+
+        try:
+            self._catalog_dir.mkdir(parents=True, exist_ok=True)
+            self._close_pooled(dataset_id)
+            tmp_target.unlink(missing_ok=True)
+
+            safe_path = source_path.replace("'", "''")
+            stat = os.stat(source_path)
+
+            conn = duckdb.connect(database=str(tmp_target), config=self._config())
+            try:
+                select_sql = f"SELECT * FROM {reader}('{safe_path}')"
+                with admission_controller.admitted(
+                    conn,
+                    select_sql,
+                    source_bytes=source_bytes_for(source_path),
+                    priority=QueryPriority.BACKGROUND,
+                    dataset_id=dataset_id,
+                ):
+                    conn.execute(f"CREATE TABLE data AS {select_sql}")
+                try:
+                    conn.execute("ANALYZE data")
+                except duckdb.Error as exc:
+                    logger.debug("[Catalog] ANALYZE skipped for %s: %s", dataset_id[:8], exc)
+                conn.execute(
+                    "CREATE TABLE _catalog_meta AS SELECT "
+                    "? AS source_path, ? AS source_size, ? AS source_mtime, ? AS built_at",
+                    [
+                        source_path,
+                        stat.st_size,
+                        stat.st_mtime,
+                        datetime.now(UTC).replace(tzinfo=None).isoformat(),
+                    ],
+                )
+                conn.execute("CHECKPOINT")
+                row_count = conn.execute("SELECT COUNT(*) FROM data").fetchone()[0]
+            finally:
+                conn.close()
+
+            os.replace(tmp_target, target)
+        except Exception as exc:
+            logger.warning("[Catalog] Build failed for %s: %s", dataset_id[:8], exc)
+            tmp_target.unlink(missing_ok=True)
+            Path(f"{tmp_target}.wal").unlink(missing_ok=True)
+            return None
+
+        logger.info(
+            "[Catalog] Built %s (%d rows) in %.0f ms",
+            target.name,
+            row_count,
+            (time.perf_counter() - start) * 1000,
+        )
+        return target
+
+    # ── Read path ───────────────────────────────────────────────────────────
+
+    @contextmanager
+    def cursor(self, dataset_id: Optional[str]) -> Iterator[Optional[duckdb.DuckDBPyConnection]]:
+        """Yield a read-only cursor on the dataset's catalog, or ``None``.
+
+        ``None`` means "no catalog available" — the caller should fall back
+        to registering the ``data`` view itself. The cursor is closed on
+        exit; the pooled parent connection stays open for reuse.
+        """
+        conn = self._get_pooled(dataset_id) if dataset_id else None
+        if conn is None:
+            yield None
+            return
+
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def session(self, dataset_id: Optional[str]) -> Iterator[Optional[PreparedSession]]:
+        """Yield a pooled :class:`PreparedSession` on the dataset's catalog.
+
+        Unlike :meth:`cursor`, the underlying cursor outlives the ``with``
+        block: it goes back to a small idle pool so the statements it
+        prepared are reused by the next caller. ``None`` means no catalog.
+        """
+        conn = self._get_pooled(dataset_id) if dataset_id else None
+        if conn is None:
+            yield None
+            return
+
+        session = self._checkout_session(dataset_id, conn)
+        try:
+            yield session
+        finally:
+            self._checkin_session(dataset_id, session)
+
+    def _checkout_session(
+        self, dataset_id: str, conn: duckdb.DuckDBPyConnection
+    ) -> PreparedSession:
+        stale: list[PreparedSession] = []
+        session = None
+        with self._lock:
+            idle = self._sessions.get(dataset_id, [])
+            while idle:
+                candidate = idle.pop()
+                if candidate.parent is conn:
+                    session = candidate
+                    break
+                stale.append(candidate)
+        for old in stale:
+            old.close()
+        return session or PreparedSession(conn.cursor(), conn)
+
+    def _checkin_session(self, dataset_id: str, session: PreparedSession) -> None:
+        with self._lock:
+            pooled = self._pool.get(dataset_id)
+            idle = self._sessions.setdefault(dataset_id, [])
+            if (
+                pooled is not None
+                and pooled[0] is session.parent
+                and len(idle) < settings.DUCKDB_PREPARED_SESSIONS
+            ):
+                idle.append(session)
+                return
+        session.close()
+
+    def _get_pooled(self, dataset_id: str) -> Optional[duckdb.DuckDBPyConnection]:
+        if not self.has(dataset_id):
+            return None
+        path = self.path_for(dataset_id)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            pooled = self._pool.get(dataset_id)
+            if pooled is not None:
+                conn, opened_mtime = pooled
+                if opened_mtime == mtime:
+                    return conn
+                # Another worker rebuilt the file — drop the stale handle.
+                self._pool.pop(dataset_id, None)
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            try:
+                conn = duckdb.connect(
+                    database=str(path),
+                    read_only=True,
+                    config=self._config(),
+                )
+            except duckdb.Error as exc:
+                logger.warning("[Catalog] Could not open %s: %s", dataset_id[:8], exc)
+                return None
+            self._pool[dataset_id] = (conn, mtime)
+            return conn
+
+    # ── Invalidation ────────────────────────────────────────────────────────
+
+    def invalidate(self, dataset_id: str) -> bool:
+        """Close the pooled connection and delete the catalog file.
+
+        Called on reprocess, re-import and cleaning mutations so stale
+        tables are never served. Returns True if a file was removed.
+        """
+        self._close_pooled(dataset_id)
+        target = self.path_for(dataset_id)
+        existed = target.exists()
+        try:
+            target.unlink(missing_ok=True)
+            Path(f"{target}.wal").unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("[Catalog] Could not delete %s: %s", target, exc)
+            return False
+        if existed:
+            logger.info("[Catalog] Invalidated %s", dataset_id[:8])
+        return existed
+
+    def close_all(self) -> None:
+        """Close every pooled connection (application shutdown)."""
+        with self._lock:
+            pooled = [conn for conn, _ in self._pool.values()]
+            self._pool.clear()
+            sessions = [s for idle in self._sessions.values() for s in idle]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+        for conn in pooled:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _close_pooled(self, dataset_id: str) -> None:
+        with self._lock:
+            pooled = self._pool.pop(dataset_id, None)
+            sessions = self._sessions.pop(dataset_id, [])
+        for session in sessions:
+            session.close()
+        if pooled is not None:
+            try:
+                pooled[0].close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _config() -> dict[str, str]:
+        temp_dir = settings.DUCKDB_TEMP_DIRECTORY
+        try:
+            os.makedirs(temp_dir, exist_ok=True)
+        except OSError:
+            temp_dir = "/tmp"
+        return {
+            "memory_limit": settings.DUCKDB_MEMORY_LIMIT,
+            "threads": str(settings.DUCKDB_THREADS),
+            "temp_directory": temp_dir,
+        }
+
+
+# Module-level singleton
+dataset_catalog = DatasetCatalog()
@@ -25,15 +25,31 @@ Usage
 
     with create_duckdb_connection() as conn:
         conn.execute("SELECT 1")
+
+Result materialisation
+----------------------
+:func:`fetch_polars` turns an executed cursor into a Polars DataFrame.
+With pyarrow installed it uses DuckDB's Arrow export (``cursor.pl()``),
+which hands the result buffers to Polars without copying them through
+Python objects. Without pyarrow it falls back to ``fetchall()`` +
+``orient="row"`` construction, which Polars builds column-by-column in
+Rust — no per-row ``dict`` is ever created.
+
+:func:`register_frame` is the inverse: it exposes a Polars DataFrame to a
+connection as a named view (Arrow when available, else Pandas).
 """
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
+from functools import lru_cache
 from typing import Optional
 
 import duckdb
+import pandas as pd
+import polars as pl
 
 from core.config import settings
 
@@ -101,3 +117,98 @@ def create_duckdb_connection(
     )
 
     return conn
+
+
+@lru_cache(maxsize=1)
+def arrow_available() -> bool:
+    """True when pyarrow is importable (enables DuckDB's zero-copy export)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def register_frame(
+    conn: duckdb.DuckDBPyConnection,
+    name: str,
+    df: pl.DataFrame,
+) -> None:
+    """Register *df* on *conn* as the view *name*.
+
+    Polars→Arrow (zero-copy) when pyarrow is installed, otherwise
+    Polars→Pandas, and as a last resort a dict-based Pandas frame.
+    """
+    if arrow_available():
+        conn.register(name, df.to_arrow())
+        return
+    try:
+        pandas_df = df.to_pandas()
+    except ModuleNotFoundError as exc:
+        if exc.name != "pyarrow":
+            raise
+        logger.warning(
+            "pyarrow is not installed; falling back to slower "
+            "dict-based Polars->Pandas conversion for SQL execution."
+        )
+        pandas_df = pd.DataFrame(df.to_dicts())
+    conn.register(name, pandas_df)
+
+
+def fetch_polars(
+    cursor: duckdb.DuckDBPyConnection,
+    prefer_arrow: bool = True,
+) -> pl.DataFrame:
+    """Materialise the pending result of *cursor* as a Polars DataFrame.
+
+    Parameters
+    ----------
+    cursor:
+        A connection/cursor on which ``execute()`` has just been called.
+    prefer_arrow:
+        Use DuckDB's Arrow export when pyarrow is available. Set to
+        ``False`` to force the tuple fallback (benchmarks, debugging).
+
+    Returns
+    -------
+    pl.DataFrame
+        The result set, with Decimal columns cast as by
+        :func:`_plain_numbers`. An empty result on the fallback path keeps
+        the column names with ``Utf8`` dtype, matching the legacy behaviour.
+    """
+    if prefer_arrow and arrow_available():
+        return _plain_numbers(cursor.pl())
+
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    if not rows:
+        return pl.DataFrame({col: pl.Series(col, [], dtype=pl.Utf8) for col in columns})
+    return _plain_numbers(
+        pl.DataFrame(
+            rows,
+            schema=columns,
+            orient="row",
+            infer_schema_length=None,
+        )
+    )
+
+
+def _plain_numbers(df: pl.DataFrame) -> pl.DataFrame:
+    """Cast Decimal columns to Int64 (scale 0) or Float64.
+
+    DuckDB's Arrow export turns HUGEINT results such as ``SUM(int)`` into
+    ``Decimal(38, 0)``, while the tuple path yields Python ints. Decimal
+    values serialise as JSON strings, so without the cast a result's JSON
+    type would depend on the path that produced it. Scale-0 columns that
+    overflow Int64 become Float64.
+    """
+    casts = []
+    for name, dtype in df.schema.items():
+        if not isinstance(dtype, pl.Decimal):
+            continue
+        if dtype.scale == 0:
+            try:
+                df[name].cast(pl.Int64)
+            except pl.exceptions.InvalidOperationError:
+                casts.append(pl.col(name).cast(pl.Float64))
+            else:
+                casts.append(pl.col(name).cast(pl.Int64))
+        else:
+            casts.append(pl.col(name).cast(pl.Float64))
+    return df.with_columns(casts) if casts else df
@@ -13,17 +13,19 @@ Architecture:
     User Query → SQL Generation (LLM) → SQL Validation → DuckDB Execution → Result Formatting
 """
 
+import asyncio
 import logging
 import re
 import hashlib
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 import json
 
 import duckdb
 import polars as pl
-import pandas as pd
 
 from llm.router import llm_router
 from core.config import settings
@@ -38,7 +40,21 @@ from services.query.sql_repair_agent import (
     build_column_whitelist_block,
 )
 from services.query.approximate_engine import approximate_rewriter
-from services.query.duckdb_helpers import create_duckdb_connection
+from services.observability import metrics
+from services.query.duckdb_helpers import (
+    create_duckdb_connection,
+    fetch_polars,
+    register_frame,
+)
+from services.query.admission import (
+    QueryPriority,
+    admission_controller,
+    cost_model,
+    source_bytes_for,
+)
+from services.query.dataset_catalog import dataset_catalog
+from services.query.progressive import progressive_engine
+from services.query import query_cache
 
 # understand_query is the single routing authority — imported lazily to avoid circular imports
 from services.ai.query_rewrite import understand_query
@@ -501,7 +517,8 @@ class QueryExecutor:
 
         Strategy (best → fallback):
         1. **Direct file read** (CSV/Parquet) — DuckDB streams from disk, zero Python memory.
-        2. **Pandas registration** — existing Polars→Pandas→DuckDB path for Excel/JSON.
+        2. **DataFrame registration** — Polars→Arrow (zero-copy) when pyarrow is
+           installed, else Polars→Pandas→DuckDB, for Excel/JSON.
 
         Args:
             conn: An open DuckDB in-memory connection.
@@ -523,18 +540,76 @@ class QueryExecutor:
                 return
             # Unsupported format — fall through to DataFrame path
 
-        # Fallback: register Polars DataFrame
+        # Fallback: register Polars DataFrame — via Arrow (zero-copy) when
+        # pyarrow is installed, otherwise through Pandas.
+        register_frame(conn, "data", df)
+
+    @classmethod
+    @contextmanager
+    def _data_connection(
+        cls,
+        dataset_id: Optional[str],
+        file_path: Optional[str],
+        df: pl.DataFrame,
+        admit_sql: Optional[str] = None,
+    ) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Yield a DuckDB connection on which ``data`` is queryable.
+
+        Prefers a pooled read-only cursor on the dataset's persistent catalog;
+        otherwise opens a throwaway in-memory connection and registers the
+        ``data`` view via :meth:`_register_data_view`.
+
+        With ``admit_sql`` the connection is only yielded once that statement
+        has been admitted as interactive work (``services/query/admission.py``);
+        a throwaway connection is also capped to the granted memory/threads.
+        """
+        source_bytes = cls._source_bytes(dataset_id, file_path, df) if admit_sql else 0
+
+        with dataset_catalog.cursor(dataset_id) as cur:
+            if cur is not None:
+                if admit_sql is None:
+                    yield cur
+                    return
+                with admission_controller.admitted(
+                    cur,
+                    admit_sql,
+                    source_bytes=source_bytes,
+                    priority=QueryPriority.INTERACTIVE,
+                    dataset_id=dataset_id,
+                    exclusive=False,
+                ):
+                    yield cur
+                return
+
+        conn = create_duckdb_connection()
         try:
-            pandas_df = df.to_pandas()
-        except ModuleNotFoundError as exc:
-            if exc.name != "pyarrow":
-                raise
-            logger.warning(
-                "pyarrow is not installed; falling back to slower "
-                "dict-based Polars->Pandas conversion for SQL execution."
-            )
-            pandas_df = pd.DataFrame(df.to_dicts())
-        conn.register("data", pandas_df)
+            cls._register_data_view(conn, file_path, df)
+            if admit_sql is None:
+                yield conn
+                return
+            with admission_controller.admitted(
+                conn,
+                admit_sql,
+                source_bytes=source_bytes,
+                priority=QueryPriority.INTERACTIVE,
+                dataset_id=dataset_id,
+            ):
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _source_bytes(
+        dataset_id: Optional[str], file_path: Optional[str], df: pl.DataFrame
+    ) -> int:
+        """Bytes a query over ``data`` may scan — the largest known source."""
+        sizes = [source_bytes_for(file_path)]
+        if dataset_id and dataset_catalog.has(dataset_id):
+            sizes.append(source_bytes_for(str(dataset_catalog.path_for(dataset_id))))
+        if df is not None:
+            sizes.append(int(df.estimated_size()))
+        return max(sizes)
 
     @staticmethod
     def _build_schema_sample_from_file(file_path: str, max_rows: int = 200) -> Optional[pl.DataFrame]:
@@ -571,15 +646,7 @@ class QueryExecutor:
                         f"CREATE VIEW _schema_src AS SELECT * FROM read_parquet('{safe_path}') LIMIT {max_rows}"
                     )
 
-                cursor = conn.execute("SELECT * FROM _schema_src")
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                records = [dict(zip(columns, row)) for row in rows]
-                return (
-                    pl.from_dicts(records)
-                    if records
-                    else pl.DataFrame({c: pl.Series(c, [], dtype=pl.Utf8) for c in columns})
-                )
+                return fetch_polars(conn.execute("SELECT * FROM _schema_src"))
             finally:
                 conn.close()
         except Exception as e:
@@ -762,7 +829,7 @@ Sample data (first 5 rows):
                     continue
 
                 # Try to execute to catch runtime errors
-                result_df, exec_error = self.execute_sql(sql, df)
+                result_df, exec_error = await asyncio.to_thread(self.execute_sql, sql, df)
                 if exec_error:
                     logger.warning(f"SQL execution failed: {exec_error}")
 
@@ -780,7 +847,9 @@ Sample data (first 5 rows):
                             f"[SQLRepairAgent] Repair succeeded via {repair_result.repair_method}"
                         )
                         # Re-execute the repaired SQL
-                        result_df, exec_error = self.execute_sql(repair_result.sql, df)
+                        result_df, exec_error = await asyncio.to_thread(
+                            self.execute_sql, repair_result.sql, df
+                        )
                         if not exec_error:
                             sql = repair_result.sql
                             logger.info(f"SQL repaired and executed successfully")
@@ -921,7 +990,7 @@ Output ONLY the corrected SQL — nothing else.
             )
             return "", f"SQL validation failed: {msg}"
 
-        result_df, exec_error = self.execute_sql(sql, df)
+        result_df, exec_error = await asyncio.to_thread(self.execute_sql, sql, df)
         if exec_error:
             error_msg = exec_error
             logger.warning(f"[DirectSQL] DuckDB error on first attempt: {error_msg}")
@@ -936,7 +1005,7 @@ Output ONLY the corrected SQL — nothing else.
             if repair_result.was_repaired:
                 sql_2 = repair_result.sql
                 sql_2 = self._sanitize_sql(sql_2)
-                _, exec_error_2 = self.execute_sql(sql_2, df)
+                _, exec_error_2 = await asyncio.to_thread(self.execute_sql, sql_2, df)
                 if not exec_error_2:
                     logger.info("[DirectSQL] Repair succeeded on retry")
                     return sql_2, ""
@@ -986,13 +1055,20 @@ Output ONLY the corrected SQL — nothing else.
         sql: str,
         df: pl.DataFrame,
         file_path: Optional[str] = None,
+        dataset_id: Optional[str] = None,
+        params: Optional[List[Any]] = None,
     ) -> Tuple[Optional[pl.DataFrame], str]:
         """
         Execute SQL query against the dataframe using DuckDB.
 
-        When ``file_path`` is provided and the file type is CSV or Parquet,
-        DuckDB reads the file **directly** — streaming from disk instead of
-        going through Polars→Pandas→DuckDB (which triples memory usage).
+        When ``dataset_id`` has a built catalog (see
+        ``services/query/dataset_catalog.py``), the query runs on a pooled
+        read-only cursor over the native ``data`` table — no file parsing.
+
+        Otherwise, when ``file_path`` is provided and the file type is CSV or
+        Parquet, DuckDB reads the file **directly** — streaming from disk
+        instead of going through Polars→Pandas→DuckDB (which triples memory
+        usage).
 
         For Excel/JSON files, the existing Polars→Pandas→DuckDB path is used
         as a fallback since DuckDB doesn't natively read those formats.
@@ -1001,6 +1077,11 @@ Output ONLY the corrected SQL — nothing else.
             sql: The SQL query to execute. Uses table name ``data``.
             df: Polars DataFrame (fallback when file_path is not used).
             file_path: Optional path to the source file for direct DuckDB reads.
+            dataset_id: Optional dataset id used to look up the persistent catalog.
+            params: Positional values for ``?`` placeholders (compiled semantic
+                SQL). On a catalog the statement is prepared once per pooled
+                cursor and replayed with ``EXECUTE`` — see
+                ``services/query/prepared.py``.
 
         Returns:
             (result_df, error_message)
@@ -1015,34 +1096,20 @@ Output ONLY the corrected SQL — nothing else.
             if not is_valid:
                 return None, f"SQL validation failed: {error}"
 
-            # Create DuckDB connection (in-memory, isolated, resource-governed)
-            conn = create_duckdb_connection()
-
-            try:
-                # ── Register the ``data`` view ───────────────────────
-                # Uses direct DuckDB file reads for CSV/Parquet (zero Python
-                # memory) and falls back to Polars→Pandas for Excel/JSON.
-                self._register_data_view(conn, file_path, df)
-
-                # Execute with timeout and row limit
-                result_sql = (
-                    f"SELECT * FROM ({sql.rstrip(';')}) AS subquery LIMIT {self._max_result_rows}"
-                )
+            # Execute with timeout and row limit
+            result_sql = (
+                f"SELECT * FROM ({sql.rstrip(';')}) AS subquery LIMIT {self._max_result_rows}"
+            )
 
-                # Avoid pyarrow dependency: use fetchall() + build Polars from dicts.
-                # .pl() and .df() both rely on Arrow (pyarrow), but fetchall()
-                # returns plain Python tuples which need no extra C-extension.
-                cursor = conn.execute(result_sql)
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                records = [dict(zip(columns, row)) for row in rows]
-                result = (
-                    pl.from_dicts(records)
-                    if records
-                    else pl.DataFrame({col: pl.Series(col, [], dtype=pl.Utf8) for col in columns})
-                )
-            finally:
-                conn.close()
+            if params is not None:
+                result = self._execute_parameterized(result_sql, params, df, file_path, dataset_id)
+            else:
+                with self._data_connection(
+                    dataset_id, file_path, df, admit_sql=result_sql
+                ) as conn:
+                    # Arrow export when pyarrow is present, column-wise tuple
+                    # fallback otherwise — never one Python dict per row.
+                    result = fetch_polars(conn.execute(result_sql))
 
             logger.info(f"✅ SQL executed successfully, returned {len(result)} rows")
             return result, ""
@@ -1063,6 +1130,35 @@ Output ONLY the corrected SQL — nothing else.
             logger.error(f"Unexpected execution error: {e}", exc_info=True)
             return None, f"Unexpected error: {str(e)}"
 
+    def _execute_parameterized(
+        self,
+        sql: str,
+        params: List[Any],
+        df: pl.DataFrame,
+        file_path: Optional[str],
+        dataset_id: Optional[str],
+    ) -> pl.DataFrame:
+        """Run a ``?``-parameterized statement, reusing prepared plans.
+
+        With a catalog the template is prepared on a pooled session and
+        later calls with the same shape skip parsing and planning. Without
+        one the throwaway connection cannot keep a plan, so the values are
+        simply bound on a plain ``execute``.
+        """
+        with dataset_catalog.session(dataset_id) as session:
+            if session is not None:
+                # Placeholders cannot be EXPLAINed — cost from size + history.
+                cost = cost_model.estimate(
+                    sql,
+                    source_bytes=self._source_bytes(dataset_id, file_path, df),
+                    dataset_id=dataset_id,
+                )
+                with admission_controller.admit_sync(cost, QueryPriority.INTERACTIVE):
+                    return fetch_polars(session.execute(sql, params))
+
+        with self._data_connection(None, file_path, df, admit_sql=sql) as conn:
+            return fetch_polars(conn.execute(sql, params))
+
     def _make_row_count_warning(
         self,
         query: str,
@@ -1107,6 +1203,7 @@ Output ONLY the corrected SQL — nothing else.
         sql: str,
         df: pl.DataFrame,
         file_path: Optional[str] = None,
+        dataset_id: Optional[str] = None,
     ) -> Tuple[int, Optional[str]]:
         """
         Estimate the number of rows a SQL query would return using COUNT(*).
@@ -1124,6 +1221,7 @@ Output ONLY the corrected SQL — nothing else.
             sql: The SQL query to estimate
             df: Polars DataFrame with the data (fallback when no file_path)
             file_path: Optional path to the source file for direct DuckDB reads
+            dataset_id: Optional dataset id used to look up the persistent catalog
 
         Returns:
             (estimated_rows, error_message)
@@ -1132,16 +1230,11 @@ Output ONLY the corrected SQL — nothing else.
             # Strip trailing semicolon for wrapping
             clean_sql = sql.strip().rstrip(";")
 
-            conn = create_duckdb_connection()
-            try:
-                self._register_data_view(conn, file_path, df)
-
+            with self._data_connection(dataset_id, file_path, df) as conn:
                 count_sql = f"SELECT COUNT(*) AS _cnt FROM ({clean_sql}) AS _subq"
                 cursor = conn.execute(count_sql)
                 row = cursor.fetchone()
                 count = row[0] if row else 0
-            finally:
-                conn.close()
 
             return int(count), None
         except duckdb.Error as e:
@@ -1151,6 +1244,115 @@ Output ONLY the corrected SQL — nothing else.
             logger.warning(f"[RowCount] Estimation error: {e}")
             return 0, str(e)
 
+    def _execute_exact(
+        self,
+        sql: str,
+        df: pl.DataFrame,
+        file_path: Optional[str],
+        dataset_id: Optional[str],
+    ) -> Tuple[Optional[pl.DataFrame], int, str]:
+        """
+        Run *sql* for :meth:`execute_query`: ``(result_df, total_rows, error)``.
+
+        With the row threshold active a truncated result is counted
+        (:meth:`execute_sql_with_count`); otherwise ``total_rows`` is simply
+        the result length. Safe to call from a worker thread.
+        """
+        if settings.MAX_ROWS_WARNING_THRESHOLD > 0:
+            return self.execute_sql_with_count(sql, df, file_path=file_path, dataset_id=dataset_id)
+        result_df, exec_error = self.execute_sql(
+            sql, df, file_path=file_path, dataset_id=dataset_id
+        )
+        metrics.incr("query_scans_total", 1)
+        metrics.observe("query_scans_per_query", 1)
+        return result_df, len(result_df) if result_df is not None else 0, exec_error
+
+    def execute_sql_with_count(
+        self,
+        sql: str,
+        df: pl.DataFrame,
+        file_path: Optional[str] = None,
+        dataset_id: Optional[str] = None,
+    ) -> Tuple[Optional[pl.DataFrame], int, str]:
+        """
+        Execute SQL and learn its true cardinality.
+
+        Replaces the ``_estimate_row_count`` + ``execute_sql`` pair, which
+        always ran the full query twice. The query runs once, capped at
+        ``max_result_rows``; only a result that reaches the cap is counted
+        with a separate ``SELECT COUNT(*)`` over the un-limited query. That
+        count needs no ORDER BY and no result columns, so DuckDB drops
+        them. Most chat answers are smaller than the cap, so they cost one
+        scan, and no result is ever materialised just to be counted. An
+        empty result has a total of 0.
+
+        When ``dataset_id`` is given the shared ``query_cache`` is consulted
+        first and filled afterwards. Its keys are canonical SQL fingerprints,
+        so the same question answered by ``execute_query`` and by
+        ``SemanticQueryService`` — or re-generated by the LLM with different
+        aliases or predicate order — is scanned once per dataset version.
+        ``query_scans_total`` records the scans actually run (1 or 2).
+
+        Returns:
+            (result_df, total_rows, error_message)
+        """
+        limit = self._max_result_rows
+        if dataset_id:
+            cached = query_cache.get(dataset_id, sql, limit)
+            # Entries stored by the /query API carry no total — treat as a miss.
+            if cached is not None and "total_rows" in cached:
+                return self._frame_from_cached(cached), int(cached["total_rows"]), ""
+
+        start_time = datetime.now()
+        result, error = self.execute_sql(sql, df, file_path=file_path, dataset_id=dataset_id)
+        scans = 1
+        if error or result is None:
+            metrics.incr("query_scans_total", scans)
+            metrics.observe("query_scans_per_query", scans)
+            return None, 0, error
+
+        total_rows = len(result)
+        if total_rows >= limit:
+            # Truncated at the cap: count the un-limited query
+            count, count_error = self._estimate_row_count(
+                sql.replace("`", '"'), df, file_path=file_path, dataset_id=dataset_id
+            )
+            scans += 1
+            if count_error is None:
+                total_rows = max(count, total_rows)
+        metrics.incr("query_scans_total", scans)
+        metrics.observe("query_scans_per_query", scans)
+
+        if dataset_id:
+            # Same shape as execute_sql_async() output, plus ``total_rows``,
+            # so /query API lookups for this key can reuse the entry.
+            query_cache.put(
+                dataset_id,
+                sql,
+                limit,
+                {
+                    "success": True,
+                    "columns": result.columns,
+                    "data": result.to_dicts(),
+                    "row_count": len(result),
+                    "total_rows": total_rows,
+                    "execution_time_ms": int(
+                        (datetime.now() - start_time).total_seconds() * 1000
+                    ),
+                    "error": None,
+                },
+            )
+        return result, total_rows, ""
+
+    @staticmethod
+    def _frame_from_cached(cached: Dict[str, Any]) -> pl.DataFrame:
+        """Rebuild a result DataFrame from a ``query_cache`` entry."""
+        if cached["data"]:
+            return pl.from_dicts(cached["data"], infer_schema_length=None).select(
+                cached["columns"]
+            )
+        return pl.DataFrame(schema={col: pl.Utf8 for col in cached["columns"]})
+
     def format_results(self, result_df: pl.DataFrame, max_display_rows: int = 20) -> str:
         """Format query results as a readable markdown table."""
         if result_df is None or len(result_df) == 0:
@@ -1407,37 +1609,11 @@ Output ONLY the corrected SQL — nothing else.
                 "execution_time_ms": (datetime.now() - start_time).total_seconds() * 1000,
             }
 
-        # ── Step 2b: Row-count pre-check ──
-        # Before executing the full query, estimate how many rows it would
-        # return. If it exceeds MAX_ROWS_WARNING_THRESHOLD, warn the user
-        # instead of running a potentially heavy query.
-        threshold = settings.MAX_ROWS_WARNING_THRESHOLD
-        if threshold > 0:
-            estimated_rows, est_error = self._estimate_row_count(sql, df, file_path=file_path)
-            if estimated_rows > threshold:
-                logger.warning(
-                    "[RowCount] Query would return %d rows (threshold=%d) — returning warning",
-                    estimated_rows,
-                    threshold,
-                )
-                return self._make_row_count_warning(
-                    query=query,
-                    sql=sql,
-                    estimated_rows=estimated_rows,
-                    threshold=threshold,
-                    start_time=start_time,
-                )
-            elif estimated_rows > 0:
-                logger.info(
-                    "[RowCount] Query returns %d rows — within threshold (%d), proceeding",
-                    estimated_rows,
-                    threshold,
-                )
-
-        # ── Step 2c: Approximate Query Processing (AQP) ──
+        # ── Step 2b: Approximate Query Processing (AQP) ──
         # If approximate mode is enabled, rewrite expensive operations
         # (COUNT DISTINCT, PERCENTILE, MEDIAN) to DuckDB native
-        # approximate functions for ~200× faster results.
+        # approximate functions for ~200× faster results. Rewrites never
+        # change cardinality, so the row-count check below is unaffected.
         aqp_info = None
         sql_for_execution = sql
         if self._approximate_mode and settings.AQP_ENABLED:
@@ -1450,9 +1626,64 @@ Output ONLY the corrected SQL — nothing else.
                 )
                 sql_for_execution = rewritten
 
-        # Step 3: Execute SQL
+        # ── Step 3: Execute SQL (with the row-count check) ──
+        # When the row threshold is active, the query runs once capped at
+        # max_result_rows; only a result that reaches the cap is followed by
+        # a separate COUNT(*) over the un-limited query, instead of every
+        # query paying a COUNT(*) pre-pass. If the total exceeds
+        # MAX_ROWS_WARNING_THRESHOLD the rows are discarded and the user
+        # gets the usual warning.
+        #
+        # On large datasets an aggregate query is also answered on the
+        # cached sample while the scan runs; that estimate (with confidence
+        # intervals) reaches the user's WebSocket first, the exact result
+        # follows (see services/query/progressive.py).
+        threshold = settings.MAX_ROWS_WARNING_THRESHOLD
         logger.info(f"⚡ Executing SQL: {sql_for_execution[:100]}...")
-        result_df, exec_error = self.execute_sql(sql_for_execution, df, file_path=file_path)
+        progress_id = None
+        if progressive_engine.applies(sql_for_execution, len(df), user_id):
+            (result_df, total_rows, exec_error), progress_id = await progressive_engine.run(
+                sql_for_execution,
+                partial(self._execute_exact, sql_for_execution, df, file_path, dataset_id),
+                dataset_id=dataset_id,
+                user_id=user_id,
+                df=df,
+                file_path=file_path,
+            )
+        else:
+            result_df, total_rows, exec_error = await asyncio.to_thread(
+                self._execute_exact, sql_for_execution, df, file_path, dataset_id
+            )
+        if progress_id:
+            over_threshold = threshold > 0 and total_rows > threshold
+            await progressive_engine.push_exact(
+                user_id,
+                progress_id,
+                dataset_id,
+                None if exec_error or over_threshold else result_df,
+                error=exec_error or ("Result too large to display" if over_threshold else None),
+            )
+
+        if threshold > 0:
+            if not exec_error and total_rows > threshold:
+                logger.warning(
+                    "[RowCount] Query would return %d rows (threshold=%d) — returning warning",
+                    total_rows,
+                    threshold,
+                )
+                return self._make_row_count_warning(
+                    query=query,
+                    sql=sql,
+                    estimated_rows=total_rows,
+                    threshold=threshold,
+                    start_time=start_time,
+                )
+            if not exec_error:
+                logger.info(
+                    "[RowCount] Query returns %d rows — within threshold (%d)",
+                    total_rows,
+                    threshold,
+                )
 
         if exec_error:
             # Try to provide helpful feedback
@@ -1493,6 +1724,8 @@ Output ONLY the corrected SQL — nothing else.
             result["approx_accuracy"] = aqp_info["accuracy"]
             result["approx_rule_count"] = aqp_info["rule_count"]
             result["approx_changes"] = aqp_info["changes"]
+        if progress_id:
+            result["progress_id"] = progress_id
 
         # Cache result
         if len(self._query_cache) >= self._max_cache_size:
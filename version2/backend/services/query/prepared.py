@@ -0,0 +1,148 @@
+"""
+Prepared statements for compiled semantic SQL
+=============================================
+Keeps DuckDB prepared statements alive on long-lived catalog cursors so
+parameterized queries that share a shape skip parsing, binding and
+planning on every repeat.
+
+Why
+---
+The semantic compiler used to inline every filter value into the SQL
+text, so a drill-down that only switched ``region = 'North'`` to
+``region = 'South'`` produced brand-new SQL that DuckDB parsed and
+planned from scratch. :meth:`MetricSQLCompiler.compile_parameterized`
+now emits the statement with ``?`` placeholders plus a parameter list;
+the template text *is* the intent shape.
+
+A :class:`PreparedSession` wraps one cursor on a dataset's pooled
+catalog connection (see ``dataset_catalog.session``) and remembers which
+templates it already prepared. The first execution of a shape runs
+``PREPARE``; repeats only run ``EXECUTE name(<values>)``.
+
+DuckDB does not accept bound parameters inside ``EXECUTE`` itself, so
+argument values are rendered as typed literals by :func:`sql_literal` —
+an ``EXECUTE`` with a handful of constants is trivial to parse next to
+the statement it replays.
+
+Usage
+-----
+    from services.query.dataset_catalog import dataset_catalog
+
+    with dataset_catalog.session(dataset_id) as session:
+        if session is not None:
+            cursor = session.execute(template_sql, params)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+from collections import OrderedDict
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+import duckdb
+
+from core.config import settings
+from services.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def sql_literal(value: Any) -> str:
+    """Render a Python scalar as a DuckDB literal for ``EXECUTE`` arguments.
+
+    Strings are single-quoted with embedded quotes doubled; dates and
+    timestamps are cast explicitly so they compare against typed columns
+    the same way a bound parameter would.
+
+    Raises:
+        TypeError: For values with no literal form (lists, dicts, objects).
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return f"'{value}'::DOUBLE"
+        return repr(value)
+    if isinstance(value, Decimal):
+        return f"{value}"
+    if isinstance(value, datetime):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, time):
+        return f"TIME '{value.isoformat()}'"
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    raise TypeError(f"Cannot render {type(value).__name__} as a SQL literal")
+
+
+def statement_name(sql: str) -> str:
+    """Deterministic prepared-statement name for a template."""
+    return "ps_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+
+
+class PreparedSession:
+    """One long-lived cursor plus the statements prepared on it.
+
+    Not thread-safe — the catalog hands each session to one caller at a
+    time. Prepared statements live in the cursor's client context, so
+    they disappear with it; the LRU bound keeps a session from
+    accumulating plans for every shape it has ever seen.
+    """
+
+    def __init__(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        parent: duckdb.DuckDBPyConnection,
+        max_statements: Optional[int] = None,
+    ):
+        self.cursor = cursor
+        self.parent = parent
+        self._max_statements = max_statements or settings.DUCKDB_PREPARED_STATEMENTS
+        # template SQL → statement name, least recently used first
+        self._statements: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> duckdb.DuckDBPyConnection:
+        """Run *sql* with *params*, preparing the template on first use."""
+        name = self._statements.get(sql)
+        if name is None:
+            name = statement_name(sql)
+            self.cursor.execute(f"PREPARE {name} AS {sql}")
+            self._statements[sql] = name
+            metrics.incr("prepared_statement_misses_total")
+            self._evict()
+        else:
+            self._statements.move_to_end(sql)
+            metrics.incr("prepared_statement_hits_total")
+
+        if params:
+            args = ", ".join(sql_literal(v) for v in params)
+            return self.cursor.execute(f"EXECUTE {name}({args})")
+        return self.cursor.execute(f"EXECUTE {name}")
+
+    def close(self) -> None:
+        self._statements.clear()
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+
+    def _evict(self) -> None:
+        while len(self._statements) > self._max_statements:
+            _, name = self._statements.popitem(last=False)
+            try:
+                self.cursor.execute(f"DEALLOCATE {name}")
+            except duckdb.Error as exc:
+                logger.debug("[Prepared] DEALLOCATE %s failed: %s", name, exc)
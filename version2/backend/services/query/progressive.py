@@ -0,0 +1,563 @@
+"""
+Progressive Query Execution — Sample-first answers with error bounds
+====================================================================
+A chat question on a multi-million-row dataset waits for the full DuckDB
+scan before anything is shown. For aggregate questions ("revenue by
+region", "average order value per month") the cached stratified sample
+from ``dataset_loader.load_dataset_sample`` already knows the answer to
+within a few percent, in milliseconds.
+
+While the exact scan runs in a worker thread, :class:`ProgressiveEngine`
+runs the same SQL (after :class:`ApproximateRewriter`) on the sample and
+pushes the result to the user's WebSocket as a ``query_estimate`` event.
+When the scan finishes a ``query_exact`` event replaces it. If the scan
+wins the race, no estimate is sent and the bootstrap stops at its next
+resample.
+
+Which queries qualify
+---------------------
+:func:`analyse_sql` walks DuckDB's parse tree
+(:func:`services.query.sql_normalizer.parse_sql`) and classifies every
+select item:
+
+- **key** — no aggregate (group-by columns, ``date_trunc`` buckets…)
+- **additive** — ``SUM`` / ``COUNT`` and linear combinations of them;
+  scaled by ``population_rows / sample_rows`` (the sample is
+  self-weighting — proportional allocation per stratum)
+- **ratio** — ``AVG``, ``MEDIAN``, quantiles, stddev and quotients of
+  additive terms; scale-invariant, used as-is
+
+Anything else — ``MIN`` / ``MAX``, ``COUNT(DISTINCT)``, window
+functions, subqueries, joins, CTEs, ``HAVING``, ``DISTINCT``, ``*`` — has
+no honest sample estimate and the query runs exact-only.
+
+Error bounds are percentile bootstrap intervals
+(``PROGRESSIVE_BOOTSTRAP_RESAMPLES`` resamples of the sample, matched to
+the point estimate by their key columns) at ``PROGRESSIVE_CONFIDENCE``.
+
+Usage
+-----
+    from services.query.progressive import progressive_engine
+
+    if progressive_engine.applies(sql, len(df), user_id):
+        result, progress_id = await progressive_engine.run(
+            sql, exact_fn, dataset_id=dataset_id, user_id=user_id, df=df
+        )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypeVar
+
+import numpy as np
+import polars as pl
+
+from core.config import settings
+from services.observability import metrics
+from services.query.approximate_engine import approximate_rewriter
+from services.query.duckdb_helpers import create_duckdb_connection, fetch_polars, register_frame
+from services.query.sql_normalizer import parse_sql
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rows of the estimate pushed to the client (matches execute_query's preview)
+_MAX_ESTIMATE_ROWS = 100
+
+_ADDITIVE_AGGREGATES = frozenset({"sum", "count", "count_star", "count_if", "countif"})
+_RATIO_AGGREGATES = frozenset(
+    {
+        "avg",
+        "mean",
+        "median",
+        "quantile",
+        "quantile_cont",
+        "quantile_disc",
+        "approx_quantile",
+        "stddev",
+        "stddev_samp",
+        "var_samp",
+        "variance",
+    }
+)
+# Aggregates with no unbiased sample estimate — the query runs exact-only.
+_UNESTIMABLE_AGGREGATES = frozenset(
+    {
+        "min",
+        "max",
+        "arg_min",
+        "arg_max",
+        "argmin",
+        "argmax",
+        "min_by",
+        "max_by",
+        "first",
+        "last",
+        "any_value",
+        "mode",
+        "approx_count_distinct",
+        "string_agg",
+        "group_concat",
+        "list",
+        "array_agg",
+        "histogram",
+        "product",
+        "bool_and",
+        "bool_or",
+        "entropy",
+        "kurtosis",
+        "skewness",
+    }
+)
+
+_KEY, _CONST, _ADDITIVE, _RATIO = "key", "const", "additive", "ratio"
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SQL analysis
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(frozen=True)
+class ProgressivePlan:
+    """Select-list positions by kind (see module docstring)."""
+
+    key_positions: tuple[int, ...]
+    additive_positions: tuple[int, ...]
+    ratio_positions: tuple[int, ...]
+
+
+@lru_cache(maxsize=256)
+def analyse_sql(sql: str) -> Optional[ProgressivePlan]:
+    """Return the :class:`ProgressivePlan` for *sql*, or ``None`` if it has
+    no sample estimate (not a single-table aggregate over ``data``)."""
+    statements = parse_sql(sql)
+    if not statements or len(statements) != 1:
+        return None
+    node = statements[0].get("node") or {}
+    if node.get("type") != "SELECT_NODE":
+        return None
+    if node.get("having") or node.get("qualify") or node.get("sample"):
+        return None
+    if (node.get("cte_map") or {}).get("map"):
+        return None
+    if any(m.get("type") == "DISTINCT_MODIFIER" for m in node.get("modifiers") or []):
+        return None
+    if (node.get("from_table") or {}).get("type") != "BASE_TABLE":
+        return None
+    select_list = node.get("select_list") or []
+    if _contains_class(node, {"SUBQUERY", "WINDOW"}):
+        return None
+    if any(item.get("class") == "STAR" for item in select_list):
+        return None
+
+    keys: list[int] = []
+    additive: list[int] = []
+    ratio: list[int] = []
+    for position, item in enumerate(select_list):
+        kind = _kind(item)
+        if kind in (_KEY, _CONST):
+            keys.append(position)
+        elif kind == _ADDITIVE:
+            additive.append(position)
+        elif kind == _RATIO:
+            ratio.append(position)
+        else:
+            return None
+
+    if not additive and not ratio:
+        return None
+    # Grouped rows must be identifiable to match bootstrap replicates
+    if node.get("group_expressions") and not keys:
+        return None
+    return ProgressivePlan(tuple(keys), tuple(additive), tuple(ratio))
+
+
+def _contains_class(node: Any, classes: set[str]) -> bool:
+    if isinstance(node, list):
+        return any(_contains_class(item, classes) for item in node)
+    if not isinstance(node, dict):
+        return False
+    if node.get("class") in classes:
+        return True
+    return any(_contains_class(value, classes) for value in node.values())
+
+
+def _kind(node: dict) -> Optional[str]:
+    """How *node* behaves when the table is a 1-in-k sample (``None``: unknown)."""
+    cls = node.get("class")
+    if cls == "CONSTANT":
+        return _CONST
+    if cls == "COLUMN_REF":
+        return _KEY
+    if cls == "CAST":
+        return _kind(node.get("child") or {})
+    if cls != "FUNCTION":
+        # CASE / comparisons / operators: fine over keys, unknown over aggregates
+        return _KEY if not _has_aggregate(node) else None
+
+    name = str(node.get("function_name", "")).lower()
+    children = node.get("children") or []
+    if name in _ADDITIVE_AGGREGATES or name in _RATIO_AGGREGATES:
+        if node.get("distinct") or any(_has_aggregate(child) for child in children):
+            return None
+        return _ADDITIVE if name in _ADDITIVE_AGGREGATES else _RATIO
+    if name in _UNESTIMABLE_AGGREGATES:
+        return None
+
+    kinds = [_kind(child) for child in children]
+    if any(kind is None for kind in kinds):
+        return None
+    if node.get("is_operator") and len(kinds) == 2:
+        return _combine(name, kinds[0], kinds[1])
+    if name == "round" and kinds and all(kind == _CONST for kind in kinds[1:]):
+        return kinds[0]
+    if all(kind in (_KEY, _CONST) for kind in kinds):
+        return _KEY
+    return None
+
+
+def _combine(operator: str, left: str, right: str) -> Optional[str]:
+    """Kind of ``left <operator> right`` (scaling algebra of the estimate)."""
+    pair = {left, right}
+    if pair <= {_KEY, _CONST}:
+        return _KEY if _KEY in pair else _CONST
+    if _KEY in pair:
+        return None
+    if operator in ("+", "-"):
+        if left == right:
+            return left
+        return _RATIO if pair == {_RATIO, _CONST} else None
+    if operator == "*":
+        if _ADDITIVE in pair and (pair & {_CONST, _RATIO}):
+            return _ADDITIVE
+        return _RATIO if pair <= {_RATIO, _CONST} else None
+    if operator in ("/", "//"):
+        if left == _ADDITIVE:
+            return _RATIO if right == _ADDITIVE else _ADDITIVE
+        if left in (_RATIO, _CONST) and right in (_RATIO, _CONST):
+            return _RATIO
+    return None
+
+
+def _has_aggregate(node: Any) -> bool:
+    if isinstance(node, list):
+        return any(_has_aggregate(item) for item in node)
+    if not isinstance(node, dict):
+        return False
+    if node.get("class") == "FUNCTION":
+        name = str(node.get("function_name", "")).lower()
+        if (
+            name in _ADDITIVE_AGGREGATES
+            or name in _RATIO_AGGREGATES
+            or name in _UNESTIMABLE_AGGREGATES
+        ):
+            return True
+    return any(_has_aggregate(value) for value in node.values())
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Estimate
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class ProgressiveEstimate:
+    """Sample answer with per-cell confidence intervals."""
+
+    frame: pl.DataFrame
+    # column → one (low, high) per row, None where too few replicates matched
+    intervals: dict[str, list[Optional[tuple[float, float]]]] = field(default_factory=dict)
+    sample_rows: int = 0
+    population_rows: int = 0
+    confidence: float = 0.95
+    execution_time_ms: float = 0.0
+
+    def to_message(self, progress_id: str, dataset_id: str) -> dict[str, Any]:
+        """WebSocket ``query_estimate`` event."""
+        rows = self.frame.head(_MAX_ESTIMATE_ROWS)
+        return {
+            "type": "query_estimate",
+            "progress_id": progress_id,
+            "dataset_id": dataset_id,
+            "columns": rows.columns,
+            "data": rows.to_dicts(),
+            "intervals": {
+                col: [list(ci) if ci else None for ci in cis[:_MAX_ESTIMATE_ROWS]]
+                for col, cis in self.intervals.items()
+            },
+            "confidence": self.confidence,
+            "sample_rows": self.sample_rows,
+            "population_rows": self.population_rows,
+            "execution_time_ms": round(self.execution_time_ms, 1),
+        }
+
+
+def estimate(
+    sql: str,
+    sample: pl.DataFrame,
+    population_rows: int,
+    resamples: Optional[int] = None,
+    confidence: Optional[float] = None,
+    cancelled: Optional[threading.Event] = None,
+) -> Optional[ProgressiveEstimate]:
+    """Answer *sql* on *sample*, scaled to *population_rows*, with bootstrap CIs.
+
+    Synchronous (DuckDB + NumPy) — async callers run it in an executor.
+    Returns ``None`` when *sql* has no sample estimate or fails on the sample,
+    or once *cancelled* is set (checked between resamples: cancelling the
+    awaiting task does not stop the executor thread).
+    """
+    sample_sql, _ = approximate_rewriter.rewrite(sql)
+    plan = analyse_sql(sample_sql)
+    if plan is None or sample.is_empty():
+        return None
+    resamples = settings.PROGRESSIVE_BOOTSTRAP_RESAMPLES if resamples is None else resamples
+    confidence = settings.PROGRESSIVE_CONFIDENCE if confidence is None else confidence
+    scale = population_rows / len(sample)
+    start = time.perf_counter()
+
+    conn = create_duckdb_connection()
+    try:
+        point = _run_scaled(conn, sample_sql, sample, plan, scale)
+        if point is None:
+            return None
+        key_cols = [point.columns[i] for i in plan.key_positions]
+        value_cols = [point.columns[i] for i in plan.additive_positions + plan.ratio_positions]
+
+        # Bootstrap: re-run on resamples (with replacement), collect each
+        # row's values by its key tuple
+        replicates: dict[tuple, dict[str, list[float]]] = {}
+        for seed in range(resamples):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            resample = sample.sample(n=len(sample), with_replacement=True, seed=seed)
+            result = _run_scaled(conn, sample_sql, resample, plan, scale)
+            if result is None:
+                continue
+            for row in result.iter_rows(named=True):
+                slot = replicates.setdefault(tuple(row[k] for k in key_cols), {})
+                for col in value_cols:
+                    if row[col] is not None:
+                        slot.setdefault(col, []).append(float(row[col]))
+    finally:
+        conn.close()
+
+    alpha = (1.0 - confidence) / 2.0
+    intervals: dict[str, list[Optional[tuple[float, float]]]] = {col: [] for col in value_cols}
+    for row in point.iter_rows(named=True):
+        slot = replicates.get(tuple(row[k] for k in key_cols), {})
+        for col in value_cols:
+            values = slot.get(col, [])
+            if len(values) < 2:
+                intervals[col].append(None)
+                continue
+            low, high = np.quantile(values, [alpha, 1.0 - alpha])
+            intervals[col].append((float(low), float(high)))
+
+    return ProgressiveEstimate(
+        frame=point,
+        intervals=intervals,
+        sample_rows=len(sample),
+        population_rows=population_rows,
+        confidence=confidence,
+        execution_time_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
+def _run_scaled(
+    conn: Any,
+    sql: str,
+    frame: pl.DataFrame,
+    plan: ProgressivePlan,
+    scale: float,
+) -> Optional[pl.DataFrame]:
+    """Run *sql* with *frame* as ``data`` and scale the additive columns."""
+    try:
+        conn.unregister("data")
+    except Exception:
+        pass
+    try:
+        register_frame(conn, "data", frame)
+        result = fetch_polars(conn.execute(sql))
+    except Exception as exc:
+        logger.debug("[Progressive] Sample query failed: %s", exc)
+        return None
+    additive_cols = [result.columns[i] for i in plan.additive_positions]
+    if additive_cols:
+        result = result.with_columns(
+            (pl.col(col).cast(pl.Float64) * scale).alias(col) for col in additive_cols
+        )
+    return result
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Engine — race the sample against the exact scan
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class ProgressiveEngine:
+    """Runs the exact query in a worker thread and pushes a sample estimate
+    to the user's WebSocket if it is ready first."""
+
+    def applies(self, sql: str, population_rows: int, user_id: Optional[str]) -> bool:
+        """True when an early estimate is possible and someone is listening."""
+        from services.notifications.hub import notification_hub
+
+        if not settings.PROGRESSIVE_QUERY_ENABLED or not user_id:
+            return False
+        if population_rows < max(settings.PROGRESSIVE_MIN_ROWS, settings.PROGRESSIVE_SAMPLE_ROWS + 1):
+            return False
+        if not notification_hub.is_connected(user_id):
+            return False
+        return analyse_sql(approximate_rewriter.rewrite(sql)[0]) is not None
+
+    async def run(
+        self,
+        sql: str,
+        exact: Callable[[], T],
+        *,
+        dataset_id: str,
+        user_id: str,
+        df: pl.DataFrame,
+        file_path: Optional[str] = None,
+    ) -> tuple[T, Optional[str]]:
+        """Run ``exact()`` off the event loop, racing a sample estimate.
+
+        Returns ``(exact_result, progress_id)``. ``progress_id`` is set only
+        when an estimate was pushed; the caller must then follow up with
+        :meth:`push_exact` so the client can replace it.
+        """
+        from services.notifications.hub import notification_hub
+        from utils.json_encoder import ensure_json_serializable
+
+        loop = asyncio.get_running_loop()
+        exact_future = loop.run_in_executor(None, exact)
+        cancelled = threading.Event()
+        estimate_task = asyncio.ensure_future(
+            self._estimate(sql, dataset_id, user_id, df, file_path, cancelled)
+        )
+
+        try:
+            done, _ = await asyncio.wait(
+                {exact_future, estimate_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        except asyncio.CancelledError:
+            cancelled.set()
+            estimate_task.cancel()
+            raise
+        progress_id = None
+        if estimate_task in done and not exact_future.done():
+            result = estimate_task.result()
+            if result is not None:
+                progress_id = uuid.uuid4().hex[:16]
+                message = result.to_message(progress_id, dataset_id)
+                await notification_hub.push_to_user(user_id, ensure_json_serializable(message))
+                metrics.incr("progressive_estimates_total")
+                metrics.observe("progressive_estimate_ms", result.execution_time_ms)
+                logger.info(
+                    "[Progressive] Estimate for %s pushed in %.0f ms (%d/%d rows)",
+                    dataset_id[:8],
+                    result.execution_time_ms,
+                    result.sample_rows,
+                    result.population_rows,
+                )
+        else:
+            # Stops the bootstrap thread too, not just the awaiting task
+            cancelled.set()
+            estimate_task.cancel()
+            metrics.incr("progressive_exact_first_total")
+
+        return await exact_future, progress_id
+
+    async def push_exact(
+        self,
+        user_id: str,
+        progress_id: str,
+        dataset_id: str,
+        result_df: Optional[pl.DataFrame],
+        error: Optional[str] = None,
+    ) -> None:
+        """WebSocket ``query_exact`` event replacing the estimate *progress_id*."""
+        from services.notifications.hub import notification_hub
+        from utils.json_encoder import ensure_json_serializable
+
+        rows = result_df.head(_MAX_ESTIMATE_ROWS) if result_df is not None else None
+        message = {
+            "type": "query_exact",
+            "progress_id": progress_id,
+            "dataset_id": dataset_id,
+            "columns": rows.columns if rows is not None else [],
+            "data": rows.to_dicts() if rows is not None else [],
+            "row_count": len(result_df) if result_df is not None else 0,
+            "error": error,
+        }
+        await notification_hub.push_to_user(user_id, ensure_json_serializable(message))
+
+    async def _estimate(
+        self,
+        sql: str,
+        dataset_id: str,
+        user_id: str,
+        df: pl.DataFrame,
+        file_path: Optional[str],
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional[ProgressiveEstimate]:
+        try:
+            if file_path is None:
+                file_path = await self._dataset_file_path(dataset_id, user_id)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._estimate_sync, sql, df, file_path, cancelled
+            )
+        except Exception as exc:
+            logger.debug("[Progressive] Estimate skipped for %s: %s", dataset_id[:8], exc)
+            return None
+
+    def _estimate_sync(
+        self,
+        sql: str,
+        df: pl.DataFrame,
+        file_path: Optional[str],
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional[ProgressiveEstimate]:
+        sample = self._load_sample(df, file_path)
+        if cancelled is not None and cancelled.is_set():
+            return None
+        return estimate(sql, sample, len(df), cancelled=cancelled)
+
+    @staticmethod
+    def _load_sample(df: pl.DataFrame, file_path: Optional[str]) -> pl.DataFrame:
+        """The cached Parquet sample of *file_path*, created from *df* if missing.
+
+        Same per-version cache as ``dataset_loader.load_dataset_sample``,
+        but built from the frame already in memory instead of re-reading
+        the upload.
+        """
+        from services.datasets.sampling import cached_sample, stratified_sample
+
+        rows = settings.PROGRESSIVE_SAMPLE_ROWS
+        if not file_path:
+            return stratified_sample(df, rows)
+        return cached_sample(file_path, rows, lambda: stratified_sample(df, rows))
+
+    @staticmethod
+    async def _dataset_file_path(dataset_id: str, user_id: str) -> Optional[str]:
+        """The cleaned Parquet (same columns as the chat frame), else the upload."""
+        # Lazy import to break circular dependency
+        from services.datasets.enhanced_dataset_service import enhanced_dataset_service
+
+        dataset = await enhanced_dataset_service.get_dataset(dataset_id, user_id) or {}
+        return dataset.get("parquet_path") or dataset.get("file_path")
+
+
+# Singleton
+progressive_engine = ProgressiveEngine()
@@ -1,31 +1,70 @@
 """
-QueryCache — DiskCache-backed result caching for DuckDB queries
-================================================================
-Uses ``diskcache.Cache`` (SQLite-backed) to persist query results
-across restarts without external infrastructure.
+QueryCache — Two-tier result caching for DuckDB queries
+========================================================
+Tier 1 is a bounded in-process LRU (sized in **bytes**, not entries);
+tier 2 is ``diskcache.Cache`` (SQLite-backed), which persists results
+across restarts and is shared by every worker on the host.
 
-Cache entries are keyed by ``qry:<dataset_id>:<sql_hash>:<limit>``.
+Lookups hit memory first, then disk; a disk hit is promoted to memory.
+The memory tier holds pickled results and every hit unpickles a private
+copy, so a caller that mutates its result cannot corrupt the cache.
+
+Cache entries are keyed by ``qry:<dataset_id>:g<generation>:<sql_hash>:<limit>``.
+``sql_hash`` is a fingerprint of the *canonical* SQL
+(:mod:`services.query.sql_normalizer`), so LLM output that differs only
+in whitespace, keyword case, table aliases or predicate order shares one
+entry.
+
+Invalidation
+------------
+Each dataset has a generation counter stored in the disk tier
+(``gen:<dataset_id>``). :func:`invalidate_dataset` bumps it with
+``Cache.incr`` — a single atomic write — so every existing key for the
+dataset becomes unreachable at once, in every worker. Orphaned disk
+entries expire via TTL; orphaned memory entries are dropped eagerly.
+Previously invalidation walked ``cache.iterkeys()`` over the whole
+cache, which got slower as the cache grew.
+
+Each process keeps the generations it has read in memory, so a lookup
+(memory hits included) does not touch SQLite. A local invalidation
+updates the in-memory counter at once; a bump by another worker is
+picked up within ``GENERATION_REFRESH_SECONDS``.
+
+Metrics (``services/observability/metrics.py``):
+``query_cache_memory_hits_total``, ``query_cache_disk_hits_total``,
+``query_cache_misses_total``, ``query_cache_memory_evictions_total``,
+``query_cache_invalidations_total``.
 
 TTL is configurable via ``settings.QUERY_CACHE_TTL`` (default 300 s).
-Set to 0 to disable caching.
+Set to 0 to disable caching. The memory tier budget is
+``settings.QUERY_CACHE_MEMORY_MAX_BYTES`` (0 disables tier 1).
 """
 
 from __future__ import annotations
 
-import hashlib
 import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 from diskcache import Cache as DiskCache
 
 from core.config import settings
+from services.observability import metrics
+from services.query.sql_normalizer import sql_fingerprint
 
 logger = logging.getLogger(__name__)
 
 # Module-level singleton — the DiskCache is thread-safe by design
 _cache: DiskCache | None = None
 
+# How long a generation read from disk is trusted before it is re-read
+# (bounds how late another worker's invalidation is seen here).
+GENERATION_REFRESH_SECONDS = 1.0
+
 
 def _get_cache() -> DiskCache | None:
     """Lazy-initialize the shared DiskCache instance.
@@ -39,18 +78,166 @@ def _get_cache() -> DiskCache | None:
         cache_dir = Path(settings.QUERY_CACHE_DIR)
         cache_dir.mkdir(parents=True, exist_ok=True)
         _cache = DiskCache(str(cache_dir))
+        _generations.clear()
         logger.info(
-            "[QueryCache] Initialised at %s (TTL=%ds)",
+            "[QueryCache] Initialised at %s (TTL=%ds, memory tier=%d bytes)",
             cache_dir,
             settings.QUERY_CACHE_TTL,
+            settings.QUERY_CACHE_MEMORY_MAX_BYTES,
         )
     return _cache
 
 
-def _make_key(dataset_id: str, sql: str, limit: int) -> str:
-    """Deterministic cache key from query parameters."""
-    sql_hash = hashlib.sha256(sql.encode("utf-8")).hexdigest()[:16]
-    return f"qry:{dataset_id}:{sql_hash}:{limit}"
+# ═════════════════════════════════════════════════════════════════════════════
+# Tier 1 — in-process byte-bounded LRU
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class _MemoryLRU:
+    """Byte-bounded LRU of pickled result dicts with per-entry expiry.
+
+    Entries larger than a quarter of the budget are not admitted, so one
+    huge result can't flush the whole tier.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        # key → (pickled result, size_bytes, expires_at_monotonic)
+        self._entries: OrderedDict[str, tuple[bytes, int, float]] = OrderedDict()
+        self._keys_by_dataset: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """A private copy of the entry for *key*, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def put(self, dataset_id: str, key: str, result: dict[str, Any], ttl: int) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        size = len(data)
+        if size > self.max_bytes // 4:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, size, time.monotonic() + ttl)
+            self._keys_by_dataset.setdefault(dataset_id, set()).add(key)
+            self.current_bytes += size
+
+            evicted = 0
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                evicted += 1
+        if evicted:
+            metrics.incr("query_cache_memory_evictions_total", evicted)
+
+    def drop_dataset(self, dataset_id: str) -> int:
+        with self._lock:
+            keys = self._keys_by_dataset.pop(dataset_id, set())
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.current_bytes -= entry[1]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_dataset.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove *key* (caller holds the lock)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.current_bytes -= entry[1]
+        dataset_id = key.split(":", 2)[1]
+        keys = self._keys_by_dataset.get(dataset_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._keys_by_dataset.pop(dataset_id, None)
+
+
+_memory = _MemoryLRU(settings.QUERY_CACHE_MEMORY_MAX_BYTES)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Keys & generations
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class _Generations:
+    """In-process view of the per-dataset generation counters on disk."""
+
+    def __init__(self) -> None:
+        # dataset_id → (generation, read_at_monotonic)
+        self._known: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache: DiskCache, dataset_id: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            known = self._known.get(dataset_id)
+        if known is not None and now - known[1] < GENERATION_REFRESH_SECONDS:
+            return known[0]
+        generation = int(cache.get(f"gen:{dataset_id}", default=0))
+        self.remember(dataset_id, generation, now)
+        return generation
+
+    def remember(self, dataset_id: str, generation: int, now: float | None = None) -> None:
+        with self._lock:
+            known = self._known.get(dataset_id)
+            # Never step back to an older generation read concurrently
+            if known is None or generation >= known[0]:
+                self._known[dataset_id] = (generation, now or time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._known.clear()
+
+
+_generations = _Generations()
+
+
+def _generation(cache: DiskCache, dataset_id: str) -> int:
+    """Current invalidation generation for *dataset_id* (0 if never bumped).
+
+    Served from memory; re-read from disk at most every
+    ``GENERATION_REFRESH_SECONDS``.
+    """
+    return _generations.get(cache, dataset_id)
+
+
+def _make_key(dataset_id: str, sql: str, limit: int, generation: int = 0) -> str:
+    """Deterministic cache key from query parameters.
+
+    Semantically identical SQL (see :mod:`services.query.sql_normalizer`)
+    maps to the same key.
+    """
+    return f"qry:{dataset_id}:g{generation}:{sql_fingerprint(sql)}:{limit}"
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Public API
+# ═════════════════════════════════════════════════════════════════════════════
 
 
 def get(dataset_id: str, sql: str, limit: int) -> dict[str, Any] | None:
@@ -58,24 +245,37 @@ def get(dataset_id: str, sql: str, limit: int) -> dict[str, Any] | None:
 
     The returned dict has the same shape as ``execute_sql_async()`` output:
     ``{success, columns, data, row_count, execution_time_ms, error}``.
+    It is the caller's own copy.
     """
     cache = _get_cache()
     if cache is None:
         return None
-    key = _make_key(dataset_id, sql, limit)
+    key = _make_key(dataset_id, sql, limit, _generation(cache, dataset_id))
+
+    result = _memory.get(key)
+    if result is not None:
+        metrics.incr("query_cache_memory_hits_total")
+        logger.debug("[QueryCache] HIT  (memory) %s", key[:40])
+        return result
+
     result = cache.get(key)
     if result is not None:
-        logger.debug("[QueryCache] HIT  %s", key[:40])
-    return result
+        metrics.incr("query_cache_disk_hits_total")
+        logger.debug("[QueryCache] HIT  (disk) %s", key[:40])
+        _memory.put(dataset_id, key, result, settings.QUERY_CACHE_TTL)
+        return result
+
+    metrics.incr("query_cache_misses_total")
+    return None
 
 
-def set(
+def put(
     dataset_id: str,
     sql: str,
     limit: int,
     result: dict[str, Any],
 ) -> None:
-    """Store a query result in the cache with the configured TTL.
+    """Store a query result in both tiers with the configured TTL.
 
     Only successful results are cached (``result["success"] == True``).
     """
@@ -84,8 +284,9 @@ def set(
     cache = _get_cache()
     if cache is None:
         return
-    key = _make_key(dataset_id, sql, limit)
+    key = _make_key(dataset_id, sql, limit, _generation(cache, dataset_id))
     cache.set(key, result, expire=settings.QUERY_CACHE_TTL)
+    _memory.put(dataset_id, key, result, settings.QUERY_CACHE_TTL)
     logger.debug(
         "[QueryCache] SET  %s (%d rows, %d ms)",
         key[:40],
@@ -95,31 +296,37 @@ def set(
 
 
 def invalidate_dataset(dataset_id: str) -> int:
-    """Remove all cached query results for a specific dataset.
+    """Invalidate all cached query results for a specific dataset.
 
     Called when a dataset is re-processed so stale query results
-    are not served after the data changes.
+    are not served after the data changes. Bumps the dataset's
+    generation counter (O(1), visible to every worker) and drops this
+    process's in-memory entries for the dataset.
 
-    Returns the number of evicted entries.
+    Returns the number of in-memory entries dropped. Disk entries of the
+    old generation are unreachable and expire via TTL.
     """
     cache = _get_cache()
     if cache is None:
         return 0
 
-    prefix = f"qry:{dataset_id}:"
-    keys_to_delete = [key for key in cache.iterkeys() if key.startswith(prefix)]
-
-    for key in keys_to_delete:
-        cache.delete(key)
-
-    count = len(keys_to_delete)
-    if count:
-        logger.info("[QueryCache] Invalidated %d entries for dataset %s", count, dataset_id[:8])
-    return count
+    generation = cache.incr(f"gen:{dataset_id}")
+    _generations.remember(dataset_id, generation)
+    dropped = _memory.drop_dataset(dataset_id)
+    metrics.incr("query_cache_invalidations_total")
+    logger.info(
+        "[QueryCache] Invalidated dataset %s (generation → %d, %d memory entries dropped)",
+        dataset_id[:8],
+        generation,
+        dropped,
+    )
+    return dropped
 
 
 def clear() -> None:
     """Evict all cached query results."""
+    _memory.clear()
+    _generations.clear()
     cache = _get_cache()
     if cache is None:
         return
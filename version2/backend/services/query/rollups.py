@@ -0,0 +1,587 @@
+"""
+Rollups — Pre-aggregated cubes for dashboard, KPI and metric queries
+====================================================================
+Every chart in ``services/charts/hydrate.py`` and every KPI in
+``services/ai/kpi_compute.py`` re-aggregates the full DataFrame with its
+own ``group_by``, so dashboard cost grows with the row count. Most of
+those aggregations are a measure summed, counted, averaged or min/max'ed
+over one low-cardinality dimension or a time bucket — answers that can be
+recombined from a much smaller pre-aggregated table.
+
+Cube layout
+-----------
+After profiling, the pipeline calls :func:`plan_rollup` on the
+intelligence result and :meth:`RollupStore.build` on the final Parquet.
+The planner picks:
+
+- **dimensions** — ``SemanticRole.DIMENSION`` columns with at most
+  ``ROLLUP_MAX_DIMENSION_CARDINALITY`` distinct values (lowest first, up to
+  ``ROLLUP_MAX_DIMENSIONS``)
+- **measures** — numeric columns the aggregation engine allows to be
+  summed or averaged
+- **time** — the primary date column, bucketed to the day
+
+and DuckDB writes ``<ROLLUP_DIR>/<dataset_id>.parquet`` with one row per
+(dimensions × day)::
+
+    <dims…>, <time>, __rows,
+    <m>__sum, <m>__count, <m>__min, <m>__max   (per measure)
+
+plus a ``.json`` sidecar with the spec. A cube that is not at least
+``ROLLUP_MIN_REDUCTION``× smaller than the dataset is discarded.
+
+Routing
+-------
+:class:`RollupRouter` answers an aggregation from the cube only when the
+result is *exactly* what the base data would give: every group column is
+a cube dimension (or a time grain of day or coarser), the measure is in
+the cube, and the aggregation re-aggregates — SUM, COUNT, MIN, MAX, and
+MEAN as ``SUM(sum) / SUM(count)``. MEDIAN, STD, NUNIQUE and percentiles
+don't, and neither does anything filtered on a column the cube dropped;
+those return ``None`` and callers fall back to the base data.
+
+Usage
+-----
+    from services.query.rollups import rollup_router
+
+    by_region = rollup_router.aggregate(dataset_id, ["region"], "revenue", "sum")
+    if by_region is None:
+        by_region = df.group_by("region").agg(pl.sum("revenue").alias("value"))
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import duckdb
+import polars as pl
+
+from core.config import settings
+from services.observability import metrics
+from services.query.admission import QueryPriority, admission_controller, source_bytes_for
+from services.query.duckdb_helpers import create_duckdb_connection, fetch_polars
+
+logger = logging.getLogger(__name__)
+
+ROWS_COLUMN = "__rows"
+
+# Aggregations that recombine exactly from finer groups (aliases → canonical).
+_REAGGREGABLE: dict[str, str] = {
+    "sum": "sum",
+    "count": "count",
+    "min": "min",
+    "max": "max",
+    "mean": "mean",
+    "avg": "mean",
+    "average": "mean",
+}
+
+# Time grains answerable from a day-bucketed cube → Polars truncate interval.
+_GRAINS: dict[str, str] = {
+    "day": "1d",
+    "week": "1w",
+    "month": "1mo",
+    "quarter": "1q",
+    "year": "1y",
+}
+
+_INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "UTINYINT", "USMALLINT", "UINTEGER"}
+_NUMERIC_TYPES = _INTEGER_TYPES | {"UBIGINT", "HUGEINT", "FLOAT", "DOUBLE", "REAL"}
+
+# Loaded cubes kept per worker (each is at most 1/ROLLUP_MIN_REDUCTION of its dataset).
+_MAX_LOADED_CUBES = 32
+
+
+def measure_column(measure: str, part: str) -> str:
+    """Cube column holding *part* (``sum``/``count``/``min``/``max``) of *measure*."""
+    return f"{measure}__{part}"
+
+
+def _is_numeric(duckdb_type: str) -> bool:
+    return duckdb_type in _NUMERIC_TYPES or duckdb_type.startswith("DECIMAL")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Spec & planning
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class RollupSpec:
+    """Which columns a cube groups by and which it pre-aggregates."""
+
+    dimensions: list[str] = field(default_factory=list)
+    measures: list[str] = field(default_factory=list)
+    time_column: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RollupSpec":
+        return cls(
+            dimensions=list(data.get("dimensions") or []),
+            measures=list(data.get("measures") or []),
+            time_column=data.get("time_column"),
+        )
+
+
+def plan_rollup(profiling: Any, intelligence: Any) -> Optional[RollupSpec]:
+    """Choose cube dimensions/measures from the profiling + intelligence results.
+
+    Args:
+        profiling: ``RawProfilingResult`` (cardinalities, numeric stats).
+        intelligence: ``UnifiedIntelligenceResult`` (roles, aggregation rules).
+
+    Returns:
+        A :class:`RollupSpec`, or ``None`` when the dataset has nothing to
+        group by (no low-cardinality dimension and no date column).
+    """
+    from services.intelligence.models import SemanticRole
+
+    profiles = {p.name: p for p in profiling.columns}
+    max_card = settings.ROLLUP_MAX_DIMENSION_CARDINALITY
+
+    dimensions = sorted(
+        (
+            col.name
+            for col in intelligence.columns
+            if col.semantic_role == SemanticRole.DIMENSION
+            and col.name in profiles
+            and 0 < profiles[col.name].cardinality.unique_count <= max_card
+        ),
+        key=lambda name: profiles[name].cardinality.unique_count,
+    )[: settings.ROLLUP_MAX_DIMENSIONS]
+
+    measure_roles = {SemanticRole.MEASURE, SemanticRole.COUNT, SemanticRole.RATE}
+    measures = [
+        col.name
+        for col in intelligence.columns
+        if col.semantic_role in measure_roles
+        and col.name in profiles
+        and profiles[col.name].stats is not None
+        and (col.aggregation_suitability.sum_allowed or col.aggregation_suitability.avg_allowed)
+    ]
+
+    time_column = intelligence.temporal.date_column
+    if time_column not in profiles:
+        time_column = None
+
+    if not dimensions and time_column is None:
+        return None
+    return RollupSpec(dimensions=dimensions, measures=measures, time_column=time_column)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Cube
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class RollupCube:
+    """A loaded cube: its spec, the Parquet path and the in-memory frame."""
+
+    spec: RollupSpec
+    path: Path
+    frame: pl.DataFrame
+    # True when the time bucket equals the raw values (source column is a
+    # DATE), so the time column can be grouped/filtered on directly.
+    time_exact: bool = False
+    source_rows: int = 0
+
+    def has_group(self, column: str) -> bool:
+        """True if grouping by *column* itself gives exact results."""
+        if column in self.spec.dimensions:
+            return True
+        return column == self.spec.time_column and self.time_exact
+
+    def has_measure(self, measure: Optional[str], agg: str) -> bool:
+        agg = _REAGGREGABLE.get((agg or "").lower())
+        if agg is None:
+            return False
+        if measure is None:
+            return agg == "count"
+        return measure in self.spec.measures
+
+    def measure_expr(self, measure: Optional[str], agg: str) -> pl.Expr:
+        """Polars expression recombining *agg(measure)* from cube rows."""
+        agg = _REAGGREGABLE[agg.lower()]
+        if measure is None:
+            return pl.col(ROWS_COLUMN).sum()
+        if agg == "sum":
+            return pl.col(measure_column(measure, "sum")).sum()
+        if agg == "count":
+            return pl.col(measure_column(measure, "count")).sum()
+        if agg == "min":
+            return pl.col(measure_column(measure, "min")).min()
+        if agg == "max":
+            return pl.col(measure_column(measure, "max")).max()
+        count = pl.col(measure_column(measure, "count")).sum()
+        return pl.when(count > 0).then(pl.col(measure_column(measure, "sum")).sum() / count)
+
+    def measure_sql(self, measure: str, agg: str) -> Optional[str]:
+        """SQL expression recombining *agg(measure)*, or ``None`` if not exact."""
+        if not self.has_measure(measure, agg):
+            return None
+        agg = _REAGGREGABLE[agg.lower()]
+        if agg == "mean":
+            return (
+                f"SUM(`{measure_column(measure, 'sum')}`) / "
+                f"NULLIF(SUM(`{measure_column(measure, 'count')}`), 0)"
+            )
+        outer = "SUM" if agg in ("sum", "count") else agg.upper()
+        return f"{outer}(`{measure_column(measure, agg)}`)"
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Store — build, load, invalidate
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class RollupStore:
+    """Build, cache and invalidate per-dataset cube files.
+
+    Parameters
+    ----------
+    rollup_dir:
+        Directory holding ``<dataset_id>.parquet`` + ``<dataset_id>.json``.
+        Falls back to ``settings.ROLLUP_DIR``.
+    """
+
+    def __init__(self, rollup_dir: Optional[str] = None):
+        self._rollup_dir = Path(rollup_dir or settings.ROLLUP_DIR)
+        # dataset_id → (cube, parquet mtime when loaded)
+        self._loaded: OrderedDict[str, tuple[RollupCube, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, dataset_id: str) -> Path:
+        """Return the on-disk location of *dataset_id*'s cube."""
+        safe_id = "".join(ch for ch in str(dataset_id) if ch.isalnum() or ch in "-_")
+        return self._rollup_dir / f"{safe_id}.parquet"
+
+    # ── Build ───────────────────────────────────────────────────────────────
+
+    def build(
+        self,
+        dataset_id: str,
+        source_path: str,
+        spec: Optional[RollupSpec],
+    ) -> Optional[Path]:
+        """Aggregate *source_path* into the dataset's cube.
+
+        Synchronous and IO heavy — async callers should run it via
+        ``run_in_executor``. Columns of *spec* missing from the source (or
+        non-numeric measures) are dropped. Returns the cube path, or
+        ``None`` when rollups are disabled, there is nothing to group by,
+        the cube would not be small enough, or the build failed.
+        """
+        if not settings.ROLLUP_ENABLED or spec is None:
+            return None
+        if Path(source_path).suffix.lower() not in (".parquet", ".pq"):
+            logger.debug("[Rollup] Source is not Parquet — skipping %s", dataset_id[:8])
+            return None
+
+        target = self.path_for(dataset_id)
+        tmp_target = target.with_suffix(".parquet.tmp")
+        meta_path = target.with_suffix(".json")
+        start = time.perf_counter()
+
+        try:
+            self._rollup_dir.mkdir(parents=True, exist_ok=True)
+            tmp_target.unlink(missing_ok=True)
+            safe_source = source_path.replace("'", "''")
+            safe_tmp = str(tmp_target).replace("'", "''")
+
+            with create_duckdb_connection() as conn:
+                conn.execute(f"CREATE VIEW src AS SELECT * FROM read_parquet('{safe_source}')")
+                types = {
+                    row[0]: str(row[1]).upper()
+                    for row in conn.execute("DESCRIBE src").fetchall()
+                }
+                spec, select, time_exact = self._select_list(spec, types)
+                if not spec.dimensions and spec.time_column is None:
+                    return None
+
+                source_rows = conn.execute("SELECT COUNT(*) FROM src").fetchone()[0]
+                cube_sql = f"SELECT {', '.join(select)} FROM src GROUP BY ALL"
+                with admission_controller.admitted(
+                    conn,
+                    cube_sql,
+                    source_bytes=source_bytes_for(source_path),
+                    priority=QueryPriority.BACKGROUND,
+                    dataset_id=dataset_id,
+                ):
+                    conn.execute(
+                        f"COPY ({cube_sql}) TO '{safe_tmp}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+                    )
+                cube_rows = conn.execute(
+                    f"SELECT COUNT(*) FROM read_parquet('{safe_tmp}')"
+                ).fetchone()[0]
+
+            if cube_rows * settings.ROLLUP_MIN_REDUCTION > source_rows:
+                logger.info(
+                    "[Rollup] Skipped %s — %d groups for %d rows (< %d× reduction)",
+                    dataset_id[:8],
+                    cube_rows,
+                    source_rows,
+                    settings.ROLLUP_MIN_REDUCTION,
+                )
+                tmp_target.unlink(missing_ok=True)
+                self.invalidate(dataset_id)
+                return None
+
+            meta = {
+                "spec": spec.to_dict(),
+                "time_exact": time_exact,
+                "source_path": source_path,
+                "source_rows": source_rows,
+                "cube_rows": cube_rows,
+                "built_at": datetime.now(UTC).replace(tzinfo=None).isoformat(),
+            }
+            tmp_meta = meta_path.with_suffix(".json.tmp")
+            tmp_meta.write_text(json.dumps(meta))
+            os.replace(tmp_meta, meta_path)
+            os.replace(tmp_target, target)
+        except Exception as exc:
+            logger.warning("[Rollup] Build failed for %s: %s", dataset_id[:8], exc)
+            tmp_target.unlink(missing_ok=True)
+            return None
+
+        logger.info(
+            "[Rollup] Built %s: %d dims, %d measures, %d groups from %d rows in %.0f ms",
+            target.name,
+            len(spec.dimensions),
+            len(spec.measures),
+            cube_rows,
+            source_rows,
+            (time.perf_counter() - start) * 1000,
+        )
+        return target
+
+    def rebuild(self, dataset_id: str, source_path: str) -> Optional[Path]:
+        """Rebuild the cube from the data at *source_path* with its previous spec.
+
+        Used after cleaning mutations, where the intelligence result is not
+        recomputed. Without a previous cube there is nothing to rebuild.
+        """
+        meta = self._read_meta(dataset_id)
+        self.invalidate(dataset_id)
+        if meta is None:
+            return None
+        return self.build(dataset_id, source_path, RollupSpec.from_dict(meta.get("spec", {})))
+
+    @staticmethod
+    def _select_list(
+        spec: RollupSpec, types: dict[str, str]
+    ) -> tuple[RollupSpec, list[str], bool]:
+        """Restrict *spec* to the source schema and build the cube SELECT list."""
+        spec = RollupSpec(
+            dimensions=[d for d in spec.dimensions if d in types],
+            measures=[m for m in spec.measures if _is_numeric(types.get(m, ""))],
+            time_column=spec.time_column if spec.time_column in types else None,
+        )
+        select = [_quote(d) for d in spec.dimensions]
+
+        time_exact = False
+        if spec.time_column:
+            time_type = types[spec.time_column]
+            column = _quote(spec.time_column)
+            if time_type == "DATE":
+                select.append(column)
+                time_exact = True
+            elif time_type.startswith("TIMESTAMP"):
+                select.append(f"date_trunc('day', {column}) AS {column}")
+            else:
+                spec.time_column = None
+
+        select.append(f"COUNT(*) AS {_quote(ROWS_COLUMN)}")
+        for measure in spec.measures:
+            column = _quote(measure)
+            out_type = "BIGINT" if types[measure] in _INTEGER_TYPES else "DOUBLE"
+            select += [
+                f"CAST(SUM({column}) AS {out_type}) AS {_quote(measure_column(measure, 'sum'))}",
+                f"COUNT({column}) AS {_quote(measure_column(measure, 'count'))}",
+                f"MIN({column}) AS {_quote(measure_column(measure, 'min'))}",
+                f"MAX({column}) AS {_quote(measure_column(measure, 'max'))}",
+            ]
+        return spec, select, time_exact
+
+    # ── Read path ───────────────────────────────────────────────────────────
+
+    def get(self, dataset_id: Optional[str]) -> Optional[RollupCube]:
+        """Return the loaded cube for *dataset_id*, or ``None`` if there is none.
+
+        Cubes are cached per worker and reloaded when the file's mtime
+        changes (a rebuild by another worker).
+        """
+        if not settings.ROLLUP_ENABLED or not dataset_id:
+            return None
+        path = self.path_for(dataset_id)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            with self._lock:
+                self._loaded.pop(dataset_id, None)
+            return None
+
+        with self._lock:
+            loaded = self._loaded.get(dataset_id)
+            if loaded is not None and loaded[1] == mtime:
+                self._loaded.move_to_end(dataset_id)
+                return loaded[0]
+
+        meta = self._read_meta(dataset_id)
+        if meta is None:
+            return None
+        try:
+            frame = pl.read_parquet(path)
+        except Exception as exc:
+            logger.warning("[Rollup] Could not load %s: %s", dataset_id[:8], exc)
+            return None
+
+        cube = RollupCube(
+            spec=RollupSpec.from_dict(meta.get("spec", {})),
+            path=path,
+            frame=frame,
+            time_exact=bool(meta.get("time_exact")),
+            source_rows=int(meta.get("source_rows", 0)),
+        )
+        with self._lock:
+            self._loaded[dataset_id] = (cube, mtime)
+            while len(self._loaded) > _MAX_LOADED_CUBES:
+                self._loaded.popitem(last=False)
+        return cube
+
+    def _read_meta(self, dataset_id: str) -> Optional[dict[str, Any]]:
+        try:
+            return json.loads(self.path_for(dataset_id).with_suffix(".json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    # ── Invalidation ────────────────────────────────────────────────────────
+
+    def invalidate(self, dataset_id: str) -> bool:
+        """Delete the dataset's cube. Returns True if a file was removed."""
+        with self._lock:
+            self._loaded.pop(dataset_id, None)
+        target = self.path_for(dataset_id)
+        existed = target.exists()
+        try:
+            target.unlink(missing_ok=True)
+            target.with_suffix(".json").unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("[Rollup] Could not delete %s: %s", target, exc)
+            return False
+        if existed:
+            logger.info("[Rollup] Invalidated %s", dataset_id[:8])
+        return existed
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Router
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+class RollupRouter:
+    """Answer compatible aggregations from a dataset's cube.
+
+    Every method returns ``None`` when the cube can't give the exact
+    answer; the caller then runs its usual base-data path. Hits and misses
+    are counted as ``rollup_hits_total`` / ``rollup_misses_total``.
+    """
+
+    def __init__(self, store: RollupStore):
+        self._store = store
+
+    def cube(self, dataset_id: Optional[str]) -> Optional[RollupCube]:
+        return self._store.get(dataset_id)
+
+    def aggregate(
+        self,
+        dataset_id: Optional[str],
+        group_by: Sequence[str],
+        measure: Optional[str],
+        agg: str,
+        time_grain: Optional[str] = None,
+    ) -> Optional[pl.DataFrame]:
+        """``agg(measure)`` per ``group_by`` (+ time bucket) as column ``value``.
+
+        ``measure=None`` with ``agg="count"`` counts rows. With a
+        ``time_grain`` (``day`` … ``year``) the cube's time column is
+        truncated to that grain and added to the keys under its own name.
+        Groups in which the measure is entirely null are dropped, matching
+        the ``drop_nulls`` the chart and KPI code applies before grouping.
+        """
+        cube = self.cube(dataset_id)
+        keys = list(group_by)
+        if (
+            cube is None
+            or not all(cube.has_group(col) for col in keys)
+            or not cube.has_measure(measure, agg)
+            or (time_grain is not None and (time_grain not in _GRAINS or not cube.spec.time_column))
+        ):
+            metrics.incr("rollup_misses_total")
+            return None
+
+        frame = cube.frame
+        if time_grain is not None:
+            time_col = cube.spec.time_column
+            frame = frame.with_columns(pl.col(time_col).dt.truncate(_GRAINS[time_grain]))
+            if time_col not in keys:
+                keys.append(time_col)
+
+        aggs = [cube.measure_expr(measure, agg).alias("value")]
+        if measure is not None:
+            aggs.append(pl.col(measure_column(measure, "count")).sum().alias("_non_null"))
+        if keys:
+            result = frame.group_by(keys).agg(aggs)
+        else:
+            result = frame.select(aggs)
+        if measure is not None:
+            result = result.filter(pl.col("_non_null") > 0).drop("_non_null")
+
+        metrics.incr("rollup_hits_total")
+        return result
+
+    def execute_sql(self, dataset_id: Optional[str], sql: str) -> Optional[pl.DataFrame]:
+        """Run *sql* (written against the cube's columns) with the cube as ``data``.
+
+        Used for compiled semantic SQL (see
+        ``MetricSQLCompiler.compile_rollup``). Returns ``None`` on any
+        error so the caller can run the base query.
+        """
+        cube = self.cube(dataset_id)
+        if cube is None:
+            metrics.incr("rollup_misses_total")
+            return None
+        safe_path = str(cube.path).replace("'", "''")
+        # The compiler quotes identifiers with backticks; DuckDB wants `"`
+        sql = sql.replace("`", '"')
+        try:
+            with create_duckdb_connection() as conn:
+                conn.execute(f"CREATE VIEW data AS SELECT * FROM read_parquet('{safe_path}')")
+                result = fetch_polars(conn.execute(sql))
+        except duckdb.Error as exc:
+            logger.debug("[Rollup] Cube query failed for %s: %s", str(dataset_id)[:8], exc)
+            metrics.incr("rollup_misses_total")
+            return None
+        metrics.incr("rollup_hits_total")
+        return result
+
+
+# Module-level singletons
+rollup_store = RollupStore()
+rollup_router = RollupRouter(rollup_store)
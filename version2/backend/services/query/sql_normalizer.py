@@ -0,0 +1,236 @@
+"""
+SQL Normalizer — Canonical fingerprints for query-cache keys
+============================================================
+LLM-generated SQL for the same question rarely comes back byte-identical:
+whitespace, keyword case, table-alias names and the order of ``AND``
+predicates drift between calls. Hashing the raw text (what
+``query_cache._make_key`` used to do) turns every such variant into a
+cache miss.
+
+:func:`sql_fingerprint` hashes a canonical form instead:
+
+1. **Parse** with DuckDB's ``json_serialize_sql`` — the same parser that
+   will execute the query — so keyword case, whitespace, comments and
+   redundant parentheses disappear. Source offsets (``query_location``)
+   are dropped.
+2. **Rename table aliases and CTE names** positionally (``t0``, ``t1``…,
+   ``cte0``…) and rewrite qualified column references to match.
+   ``FROM data d … d.x`` and ``FROM data AS sales … sales.x`` collapse to
+   the same tree. Select-list aliases are *kept* — they name the result
+   columns, so changing them changes the result.
+3. **Sort commutative operands** — children of ``AND`` / ``OR`` and the
+   two sides of ``=`` / ``<>`` — by their canonical serialisation.
+
+If DuckDB can't parse the statement (non-SELECT, syntax DuckDB rejects),
+a lexical fallback collapses whitespace, upper-cases keywords outside
+literals and strips the trailing semicolon. Two strings that normalise
+to the same text are always the same query; the converse is best-effort.
+
+Usage
+-----
+    from services.query.sql_normalizer import sql_fingerprint
+
+    sql_fingerprint("select a from data d where d.x=1 and d.y=2")
+    == sql_fingerprint("SELECT a FROM data AS t WHERE t.y = 2 AND t.x = 1")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# One parse-only connection per process; json_serialize_sql never touches
+# data, so it needs no resource governance — just serialised access.
+_parser_conn: Optional[duckdb.DuckDBPyConnection] = None
+_parser_lock = threading.Lock()
+
+_COMMUTATIVE_LISTS = {"CONJUNCTION_AND", "CONJUNCTION_OR"}
+_COMMUTATIVE_PAIRS = {"COMPARE_EQUAL", "COMPARE_NOTEQUAL"}
+_ALIASED_TABLE_REFS = {"BASE_TABLE", "SUBQUERY", "TABLE_FUNCTION"}
+
+_TOKEN_RE = re.compile(
+    r"""
+      '(?:[^']|'')*'          # string literal
+    | "(?:[^"]|"")*"          # quoted identifier
+    | --[^\n]*                # line comment
+    | /\*.*?\*/               # block comment
+    | [A-Za-z_][A-Za-z0-9_]*  # word
+    | \d+(?:\.\d+)?           # number
+    | \S                      # any other single character
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_KEYWORDS = frozenset(
+    """
+    all and as asc between by case cast desc distinct else end except exists
+    false filter from full group having ilike in inner intersect interval is
+    join left like limit materialized not null nulls offset on or order outer
+    over partition qualify right select then true union using when where
+    window with
+    """.split()
+)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Public API
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Return the canonical form of *sql* (AST JSON, or lexical fallback)."""
+    tree = parse_sql(sql)
+    if tree is None:
+        return _lexical_normalize(sql)
+    _canonicalize(tree)
+    return json.dumps(tree, sort_keys=True, separators=(",", ":"))
+
+
+def sql_fingerprint(sql: str) -> str:
+    """Short stable hash of :func:`normalize_sql` — used in cache keys."""
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()[:16]
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# DuckDB parse
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def parse_sql(sql: str) -> Optional[list]:
+    """Parse *sql* into DuckDB's JSON statement list, or ``None``.
+
+    Each call returns a fresh tree, so callers may rewrite it in place.
+    """
+    global _parser_conn
+    try:
+        with _parser_lock:
+            if _parser_conn is None:
+                _parser_conn = duckdb.connect(":memory:")
+            row = _parser_conn.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()
+    except Exception as e:
+        logger.debug("[SQLNormalizer] DuckDB parse unavailable: %s", e)
+        return None
+
+    payload = json.loads(row[0]) if row and row[0] else {}
+    if payload.get("error") or not payload.get("statements"):
+        return None
+    return payload["statements"]
+
+
+def _canonicalize(tree: list) -> None:
+    """Rewrite the parsed statements in place into canonical form."""
+    renames: dict[str, str] = {}
+    _collect_names(tree, renames, {"cte": 0, "t": 0})
+    _rewrite(tree, renames)
+
+
+def _collect_names(node: Any, renames: dict[str, str], counters: dict[str, int]) -> None:
+    """Assign positional names to CTEs and table aliases, in tree order."""
+    if isinstance(node, list):
+        for item in node:
+            _collect_names(item, renames, counters)
+        return
+    if not isinstance(node, dict):
+        return
+
+    def assign(name: str, prefix: str) -> None:
+        if name and name not in renames:
+            renames[name] = f"{prefix}{counters[prefix]}"
+            counters[prefix] += 1
+
+    cte_map = node.get("cte_map")
+    if isinstance(cte_map, dict):
+        for entry in cte_map.get("map", []):
+            assign(str(entry.get("key", "")).lower(), "cte")
+
+    if _node_type(node) in _ALIASED_TABLE_REFS and "class" not in node:
+        assign((node.get("alias") or node.get("table_name") or "").lower(), "t")
+
+    for key in sorted(node):
+        _collect_names(node[key], renames, counters)
+
+
+def _rewrite(node: Any, renames: dict[str, str]) -> Any:
+    """Apply alias renames, drop source offsets, sort commutative operands."""
+    if isinstance(node, list):
+        for item in node:
+            _rewrite(item, renames)
+        return node
+    if not isinstance(node, dict):
+        return node
+
+    node.pop("query_location", None)
+    for value in node.values():
+        _rewrite(value, renames)
+
+    node_type = _node_type(node)
+    if node_type in _ALIASED_TABLE_REFS and "class" not in node:
+        name = (node.get("alias") or node.get("table_name") or "").lower()
+        if name in renames:
+            node["alias"] = renames[name]
+        table = str(node.get("table_name", "")).lower()
+        if table in renames and renames[table].startswith("cte"):
+            node["table_name"] = renames[table]
+
+    cte_map = node.get("cte_map")
+    if isinstance(cte_map, dict):
+        for entry in cte_map.get("map", []):
+            name = str(entry.get("key", "")).lower()
+            if name in renames:
+                entry["key"] = renames[name]
+
+    if node.get("class") == "COLUMN_REF":
+        parts = node.get("column_names") or []
+        if len(parts) >= 2 and str(parts[0]).lower() in renames:
+            parts[0] = renames[str(parts[0]).lower()]
+    elif node.get("class") == "STAR":
+        relation = str(node.get("relation_name") or "").lower()
+        if relation in renames:
+            node["relation_name"] = renames[relation]
+
+    if node_type in _COMMUTATIVE_LISTS and isinstance(node.get("children"), list):
+        node["children"].sort(key=_sort_key)
+    elif node_type in _COMMUTATIVE_PAIRS and "left" in node and "right" in node:
+        if _sort_key(node["left"]) > _sort_key(node["right"]):
+            node["left"], node["right"] = node["right"], node["left"]
+    return node
+
+
+def _node_type(node: dict) -> Optional[str]:
+    """``node["type"]`` when it is a node kind — casts and constants nest a
+    LogicalType dict under the same key."""
+    node_type = node.get("type")
+    return node_type if isinstance(node_type, str) else None
+
+
+def _sort_key(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Lexical fallback
+# ═════════════════════════════════════════════════════════════════════════════
+
+
+def _lexical_normalize(sql: str) -> str:
+    """Whitespace/keyword-case/comment normalisation without a parser."""
+    tokens = []
+    for token in _TOKEN_RE.findall(sql):
+        if token.startswith("--") or token.startswith("/*"):
+            continue
+        if token.lower() in _KEYWORDS:
+            token = token.upper()
+        tokens.append(token)
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return " ".join(tokens)
@@ -44,7 +44,7 @@ from .query_intent import (
     IntentValidationResult,
     validate_intent,
 )
-from .sql_compiler import MetricSQLCompiler, CompilationError, metric_sql_compiler
+from .sql_compiler import CompiledQuery, MetricSQLCompiler, CompilationError, metric_sql_compiler
 from .intent_extractor import IntentExtractor, intent_extractor
 from .semantic_query_service import SemanticQueryService, SemanticQueryResult, semantic_query_service
 from .validators import (
@@ -85,6 +85,7 @@ __all__ = [
     "IntentValidationResult",
     "validate_intent",
     "MetricSQLCompiler",
+    "CompiledQuery",
     "CompilationError",
     "metric_sql_compiler",
     "IntentExtractor",
@@ -25,7 +25,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass, field, asdict
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +149,41 @@ class FilterIntent:
         else:
             return f"{col} = {self._format_value(self.value)}"
 
+    def to_param_sql(self) -> Tuple[str, List[Any]]:
+        """Convert to a WHERE fragment with ``?`` placeholders plus its values.
+
+        Mirrors :meth:`to_sql` clause for clause, so the fragment depends
+        only on column, operator and value *count* — the filter's shape.
+        """
+        col = f"`{self.column}`"
+        op = self.operator
+
+        if op == FilterOperator.IS_NULL:
+            return f"{col} IS NULL", []
+        if op == FilterOperator.IS_NOT_NULL:
+            return f"{col} IS NOT NULL", []
+        if op in (FilterOperator.IN, FilterOperator.NOT_IN):
+            values = list(self.value) if isinstance(self.value, list) else [self.value]
+            keyword = "IN" if op == FilterOperator.IN else "NOT IN"
+            placeholders = ", ".join("?" for _ in values)
+            return f"{col} {keyword} ({placeholders})", values
+        if op == FilterOperator.BETWEEN:
+            if isinstance(self.value, (list, tuple)) and len(self.value) == 2:
+                return f"{col} BETWEEN ? AND ?", [self.value[0], self.value[1]]
+            return f"{col} = ?", [self.value]
+
+        symbols = {
+            FilterOperator.EQ: "=",
+            FilterOperator.NEQ: "!=",
+            FilterOperator.GT: ">",
+            FilterOperator.GTE: ">=",
+            FilterOperator.LT: "<",
+            FilterOperator.LTE: "<=",
+            FilterOperator.LIKE: "LIKE",
+            FilterOperator.ILIKE: "ILIKE",
+        }
+        return f"{col} {symbols.get(op, '=')} ?", [self.value]
+
     @staticmethod
     def _format_value(val: Any) -> str:
         if val is None:
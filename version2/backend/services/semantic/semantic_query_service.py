@@ -19,6 +19,7 @@ behavior is enforced — or the user is told exactly why it can't be.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -29,7 +30,9 @@ import polars as pl
 from llm.router import llm_router
 from core.config import settings
 from prompts.sql import get_result_interpretation_prompt
+from services.observability import metrics
 from services.query.executor import QueryExecutor, query_executor as legacy_executor
+from services.query.rollups import rollup_router
 from services.semantic.metric_definition_store import (
     MetricDefinition,
     MetricDefinitionStore,
@@ -178,7 +181,7 @@ class SemanticQueryService:
         # Instead, do a single merged LLM call that produces SQL directly.
         # This is the "Generate SQL" feature path (used by the SQL Editor).
         if return_raw and intent is None:
-            result_df, sql, error = await self._execute_direct_sql(query, df)
+            result_df, sql, error = await self._execute_direct_sql(query, df, dataset_id)
             if error:
                 # Handle row-count warnings with a formatted message
                 if error.startswith("row_count_warning:"):
@@ -396,14 +399,35 @@ class SemanticQueryService:
 
             # Compile and execute
             try:
-                sub_sql = self._compiler.compile(
+                compiled = self._compiler.compile_parameterized(
                     intent=sub.intent,
                     metric_definitions=resolved_map,
                     available_columns=list(df.columns),
                 )
-                all_sqls.append(sub_sql)
-
-                sub_df, sub_err = legacy_executor.execute_sql(sub_sql, df)
+                all_sqls.append(compiled.text)
+
+                # Pre-aggregated rollup first — same result, scans groups
+                # instead of rows. Falls back to the base data otherwise.
+                sub_df, sub_err = None, ""
+                cube = rollup_router.cube(dataset_id)
+                if cube is not None:
+                    rollup_sql = self._compiler.compile_rollup(
+                        intent=sub.intent,
+                        metric_definitions=resolved_map,
+                        cube=cube,
+                    )
+                    if rollup_sql:
+                        sub_df = rollup_router.execute_sql(dataset_id, rollup_sql)
+                if sub_df is None:
+                    # Parameterized: drill-downs that only change filter
+                    # values reuse the prepared plan on the catalog cursor
+                    sub_df, sub_err = await asyncio.to_thread(
+                        legacy_executor.execute_sql,
+                        compiled.sql,
+                        df,
+                        dataset_id=dataset_id,
+                        params=compiled.params,
+                    )
                 sub_results.append((sub, sub_df, sub_err))
 
                 # Collect resolved metric info
@@ -553,11 +577,13 @@ class SemanticQueryService:
                 path="fallback_raw",
             )
 
-        # ── Row-count pre-check before execution ──
+        # ── Execute, counting the full result only when it is truncated ──
         threshold = settings.MAX_ROWS_WARNING_THRESHOLD
         if threshold > 0:
-            estimated_rows, est_error = legacy_executor._estimate_row_count(sql, df)
-            if estimated_rows > threshold:
+            result_df, estimated_rows, exec_error = await asyncio.to_thread(
+                legacy_executor.execute_sql_with_count, sql, df, dataset_id=dataset_id
+            )
+            if not exec_error and estimated_rows > threshold:
                 logger.warning(
                     "[SemanticQuery] Row-count warning: %d rows (threshold=%d)",
                     estimated_rows,
@@ -580,8 +606,13 @@ class SemanticQueryService:
                     execution_time_ms=self._elapsed_ms(start_time),
                     path="fallback_raw",
                 )
+        else:
+            result_df, exec_error = await asyncio.to_thread(
+                legacy_executor.execute_sql, sql, df, dataset_id=dataset_id
+            )
+            metrics.incr("query_scans_total", 1)
+            metrics.observe("query_scans_per_query", 1)
 
-        result_df, exec_error = legacy_executor.execute_sql(sql, df)
         if exec_error:
             return SemanticQueryResult(
                 success=False,
@@ -610,6 +641,7 @@ class SemanticQueryService:
         self,
         query: str,
         df: pl.DataFrame,
+        dataset_id: Optional[str] = None,
     ) -> Tuple[Optional[pl.DataFrame], Optional[str], Optional[str]]:
         """1-call NLQ→SQL generation with direct DuckDB execution.
 
@@ -632,19 +664,26 @@ class SemanticQueryService:
         if sql_error:
             return None, sql or None, sql_error
 
-        # ── Row-count pre-check before execution ──
+        # ── Execute, counting the full result only when it is truncated ──
         threshold = settings.MAX_ROWS_WARNING_THRESHOLD
         if threshold > 0:
-            estimated_rows, est_error = legacy_executor._estimate_row_count(sql, df)
-            if estimated_rows > threshold:
+            result_df, estimated_rows, exec_error = await asyncio.to_thread(
+                legacy_executor.execute_sql_with_count, sql, df, dataset_id=dataset_id
+            )
+            if not exec_error and estimated_rows > threshold:
                 logger.warning(
                     "[DirectSQL] Row-count warning: %d rows (threshold=%d)",
                     estimated_rows,
                     threshold,
                 )
                 return None, sql, f"row_count_warning:{estimated_rows}:{threshold}"
+        else:
+            result_df, exec_error = await asyncio.to_thread(
+                legacy_executor.execute_sql, sql, df, dataset_id=dataset_id
+            )
+            metrics.incr("query_scans_total", 1)
+            metrics.observe("query_scans_per_query", 1)
 
-        result_df, exec_error = legacy_executor.execute_sql(sql, df)
         if exec_error:
             return None, sql, exec_error
 
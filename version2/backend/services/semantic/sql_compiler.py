@@ -19,7 +19,8 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 from .metric_definition_store import MetricDefinition
 from .query_intent import (
@@ -33,6 +34,9 @@ from .query_intent import (
     TimeGrain,
 )
 
+if TYPE_CHECKING:
+    from services.query.rollups import RollupCube
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +52,23 @@ class CompilationError(Exception):
         super().__init__(self.message)
 
 
+# ── Compiled output ─────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A compiled statement in both executable and display form.
+
+    ``sql`` carries ``?`` placeholders bound positionally to ``params``;
+    it doubles as the plan-cache key for the intent's shape. ``text`` is
+    the same statement with the values inlined as literals.
+    """
+
+    sql: str
+    params: List[Any] = field(default_factory=list)
+    text: str = ""
+
+
 # ── Compiler ────────────────────────────────────────────────────────────────
 
 
@@ -76,6 +97,10 @@ class MetricSQLCompiler:
     ) -> str:
         """Compile a QueryIntent into deterministic SQL.
 
+        Filter values are inlined as literals — use
+        :meth:`compile_parameterized` for execution, this form for display,
+        validation and interpretation prompts.
+
         Args:
             intent: The structured query intent
             metric_definitions: Resolved metric definitions, keyed by name
@@ -84,6 +109,25 @@ class MetricSQLCompiler:
         Returns:
             A DuckDB-compatible SQL string
 
+        Raises:
+            CompilationError: If metrics can't be resolved or SQL is invalid
+        """
+        return self.compile_parameterized(intent, metric_definitions, available_columns).text
+
+    def compile_parameterized(
+        self,
+        intent: QueryIntent,
+        metric_definitions: Dict[str, MetricDefinition],
+        available_columns: Optional[List[str]] = None,
+    ) -> CompiledQuery:
+        """Compile a QueryIntent into a ``?``-parameterized statement.
+
+        Intent filter values become positional parameters, so two intents
+        that differ only in filter values compile to the same ``sql`` —
+        the executor prepares that template once per catalog cursor.
+        Governed filters, LIMIT and OFFSET stay inline: they are part of
+        the shape, not user-supplied values.
+
         Raises:
             CompilationError: If metrics can't be resolved or SQL is invalid
         """
@@ -115,14 +159,25 @@ class MetricSQLCompiler:
         # If no dimensions but there are metrics, we need a simple SELECT
         if intent.is_metric_query() and not dimension_selects:
             select_clause = ",\n  ".join(select_parts)
-            sql = f"SELECT\n  {select_clause}\nFROM {self._table_name}"
+            head = f"SELECT\n  {select_clause}\nFROM {self._table_name}"
         else:
             all_selects = dimension_selects + select_parts
             select_clause = ",\n  ".join(all_selects)
-            sql = f"SELECT\n  {select_clause}\nFROM {self._table_name}"
-
-        # Step 2: Build WHERE clause (from intent filters)
-        where_parts = [f.to_sql() for f in intent.filters if f.to_sql()]
+            head = f"SELECT\n  {select_clause}\nFROM {self._table_name}"
+
+        # Step 2: Build WHERE clause (from intent filters), once with
+        # literals and once with placeholders
+        where_parts: List[str] = []
+        param_parts: List[str] = []
+        params: List[Any] = []
+        for f in intent.filters:
+            literal_sql = f.to_sql()
+            if not literal_sql:
+                continue
+            fragment, values = f.to_param_sql()
+            where_parts.append(literal_sql)
+            param_parts.append(fragment)
+            params.extend(values)
 
         # Step 3: Add any governed filters from metric definitions
         for metric in intent.metrics:
@@ -131,11 +186,10 @@ class MetricSQLCompiler:
                 for gov_filter in defn.filters:
                     if gov_filter not in where_parts:
                         where_parts.append(gov_filter)
-
-        if where_parts:
-            sql += "\nWHERE " + "\n  AND ".join(where_parts)
+                        param_parts.append(gov_filter)
 
         # Step 4: Build GROUP BY clause
+        tail = ""
         if dimension_selects and intent.is_metric_query():
             group_cols: List[str] = []
             for dim in intent.dimensions:
@@ -148,26 +202,139 @@ class MetricSQLCompiler:
                     group_cols.append(grain_expr)
 
             if group_cols:
-                sql += "\nGROUP BY " + ", ".join(group_cols)
+                tail += "\nGROUP BY " + ", ".join(group_cols)
 
-        # Step 5: Build ORDER BY
+        # Steps 5-6: ORDER BY, LIMIT / OFFSET
+        tail += self._compile_tail(
+            intent, metric_definitions, cols_lower, bool(dimension_selects)
+        )
+
+        def _assemble(parts: List[str]) -> str:
+            sql = head
+            if parts:
+                sql += "\nWHERE " + "\n  AND ".join(parts)
+            sql += tail
+            if intent.distinct:
+                sql = sql.replace("SELECT", "SELECT DISTINCT", 1)
+            return sql
+
+        compiled = CompiledQuery(
+            sql=_assemble(param_parts),
+            params=params,
+            text=_assemble(where_parts),
+        )
+        logger.info(
+            f"[SQLCompiler] Compiled intent → SQL ({len(compiled.sql)} chars, "
+            f"{len(params)} params)"
+        )
+        return compiled
+
+    def compile_rollup(
+        self,
+        intent: QueryIntent,
+        metric_definitions: Dict[str, MetricDefinition],
+        cube: "RollupCube",
+    ) -> Optional[str]:
+        """Compile *intent* against a pre-aggregated rollup cube.
+
+        Produces the same result set as :meth:`compile` would on the base
+        data, reading ``data`` = the cube (see ``services/query/rollups.py``).
+        Returns ``None`` — never raises — whenever that can't be guaranteed:
+        formula metrics, non-re-aggregable aggregations (median, count
+        distinct…), dimensions or filters on columns the cube dropped,
+        governed filters (free-form SQL), or DISTINCT.
+        """
+        if not intent.is_metric_query() or intent.distinct:
+            return None
+
+        dims_lower = {d.lower(): d for d in cube.spec.dimensions}
+        time_col = cube.spec.time_column
+        if time_col:
+            dims_lower.setdefault(time_col.lower(), time_col)
+
+        # Dimensions — grouped exactly as compile() groups them (by the
+        # resolved column), so every group column must be exact in the cube
+        dimension_selects: List[str] = []
+        group_cols: List[str] = []
+        for dim in intent.dimensions:
+            col_name = self._resolve_column(dim.column, dims_lower)
+            if col_name is None or not cube.has_group(col_name):
+                return None
+            alias = f"`{dim.alias or dim.column.replace(' ', '_')}`"
+            if dim.grain and dim.grain != TimeGrain.RAW:
+                expr = self._date_trunc_expr(col_name, dim.grain)
+            else:
+                expr = f"`{col_name}`"
+            dimension_selects.append(f"  {expr} AS {alias}")
+            group_cols.append(f"`{col_name}`")
+
+        # Metrics — plain column metrics whose aggregation recombines
+        select_parts: List[str] = []
+        for metric in intent.metrics:
+            defn = metric_definitions.get(metric.name.lower().strip())
+            if defn is None or defn.filters:
+                return None
+            column = defn.source_column
+            if defn.formula:
+                if not self._is_simple_column_ref(defn.formula):
+                    return None
+                column = defn.formula.strip().strip("`")
+            if not column:
+                return None
+            expr = cube.measure_sql(column, metric.aggregation or defn.aggregation)
+            if expr is None:
+                return None
+            alias = f"`{metric.alias or metric.name.lower().strip().replace(' ', '_')}`"
+            select_parts.append(f"  {expr} AS {alias}")
+
+        # Filters — only on columns the cube keeps at full precision
+        where_parts: List[str] = []
+        for f in intent.filters:
+            if not f.to_sql():
+                continue
+            col_name = self._resolve_column(f.column, dims_lower)
+            if col_name is None or not cube.has_group(col_name):
+                return None
+            where_parts.append(f.to_sql())
+
+        select_clause = ",\n  ".join(dimension_selects + select_parts)
+        sql = f"SELECT\n  {select_clause}\nFROM {self._table_name}"
+        if where_parts:
+            sql += "\nWHERE " + "\n  AND ".join(where_parts)
+        if group_cols:
+            sql += "\nGROUP BY " + ", ".join(group_cols)
+        sql += self._compile_tail(intent, metric_definitions, dims_lower, bool(dimension_selects))
+
+        logger.info(f"[SQLCompiler] Compiled intent → rollup SQL ({len(sql)} chars)")
+        return sql
+
+    # ── Private compilation methods ─────────────────────────────────────────
+
+    def _compile_tail(
+        self,
+        intent: QueryIntent,
+        definitions: Dict[str, MetricDefinition],
+        cols_lower: Dict[str, str],
+        has_dimensions: bool,
+    ) -> str:
+        """Compile the ORDER BY and LIMIT / OFFSET clauses."""
+        sql = ""
         order_parts: List[str] = []
         for o in intent.order:
-            order_sql = self._compile_order(o, metric_definitions, cols_lower)
+            order_sql = self._compile_order(o, definitions, cols_lower)
             if order_sql:
                 order_parts.append(order_sql)
 
         if order_parts:
             sql += "\nORDER BY " + ", ".join(order_parts)
-        elif dimension_selects and intent.is_metric_query():
+        elif has_dimensions and intent.is_metric_query():
             # Default: order by first metric descending
             for metric in intent.metrics:
-                defn = metric_definitions.get(metric.name.lower().strip())
+                defn = definitions.get(metric.name.lower().strip())
                 if defn and defn.source_column:
                     sql += f"\nORDER BY `{defn.source_column}` DESC"
                     break
 
-        # Step 6: Build LIMIT / OFFSET
         if intent.limit is not None:
             sql += f"\nLIMIT {intent.limit}"
         elif intent.is_metric_query():
@@ -175,15 +342,8 @@ class MetricSQLCompiler:
 
         if intent.offset:
             sql += f"\nOFFSET {intent.offset}"
-
-        if intent.distinct:
-            sql = sql.replace("SELECT", "SELECT DISTINCT", 1)
-
-        logger.info(f"[SQLCompiler] Compiled intent → SQL ({len(sql)} chars)")
         return sql
 
-    # ── Private compilation methods ─────────────────────────────────────────
-
     def _compile_metric(
         self,
         metric: MetricIntent,
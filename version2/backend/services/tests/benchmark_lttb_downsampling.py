@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Line-Series Downsampling — Pure-Python LTTB vs NumPy LTTB vs M4
+==========================================================================
+Downsamples one aggregated (x, y) line series to the line chart's point
+budget three ways and reports points/second:
+
+  - python LTTB — the original per-point implementation
+                  (``test_lttb_downsampling._reference_lttb``) over
+                  ``to_list()`` columns, as the hydrators used to call it
+  - numpy LTTB  — ``hydrate._downsample_df(..., "lttb")``, straight from the
+                  Polars column buffers
+  - numpy M4    — ``hydrate._downsample_df(..., "m4")``, first/last/min/max
+                  per x bucket
+
+Each series is a random walk over a Datetime x column (the shape of a large
+daily/hourly time-series line chart).
+
+Usage:
+    cd version2/backend
+    python services/tests/benchmark_lttb_downsampling.py
+    python services/tests/benchmark_lttb_downsampling.py --points 100000 1000000 --budget 1000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from services.charts.hydrate import _downsample_df  # noqa: E402
+from test_lttb_downsampling import _reference_lttb  # noqa: E402
+
+
+def _series(n: int, seed: int = 42) -> pl.DataFrame:
+    start = datetime(2000, 1, 1)
+    return pl.DataFrame(
+        {
+            "x": pl.datetime_range(start, start + timedelta(hours=n - 1), "1h", eager=True),
+            "y": np.cumsum(np.random.default_rng(seed).normal(size=n)),
+        }
+    )
+
+
+def _python_lttb(df: pl.DataFrame, budget: int) -> int:
+    sx, _ = _reference_lttb(df["x"].to_list(), df["y"].to_list(), budget)
+    return len(sx)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--points", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--budget", type=int, default=1000, help="line chart point budget")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"\n{'points':>10} {'method':<12} {'ms':>9} {'points/s':>14} {'kept':>6} {'speedup':>8}")
+    for n in args.points:
+        df = _series(n)
+        runs = [
+            ("python LTTB", lambda df=df: _python_lttb(df, args.budget)),
+            ("numpy LTTB", lambda df=df: len(_downsample_df(df, args.budget, "lttb")[0])),
+            ("numpy M4", lambda df=df: len(_downsample_df(df, args.budget, "m4")[0])),
+        ]
+        baseline = None
+        for label, fn in runs:
+            kept = fn()
+            seconds = _best_of(fn, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{n:>10,} {label:<12} {seconds * 1000:>9.1f} {n / seconds:>14,.0f} "
+                f"{kept:>6} {baseline / seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
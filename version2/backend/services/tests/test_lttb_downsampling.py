@@ -5,6 +5,7 @@ in services/charts/hydrate.py (Phase 1 — honest truncation).
 import math
 import sys
 
+import numpy as np
 import polars as pl
 import pytest
 
@@ -15,10 +16,54 @@ import pytest
 sys.modules.pop("services.charts.hydrate", None)
 
 from services.charts.hydrate import (  # noqa: E402
+    _downsample_df,
     _lttb_downsample,
     _lttb_downsample_df,
     aggregate_sampling_metadata,
 )
+from services.charts.downsampling import downsample_indices, m4_indices  # noqa: E402
+
+
+def _reference_lttb(x, y, threshold):
+    """The original pure-Python LTTB, kept as the accuracy reference for
+    the vectorised implementation."""
+    n = len(x)
+    if threshold >= n or threshold < 3 or n < 3:
+        return x, y
+    x_num = []
+    for k, xv in enumerate(x):
+        try:
+            x_num.append(float(xv))
+        except (TypeError, ValueError):
+            x_num.append(float(k))
+    sampled_x, sampled_y = [x[0]], [y[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start < next_end:
+            count = next_end - next_start
+            avg_x = sum(x_num[next_start:next_end]) / count
+            avg_y = sum(float(v) for v in y[next_start:next_end]) / count
+        else:
+            avg_x, avg_y = x_num[a], float(y[a])
+        range_start = int(i * every) + 1
+        range_end = min(int((i + 1) * every) + 1, n)
+        max_area, chosen = -1.0, a
+        for k in range(range_start, range_end):
+            area = abs(
+                (x_num[a] - avg_x) * (float(y[k]) - float(y[a]))
+                - (x_num[a] - x_num[k]) * (avg_y - float(y[a]))
+            )
+            if area > max_area:
+                max_area, chosen = area, k
+        sampled_x.append(x[chosen])
+        sampled_y.append(y[chosen])
+        a = chosen
+    sampled_x.append(x[n - 1])
+    sampled_y.append(y[n - 1])
+    return sampled_x, sampled_y
 
 
 # ── _lttb_downsample ──────────────────────────────────────────────────────────
@@ -133,6 +178,73 @@ class TestLttbDownsampleDf:
         assert out["x"].dtype == pl.Datetime
 
 
+class TestVectorizedMatchesReference:
+    @pytest.mark.parametrize(
+        "n,threshold", [(10, 5), (1_000, 100), (10_007, 333), (50_000, 1_000), (2_000, 1_999)]
+    )
+    def test_same_points_as_reference(self, n, threshold):
+        rng = np.random.default_rng(n)
+        x = list(range(n))
+        y = np.cumsum(rng.normal(size=n)).tolist()
+        assert _lttb_downsample(x, y, threshold) == _reference_lttb(x, y, threshold)
+
+    def test_series_path_matches_reference(self):
+        """The DataFrame path reads the column buffers directly — same picks."""
+        from datetime import datetime, timedelta
+
+        n = 20_000
+        y = np.cumsum(np.random.default_rng(7).normal(size=n)).tolist()
+        for x in (
+            [i * 0.5 for i in range(n)],
+            [datetime(2020, 1, 1) + timedelta(hours=i) for i in range(n)],
+            [f"label-{i:05d}" for i in range(n)],
+        ):
+            out, _ = _lttb_downsample_df(pl.DataFrame({"x": x, "y": y}), 500)
+            ref_x, ref_y = _reference_lttb(x, y, 500)
+            assert out["x"].to_list() == ref_x
+            assert out["y"].to_list() == ref_y
+
+    def test_null_y_does_not_break_selection(self):
+        y = pl.Series("y", [None if i % 50 == 0 else math.sin(i / 30) for i in range(5_000)])
+        picked = downsample_indices(pl.Series("x", range(5_000)), y, 200)
+        assert len(picked) == 200 and picked[0] == 0 and picked[-1] == 4_999
+
+
+class TestM4Downsample:
+    def test_keeps_every_bucket_envelope(self):
+        n, budget = 100_000, 400
+        rng = np.random.default_rng(3)
+        x = np.arange(n, dtype=np.float64)
+        y = np.cumsum(rng.normal(size=n))
+        picked = m4_indices(x, y, budget)
+
+        assert len(picked) <= budget
+        assert picked[0] == 0 and picked[-1] == n - 1
+        assert np.all(np.diff(picked) > 0)
+        # Every x bucket's min and max survive, so the drawn envelope is exact
+        buckets = np.minimum((x * (budget // 4) / (n - 1)).astype(int), budget // 4 - 1)
+        kept = set(picked.tolist())
+        for b in range(budget // 4):
+            members = np.flatnonzero(buckets == b)
+            assert members[np.argmin(y[members])] in kept
+            assert members[np.argmax(y[members])] in kept
+
+    def test_buckets_by_position_when_x_not_ascending(self):
+        x = np.array([5.0, 1.0, 3.0] * 1_000)
+        y = np.sin(np.arange(3_000) / 10.0)
+        picked = m4_indices(x, y, 100)
+        assert len(picked) <= 100
+        assert y[picked].max() == y.max() and y[picked].min() == y.min()
+
+    def test_downsample_df_reports_method(self):
+        n = 5_000
+        df = pl.DataFrame({"x": list(range(n)), "y": [math.sin(i / 50.0) for i in range(n)]})
+        out, original, method = _downsample_df(df, 400, "m4")
+        assert (original, method) == (n, "m4")
+        assert len(out) <= 400 and out["y"].max() == df["y"].max()
+        assert _downsample_df(df, 400, "lttb")[0].equals(_lttb_downsample_df(df, 400)[0])
+
+
 # ── aggregate_sampling_metadata ───────────────────────────────────────────────
 
 
@@ -0,0 +1,224 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import duckdb
+import pytest
+
+MB = 1024 * 1024
+
+
+def _cost(mb):
+    from services.query.admission import QueryCost
+
+    return QueryCost(memory_bytes=mb * MB, cpu_seconds=0.1, source="heuristic")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("2GB", 2_000_000_000), ("512MiB", 512 * MB), ("64 MB", 64_000_000), ("1024", 1024)],
+)
+def test_parse_size(text, expected):
+    from services.query.admission import parse_size
+
+    assert parse_size(text) == expected
+
+
+def test_plan_memory_counts_blocking_operators():
+    from services.query.admission import plan_memory
+
+    scan = {"name": "SEQ_SCAN", "children": [], "extra_info": {"Estimated Cardinality": "1000"}}
+    group = {
+        "name": "HASH_GROUP_BY",
+        "children": [scan],
+        "extra_info": {"Estimated Cardinality": "10"},
+    }
+    order = {"name": "ORDER_BY", "children": [group], "extra_info": {}}
+    # 100 bytes per row: scan buffers + 10 groups × 2 (hash) + 10 sorted rows
+    assert plan_memory([order], 100_000) == 100_000 + 2_000 + 1_000
+    assert plan_memory([scan], 100_000) == 100_000
+
+
+def test_explain_estimate_grows_with_blocking_work(monkeypatch):
+    from core.config import settings
+    from services.query.admission import CostModel
+
+    monkeypatch.setattr(settings, "QUERY_MIN_GRANT", "1B")
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE data AS SELECT range AS i, range % 1000 AS k FROM range(100000)")
+    model = CostModel()
+
+    scan = model.estimate("SELECT i FROM data WHERE k = 3", source_bytes=1_600_000, conn=conn)
+    heavy = model.estimate("SELECT i FROM data ORDER BY i", source_bytes=1_600_000, conn=conn)
+    assert scan.source == heavy.source == "explain"
+    assert heavy.memory_bytes > scan.memory_bytes
+
+
+def test_out_of_memory_history_raises_estimate():
+    from services.query.admission import CostModel
+
+    model = CostModel()
+    sql = "SELECT k, COUNT(*) FROM data GROUP BY k"
+    before = model.estimate(sql, source_bytes=100 * MB)
+    model.record(sql, "ds1", elapsed=2.0, granted_bytes=before.memory_bytes, out_of_memory=True)
+
+    after = model.estimate(sql, source_bytes=100 * MB, dataset_id="ds1")
+    assert after.source == "history"
+    assert after.memory_bytes == before.memory_bytes * 2
+    assert after.cpu_seconds == 2.0
+
+
+def test_query_waits_for_memory_budget():
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB)
+    admitted = threading.Event()
+
+    def second():
+        with controller.admit_sync(_cost(60), QueryPriority.INTERACTIVE):
+            admitted.set()
+
+    with controller.admit_sync(_cost(60), QueryPriority.INTERACTIVE):
+        worker = threading.Thread(target=second)
+        worker.start()
+        assert not admitted.wait(0.2)
+    worker.join(2)
+    assert admitted.is_set()
+    assert controller.in_use == 0
+
+
+def test_interactive_overtakes_queued_background():
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB, background_fraction=1.0)
+    order = []
+
+    def run(name, priority):
+        with controller.admit_sync(_cost(80), priority):
+            order.append(name)
+
+    with controller.admit_sync(_cost(80), QueryPriority.INTERACTIVE):
+        background = threading.Thread(target=run, args=("export", QueryPriority.BACKGROUND))
+        background.start()
+        time.sleep(0.1)
+        chat = threading.Thread(target=run, args=("chat", QueryPriority.INTERACTIVE))
+        chat.start()
+        time.sleep(0.1)
+    background.join(2)
+    chat.join(2)
+    assert order == ["chat", "export"]
+
+
+def test_background_is_capped_but_interactive_is_not():
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB, background_fraction=0.5)
+    with controller.admit_sync(_cost(40), QueryPriority.BACKGROUND):
+        with pytest.raises(TimeoutError):
+            with controller.admit_sync(_cost(40), QueryPriority.BACKGROUND, timeout=0.1):
+                pass
+        with controller.admit_sync(_cost(50), QueryPriority.INTERACTIVE, timeout=0.1):
+            assert controller.in_use == 90 * MB
+    assert controller.in_use == 0
+
+
+def test_oversized_query_is_clamped_to_budget():
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB)
+    with controller.admit_sync(_cost(500), QueryPriority.INTERACTIVE, timeout=0.1) as grant:
+        assert grant.memory_bytes == 100 * MB
+        assert grant.memory_limit == "100MB"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_async_waiter_is_withdrawn():
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB)
+
+    async def wait_for_slot():
+        async with controller.admit(_cost(80), QueryPriority.INTERACTIVE):
+            pass
+
+    async with controller.admit(_cost(80), QueryPriority.INTERACTIVE):
+        task = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert controller.in_use == 0
+    async with controller.admit(_cost(80), QueryPriority.INTERACTIVE):
+        assert controller.in_use == 80 * MB
+
+
+
+@pytest.mark.asyncio
+async def test_loop_side_caller_is_not_blocked_by_an_async_holder(monkeypatch):
+    import importlib
+
+    import polars as pl
+
+    from services.query import admission
+    from services.query.admission import AdmissionController, QueryPriority
+
+    semantic = importlib.import_module("services.semantic.semantic_query_service")
+
+    controller = AdmissionController(budget_bytes=100 * MB)
+    monkeypatch.setattr("services.query.executor.admission_controller", controller)
+    monkeypatch.setattr(admission.settings, "QUERY_MIN_GRANT", "80MB")
+
+    async def generate_sql_direct(query, df):
+        return "SELECT SUM(k) AS s FROM data", ""
+
+    monkeypatch.setattr(semantic.legacy_executor, "generate_sql_direct", generate_sql_direct)
+
+    # Blocking on the loop would deadlock against an async holder
+    with pytest.raises(RuntimeError):
+        with controller.admit_sync(_cost(80), QueryPriority.INTERACTIVE, timeout=5):
+            pass
+
+    df = pl.DataFrame({"k": list(range(10))})
+    async with controller.admit(_cost(80), QueryPriority.INTERACTIVE):
+        chat = asyncio.create_task(
+            semantic.semantic_query_service._execute_direct_sql("total k", df)
+        )
+        await asyncio.sleep(0.1)
+        assert not chat.done()  # queued in a worker thread; the loop runs on
+    result_df, sql, error = await asyncio.wait_for(chat, timeout=5)
+    assert error is None and result_df["s"][0] == 45
+    assert controller.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_async_grant_is_held_until_the_duckdb_thread_returns(monkeypatch):
+    import polars as pl
+
+    from services.query import async_executor
+    from services.query.admission import AdmissionController, QueryPriority
+
+    controller = AdmissionController(budget_bytes=100 * MB)
+    monkeypatch.setattr(async_executor, "admission_controller", controller)
+    monkeypatch.setattr(async_executor.settings, "QUERY_TIMEOUT", 0.3)
+    finished = threading.Event()
+
+    def slow_duckdb(sql, limit, data_source, grant, dataset_id, running=None):
+        time.sleep(0.6)  # a statement that ignores the interrupt
+        finished.set()
+        return {"success": True}
+
+    monkeypatch.setattr(async_executor, "_execute_in_duckdb", slow_duckdb)
+    monkeypatch.setattr(async_executor, "_estimate_cost", lambda *a: _cost(80))
+
+    result = await async_executor.execute_sql_async(
+        "SELECT 1", pl.DataFrame({"k": [1]}), priority=QueryPriority.INTERACTIVE
+    )
+    assert "timed out" in result["error"]
+    assert not finished.is_set() and controller.in_use == 80 * MB
+    await asyncio.to_thread(finished.wait, 2)
+    await asyncio.sleep(0.05)
+    assert controller.in_use == 0
@@ -0,0 +1,108 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def sales():
+    n = 300
+    return pl.DataFrame(
+        {
+            "region": [["N", "S", "E", "W", None][i % 5] for i in range(n)],
+            "channel": ["web" if i % 3 else "store" for i in range(n)],
+            "revenue": [None if i % 11 == 0 else float(i % 40) for i in range(n)],
+            "units": [i % 7 for i in range(n)],
+        }
+    )
+
+
+def _config(chart_type, columns, aggregation="sum", **extra):
+    return {"chart_type": chart_type, "columns": columns, "aggregation": aggregation, **extra}
+
+
+DASHBOARD = [
+    _config("bar", ["region", "revenue"]),
+    _config("pie", ["region", "revenue"]),  # same x × y × agg as the bar
+    _config("funnel", ["region", "revenue"], "mean"),  # same group-by, second agg
+    _config("waterfall", ["channel", "units"], "count"),
+    _config("grouped_bar", ["channel", "revenue", "units"]),
+    _config("bar", ["region", "revenue"], group_by="channel"),  # not planned
+    _config("scatter", ["revenue", "units"]),  # not planned
+]
+
+
+@pytest.mark.parametrize("agg", ["sum", "mean", "count", "nunique", "median", "max"])
+def test_planned_aggregate_matches_safe_aggregate(sales, agg):
+    from db.schemas_dashboard import AggregationType
+    from services.charts.aggregation_plan import AggregationPlan
+    from services.charts.hydrate import _safe_aggregate
+
+    agg = AggregationType(agg)
+    expected = _safe_aggregate(sales, "region", "revenue", agg)
+
+    plan = AggregationPlan(sales)
+    plan.add("region", "revenue", agg)
+    plan.collect()
+    with plan.active():
+        got = _safe_aggregate(sales, "region", "revenue", agg)
+        # A frame the handler derived from the planned one is never answered
+        assert plan.lookup(sales.head(10), "region", "revenue", agg) is None
+
+    # Sorted by y; ties between groups may come out in either order
+    assert got.sort("x").to_dicts() == expected.sort("x").to_dicts()
+    assert got["y"].to_list() == expected["y"].to_list()
+    assert got.schema == expected.schema
+
+
+def test_plan_deduplicates_shared_group_bys(sales):
+    from services.charts.aggregation_plan import AggregationPlan
+    from services.charts.chart_render_service import ChartRenderService
+    from services.charts.hydrate import plan_chart_aggregations
+
+    service = ChartRenderService()
+    plan = AggregationPlan(sales)
+    for config in DASHBOARD:
+        for key in plan_chart_aggregations(sales, service._parse_config(dict(config))):
+            plan.add(*key)
+
+    # bar + pie share one aggregation; the funnel's mean rides the same group-by
+    assert len(plan) == 5
+    assert sorted(plan._requested) == [
+        ("channel", "revenue"), ("channel", "units"), ("region", "revenue")
+    ]
+    assert plan._requested[("region", "revenue")] == ["sum", "mean"]
+
+
+@pytest.mark.asyncio
+async def test_render_dashboard_matches_one_chart_at_a_time(sales, monkeypatch):
+    import polars
+    from services.charts.chart_render_service import ChartRenderService
+
+    service = ChartRenderService()
+    configs = [dict(c) for c in DASHBOARD] + [{"chart_type": "no_such_chart"}]
+    alone = [await service.render_chart(sales, dict(c)) for c in DASHBOARD]
+
+    batches = []
+    collect_all = polars.collect_all
+    monkeypatch.setattr(
+        polars, "collect_all", lambda queries: batches.append(len(queries)) or collect_all(queries)
+    )
+    together = await service.render_dashboard(sales, configs)
+
+    # 3 group-bys, 3 row counts per x, 1 select of every cardinality — one batch
+    assert batches == [7]
+    assert isinstance(together[-1], Exception)
+    for one, batched in zip(alone, together):
+        assert batched["metadata"]["rows_used"] == one["metadata"]["rows_used"]
+        assert batched["semantic_types"] == one["semantic_types"]
+        assert batched.get("point_intelligence") == one.get("point_intelligence")
+    # The planned charts hydrate to exactly what they would alone
+    for one, batched in zip(alone[:5], together[:5]):
+        assert batched["traces"] == one["traces"]
+
+    charts = await service.render_multiple_charts(sales, configs)
+    assert len(charts) == len(DASHBOARD)
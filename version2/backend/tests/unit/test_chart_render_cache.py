@@ -0,0 +1,120 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import json
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "sales.parquet"
+    pl.DataFrame(
+        {"region": ["N", "S", "E", "W"] * 25, "revenue": [float(i) for i in range(100)]}
+    ).write_parquet(path)
+    return {"_id": "ds1", "parquet_path": str(path)}
+
+
+CONFIG = {"chart_type": "bar", "columns": ["region", "revenue"], "aggregation": "sum"}
+
+
+def test_key_is_canonical_and_versioned(dataset):
+    from services.cache.chart_render_cache import ChartRenderCache
+
+    cache = ChartRenderCache(max_bytes=1 << 20, redis_url="")
+    key = cache.key(CONFIG, "dark", dataset)
+
+    # Key order and identity/owner fields don't change what is drawn
+    reordered = dict(reversed(list(CONFIG.items())), id="c1", user_id="u2", dataset_id="ds1")
+    assert cache.key(reordered, "dark", dataset) == key
+
+    assert cache.key(CONFIG, "light", dataset) != key
+    assert cache.key(CONFIG, "dark", dataset, scope={"filters": [{"field": "region"}]}) != key
+    assert cache.key({**CONFIG, "aggregation": "mean"}, "dark", dataset) != key
+
+    # Rewriting the file (mutation / re-import) moves every key
+    pl.DataFrame({"region": ["N"], "revenue": [1.0]}).write_parquet(dataset["parquet_path"])
+    assert cache.key(CONFIG, "dark", dataset) != key
+
+    assert cache.key(CONFIG, "dark", {"parquet_path": "/nonexistent.parquet"}) is None
+    assert cache.key(CONFIG, "dark", None) is None
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_byte_bounded_lru():
+    from services.cache.chart_render_cache import ChartRenderCache, _encode
+
+    payload = {"traces": [{"x": list(range(20))}]}
+    size = len(_encode(payload))
+    cache = ChartRenderCache(max_bytes=size * 4, redis_url="")
+
+    for key in ("a", "b", "c", "d"):
+        await cache.set(key, payload)
+    assert await cache.get("a") == payload  # "a" is now most recent
+    await cache.set("e", payload)
+
+    assert await cache.get("b") is None
+    assert [await cache.get(k) is not None for k in "acde"] == [True] * 4
+    assert cache.stats()["bytes"] <= size * 4
+
+    # A payload over a quarter of the budget is not admitted
+    await cache.set("big", {"traces": [{"x": list(range(200))}]})
+    assert await cache.get("big") is None
+    assert await cache.get_many(["a", None, "zz"]) == [payload, None, None]
+
+
+@pytest.mark.asyncio
+async def test_hits_are_private_copies_of_the_rendered_payload(dataset):
+    from services.cache.chart_render_cache import ChartRenderCache
+    from services.charts.chart_render_service import ChartRenderService
+
+    cache = ChartRenderCache(max_bytes=1 << 20, redis_url="")
+    df = pl.read_parquet(dataset["parquet_path"])
+    payload = await ChartRenderService().render_chart(df, dict(CONFIG), theme="dark")
+
+    key = cache.key(CONFIG, "dark", dataset)
+    await cache.set(key, payload)
+    hit = await cache.get(key)
+    assert hit == json.loads(json.dumps(payload, default=str))
+
+    hit["traces"].clear()
+    assert (await cache.get(key))["traces"]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_promoted():
+    from services.cache.chart_render_cache import ChartRenderCache
+
+    shared = _FakeRedis()
+    worker_a = ChartRenderCache(max_bytes=1 << 20, redis_url="redis://shared")
+    worker_b = ChartRenderCache(max_bytes=1 << 20, redis_url="redis://shared")
+    worker_a._redis = worker_b._redis = shared
+
+    await worker_a.set("k", {"traces": [1, 2]})
+    assert await worker_b.get("k") == {"traces": [1, 2]}
+    assert worker_b.stats()["entries"] == 1  # promoted into b's memory tier
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_falls_back_to_memory():
+    from services.cache.chart_render_cache import ChartRenderCache
+
+    cache = ChartRenderCache(max_bytes=1 << 20, redis_url="redis://127.0.0.1:1/0")
+    await cache.set("k", {"traces": []})
+    assert await cache.get("k") == {"traces": []}
+    assert await cache.get("missing") is None
+    assert cache._redis_client() is None  # backed off after the failure
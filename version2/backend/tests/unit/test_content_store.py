@@ -0,0 +1,119 @@
+import sys
+import os
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+CSV = b"region,amount\nNorth,1\nSouth,2\n"
+HASH = hashlib.sha256(CSV).hexdigest()
+
+
+def _upload(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(CSV)
+    return str(path)
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    from services.datasets.content_store import ContentStore
+
+    store = ContentStore(str(tmp_path / "store"))
+    first = store.adopt(_upload(tmp_path, "a.csv"), HASH, "csv")
+    second_temp = _upload(tmp_path, "b.csv")
+    second = store.adopt(second_temp, HASH, "csv")
+
+    assert first == second and open(first, "rb").read() == CSV
+    assert not os.path.exists(second_temp)
+    assert store.content_hash_of(first) == HASH
+    assert store.owns(first[:-4] + ".parquet")
+    assert not store.owns(store.private_parquet_path("d1"))
+    assert not store.owns(str(tmp_path / "a.csv"))
+
+
+def test_derived_results_round_trip_and_share_artifacts(tmp_path):
+    from services.datasets.content_store import ContentStore
+
+    store = ContentStore(str(tmp_path / "store"))
+    raw = store.adopt(_upload(tmp_path, "a.csv"), HASH, "csv")
+    parquet = raw[:-4] + ".parquet"
+    open(parquet, "wb").write(b"PAR1")
+    catalog = tmp_path / "catalog" / "d1.duckdb"
+    catalog.parent.mkdir()
+    catalog.write_bytes(b"duck")
+
+    assert store.load_derived(raw) is None
+    store.save_derived(
+        raw,
+        {"source_dataset_id": "d1", "fields": {"row_count": 2, "parquet_path": parquet}},
+        artifacts={"catalog.duckdb": str(catalog), "rollup.parquet": str(tmp_path / "none")},
+    )
+
+    record = store.load_derived(raw)
+    assert record["fields"]["row_count"] == 2 and record["artifacts"] == ["catalog.duckdb"]
+
+    target = tmp_path / "catalog" / "d2.duckdb"
+    assert store.restore_artifact(raw, "catalog.duckdb", target)
+    assert target.read_bytes() == b"duck"
+    assert os.stat(target).st_ino == os.stat(catalog).st_ino  # linked, not copied
+    assert not store.restore_artifact(raw, "rollup.parquet", tmp_path / "r.parquet")
+
+    os.remove(parquet)  # results without their Parquet are not reusable
+    assert store.load_derived(raw) is None
+
+
+@pytest.mark.asyncio
+async def test_last_release_removes_the_files(tmp_path):
+    from services.datasets.content_store import ContentStore
+
+    store = ContentStore(str(tmp_path / "store"))
+    collection = MagicMock()
+    collection.update_one = AsyncMock()
+    collection.find_one_and_delete = AsyncMock(return_value=None)
+
+    with patch.object(ContentStore, "_collection", collection):
+        await store.acquire(HASH, "d1")
+        raw = store.adopt(_upload(tmp_path, "a.csv"), HASH, "csv")
+
+        assert not await store.release(HASH, "d1")  # another dataset still refers to it
+        assert os.path.exists(raw)
+
+        collection.find_one_and_delete.return_value = {"_id": HASH, "refs": []}
+        assert await store.release(HASH, "d2")
+        assert not store.blob_dir(HASH).exists()
+
+    assert collection.update_one.call_args_list[0].kwargs["upsert"] is True
+
+
+@pytest.mark.asyncio
+async def test_pipeline_adopts_stored_results_without_running_stages(tmp_path):
+    pytest.importorskip("s3fs")  # services.pipeline.process imports the S3 client
+    from services.datasets.content_store import ContentStore
+    from services.pipeline import process
+
+    store = ContentStore(str(tmp_path / "store"))
+    raw = store.adopt(_upload(tmp_path, "a.csv"), HASH, "csv")
+    record = {
+        "source_dataset_id": "d1",
+        "pipeline_version": "3.1-separated",
+        "fields": {"row_count": 2, "column_count": 2, "domain": "sales", "metadata": {}},
+        "profile": {"columns": []},
+        "intelligence": None,
+        "artifacts": [],
+    }
+    db = MagicMock()
+
+    with patch.object(process, "content_store", store), patch.object(
+        process.faiss_vector_service, "clone_dataset_vectors", AsyncMock(return_value=True)
+    ) as clone:
+        result = await process._adopt_stored_results(db, "d2", "u1", "w1", raw, record)
+
+    assert result["reused"] and result["rows"] == 2 and result["domain"] == "sales"
+    update = db.uploads.update_one.call_args.args[1]["$set"]
+    assert update["processing_status"] == "completed" and update["derived_from"] == "d1"
+    assert update["workspace_id"] == "w1"
+    db["dataset_profiles"].update_one.assert_called_once()
+    clone.assert_awaited_once_with("d1", "d2", user_id="u1", workspace_id="w1")
@@ -0,0 +1,96 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    from services.query.dataset_catalog import DatasetCatalog
+
+    cat = DatasetCatalog(catalog_dir=str(tmp_path / "catalog"))
+    yield cat
+    cat.close_all()
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    path = tmp_path / "sales.parquet"
+    pl.DataFrame(
+        {"region": ["N", "S", "N", "E"], "revenue": [10.0, 20.0, 30.0, 40.0]}
+    ).write_parquet(path)
+    return str(path)
+
+
+def test_build_creates_native_table(catalog, parquet_file):
+    path = catalog.build("ds1", parquet_file)
+    assert path is not None and path.exists()
+    assert catalog.has("ds1")
+
+    with catalog.cursor("ds1") as cur:
+        assert cur is not None
+        total = cur.execute("SELECT SUM(revenue) FROM data").fetchone()[0]
+    assert total == 100.0
+
+
+def test_cursor_without_catalog_yields_none(catalog):
+    with catalog.cursor("missing") as cur:
+        assert cur is None
+    with catalog.cursor(None) as cur:
+        assert cur is None
+
+
+def test_invalidate_removes_file_and_pool(catalog, parquet_file):
+    catalog.build("ds1", parquet_file)
+    with catalog.cursor("ds1") as cur:
+        cur.execute("SELECT 1").fetchone()
+    assert "ds1" in catalog._pool
+
+    assert catalog.invalidate("ds1") is True
+    assert not catalog.has("ds1")
+    assert "ds1" not in catalog._pool
+    assert catalog.invalidate("ds1") is False
+
+
+def test_rebuild_replaces_pooled_connection(catalog, parquet_file, tmp_path):
+    catalog.build("ds1", parquet_file)
+    with catalog.cursor("ds1") as cur:
+        assert cur.execute("SELECT COUNT(*) FROM data").fetchone()[0] == 4
+
+    bigger = tmp_path / "bigger.parquet"
+    pl.DataFrame({"region": ["W"] * 7, "revenue": [1.0] * 7}).write_parquet(bigger)
+    catalog.build("ds1", str(bigger))
+
+    with catalog.cursor("ds1") as cur:
+        assert cur.execute("SELECT COUNT(*) FROM data").fetchone()[0] == 7
+
+
+def test_unsupported_format_is_skipped(catalog, tmp_path):
+    xlsx = tmp_path / "book.xlsx"
+    xlsx.write_bytes(b"")
+    assert catalog.build("ds1", str(xlsx)) is None
+    assert not catalog.has("ds1")
+
+
+def test_executor_uses_catalog_for_dataset(catalog, parquet_file, monkeypatch):
+    from services.query import executor as executor_module
+
+    monkeypatch.setattr(executor_module, "dataset_catalog", catalog)
+    catalog.build("ds1", parquet_file)
+
+    qe = executor_module.QueryExecutor()
+    # Empty fallback frame: any rows returned must come from the catalog.
+    empty = pl.DataFrame({"region": pl.Series([], dtype=pl.Utf8)})
+    result, error = qe.execute_sql(
+        "SELECT region, SUM(revenue) AS total FROM data GROUP BY region ORDER BY region",
+        empty,
+        dataset_id="ds1",
+    )
+    assert error == ""
+    assert result["region"].to_list() == ["E", "N", "S"]
+
+    count, err = qe._estimate_row_count("SELECT * FROM data", empty, dataset_id="ds1")
+    assert (count, err) == (4, None)
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+def _wide(n=1000, width=40):
+    cols = {f"m{i}": [float(i)] * n for i in range(width)}
+    cols["region"] = ["North", "South"] * (n // 2)
+    cols["year"] = [2023 + (i % 2) for i in range(n)]
+    return pl.DataFrame(cols)
+
+
+def test_handle_reads_metadata_and_pushes_down_columns_and_predicate(tmp_path):
+    from services.datasets.dataset_handle import open_dataset
+
+    path = tmp_path / "d1.parquet"
+    _wide().write_parquet(path)
+    handle = open_dataset("d1", {"parquet_path": str(path), "file_path": "/gone.csv"})
+
+    assert handle.is_parquet and handle.num_rows == 1000 and len(handle.columns) == 42
+
+    lf = handle.scan(["region", "m3"], pl.col("year") == 2024)
+    plan = lf.explain()
+    # Two projected columns + the predicate column are decoded, not 42
+    assert "PROJECT 3/42 COLUMNS" in plan and "SELECTION" in plan
+
+    df = lf.collect()
+    assert df.columns == ["m3", "region"]  # table order
+    assert df.height == 500
+
+
+def test_unknown_columns_are_ignored_and_none_known_means_all(tmp_path):
+    from services.datasets.dataset_handle import open_dataset
+
+    path = tmp_path / "d1.parquet"
+    _wide(10, 3).write_parquet(path)
+    handle = open_dataset("d1", {"parquet_path": str(path)})
+
+    assert handle.collect(["region", "nope"]).columns == ["region"]
+    assert handle.collect(["nope"]).width == 5
+    assert handle.collect(limit=3).height == 3
+
+
+def test_handle_is_pinned_to_the_version_it_opened(tmp_path):
+    from services.datasets.dataset_handle import DatasetVersionChanged, open_dataset
+
+    path = tmp_path / "d1.parquet"
+    _wide(10, 3).write_parquet(path)
+    doc = {"parquet_path": str(path)}
+    handle = open_dataset("d1", doc)
+
+    time.sleep(0.01)
+    _wide(20, 3).write_parquet(path)  # a mutation replaces the file
+    with pytest.raises(DatasetVersionChanged):
+        handle.collect()
+    assert open_dataset("d1", doc).num_rows == 20
+
+
+def test_falls_back_to_raw_upload_and_raises_when_nothing_on_disk(tmp_path):
+    from services.datasets.dataset_handle import open_dataset
+
+    csv = tmp_path / "d1.csv"
+    csv.write_text("region,amount\nNorth,1\nSouth,2\n")
+    handle = open_dataset("d1", {"parquet_path": str(tmp_path / "x.parquet"), "file_path": str(csv)})
+
+    assert handle.file_type == "csv" and handle.num_rows == 2
+    assert handle.collect(["amount"])["amount"].to_list() == [1, 2]
+
+    with pytest.raises(FileNotFoundError):
+        open_dataset("d2", {"file_path": str(tmp_path / "missing.csv")})
+
+
+def test_page_slices_any_offset_and_matches_file_order(tmp_path):
+    from services.datasets.dataset_handle import open_dataset
+
+    path = tmp_path / "d1.parquet"
+    pl.DataFrame({"id": list(range(10_000))}).write_parquet(path, row_group_size=1000)
+    handle = open_dataset("d1", {"parquet_path": str(path)})
+
+    assert handle.page(0, 5)["id"].to_list() == [0, 1, 2, 3, 4]
+    assert handle.page(9_998, 5)["id"].to_list() == [9_998, 9_999]
+    assert handle.page(20_000, 5).height == 0
+
+
+def test_raw_csv_fallback_pages_keep_the_header(tmp_path):
+    import asyncio
+
+    from services.datasets.file_storage_service import file_storage_service
+
+    csv = tmp_path / "raw.csv"
+    csv.write_text("id,name\n" + "".join(f"{i},n{i}\n" for i in range(10)))
+
+    rows, total = asyncio.run(file_storage_service.get_paginated_file_data(str(csv), 3, 4))
+    assert total == 10
+    assert rows == [{"id": 4, "name": "n4"}, {"id": 5, "name": "n5"}, {"id": 6, "name": "n6"}]
@@ -0,0 +1,212 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import asyncio
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import polars as pl
+import pytest
+
+
+def _sqlite_connector(rows, key=True, streaming=True):
+    """A DatabaseConnector over an in-memory SQLite table ``t``."""
+    from services.databases.connectors.base import DatabaseConnector, rows_to_frame
+
+    class SQLiteConnector(DatabaseConnector):
+        def __init__(self):
+            super().__init__({"host": "localhost", "database": "test"})
+            self.db = sqlite3.connect(":memory:")
+            pk = "PRIMARY KEY" if key else ""
+            self.db.execute(f"CREATE TABLE t (id INTEGER {pk}, name TEXT, amount REAL)")
+            self.db.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+            self.queries = []
+            self.active = self.peak = 0
+
+        def _fetch(self, sql, params=()):
+            self.queries.append(sql)
+            cur = self.db.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, r)) for r in cur.fetchall()]
+
+        async def connect(self):
+            return True
+
+        async def disconnect(self):
+            pass
+
+        async def test_connection(self):
+            return {"success": True}
+
+        async def get_tables(self):
+            return ["t"]
+
+        async def get_foreign_keys(self):
+            return []
+
+        async def get_table_schema(self, table_name):
+            return []
+
+        async def extract_incremental(self, table_name, last_value, increment_column):
+            return []
+
+        async def extract_data(self, table_name, columns=None, limit=None, offset=None):
+            return self._fetch(f"SELECT * FROM {table_name} LIMIT ? OFFSET ?", (limit, offset))
+
+        async def get_key_columns(self, table_name):
+            return ["id"] if key else []
+
+        async def extract_keyset(self, table_name, key_columns, after=None, limit=None,
+                                 columns=None):
+            where = "WHERE (id) > (?)" if after is not None else ""
+            params = (*after, limit) if after is not None else (limit,)
+            return self._fetch(f"SELECT * FROM {table_name} {where} ORDER BY id LIMIT ?", params)
+
+        async def get_key_stats(self, table_name, key_column):
+            lo, hi, n = self.db.execute(f"SELECT min(id), max(id), count(*) FROM {table_name}").fetchone()
+            return {"min": lo, "max": hi, "rows": n, "histogram": []}
+
+        if streaming:
+            async def stream_batches(self, table_name, columns=None, batch_size=5000,
+                                     limit=None, key_range=None):
+                self.queries.append("cursor")
+                lo = key_range.lower if key_range and key_range.lower is not None else -(2**62)
+                hi = key_range.upper if key_range and key_range.upper is not None else 2**62
+                cur = self.db.execute(
+                    f"SELECT * FROM {table_name} WHERE id >= ? AND id < ? LIMIT ?",
+                    (lo, hi, limit or -1),
+                )
+                names = [d[0] for d in cur.description]
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                try:
+                    while batch := cur.fetchmany(batch_size):
+                        await asyncio.sleep(0)  # let other ranges interleave
+                        yield rows_to_frame(names, batch)
+                finally:
+                    self.active -= 1
+
+    return SQLiteConnector()
+
+
+def _table(n):
+    return [(i, f"n{i}" if i % 7 else None, float(i) if i % 5 else None) for i in range(n)]
+
+
+def test_rows_to_frame_converts_like_flatten_document():
+    from services.databases.connectors.base import rows_to_frame
+    from services.databases.schema_discovery import _flatten_document
+
+    names = ["id", "day", "price", "tags", "note"]
+    rows = [
+        (1, date(2024, 1, 2), Decimal("1.50"), ["a", "b"], None),
+        (2, None, Decimal("2"), [], "x"),
+    ]
+    frame = rows_to_frame(names, rows)
+    expected = pl.from_dicts([_flatten_document(dict(zip(names, r))) for r in rows])
+
+    assert frame.to_dicts() == expected.to_dicts()
+    assert frame["id"].dtype == pl.Int64
+    assert rows_to_frame(names, []).columns == names
+
+
+@pytest.mark.asyncio
+async def test_paginated_extract_seeks_on_the_key():
+    from services.databases.data_extractor import DataExtractor
+
+    connector = _sqlite_connector(_table(95))
+    pages = [p async for p in DataExtractor(batch_size=20).extract_paginated(connector, "t")]
+
+    assert [len(p) for p in pages] == [20, 20, 20, 20, 15]
+    assert [r["id"] for p in pages for r in p] == list(range(95))
+    assert not any("OFFSET" in q for q in connector.queries)
+    assert connector.queries[1].count("?") == 2  # WHERE id > ? … LIMIT ?
+
+
+@pytest.mark.asyncio
+async def test_paginated_extract_without_key_falls_back_to_offset():
+    from services.databases.data_extractor import DataExtractor
+
+    connector = _sqlite_connector(_table(45), key=False)
+    rows = await DataExtractor(batch_size=20).extract_full_table(connector, "t")
+
+    assert len(rows) == 45
+    assert all("OFFSET" in q for q in connector.queries)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode,streaming", [("cursor", True), ("keyset", True), ("cursor", False)])
+async def test_stream_to_parquet_writes_every_row_once(tmp_path, mode, streaming):
+    from services.databases.data_extractor import DataExtractor
+
+    # First batch has only NULL amounts; later batches widen the column
+    rows = [(i, "a", None) for i in range(10)] + [(i, "b", i * 1.5) for i in range(10, 57)]
+    connector = _sqlite_connector(rows, streaming=streaming)
+    path = str(tmp_path / "t.parquet")
+
+    extractor = DataExtractor(batch_size=10, mode=mode)
+    assert await extractor.stream_to_parquet(connector, "t", path) == 57
+
+    out = pl.read_parquet(path)
+    assert out["id"].to_list() == list(range(57))
+    assert out["amount"].dtype == pl.Float64 and out["amount"].null_count() == 10
+    assert ("cursor" in connector.queries) == (mode == "cursor" and streaming)
+    assert os.listdir(tmp_path) == ["t.parquet"]
+
+    capped = str(tmp_path / "capped.parquet")
+    assert await extractor.stream_to_parquet(connector, "t", capped, limit=25) == 25
+    assert pl.read_parquet(capped)["id"].to_list() == list(range(25))
+
+
+def test_split_points_follow_histogram_or_min_max():
+    from services.databases.schema_discovery import _split_points
+
+    linear = {"min": 0, "max": 1000, "rows": 1000, "histogram": []}
+    assert _split_points(linear, 4, 1.0) == [250, 500, 750]
+    assert _split_points(linear, 4, 0.2) == [50, 100, 150]
+
+    # Skewed keys: the histogram's quantiles, not the key space, set the bounds
+    skewed = {"min": 1, "max": 10**9, "rows": 10**6, "histogram": [1, 10, 20, 30, 40, 10**9]}
+    assert _split_points(skewed, 5, 1.0) == [10, 20, 30, 40]
+    assert _split_points({"min": "a", "max": "z", "rows": 10**6}, 4, 1.0) == []
+
+
+@pytest.mark.asyncio
+async def test_plan_key_ranges_covers_the_key_space():
+    from services.databases.schema_discovery import SchemaDiscoveryService
+
+    connector = _sqlite_connector(_table(1000))
+    planner = SchemaDiscoveryService()
+
+    ranges = await planner.plan_key_ranges(connector, "t", partitions=4)
+    assert [(r.lower, r.upper) for r in ranges] == [
+        (None, 249), (249, 499), (499, 749), (749, None)
+    ]
+    assert await planner.plan_key_ranges(connector, "t", partitions=4, min_rows=5000) == []
+    assert await planner.plan_key_ranges(_sqlite_connector(_table(9), key=False), "t", 4) == []
+
+
+@pytest.mark.asyncio
+async def test_partitioned_extract_merges_ranges_in_key_order(tmp_path):
+    from services.databases.data_extractor import DataExtractor
+    from services.databases.schema_discovery import SchemaDiscoveryService
+
+    connector = _sqlite_connector(_table(1000))
+    connector._pool_size = 8
+    ranges = await SchemaDiscoveryService().plan_key_ranges(connector, "t", partitions=8)
+    extractor = DataExtractor(batch_size=50, max_parallel_per_source=3)
+
+    path = str(tmp_path / "t.parquet")
+    assert await extractor.stream_to_parquet(connector, "t", path, key_ranges=ranges) == 1000
+    assert pl.read_parquet(path)["id"].to_list() == list(range(1000))
+    assert connector.peak == 3  # the per-source cap, not the 8 ranges
+
+    capped = str(tmp_path / "capped.parquet")
+    assert await extractor.stream_to_parquet(
+        connector, "t", capped, limit=300, key_ranges=ranges
+    ) == 300
+    assert pl.read_parquet(capped)["id"].to_list() == list(range(300))
+    assert sorted(os.listdir(tmp_path)) == ["capped.parquet", "t.parquet"]
@@ -0,0 +1,42 @@
+import sys
+import os
+import json
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.mark.parametrize("prefer_arrow", [True, False])
+def test_integer_sums_serialise_as_json_numbers(prefer_arrow):
+    from services.query.duckdb_helpers import create_duckdb_connection, fetch_polars
+
+    with create_duckdb_connection() as conn:
+        conn.execute("CREATE TABLE data AS SELECT * FROM range(4) t(k)")
+        df = fetch_polars(
+            conn.execute("SELECT SUM(k + 3) AS total, AVG(k) AS mean FROM data"),
+            prefer_arrow=prefer_arrow,
+        )
+
+    assert df.schema["total"] == pl.Int64
+    assert json.loads(json.dumps(df.to_dicts())) == [{"total": 18, "mean": 1.5}]
+
+
+@pytest.mark.parametrize("prefer_arrow", [True, False])
+def test_decimal_columns_become_floats(prefer_arrow):
+    from services.query.duckdb_helpers import create_duckdb_connection, fetch_polars
+
+    with create_duckdb_connection() as conn:
+        df = fetch_polars(
+            conn.execute(
+                "SELECT 12.50::DECIMAL(10, 2) AS price, "
+                "170141183460469231731687303715884105727::HUGEINT AS huge"
+            ),
+            prefer_arrow=prefer_arrow,
+        )
+
+    assert df.schema["price"] == pl.Float64
+    assert df["price"].to_list() == [12.5]
+    assert not isinstance(df["huge"][0], Decimal)
@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+
+
+def _frame(n=1000):
+    return pl.DataFrame({"id": list(range(n)), "region": ["North", "South"] * (n // 2)})
+
+
+def _source(tmp_path, name="d1.parquet", n=1000):
+    path = tmp_path / name
+    _frame(n).write_parquet(path)
+    return str(path)
+
+
+def test_put_then_get_maps_the_same_frame(tmp_path):
+    from services.cache.frame_cache import DatasetFrameCache
+
+    cache = DatasetFrameCache(str(tmp_path / "cache"), max_bytes=64 * 1024 * 1024)
+    src = _source(tmp_path)
+
+    assert cache.get("d1", src) is None
+    assert cache.put("d1", src, _frame())
+    hit = cache.get("d1", src)
+    assert hit is not None and hit.equals(_frame())
+    # A second "worker" with its own instance maps the same file
+    assert DatasetFrameCache(str(tmp_path / "cache"), max_bytes=1 << 30).get("d1", src) is not None
+
+
+def test_rewriting_the_source_invalidates_and_drops_stale_version(tmp_path):
+    from services.cache.frame_cache import DatasetFrameCache
+
+    cache = DatasetFrameCache(str(tmp_path / "cache"), max_bytes=64 * 1024 * 1024)
+    src = _source(tmp_path)
+    cache.put("d1", src, _frame())
+
+    time.sleep(0.01)
+    _frame(10).write_parquet(src)  # mutation rewrites the dataset file
+    assert cache.get("d1", src) is None
+
+    cache.put("d1", src, _frame(10))
+    assert cache.get("d1", src).height == 10
+    assert len(list((tmp_path / "cache").glob("*.arrow"))) == 1
+
+
+def test_variants_are_separate_and_invalidate_drops_all(tmp_path):
+    from services.cache.frame_cache import DatasetFrameCache
+
+    cache = DatasetFrameCache(str(tmp_path / "cache"), max_bytes=64 * 1024 * 1024)
+    src = _source(tmp_path)
+    cache.put("d1", src, _frame())
+    cache.put("d1", src, _frame(10), variant="quis:t1")
+
+    assert cache.get("d1", src).height == 1000
+    assert cache.get("d1", src, variant="quis:t1").height == 10
+    assert cache.invalidate("d1") == 2
+    assert cache.get("d1", src) is None
+
+
+def test_eviction_keeps_directory_under_byte_budget(tmp_path):
+    from services.cache.frame_cache import DatasetFrameCache
+
+    entry = _frame(20_000)
+    entry.write_ipc(tmp_path / "probe.arrow", compression="uncompressed")
+    file_size = (tmp_path / "probe.arrow").stat().st_size
+    cache = DatasetFrameCache(str(tmp_path / "cache"), max_bytes=int(file_size * 3.5))
+    sources = [_source(tmp_path, f"d{i}.parquet", 20_000) for i in range(4)]
+    for i, src in enumerate(sources):
+        assert cache.put(f"d{i}", src, entry)
+        time.sleep(0.01)
+    # Three fit: d0 was evicted. Touch d1 so d2 goes next.
+    cache.get("d1", sources[1])
+    cache.put("d4", _source(tmp_path, "d4.parquet", 20_000), entry)
+
+    assert cache.stats()["size_mb"] * 1024 * 1024 <= cache.max_bytes
+    assert cache.get("d0", sources[0]) is None
+    assert cache.get("d2", sources[2]) is None
+    assert cache.get("d1", sources[1]) is not None
+
+
+def test_oversized_frame_and_missing_source_are_not_cached(tmp_path):
+    from services.cache.frame_cache import DatasetFrameCache
+
+    cache = DatasetFrameCache(str(tmp_path / "cache"), max_bytes=1024)
+    src = _source(tmp_path)
+    assert not cache.put("d1", src, _frame())
+    assert not cache.put("d1", str(tmp_path / "gone.parquet"), _frame(2))
+    assert DatasetFrameCache(str(tmp_path / "off"), max_bytes=0).get("d1", src) is None
@@ -0,0 +1,103 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def executor():
+    from services.query.executor import QueryExecutor
+
+    qe = QueryExecutor()
+    qe._max_result_rows = 5
+    return qe
+
+
+@pytest.fixture
+def df():
+    return pl.DataFrame({"k": list(range(50)), "g": [i % 7 for i in range(50)]})
+
+
+def test_total_rows_exceeds_transferred_rows(executor, df):
+    result, total, error = executor.execute_sql_with_count("SELECT * FROM data", df)
+    assert error == ""
+    assert total == 50
+    assert len(result) == 5
+    assert "__total_rows" not in result.columns
+
+
+def test_order_by_is_preserved(executor, df):
+    result, total, _ = executor.execute_sql_with_count(
+        "SELECT k FROM data ORDER BY k DESC;", df
+    )
+    assert total == 50
+    assert result["k"].to_list() == [49, 48, 47, 46, 45]
+
+
+def test_group_by_cardinality_matches_estimate(executor, df):
+    sql = "WITH t AS (SELECT g, COUNT(*) AS n FROM data GROUP BY g) SELECT * FROM t"
+    _, total, _ = executor.execute_sql_with_count(sql, df)
+    estimated, _ = executor._estimate_row_count(sql, df)
+    assert total == estimated == 7
+
+
+def test_empty_result_has_zero_total(executor, df):
+    result, total, error = executor.execute_sql_with_count(
+        "SELECT * FROM data WHERE k < 0", df
+    )
+    assert error == ""
+    assert total == 0
+    assert len(result) == 0
+
+
+def test_errors_are_reported(executor, df):
+    result, total, error = executor.execute_sql_with_count("SELECT missing FROM data", df)
+    assert result is None
+    assert total == 0
+    assert error
+
+
+def test_only_truncated_results_pay_a_count_scan(executor, df, monkeypatch):
+    from services.query import executor as executor_module
+
+    scans = []
+    monkeypatch.setattr(
+        executor_module.metrics,
+        "incr",
+        lambda name, amount=1: scans.append(amount) if name == "query_scans_total" else None,
+    )
+    _, total, _ = executor.execute_sql_with_count("SELECT DISTINCT g FROM data WHERE g < 3", df)
+    assert total == 3 and scans == [1]
+
+    _, total, _ = executor.execute_sql_with_count("SELECT `k` FROM data ORDER BY `k`", df)
+    assert total == 50 and scans == [1, 2]
+
+
+def test_dataset_results_are_shared_through_query_cache(executor, df, tmp_path, monkeypatch):
+    from core.config import settings
+    from services.query import query_cache
+
+    monkeypatch.setattr(settings, "QUERY_CACHE_DIR", str(tmp_path / "qc"))
+    monkeypatch.setattr(settings, "QUERY_CACHE_TTL", 60)
+    monkeypatch.setattr(settings, "DUCKDB_CATALOG_ENABLED", False)
+    monkeypatch.setattr(query_cache, "_cache", None)
+    monkeypatch.setattr(query_cache, "_memory", query_cache._MemoryLRU(1_000_000))
+
+    first, total, _ = executor.execute_sql_with_count(
+        "SELECT k FROM data d WHERE d.g = 1 AND d.k > 3 ORDER BY k", df, dataset_id="ds1"
+    )
+    # A re-generated, semantically identical query is served from the cache
+    # even though the in-memory data no longer matches.
+    second, cached_total, error = executor.execute_sql_with_count(
+        "select k from data AS x where x.k > 3 and x.g = 1 order by k",
+        df.head(0),
+        dataset_id="ds1",
+    )
+    query_cache._cache.close()
+
+    assert error == ""
+    assert cached_total == total == 6
+    assert second.equals(first)
@@ -0,0 +1,144 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import math
+
+import numpy as np
+import polars as pl
+import pytest
+
+
+def _config(chart_type, columns, aggregation="sum", **extra):
+    from services.charts.chart_render_service import ChartRenderService
+
+    return ChartRenderService()._parse_config(
+        {"chart_type": chart_type, "columns": columns, "aggregation": aggregation, **extra}
+    )
+
+
+def _reference_bin_label(v, edges):
+    """The per-row bin labelling ``_auto_bin_numeric_col`` used to run."""
+
+    def fmt(x):
+        return str(int(x)) if float(x) == int(float(x)) else f"{x:.1f}"
+
+    if v is None:
+        return None
+    for i in range(len(edges) - 1):
+        lo, hi = edges[i], edges[i + 1]
+        if lo <= v < hi or (i == len(edges) - 2 and v <= hi):
+            return f"{fmt(lo)}–{fmt(hi)}"
+    return f"{fmt(edges[-2])}+"
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.37, 1234.5])
+def test_auto_bin_labels_match_per_row_reference(scale):
+    from services.charts.hydrate import _auto_bin_numeric_col
+
+    rng = np.random.default_rng(3)
+    values = (rng.gamma(2.0, 10.0, 2000) * scale).tolist()
+    values[:4] = [None, min(values), max(values), float("nan")]
+    df = pl.DataFrame({"v": values}, schema={"v": pl.Float64})
+
+    binned, order_map = _auto_bin_numeric_col(df, "v")
+
+    # The edges the function derives from the column's range
+    lo, hi = float(df["v"].drop_nulls().min()), float(df["v"].drop_nulls().max())
+    raw_step = (hi - lo) / 7
+    magnitude = 10 ** int(np.floor(np.log10(raw_step)))
+    step = min([magnitude * m for m in [1, 2, 2.5, 5, 10]], key=lambda s: abs(s - raw_step))
+    step = max(step, 0.5)
+    v, edges = np.floor(lo / step) * step, []
+    while v < hi + step:
+        edges.append(round(float(v), 4))
+        v += step
+
+    got = binned["v"].to_list()
+    assert got == [_reference_bin_label(x, edges) for x in values]
+    assert order_map == {
+        _reference_bin_label(edges[i], edges): i for i in range(len(edges) - 1)
+    }
+
+
+def test_bar_bins_sort_in_natural_order():
+    from services.charts.hydrate import hydrate_chart
+
+    df = pl.DataFrame({"hours": [float(i % 40) for i in range(400)], "score": [1.0] * 400})
+    traces, _ = hydrate_chart(df, _config("bar", ["hours", "score"]))
+    lows = [float(label.split("–")[0].rstrip("+")) for label in traces[0]["x"]]
+    assert lows == sorted(lows)
+
+
+def test_sankey_nodes_in_order_of_appearance():
+    from services.charts.hydrate import hydrate_chart
+
+    df = pl.DataFrame(
+        {
+            "src": ["a", "a", "b", None, "c"],
+            "dst": ["x", "y", "x", "x", "a"],
+            "amount": [50.0, 40.0, 30.0, 20.0, 10.0],
+        }
+    )
+    traces, _ = hydrate_chart(df, _config("sankey", ["src", "dst", "amount"]))
+    trace = traces[0]
+    labels = trace["node"]["label"]
+    assert labels == ["a", "x", "y", "b", "None", "c"]
+    links = list(zip(trace["link"]["source"], trace["link"]["target"], trace["link"]["value"]))
+    assert [(labels[s], labels[t], v) for s, t, v in links] == [
+        ("a", "x", 50.0), ("a", "y", 40.0), ("b", "x", 30.0), ("None", "x", 20.0), ("c", "a", 10.0)
+    ]
+
+
+def test_grouped_bar_fills_missing_categories_with_zero():
+    from services.charts.hydrate import hydrate_chart
+
+    df = pl.DataFrame(
+        {
+            "region": ["N", "N", "S", "S", "E", "N"],
+            "channel": ["web", "store", "web", "web", "store", "web"],
+            "revenue": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    traces, _ = hydrate_chart(df, _config("bar", ["region", "revenue"], group_by="channel"))
+    by_name = {t["name"]: dict(zip(t["x"], t["y"])) for t in traces}
+    assert by_name["web"] == {"N": 7.0, "S": 7.0, "E": 0}
+    assert by_name["store"] == {"N": 2.0, "S": 0, "E": 5.0}
+
+
+def test_scatter_drops_null_and_nan_points_and_jitters_like_before():
+    from services.charts.hydrate import hydrate_chart
+
+    n = 500
+    xs = [float(i % 4) for i in range(n)]
+    ys = [float(i) for i in range(n)]
+    xs[7], ys[9] = None, float("nan")
+    df = pl.DataFrame({"x": xs, "y": ys})
+    traces, _ = hydrate_chart(df, _config("scatter", ["x", "y"]))
+
+    kept = [(x, y) for x, y in zip(xs, ys) if x is not None and not math.isnan(y)]
+    rng = np.random.default_rng(42)
+    scale = max(0.2, 3.0 / 4 * 0.15)
+    expected_x = [x + rng.uniform(-scale, scale) for x, _ in kept]
+    assert traces[0]["x"] == expected_x
+    assert traces[0]["y"] == [y for _, y in kept]  # high-cardinality y is left alone
+
+
+def test_scatter_by_group_matches_per_group_filter():
+    from services.charts.hydrate import hydrate_chart
+
+    rng = np.random.default_rng(5)
+    df = pl.DataFrame(
+        {
+            "g": rng.choice(["a", "b", "c"], 3000).tolist(),
+            "x": rng.random(3000).tolist(),
+            "y": [None if i % 13 == 0 else float(i) for i in range(3000)],
+        }
+    )
+    traces, _ = hydrate_chart(df, _config("scatter", ["x", "y"], group_by="g"))
+    for trace in traces:
+        grp = df.filter(pl.col("g") == trace["name"]).select(["x", "y"]).drop_nulls()
+        grp = grp.sample(n=500, seed=42)
+        assert trace["x"] == grp["x"].to_list()
+        assert trace["y"] == grp["y"].to_list()
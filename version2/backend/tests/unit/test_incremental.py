@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import random
+
+import polars as pl
+import pytest
+
+
+def _rows(n, start=0):
+    regions = ["North", "South", "East", "West"]
+    return [
+        {
+            "order_date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "region": regions[i % 4],
+            "amount": round(10 + (i * 7919) % 500 / 3, 2),
+            "units": i % 9,
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def _write_csv(path, rows):
+    pl.DataFrame(rows).write_csv(path)
+    return str(path)
+
+
+@pytest.fixture
+def state_root(tmp_path, monkeypatch):
+    from core.config import settings
+
+    monkeypatch.setattr(settings, "INCREMENTAL_STATE_DIR", str(tmp_path / "state"))
+    return tmp_path
+
+
+def _baseline(tmp_path, dataset_id, rows):
+    """What a full pipeline run leaves behind: the Parquet and the baseline."""
+    from services.datasets.parquet_layout import write_dataset_parquet
+    from services.pipeline.incremental import capture_baseline
+    from services.pipeline.workers import load_stage
+
+    csv = _write_csv(tmp_path / "v1.csv", rows)
+    loaded = load_stage(csv)[0]
+    parquet = str(tmp_path / f"{dataset_id}.parquet")
+    write_dataset_parquet(loaded, parquet)
+    capture_baseline(dataset_id, loaded, loaded, parquet, cleaned=False)
+    return parquet
+
+
+def test_sketch_merge_matches_sketch_of_concatenation():
+    from services.pipeline.incremental import ColumnSketch
+
+    a = pl.Series("x", [1.0, 2.0, None, 4.0, 4.0])
+    b = pl.Series("x", [10.0, None, None, -3.0])
+    merged = ColumnSketch.of(a).merge(ColumnSketch.of(b))
+    whole = ColumnSketch.of(pl.concat([a, b]))
+
+    assert (merged.rows, merged.nulls, merged.distinct) == (9, 3, 5)
+    assert merged.distinct == whole.distinct and merged.top == whole.top
+    assert merged.min == -3.0 and merged.max == 10.0
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.std == pytest.approx(pl.concat([a, b]).drop_nulls().std())
+    assert ColumnSketch.from_dict(merged.to_dict()) == merged
+
+
+def test_distinct_estimate_past_the_sketch_size():
+    from services.pipeline.incremental import SKETCH_K, ColumnSketch
+
+    halves = [pl.Series("id", range(k, 50_000, 2)) for k in (0, 1)]
+    merged = ColumnSketch.of(halves[0]).merge(ColumnSketch.of(halves[1]))
+
+    assert len(merged.hashes) == SKETCH_K
+    assert merged.distinct == pytest.approx(50_000, rel=0.1)
+
+
+def test_appended_rows_are_merged_in_any_order(state_root):
+    from services.pipeline.incremental import apply_append, load_state
+
+    old = _rows(200)
+    parquet = _baseline(state_root, "d1", old)
+
+    shuffled = old[:]
+    random.Random(7).shuffle(shuffled)
+    new_file = _write_csv(state_root / "v2.csv", shuffled + _rows(25, start=200))
+    outcome = apply_append("d1", new_file, parquet, parquet)
+
+    assert outcome["status"] == "appended" and outcome["rows_appended"] == 25
+    assert outcome["row_count"] == 225
+    assert set(outcome["changed_columns"]) == {"order_date", "region", "amount", "units"}
+    stored = pl.read_parquet(parquet)
+    assert len(stored) == 225 and stored["amount"].sum() == pytest.approx(
+        sum(r["amount"] for r in old + _rows(25, start=200))
+    )
+    assert outcome["sketches"]["units"]["rows"] == 225
+    assert load_state("d1")["rows"] == 225
+
+    # Same file again: nothing new, nothing rewritten.
+    assert apply_append("d1", new_file, parquet, parquet)["status"] == "unchanged"
+
+
+def test_changed_rows_or_schema_decline(state_root):
+    from services.pipeline.incremental import apply_append
+
+    old = _rows(50)
+    parquet = _baseline(state_root, "d2", old)
+
+    edited = [dict(r) for r in old]
+    edited[3]["amount"] = 999.0
+    changed = _write_csv(state_root / "edited.csv", edited + _rows(5, start=50))
+    assert apply_append("d2", changed, parquet, parquet) == {
+        "status": "declined",
+        "reason": "existing rows changed",
+    }
+
+    widened = [{**r, "channel": "web"} for r in old]
+    new_schema = _write_csv(state_root / "widened.csv", widened)
+    assert apply_append("d2", new_schema, parquet, parquet)["reason"] == "schema changed"
+
+    pl.read_parquet(parquet).head(10).write_parquet(parquet)  # e.g. a cleaning mutation
+    grown = _write_csv(state_root / "grown.csv", old + _rows(5, start=50))
+    assert "changed since" in apply_append("d2", grown, parquet, parquet)["reason"]
+
+
+def test_profile_and_kpis_follow_the_changed_columns():
+    from services.pipeline.incremental import (
+        ColumnSketch,
+        merge_profile_columns,
+        stale_kpis,
+    )
+
+    columns = [
+        {
+            "name": "region",
+            "cardinality": {"unique_count": 2, "cardinality_level": "low"},
+            "stats": None,
+        },
+        {
+            "name": "amount",
+            "cardinality": {"unique_count": 3, "cardinality_level": "very_high"},
+            "stats": {"min": 1.0, "max": 3.0, "mean": 2.0, "median": 2.0},
+        },
+    ]
+    sketches = {
+        "region": ColumnSketch.of(pl.Series(["a", "b"] * 50)),
+        "amount": ColumnSketch.of(pl.Series([1.0, 2.0, 3.0, 3.0, None] * 20)),
+    }
+
+    assert merge_profile_columns(columns, sketches) == ["amount"]
+    amount = columns[1]
+    assert amount["cardinality"]["null_count"] == 20
+    assert amount["cardinality"]["cardinality_level"] == "low"
+    assert amount["stats"]["mean"] == 2.25 and amount["stats"]["median"] == 2.0
+    assert columns[0]["top_values"][0] == {"value": "a", "count": 50}
+
+    kpis = [{"column": "amount"}, {"column": "units"}]
+    assert stale_kpis(kpis, {"amount"}, set()) == [0]
+    assert stale_kpis(kpis, {"amount", "order_date"}, {"order_date"}) == [0, 1]
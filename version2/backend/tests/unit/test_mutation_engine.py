@@ -11,8 +11,9 @@ Covers the two-phase mutation layer (services/cleaning/mutation_engine.py):
     - Reject an already-applied destructive op → guarded ValueError
     - override_to renames the real parquet column (tolerates case drift)
     - Collision guards warn and no-op instead of corrupting data
+    - The downstream refresh invalidates cached SQL results
 
-Pure logic only — no MongoDB, no file I/O.
+Pure logic only — no MongoDB; the refresh test writes to a tmp dir.
 """
 
 import sys
@@ -201,3 +202,66 @@ class TestResetAndState:
         assert is_ai_proposal({"action_type": "remove"}) is True
         assert is_ai_proposal({"action_type": "merge"}) is True
         assert is_ai_proposal({"original_name": "a", "normalized_name": "b"}) is False
+
+
+# ── Downstream refresh ─────────────────────────────────────────────────────
+
+
+class TestDownstreamRefresh:
+    async def test_mutation_invalidates_cached_query_results(self, tmp_path, monkeypatch):
+        from unittest.mock import AsyncMock, MagicMock
+
+        from core.config import settings
+        from services.cleaning import mutation_engine
+        from services.query import query_cache
+        from services.query.dataset_catalog import dataset_catalog
+        from services.query.rollups import rollup_store
+
+        monkeypatch.setattr(settings, "QUERY_CACHE_DIR", str(tmp_path / "qc"))
+        monkeypatch.setattr(settings, "QUERY_CACHE_TTL", 60)
+        monkeypatch.setattr(query_cache, "_cache", None)
+        monkeypatch.setattr(query_cache, "_memory", query_cache._MemoryLRU(1_000_000))
+        monkeypatch.setattr(dataset_catalog, "build", lambda *a, **k: None)
+        monkeypatch.setattr(rollup_store, "rebuild", lambda *a, **k: None)
+        db = MagicMock()
+        db.uploads.update_one = AsyncMock()
+        monkeypatch.setattr(mutation_engine, "get_database", lambda: db)
+
+        result = {"success": True, "columns": ["n"], "data": [{"n": 2}], "row_count": 1}
+        query_cache.put("ds1", "SELECT COUNT(*) AS n FROM data", 100, result)
+        assert query_cache.get("ds1", "SELECT COUNT(*) AS n FROM data", 100) == result
+
+        df = pl.DataFrame({"revenue": [10, 20, 30]})
+        await mutation_engine._refresh_downstream(
+            "ds1", "u1", "w1", df, {}, "csv", str(tmp_path / "ds1.parquet"), []
+        )
+
+        assert query_cache.get("ds1", "SELECT COUNT(*) AS n FROM data", 100) is None
+        query_cache._cache.close()
+
+    async def test_store_rebuilds_run_off_the_event_loop(self, tmp_path, monkeypatch):
+        import threading
+        from unittest.mock import AsyncMock, MagicMock
+
+        from services.cleaning import mutation_engine
+        from services.query.dataset_catalog import dataset_catalog
+        from services.query.rollups import rollup_store
+
+        threads = {}
+        monkeypatch.setattr(
+            dataset_catalog, "build", lambda *a: threads.setdefault("catalog", threading.get_ident())
+        )
+        monkeypatch.setattr(
+            rollup_store, "rebuild", lambda *a: threads.setdefault("rollup", threading.get_ident())
+        )
+        db = MagicMock()
+        db.uploads.update_one = AsyncMock()
+        monkeypatch.setattr(mutation_engine, "get_database", lambda: db)
+
+        df = pl.DataFrame({"revenue": [10, 20, 30]})
+        await mutation_engine._refresh_downstream(
+            "ds1", "u1", "w1", df, {}, "csv", str(tmp_path / "ds1.parquet"), []
+        )
+
+        assert set(threads) == {"catalog", "rollup"}
+        assert threading.get_ident() not in threads.values()
@@ -0,0 +1,108 @@
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import duckdb
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def sales():
+    n = 4_000
+    start = date(2023, 1, 1)
+    return pl.DataFrame(
+        {
+            "order_id": [f"ORD_{i:05d}" for i in range(n)],
+            # Shuffled upload order: dates cycle through two years
+            "order_date": [(start + timedelta(days=(i * 37) % 730)).isoformat() for i in range(n)],
+            "region": [["north", "south", "east", "west"][i % 4] for i in range(n)],
+            "amount": [float(i % 97) for i in range(n)],
+        }
+    )
+
+
+def test_plan_picks_string_dates_and_low_cardinality_dimension(sales):
+    from services.datasets.parquet_layout import plan_layout
+
+    layout = plan_layout(sales)
+    assert layout.time_column == "order_date"
+    assert layout.parse_time is True
+    assert layout.dimension == "region"
+    assert layout.sort_by == ["order_date", "region"]
+
+
+def test_plan_prefers_temporal_dtype(sales):
+    from services.datasets.parquet_layout import plan_layout
+
+    df = sales.with_columns(pl.col("order_date").str.to_date().alias("shipped"))
+    layout = plan_layout(df.select("shipped", "order_date", "region"))
+    assert layout.time_column == "shipped"
+    assert layout.parse_time is False
+
+
+def test_written_file_is_clustered_with_tuned_row_groups(tmp_path, sales):
+    from services.datasets.parquet_layout import write_dataset_parquet
+
+    path = tmp_path / "sales.parquet"
+    write_dataset_parquet(sales, path)
+
+    out = pl.read_parquet(path)
+    assert out.sort("order_id").equals(sales.sort("order_id"))
+    months = out["order_date"].str.slice(0, 7)
+    assert months.to_list() == sorted(months.to_list())
+
+    groups = duckdb.sql(
+        f"SELECT row_group_id, ANY_VALUE(row_group_num_rows) FROM parquet_metadata('{path}') "
+        "GROUP BY ALL ORDER BY 1"
+    ).fetchall()
+    assert len(groups) == 1  # 4000 rows < PARQUET_ROW_GROUP_ROWS
+
+
+def test_index_records_narrow_row_group_time_ranges(tmp_path, sales, monkeypatch):
+    from core.config import settings
+    from services.datasets.parquet_layout import LayoutIndex, write_dataset_parquet
+
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_ROWS", 500)
+    path = tmp_path / "sales.parquet"
+    write_dataset_parquet(sales, path)
+
+    index = LayoutIndex.load(path)
+    assert index is not None
+    assert len(index.row_groups) == 8
+    assert index.num_rows == len(sales)
+
+    # Clustering makes the per-group ranges selective: one month of the
+    # two years overlaps at most two groups
+    march = [
+        i
+        for i, g in enumerate(index.row_groups)
+        if g["stats"]["order_date"]["min"] <= "2024-03-31"
+        and g["stats"]["order_date"]["max"] >= "2024-03-01"
+    ]
+    assert 0 < len(march) <= 2
+    stored = pl.read_parquet(path).with_row_index()
+    rows = stored.filter(pl.col("order_date").str.starts_with("2024-03"))["index"]
+    assert {r // 500 for r in rows.to_list()} <= set(march)
+
+
+def test_stale_index_is_ignored(tmp_path, sales):
+    from services.datasets.parquet_layout import LayoutIndex, write_dataset_parquet
+
+    path = tmp_path / "sales.parquet"
+    write_dataset_parquet(sales, path)
+    sales.head(10).write_parquet(path)
+    assert LayoutIndex.load(path) is None
+
+
+def test_layout_can_be_disabled(tmp_path, sales, monkeypatch):
+    from core.config import settings
+    from services.datasets.parquet_layout import write_dataset_parquet
+
+    monkeypatch.setattr(settings, "PARQUET_CLUSTERED_LAYOUT", False)
+    path = tmp_path / "sales.parquet"
+    layout = write_dataset_parquet(sales, path)
+    assert layout.sort_by == []
+    assert pl.read_parquet(path).equals(sales)
@@ -0,0 +1,181 @@
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_worker_keeps_frame_between_stages():
+    from services.pipeline.normalize import normalize_column_names
+    from services.pipeline.workers import FrameInfo, PipelineWorkerPool
+
+    pool = PipelineWorkerPool(size=1)
+
+    async def main():
+        async with pool.lease() as lease:
+            df = await lease.run(pl.DataFrame, {"Order ID": [1, 2, 3]}, keep="df")
+            renamed, entries = await lease.run(
+                normalize_column_names, lease.ref("df"), keep="df"
+            )
+            return df, renamed, entries, await lease.run(len, lease.ref("df"))
+
+    try:
+        df, renamed, entries, height = _run(main())
+    finally:
+        pool.shutdown()
+
+    # Kept frames stay in the worker; only their shape comes back
+    assert isinstance(df, FrameInfo) and isinstance(renamed, FrameInfo)
+    assert df.columns == ["Order ID"] and len(df) == 3
+    assert renamed.columns != df.columns and entries
+    assert height == 3
+
+
+def test_parquet_write_and_previews_run_on_the_kept_frame(tmp_path):
+    from services.datasets.parquet_layout import write_dataset_parquet
+    from services.pipeline.clean import calculate_quality_metrics
+    from services.pipeline.workers import PipelineWorkerPool, preview_stage
+
+    pool = PipelineWorkerPool(size=1)
+    path = str(tmp_path / "data.parquet")
+    frame = {"region": ["N", "S", None, "E", "W", "N"], "units": [1, 2, 3, 4, 5, 6]}
+
+    async def main():
+        async with pool.lease() as lease:
+            await lease.run(pl.DataFrame, frame, keep="df_clean")
+            layout = await lease.run(write_dataset_parquet, lease.ref("df_clean"), path)
+            metadata, rows = await lease.run(
+                preview_stage, lease.ref("df_clean"), fallback_metadata=True
+            )
+            quality = await lease.run(calculate_quality_metrics, metadata, 6, 0)
+            return layout, metadata, rows, quality
+
+    try:
+        layout, metadata, rows, quality = _run(main())
+    finally:
+        pool.shutdown()
+
+    assert pl.read_parquet(path).height == 6 and layout is not None
+    assert [m["name"] for m in metadata] == ["region", "units"]
+    assert metadata[0]["null_count"] == 1 and len(rows) == 5
+    assert quality["null_cells"] == 1
+
+
+def test_worker_exception_propagates_and_worker_is_reused():
+    from services.pipeline.workers import PipelineWorkerPool
+
+    pool = PipelineWorkerPool(size=1)
+
+    async def main():
+        async with pool.lease() as lease:
+            with pytest.raises(ValueError):
+                await lease.run(int, "not a number")
+            return await lease.run(int, "7")
+
+    try:
+        assert _run(main()) == 7
+        assert len(pool._idle) == 1
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_kills_worker_and_next_lease_gets_a_fresh_one():
+    from services.pipeline.workers import PipelineWorkerPool
+
+    pool = PipelineWorkerPool(size=1)
+
+    async def slow():
+        async with pool.lease() as lease:
+            await lease.run(time.sleep, 30)
+
+    async def main():
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(slow(), timeout=1.0)
+        elapsed = time.perf_counter() - started
+        assert not pool._idle  # the killed worker is not returned
+        async with pool.lease() as lease:
+            assert await lease.run(abs, -4) == 4
+        return elapsed
+
+    try:
+        assert _run(main()) < 10
+    finally:
+        pool.shutdown()
+
+
+def test_time_queued_for_a_worker_does_not_count_against_the_timeout():
+    from services.pipeline.workers import PipelineWorkerPool
+
+    pool = PipelineWorkerPool(size=1)
+
+    async def busy():
+        async with pool.lease() as lease:
+            await lease.run(time.sleep, 1.5)
+
+    async def queued():
+        # process_dataset's shape: lease first, then bound the stages
+        async with pool.lease() as lease:
+            return await asyncio.wait_for(lease.run(abs, -4), timeout=1.0)
+
+    async def main():
+        first = asyncio.create_task(busy())
+        await asyncio.sleep(0.1)
+        result = await queued()
+        await first
+        return result
+
+    try:
+        assert _run(main()) == 4
+    finally:
+        pool.shutdown()
+
+
+def test_inline_mode_runs_on_threads_with_local_store():
+    from services.pipeline.workers import PipelineWorkerPool
+
+    pool = PipelineWorkerPool(size=0)
+
+    async def main():
+        async with pool.lease() as lease:
+            await lease.run(pl.DataFrame, {"a": [1, 2]}, keep="df")
+            return await lease.run(len, lease.ref("df"))
+
+    assert _run(main()) == 2
+
+
+def test_load_stage_matches_eager_loader(tmp_path):
+    from services.pipeline.load import coerce_numeric_columns, load_dataset
+    from services.pipeline.workers import load_stage
+
+    path = tmp_path / "sales.csv"
+    path.write_text("region,amount\nNorth,10\nSouth,20\nEast,30\nTOTAL,60\n")
+
+    df, meta, entries, audit = load_stage(str(path))
+
+    raw, _ = load_dataset(str(path))
+    assert meta["file_type"] == "csv"
+    assert len(df) == 3 and len(raw) == 4
+    assert [e["row_index"] for e in entries if e["action_type"] == "drop_row"] == [3]
+    assert df.columns == coerce_numeric_columns(raw)[0].columns
+
+
+def test_clean_stage_reads_a_streamed_parquet_like_a_frame(tmp_path):
+    from services.pipeline.workers import clean_stage
+
+    df = pl.DataFrame({"region": ["N", "n/a", "S"], "units": [1.0, None, 3.0]})
+    path = tmp_path / "streamed.parquet"
+    df.write_parquet(path)
+
+    from_frame, audit_frame = clean_stage(df)
+    from_path, audit_path = clean_stage(str(path))
+    assert from_path.equals(from_frame)
+    assert audit_path == audit_frame
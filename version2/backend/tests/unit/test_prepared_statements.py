@@ -0,0 +1,151 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+def _intent(region, min_units):
+    from services.semantic.query_intent import (
+        DimensionIntent,
+        FilterIntent,
+        FilterOperator,
+        MetricIntent,
+        QueryIntent,
+    )
+
+    return QueryIntent(
+        metrics=[MetricIntent(name="revenue")],
+        dimensions=[DimensionIntent(column="channel")],
+        filters=[
+            FilterIntent(column="region", operator=FilterOperator.EQ, value=region),
+            FilterIntent(column="units", operator=FilterOperator.GTE, value=min_units),
+        ],
+    )
+
+
+@pytest.fixture
+def definitions():
+    from services.semantic.metric_definition_store import MetricDefinition
+
+    return {
+        "revenue": MetricDefinition(
+            name="revenue",
+            display_name="Revenue",
+            source_column="revenue",
+            aggregation="sum",
+            filters=["`status` != 'refunded'"],
+        )
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    from services.query.dataset_catalog import DatasetCatalog
+
+    path = tmp_path / "sales.parquet"
+    pl.DataFrame(
+        {
+            "region": ["N", "S", "N", "E", "N"],
+            "channel": ["web", "web", "store", "web", "web"],
+            "status": ["ok", "ok", "ok", "ok", "refunded"],
+            "units": [1, 5, 3, 7, 9],
+            "revenue": [10.0, 20.0, 30.0, 40.0, 50.0],
+        }
+    ).write_parquet(path)
+
+    cat = DatasetCatalog(catalog_dir=str(tmp_path / "catalog"))
+    assert cat.build("ds1", str(path)) is not None
+    yield cat
+    cat.close_all()
+
+
+def test_filter_values_become_parameters(definitions):
+    from services.semantic.sql_compiler import MetricSQLCompiler
+
+    compiler = MetricSQLCompiler()
+    columns = ["region", "channel", "status", "units", "revenue"]
+    north = compiler.compile_parameterized(_intent("N", 2), definitions, columns)
+    south = compiler.compile_parameterized(_intent("O'Brien", 4), definitions, columns)
+
+    assert north.sql == south.sql
+    assert "?" in north.sql and "'N'" not in north.sql
+    assert "`status` != 'refunded'" in north.sql
+    assert north.params == ["N", 2]
+    assert south.params == ["O'Brien", 4]
+    assert north.text == compiler.compile(_intent("N", 2), definitions, columns)
+    assert "`region` = 'N'" in north.text
+
+
+@pytest.mark.parametrize(
+    "operator, value, fragment, params",
+    [
+        ("in", ["a", "b", "c"], "`c` IN (?, ?, ?)", ["a", "b", "c"]),
+        ("not_in", "a", "`c` NOT IN (?)", ["a"]),
+        ("between", [1, 5], "`c` BETWEEN ? AND ?", [1, 5]),
+        ("is_null", None, "`c` IS NULL", []),
+        ("ilike", "%x%", "`c` ILIKE ?", ["%x%"]),
+    ],
+)
+def test_filter_param_fragments(operator, value, fragment, params):
+    from services.semantic.query_intent import FilterIntent, FilterOperator
+
+    f = FilterIntent(column="c", operator=FilterOperator(operator), value=value)
+    assert f.to_param_sql() == (fragment, params)
+
+
+def test_sql_literal_quotes_and_types():
+    from datetime import date
+    from services.query.prepared import sql_literal
+
+    assert sql_literal("it's") == "'it''s'"
+    assert sql_literal(None) == "NULL"
+    assert sql_literal(True) == "TRUE"
+    assert sql_literal(3) == "3"
+    assert sql_literal(date(2024, 3, 1)) == "DATE '2024-03-01'"
+    with pytest.raises(TypeError):
+        sql_literal(["a"])
+
+
+def test_session_prepares_each_shape_once(catalog, definitions):
+    from services.semantic.sql_compiler import MetricSQLCompiler
+
+    compiler = MetricSQLCompiler()
+    columns = ["region", "channel", "status", "units", "revenue"]
+    north = compiler.compile_parameterized(_intent("N", 2), definitions, columns)
+    east = compiler.compile_parameterized(_intent("E", 0), definitions, columns)
+
+    sql = north.sql.replace("`", '"')
+    with catalog.session("ds1") as session:
+        rows = session.execute(sql, north.params).fetchall()
+        first = session
+    assert rows == [("store", 30.0)]
+
+    with catalog.session("ds1") as session:
+        assert session is first
+        assert session.execute(sql, east.params).fetchall() == [("web", 40.0)]
+        assert len(session) == 1
+
+
+def test_execute_sql_binds_params_without_catalog():
+    from services.query.executor import QueryExecutor
+
+    df = pl.DataFrame({"region": ["N", "S", "N"], "revenue": [1.0, 2.0, 4.0]})
+    result, err = QueryExecutor().execute_sql(
+        "SELECT SUM(revenue) AS total FROM data WHERE region = ?", df, params=["N"]
+    )
+    assert err == ""
+    assert result["total"].to_list() == [5.0]
+
+
+def test_invalidate_closes_idle_sessions(catalog):
+    with catalog.session("ds1") as session:
+        session.execute("SELECT COUNT(*) FROM data WHERE units > ?", [1]).fetchone()
+    assert catalog._sessions["ds1"]
+
+    catalog.invalidate("ds1")
+    assert "ds1" not in catalog._sessions
+    with catalog.session("ds1") as session:
+        assert session is None
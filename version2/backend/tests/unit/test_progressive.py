@@ -0,0 +1,133 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def population():
+    n = 200_000
+    return pl.DataFrame(
+        {
+            "region": [["N", "S", "E", "W", "C"][i % 5] for i in range(n)],
+            "revenue": [float((i * 7919) % 1000) for i in range(n)],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        (
+            "SELECT region, SUM(revenue) AS total, AVG(revenue) FROM data GROUP BY region",
+            ((0,), (1,), (2,)),
+        ),
+        ("SELECT COUNT(*) FROM data WHERE revenue > 10", ((), (0,), ())),
+        (
+            "SELECT region, ROUND(SUM(revenue) * 100.0 / COUNT(*), 2) FROM data GROUP BY 1",
+            ((0,), (), (1,)),
+        ),
+        ("SELECT MEDIAN(revenue) FROM data", ((), (), (0,))),
+    ],
+)
+def test_analyse_sql_classifies_select_items(sql, expected):
+    from services.query.progressive import ProgressivePlan, analyse_sql
+
+    assert analyse_sql(sql) == ProgressivePlan(*expected)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM data",
+        "SELECT region, revenue FROM data",
+        "SELECT MAX(revenue) FROM data",
+        "SELECT COUNT(DISTINCT region) FROM data",
+        "SELECT region, COUNT(*) FROM data GROUP BY region HAVING COUNT(*) > 5",
+        "SELECT SUM(revenue) + 1 FROM data",
+        "SELECT SUM(revenue) FROM data GROUP BY region",
+        "SELECT SUM(t) FROM (SELECT SUM(revenue) AS t FROM data GROUP BY region)",
+    ],
+)
+def test_analyse_sql_rejects_queries_without_sample_estimate(sql):
+    from services.query.progressive import analyse_sql
+
+    assert analyse_sql(sql) is None
+
+
+def test_estimate_scales_additive_columns_with_intervals(population):
+    from services.datasets.dataset_loader import stratified_sample
+    from services.query.progressive import estimate
+
+    sample = stratified_sample(population, 10_000, "region")
+    result = estimate(
+        "SELECT region, SUM(revenue) AS total, AVG(revenue) AS mean FROM data GROUP BY region",
+        sample,
+        len(population),
+        resamples=40,
+        confidence=0.99,
+    )
+    assert result is not None
+
+    truth = population.group_by("region").agg(
+        pl.col("revenue").sum().alias("total"), pl.col("revenue").mean().alias("mean")
+    )
+    exact = {row["region"]: row for row in truth.iter_rows(named=True)}
+    for i, row in enumerate(result.frame.iter_rows(named=True)):
+        for col in ("total", "mean"):
+            true_value = exact[row["region"]][col]
+            assert row[col] == pytest.approx(true_value, rel=0.1)
+            low, high = result.intervals[col][i]
+            assert low <= row[col] <= high
+
+
+def test_stratified_sample_is_proportional():
+    from services.datasets.dataset_loader import stratified_sample
+
+    df = pl.DataFrame({"kind": ["a"] * 9_000 + ["b"] * 900 + ["c"] * 100, "v": list(range(10_000))})
+    sample = stratified_sample(df, 1_000, "kind")
+    counts = dict(sample.group_by("kind").len().iter_rows())
+    assert counts == {"a": 900, "b": 90, "c": 10}
+
+
+@pytest.mark.asyncio
+async def test_losing_estimate_stops_its_bootstrap_thread(population, monkeypatch):
+    import asyncio
+    import time
+
+    from services.query import progressive
+
+    runs = []
+
+    def slow_run(*args):
+        runs.append(1)
+        time.sleep(0.02)
+        return None if len(runs) > 1 else pl.DataFrame({"total": [1.0]})
+
+    monkeypatch.setattr(progressive, "_run_scaled", slow_run)
+    monkeypatch.setattr(progressive.settings, "PROGRESSIVE_BOOTSTRAP_RESAMPLES", 500)
+    monkeypatch.setattr(
+        progressive.ProgressiveEngine, "_load_sample", staticmethod(lambda df, path: df)
+    )
+
+    def exact():
+        time.sleep(0.1)
+        return "exact"
+
+    result, progress_id = await progressive.ProgressiveEngine().run(
+        "SELECT SUM(revenue) AS total FROM data",
+        exact,
+        dataset_id="ds1",
+        user_id="u1",
+        df=population.head(100),
+        file_path="unused",
+    )
+    assert (result, progress_id) == ("exact", None)
+
+    await asyncio.sleep(0.1)
+    stopped_at = len(runs)
+    await asyncio.sleep(0.2)
+    assert len(runs) == stopped_at < 50
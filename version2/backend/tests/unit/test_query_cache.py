@@ -0,0 +1,108 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import pytest
+
+
+def _result(rows: int = 1) -> dict:
+    return {
+        "success": True,
+        "columns": ["n"],
+        "data": [{"n": i} for i in range(rows)],
+        "row_count": rows,
+        "execution_time_ms": 3,
+        "error": None,
+    }
+
+
+@pytest.fixture
+def qcache(tmp_path, monkeypatch):
+    from core.config import settings
+    from services.query import query_cache
+
+    monkeypatch.setattr(settings, "QUERY_CACHE_DIR", str(tmp_path / "qc"))
+    monkeypatch.setattr(settings, "QUERY_CACHE_TTL", 60)
+    monkeypatch.setattr(query_cache, "_cache", None)
+    monkeypatch.setattr(query_cache, "_memory", query_cache._MemoryLRU(1_000_000))
+    yield query_cache
+    if query_cache._cache is not None:
+        query_cache._cache.close()
+
+
+def test_set_then_get_hits_memory_tier(qcache):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    assert qcache.get("ds1", "SELECT 1", 100) == _result()
+    assert qcache._memory.current_bytes > 0
+
+
+def test_disk_hit_is_promoted_to_memory(qcache):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    qcache._memory.clear()
+
+    assert qcache.get("ds1", "SELECT 1", 100) == _result()
+    assert len(qcache._memory._entries) == 1
+
+
+def test_failed_results_are_not_cached(qcache):
+    qcache.put("ds1", "SELECT 1", 100, {"success": False})
+    assert qcache.get("ds1", "SELECT 1", 100) is None
+
+
+def test_invalidate_bumps_generation_for_both_tiers(qcache):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    qcache.put("ds2", "SELECT 1", 100, _result())
+
+    assert qcache.invalidate_dataset("ds1") == 1
+    assert qcache.get("ds1", "SELECT 1", 100) is None
+    assert qcache.get("ds2", "SELECT 1", 100) == _result()
+
+    # A fresh result under the new generation is cached normally.
+    qcache.put("ds1", "SELECT 1", 100, _result(2))
+    assert qcache.get("ds1", "SELECT 1", 100)["row_count"] == 2
+
+
+def test_memory_tier_evicts_by_bytes(qcache):
+    from services.query.query_cache import _MemoryLRU
+
+    lru = _MemoryLRU(max_bytes=1_000)
+    for i in range(20):
+        lru.put("ds1", f"qry:ds1:g0:{i}:10", _result(5), ttl=60)
+    assert lru.current_bytes <= 1_000
+    assert "qry:ds1:g0:19:10" in lru._entries
+    assert "qry:ds1:g0:0:10" not in lru._entries
+
+
+def test_memory_tier_rejects_oversized_entries():
+    from services.query.query_cache import _MemoryLRU
+
+    lru = _MemoryLRU(max_bytes=1_000)
+    lru.put("ds1", "qry:ds1:g0:big:10", _result(500), ttl=60)
+    assert lru.current_bytes == 0
+
+
+def test_memory_hits_are_private_copies(qcache):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    hit = qcache.get("ds1", "SELECT 1", 100)
+    hit["data"].append({"n": 99})
+
+    assert qcache.get("ds1", "SELECT 1", 100) == _result()
+
+
+def test_memory_hits_do_not_read_generations_from_disk(qcache, monkeypatch):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    disk = qcache._get_cache()
+    monkeypatch.setattr(disk, "get", lambda *a, **k: pytest.fail("disk read on a memory hit"))
+
+    assert qcache.get("ds1", "SELECT 1", 100) == _result()
+
+
+def test_other_workers_invalidation_is_seen_after_refresh(qcache, monkeypatch):
+    qcache.put("ds1", "SELECT 1", 100, _result())
+    # Another worker bumps the shared counter on disk
+    qcache._get_cache().incr("gen:ds1")
+    assert qcache.get("ds1", "SELECT 1", 100) == _result()
+
+    monkeypatch.setattr(qcache, "GENERATION_REFRESH_SECONDS", 0)
+    assert qcache.get("ds1", "SELECT 1", 100) is None
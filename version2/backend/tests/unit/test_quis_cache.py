@@ -6,94 +6,115 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 
+_DOC = {
+    "_id": "d1",
+    "user_id": "u1",
+    "parquet_path": "/nonexistent/test.parquet",
+    "file_path": "/nonexistent/test.csv",
+}
 
-class TestQUISCacheServiceIntegration:
-    @pytest.mark.asyncio
-    async def test_load_dataset_cached_cache_hit(self):
-        mock_cache = AsyncMock()
-        mock_cache.get_dataframe.return_value = MagicMock()
 
-        with patch("services.cache.cache_service.CacheService", return_value=mock_cache):
-            with patch("db.database.get_database") as mock_get_db:
-                from agents.quis.quis_graph import _load_dataset_cached
+def _db(doc):
+    mock_db = MagicMock()
+    mock_db.uploads.find_one = AsyncMock(return_value=doc)
+    return mock_db
+
+
+def _handle(df, num_rows=1_000):
+    handle = MagicMock()
+    handle.path = "/nonexistent/test.parquet"
+    handle.num_rows = num_rows
+    handle.collect.return_value = df
+    return handle
 
-                df = await _load_dataset_cached(dataset_id="d1", user_id="u1", tenant_id="t1")
-                assert df is not None
-                mock_cache.get_dataframe.assert_called_once_with("quis:df:t1:d1")
+
+class TestQUISFrameCacheIntegration:
+    @pytest.mark.asyncio
+    async def test_load_dataset_cached_cache_hit(self):
+        mock_cache = MagicMock()
+        mock_cache.get.return_value = MagicMock()
+
+        with patch("services.cache.frame_cache.frame_cache", mock_cache):
+            with patch(
+                "services.datasets.enhanced_dataset_service.get_database",
+                return_value=_db(_DOC),
+            ):
+                handle = _handle(MagicMock())
+                with patch("services.datasets.dataset_handle.open_dataset", return_value=handle):
+                    from agents.quis.quis_graph import _load_dataset_cached
+
+                    df = await _load_dataset_cached(
+                        dataset_id="d1", user_id="u1", tenant_id="t1"
+                    )
+                    assert df is mock_cache.get.return_value
+                    mock_cache.get.assert_called_once_with(
+                        "d1", "/nonexistent/test.parquet", variant="quis:t1"
+                    )
+                    handle.collect.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_load_dataset_cached_cache_miss_loads_from_db(self):
-        mock_cache = AsyncMock()
-        mock_cache.get_dataframe.return_value = None
-
-        mock_db = MagicMock()
-        mock_db.uploads.find_one = AsyncMock(
-            return_value={
-                "_id": "d1",
-                "user_id": "u1",
-                "parquet_path": "/nonexistent/test.parquet",
-                "file_path": "/nonexistent/test.csv",
-            }
-        )
-
-        with patch("services.cache.cache_service.CacheService", return_value=mock_cache):
-            with patch("db.database.get_database", return_value=mock_db):
-                with patch("pathlib.Path.exists", return_value=True):
-                    with patch("agents.quis.quis_graph.pl.read_parquet") as mock_read:
-                        mock_df = MagicMock()
-                        mock_read.return_value = mock_df
-                        mock_df.__len__.return_value = 10
-
-                        from agents.quis.quis_graph import _load_dataset_cached
-
-                        df = await _load_dataset_cached(
-                            dataset_id="d1", user_id="u1", tenant_id="t1"
-                        )
-                        assert df is not None
-                        mock_cache.set_dataframe.assert_called_once_with("quis:df:t1:d1", mock_df)
+        mock_cache = MagicMock()
+        mock_cache.get.return_value = None
+
+        with patch("services.cache.frame_cache.frame_cache", mock_cache):
+            with patch(
+                "services.datasets.enhanced_dataset_service.get_database",
+                return_value=_db(_DOC),
+            ):
+                mock_df = MagicMock()
+                mock_df.__len__.return_value = 10
+                handle = _handle(mock_df)
+                with patch("services.datasets.dataset_handle.open_dataset", return_value=handle):
+                    from agents.quis.quis_graph import _load_dataset_cached
+
+                    df = await _load_dataset_cached(
+                        dataset_id="d1", user_id="u1", tenant_id="t1"
+                    )
+                    assert df is mock_df
+                    mock_cache.put.assert_called_once_with(
+                        "d1", "/nonexistent/test.parquet", mock_df, variant="quis:t1"
+                    )
 
     @pytest.mark.asyncio
     async def test_load_dataset_cached_returns_none_for_missing(self):
-        mock_cache = AsyncMock()
-        mock_cache.get_dataframe.return_value = None
-
-        mock_db = MagicMock()
-        mock_db.uploads.find_one = AsyncMock(return_value=None)
+        mock_cache = MagicMock()
 
-        with patch("services.cache.cache_service.CacheService", return_value=mock_cache):
-            with patch("db.database.get_database", return_value=mock_db):
+        with patch("services.cache.frame_cache.frame_cache", mock_cache):
+            with patch(
+                "services.datasets.enhanced_dataset_service.get_database",
+                return_value=_db(None),
+            ):
                 from agents.quis.quis_graph import _load_dataset_cached
 
                 df = await _load_dataset_cached(dataset_id="nonexistent", user_id="u1")
                 assert df is None
+                mock_cache.get.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_load_dataset_cached_samples_large_datasets(self):
-        mock_cache = AsyncMock()
-        mock_cache.get_dataframe.return_value = None
-
-        mock_db = MagicMock()
-        mock_db.uploads.find_one = AsyncMock(
-            return_value={
-                "_id": "d1",
-                "user_id": "u1",
-                "parquet_path": "/nonexistent/test.parquet",
-                "file_path": "/nonexistent/test.csv",
-            }
-        )
-
-        with patch("services.cache.cache_service.CacheService", return_value=mock_cache):
-            with patch("db.database.get_database", return_value=mock_db):
-                with patch("pathlib.Path.exists", return_value=True):
-                    with patch("agents.quis.quis_graph.pl.read_parquet") as mock_read:
-                        mock_df = MagicMock()
-                        mock_df.__len__.return_value = 200_000
-                        mock_read.return_value = mock_df
-
-                        from agents.quis.quis_graph import _load_dataset_cached
-
-                        df = await _load_dataset_cached(
-                            dataset_id="d1", user_id="u1", tenant_id="t1"
-                        )
-                        assert df is not None
-                        mock_df.sample.assert_called_once()
+        mock_cache = MagicMock()
+        mock_cache.get.return_value = None
+
+        with patch("services.cache.frame_cache.frame_cache", mock_cache):
+            with patch(
+                "services.datasets.enhanced_dataset_service.get_database",
+                return_value=_db(_DOC),
+            ):
+                handle = _handle(MagicMock(), num_rows=200_000)
+                sample = MagicMock()
+                with patch(
+                    "services.datasets.dataset_handle.open_dataset", return_value=handle
+                ), patch(
+                    "services.datasets.sampling.reservoir_sample", return_value=sample
+                ) as mock_sample:
+                    from agents.quis.quis_graph import QUIS_MAX_ROWS, _load_dataset_cached
+
+                    df = await _load_dataset_cached(
+                        dataset_id="d1", user_id="u1", tenant_id="t1"
+                    )
+                    assert df is sample
+                    # Sampled from the lazy scan; the full table is never collected
+                    handle.collect.assert_not_called()
+                    args = mock_sample.call_args.args
+                    assert args[0] is handle.scan.return_value and args[1] == QUIS_MAX_ROWS
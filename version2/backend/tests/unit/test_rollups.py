@@ -0,0 +1,178 @@
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture
+def sales():
+    n = 400
+    return pl.DataFrame(
+        {
+            "region": [["N", "S", "E", "W"][i % 4] for i in range(n)],
+            "channel": ["web" if i % 3 else "store" for i in range(n)],
+            "order_date": [date(2024, 1 + (i % 6), 1 + (i % 28)) for i in range(n)],
+            "revenue": [None if i % 17 == 0 else float(i % 50) for i in range(n)],
+            "units": [i % 7 for i in range(n)],
+        }
+    )
+
+
+@pytest.fixture
+def router(tmp_path, sales, monkeypatch):
+    from core.config import settings
+    from services.query.rollups import RollupRouter, RollupSpec, RollupStore
+
+    monkeypatch.setattr(settings, "ROLLUP_ENABLED", True)
+    monkeypatch.setattr(settings, "ROLLUP_MIN_REDUCTION", 1)
+    source = tmp_path / "sales.parquet"
+    sales.write_parquet(source)
+
+    store = RollupStore(rollup_dir=str(tmp_path / "rollups"))
+    spec = RollupSpec(
+        dimensions=["region", "channel"],
+        measures=["revenue", "units"],
+        time_column="order_date",
+    )
+    assert store.build("ds1", str(source), spec) is not None
+    return RollupRouter(store)
+
+
+def _by(frame: pl.DataFrame, key: str) -> dict:
+    return dict(zip(frame[key].to_list(), frame["value"].to_list()))
+
+
+@pytest.mark.parametrize("agg", ["sum", "count", "min", "max"])
+def test_aggregate_matches_base_group_by(router, sales, agg):
+    expected = (
+        sales.drop_nulls("revenue")
+        .group_by("region")
+        .agg(getattr(pl.col("revenue"), agg)().alias("value"))
+    )
+    got = router.aggregate("ds1", ["region"], "revenue", agg)
+    assert got is not None
+    assert _by(got, "region") == pytest.approx(_by(expected, "region"))
+
+
+def test_mean_is_recombined_from_sum_and_count(router, sales):
+    expected = sales.group_by("channel").agg(pl.col("revenue").mean().alias("value"))
+    got = router.aggregate("ds1", ["channel"], "revenue", "avg")
+    assert _by(got, "channel") == pytest.approx(_by(expected, "channel"))
+
+
+def test_row_count_and_ungrouped_total(router, sales):
+    counts = router.aggregate("ds1", ["region"], None, "count")
+    assert sum(counts["value"].to_list()) == len(sales)
+
+    total = router.aggregate("ds1", [], "units", "sum")
+    assert total["value"][0] == sales["units"].sum()
+
+
+def test_monthly_time_grain(router, sales):
+    expected = (
+        sales.with_columns(pl.col("order_date").dt.truncate("1mo"))
+        .group_by("order_date")
+        .agg(pl.col("units").sum().alias("value"))
+    )
+    got = router.aggregate("ds1", [], "units", "sum", time_grain="month")
+    assert _by(got, "order_date") == _by(expected, "order_date")
+
+
+def test_non_exact_requests_miss(router):
+    assert router.aggregate("ds1", ["region"], "revenue", "median") is None
+    assert router.aggregate("ds1", ["customer"], "revenue", "sum") is None
+    assert router.aggregate("ds1", ["region"], "discount", "sum") is None
+    assert router.aggregate("missing", ["region"], "revenue", "sum") is None
+
+
+def test_cube_is_discarded_when_not_small_enough(tmp_path, sales, monkeypatch):
+    from core.config import settings
+    from services.query.rollups import RollupSpec, RollupStore
+
+    monkeypatch.setattr(settings, "ROLLUP_MIN_REDUCTION", 1_000)
+    source = tmp_path / "sales.parquet"
+    sales.write_parquet(source)
+
+    store = RollupStore(rollup_dir=str(tmp_path / "rollups"))
+    spec = RollupSpec(dimensions=["region"], measures=["revenue"], time_column="order_date")
+    assert store.build("ds1", str(source), spec) is None
+    assert store.get("ds1") is None
+
+
+def test_invalidate_drops_cube(router):
+    store = router._store
+    assert store.get("ds1") is not None
+    assert store.invalidate("ds1") is True
+    assert store.get("ds1") is None
+    assert not store.path_for("ds1").exists()
+
+
+def test_compiled_rollup_sql_runs_on_the_cube(router, sales):
+    from services.semantic.metric_definition_store import MetricDefinition
+    from services.semantic.query_intent import (
+        DimensionIntent,
+        FilterIntent,
+        MetricIntent,
+        QueryIntent,
+    )
+    from services.semantic.sql_compiler import MetricSQLCompiler
+
+    intent = QueryIntent(
+        metrics=[MetricIntent(name="revenue")],
+        dimensions=[DimensionIntent(column="region")],
+        filters=[FilterIntent(column="channel", value="web")],
+    )
+    definitions = {
+        "revenue": MetricDefinition(
+            name="revenue", display_name="Revenue", source_column="revenue"
+        )
+    }
+    sql = MetricSQLCompiler().compile_rollup(intent, definitions, router.cube("ds1"))
+    assert sql is not None
+
+    got = router.execute_sql("ds1", sql)
+    assert got is not None
+    expected = (
+        sales.filter(pl.col("channel") == "web")
+        .group_by("region")
+        .agg(pl.col("revenue").sum())
+    )
+    assert dict(zip(got["region"].to_list(), got["revenue"].to_list())) == pytest.approx(
+        dict(zip(expected["region"].to_list(), expected["revenue"].to_list()))
+    )
+
+
+def test_chart_rollup_skips_row_capped_frames(router, sales, monkeypatch):
+    import importlib
+
+    module = importlib.import_module("services.charts.chart_render_service")
+    monkeypatch.setattr(module, "rollup_router", router)
+    service = module.chart_render_service
+    chart = {"chart_type": "bar", "columns": ["region", "units"], "aggregation": "sum"}
+    config = service._parse_config(chart)
+
+    assert service._rollup_frame("ds1", config, chart, loaded_rows=len(sales)) is not None
+    assert service._rollup_frame("ds1", config, chart, loaded_rows=len(sales) // 2) is None
+
+
+def test_chart_rollup_ignores_render_granularity(router, sales, monkeypatch):
+    import importlib
+
+    module = importlib.import_module("services.charts.chart_render_service")
+    monkeypatch.setattr(module, "rollup_router", router)
+    service = module.chart_render_service
+    # /render always carries the request's default granularity
+    chart = {
+        "chart_type": "bar",
+        "columns": ["region", "units"],
+        "aggregation": "sum",
+        "granularity": "day",
+    }
+    config = service._parse_config(chart)
+
+    assert service._rollup_frame("ds1", config, chart, loaded_rows=len(sales)) is not None
+    assert service._rollup_frame("ds1", config, {**chart, "filters": [{"x": 1}]}) is None
@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from datetime import datetime
+
+import polars as pl
+
+
+def _skewed(n=100_000):
+    # 90% "big", the rest spread over 19 rare kinds
+    kinds = ["big"] * 9 + [f"rare{i}" for i in range(19)]
+    return pl.DataFrame(
+        {
+            "kind": [kinds[i % 10] if i % 10 < 9 else kinds[9 + (i // 10) % 19] for i in range(n)],
+            "v": list(range(n)),
+        }
+    )
+
+
+def test_stratified_sample_is_deterministic_and_keeps_every_stratum():
+    from services.datasets.sampling import stratified_sample
+
+    df = _skewed()
+    a = stratified_sample(df, 1_000, "kind", seed=7)
+    b = stratified_sample(df, 1_000, "kind", seed=7)
+    c = stratified_sample(df, 1_000, "kind", seed=8)
+
+    assert a.equals(b) and not a.equals(c)
+    assert 900 <= len(a) <= 1_020
+    assert a["v"].n_unique() == len(a)  # no duplicated rows
+    assert set(a["kind"].unique()) == set(df["kind"].unique())
+    share = (a["kind"] == "big").mean()
+    assert abs(share - 0.9) < 0.02
+
+
+def test_equal_allocation_gives_rare_strata_the_same_quota():
+    from services.datasets.sampling import stratified_sample
+
+    df = _skewed()
+    sample = stratified_sample(df, 2_000, "kind", allocation="equal")
+    counts = dict(sample.group_by("kind").len().iter_rows())
+    assert counts["big"] >= 100
+    assert all(counts[k] == 100 for k in counts if k != "big")
+
+
+def test_reservoir_sample_matches_for_eager_and_lazy_frames():
+    from services.datasets.sampling import reservoir_sample
+
+    df = pl.DataFrame({"v": list(range(50_000))})
+    eager = reservoir_sample(df, 500, seed=3)
+    lazy = reservoir_sample(df.lazy(), 500, seed=3)
+
+    assert eager.equals(lazy) and len(eager) == 500
+    assert eager["v"].is_sorted()  # file order is kept
+    assert reservoir_sample(df, 100_000).height == 50_000
+
+
+def test_lazy_reservoir_sample_survives_a_short_key_prefilter(monkeypatch):
+    from services.datasets import sampling
+
+    df = pl.DataFrame({"v": list(range(50_000))})
+    expected = sampling.reservoir_sample(df, 500, seed=3)
+
+    # Pre-filter far too tight: falls back to the full pass, same rows
+    monkeypatch.setattr(sampling, "_oversample", lambda n: n // 4)
+    assert sampling.reservoir_sample(df.lazy(), 500, seed=3).equals(expected)
+    assert sampling.reservoir_sample(df.lazy(), 500, seed=3, num_rows=50_000).equals(expected)
+
+
+def test_representative_sample_falls_back_to_time_buckets():
+    from services.datasets.sampling import representative_sample
+
+    # Bursty: one row per hour for a year, then 20x that in the last week
+    quiet = pl.datetime_range(datetime(2023, 1, 1), datetime(2023, 12, 24), "1h", eager=True)
+    burst = pl.datetime_range(datetime(2023, 12, 24), datetime(2023, 12, 31), "3m", eager=True)
+    df = pl.DataFrame({"ts": pl.concat([quiet, burst]), "v": range(len(quiet) + len(burst))})
+
+    sample = representative_sample(df, 1_000)
+    months = sample["ts"].dt.month().n_unique()
+    assert months == 12 and abs(len(sample) - 1_000) <= 100
+
+
+def test_cached_sample_is_keyed_by_source_version(tmp_path):
+    from services.datasets.sampling import cached_sample
+
+    src = tmp_path / "d.parquet"
+    pl.DataFrame({"v": [1, 2, 3]}).write_parquet(src)
+    builds = []
+
+    def build(value):
+        builds.append(value)
+        return pl.DataFrame({"v": [value]})
+
+    assert cached_sample(str(src), 10, lambda: build(1))["v"].to_list() == [1]
+    assert cached_sample(str(src), 10, lambda: build(2))["v"].to_list() == [1]
+
+    time.sleep(0.01)
+    pl.DataFrame({"v": [4, 5]}).write_parquet(src)  # a re-import rewrites the file
+    assert cached_sample(str(src), 10, lambda: build(3))["v"].to_list() == [3]
+    assert builds == [1, 3]
+    assert len(list(tmp_path.glob("d.parquet.sample_*.parquet"))) == 1
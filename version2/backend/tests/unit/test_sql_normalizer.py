@@ -0,0 +1,70 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import pytest
+
+
+def _fp(sql):
+    from services.query.sql_normalizer import sql_fingerprint
+
+    return sql_fingerprint(sql)
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("SELECT a FROM data WHERE x = 1", "select  a\n  from data\twhere x=1;"),
+        (
+            "SELECT d.a FROM data d WHERE d.x > 1",
+            "SELECT sales.a FROM data AS sales WHERE sales.x > 1",
+        ),
+        (
+            "SELECT a FROM data WHERE x = 1 AND y = 2 AND z = 3",
+            "SELECT a FROM data WHERE z = 3 AND x = 1 AND y = 2",
+        ),
+        ("SELECT a FROM data WHERE x = y", "SELECT a FROM data WHERE y = x"),
+        (
+            "WITH t AS (SELECT a FROM data) SELECT t.a FROM t",
+            "WITH base AS (SELECT a FROM data) SELECT base.a FROM base",
+        ),
+        ("SELECT a FROM data -- top rows", "SELECT a FROM data"),
+    ],
+)
+def test_equivalent_sql_shares_fingerprint(a, b):
+    assert _fp(a) == _fp(b)
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("SELECT a FROM data WHERE x = 1", "SELECT a FROM data WHERE x = 2"),
+        ("SELECT a AS revenue FROM data", "SELECT a AS sales FROM data"),
+        ("SELECT a FROM data WHERE x < y", "SELECT a FROM data WHERE y < x"),
+        ("SELECT a FROM data ORDER BY a", "SELECT a FROM data ORDER BY a DESC"),
+    ],
+)
+def test_different_sql_gets_different_fingerprint(a, b):
+    assert _fp(a) != _fp(b)
+
+
+def test_lexical_fallback_when_parse_fails(monkeypatch):
+    from services.query import sql_normalizer
+
+    monkeypatch.setattr(sql_normalizer, "parse_sql", lambda sql: None)
+    sql_normalizer.normalize_sql.cache_clear()
+    try:
+        assert sql_normalizer.normalize_sql(
+            "select a  from data where b = 'x  y';"
+        ) == "SELECT a FROM data WHERE b = 'x  y'"
+    finally:
+        sql_normalizer.normalize_sql.cache_clear()
+
+
+def test_cache_keys_use_fingerprint():
+    from services.query.query_cache import _make_key
+
+    assert _make_key("ds1", "SELECT a FROM data WHERE x=1 AND y=2", 100) == _make_key(
+        "ds1", "select a from data where y = 2 and x = 1", 100
+    )
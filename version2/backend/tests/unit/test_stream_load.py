@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import polars as pl
+import pytest
+
+
+def _write_sales_csv(path, rows=3_000, title_rows=False, total_row=False):
+    lines = []
+    if title_rows:
+        lines += ["Acme Corp Sales Report 2024,,,", "Generated 2024-06-30,,,"]
+    lines.append("order_id,order_date,region,amount")
+    total = 0.0
+    for i in range(rows):
+        amount = float(i % 50)
+        total += amount
+        month = 1 + i % 12
+        lines.append(f'ORD_{i:05d},2024-{month:02d}-{1 + i % 28:02d},{"NSEW"[i % 4]},"${amount:,.2f}"')
+    if total_row:
+        lines.append(f'TOTAL,,,"${total:,.2f}"')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _eager(path):
+    from services.pipeline.load import coerce_numeric_columns, load_dataset
+    from services.pipeline.structural_fixers import apply_structural_fixers
+
+    df, _ = load_dataset(str(path))
+    df, entries = apply_structural_fixers(df)
+    df, cols, audit = coerce_numeric_columns(df)
+    return df, entries, cols
+
+
+@pytest.mark.parametrize("title_rows, total_row", [(False, False), (True, True)])
+def test_streamed_parquet_matches_eager_load(tmp_path, monkeypatch, title_rows, total_row):
+    from core.config import settings
+    from services.pipeline.stream_load import stream_load_to_parquet
+
+    monkeypatch.setattr(settings, "PIPELINE_STREAMING_SAMPLE_ROWS", 500)
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_ROWS", 1_000)
+    csv = _write_sales_csv(tmp_path / "sales.csv", title_rows=title_rows, total_row=total_row)
+    result = stream_load_to_parquet(str(csv), str(tmp_path / "sales.parquet"), "ds1")
+
+    expected, entries, cols = _eager(csv)
+    streamed = pl.read_parquet(result.parquet_path)
+    assert result.rows == len(expected) == 3_000
+    assert result.coerce_cols == cols == ["amount"]
+    assert [e["action_type"] for e in result.structural_entries] == [
+        e["action_type"] for e in entries
+    ]
+    assert streamed["amount"].sum() == expected["amount"].sum()
+    assert streamed.sort("order_id")["order_id"].equals(expected.sort("order_id")["order_id"])
+    # Clustered on the detected time column, in DuckDB-sized row groups
+    assert result.layout.time_column == "order_date"
+    months = streamed["order_date"].str.slice(0, 7).to_list()
+    assert months == sorted(months)
+
+
+def test_coercion_audit_counts_full_column_failures(tmp_path, monkeypatch):
+    from core.config import settings
+    from services.pipeline.stream_load import stream_load_to_parquet
+
+    monkeypatch.setattr(settings, "PIPELINE_STREAMING_SAMPLE_ROWS", 100)
+    lines = ["id,price"] + [f"{i},{i}.50" for i in range(1_000)] + ["1000,call us"]
+    csv = tmp_path / "prices.csv"
+    csv.write_text("\n".join(lines) + "\n")
+
+    result = stream_load_to_parquet(str(csv), str(tmp_path / "prices.parquet"))
+    assert result.coerce_cols == ["price"]
+    assert result.coercion_audit["price"]["full_column_parse_failures"] == 1
+
+
+def test_transcode_handles_multibyte_chunk_boundaries(tmp_path, monkeypatch):
+    from services.pipeline import stream_load
+
+    monkeypatch.setattr(stream_load, "_TRANSCODE_CHUNK_BYTES", 7)
+    text = "city,name\nMünchen,Zoë\nKraków,Łukasz\n東京,花子\n"
+    src = tmp_path / "people.csv"
+    src.write_bytes(text.encode("utf-16"))
+
+    out = stream_load.transcode_to_utf8(str(src), "utf-16", str(tmp_path / "out.csv"))
+    assert open(out, encoding="utf-8").read() == text
+
+
+def test_should_stream_uses_size_threshold(tmp_path, monkeypatch):
+    from core.config import settings
+    from services.pipeline.stream_load import should_stream
+
+    csv = _write_sales_csv(tmp_path / "sales.csv", rows=10)
+    monkeypatch.setattr(settings, "PIPELINE_STREAMING_INGEST_MB", 0)
+    assert should_stream(str(csv))
+    assert not should_stream(str(tmp_path / "sales.xlsx"))
+    monkeypatch.setattr(settings, "PIPELINE_STREAMING_INGEST_MB", 64)
+    assert not should_stream(str(csv))
@@ -0,0 +1,117 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import json
+import math
+
+import numpy as np
+import polars as pl
+import pytest
+
+
+def _same(a, b):
+    """Equal, with NaN matching NaN or None (Plotly draws both as a gap)."""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(map(_same, a, b))
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or (isinstance(b, float) and math.isnan(b))
+    return a == b and type(a) is type(b) if isinstance(a, bool) else a == b
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    n = 5000
+    return pl.DataFrame(
+        {
+            "price": rng.normal(100, 15, n),
+            "qty": rng.integers(0, 50, n),
+            "weight": rng.random(n) * 1e6,
+            "region": rng.choice(["N", "S", "E", "W"], n),
+            "segment": rng.choice([f"s{i}" for i in range(12)], n),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"chart_type": "scatter", "columns": ["price", "weight"]},
+        {"chart_type": "heatmap", "columns": ["region", "segment", "qty"], "aggregation": "sum"},
+        {"chart_type": "parallel", "columns": ["price", "qty", "weight", "region"]},
+        {"chart_type": "bar", "columns": ["segment", "price"], "aggregation": "mean"},
+    ],
+)
+@pytest.mark.asyncio
+async def test_bdata_decodes_to_the_json_traces(frame, config):
+    from services.charts.chart_render_service import ChartRenderService
+    from services.charts.trace_encoding import decode_traces, encode_payload
+
+    payload = await ChartRenderService().render_chart(frame, dict(config))
+    plain = json.loads(json.dumps(payload["traces"], default=str))
+
+    encoded = encode_payload(payload, "bdata")
+    assert encoded["trace_encoding"] == "bdata"
+    assert encoded["layout"] == payload["layout"]
+    assert _same(decode_traces(json.loads(json.dumps(encoded["traces"]))), plain)
+    assert "trace_encoding" not in payload  # the render result is not modified
+
+
+def test_dtype_selection_and_what_stays_json():
+    from services.charts.trace_encoding import MIN_ENCODED_LENGTH, decode_array, encode_trace
+
+    n = MIN_ENCODED_LENGTH
+    trace = {
+        "x": [f"label {i}" for i in range(n)],
+        "y": [float(i) / 3 for i in range(n)],
+        "z": [[i * j * 100 for j in range(n)] for i in range(3)],
+        "marker": {"size": list(range(n)), "color": [i * 100_000 for i in range(n)]},
+        "customdata": [None if i % 5 == 0 else i for i in range(n)],
+        "text": [True] * n,
+        "range": [0.0, 1.0],
+        "_axis_metadata": {"values": list(range(n))},
+    }
+    encoded = encode_trace(trace)
+
+    assert encoded["x"] == trace["x"]
+    assert encoded["text"] == trace["text"]
+    assert encoded["range"] == [0.0, 1.0]
+    assert encoded["_axis_metadata"] == trace["_axis_metadata"]
+
+    assert encoded["y"]["dtype"] == "f8"
+    assert encoded["marker"]["size"]["dtype"] == "i1"
+    assert encoded["marker"]["color"]["dtype"] == "i4"
+    assert encoded["z"]["dtype"] == "i2" and encoded["z"]["shape"] == f"3,{n}"
+    assert encoded["customdata"]["dtype"] == "f8"
+
+    assert decode_array(encoded["y"]) == trace["y"]
+    assert decode_array(encoded["z"]) == trace["z"]
+    assert _same(decode_array(encoded["customdata"]), trace["customdata"])
+
+    huge = [2**60 + i for i in range(n)]
+    assert encode_trace({"y": huge})["y"] == huge  # kept exact as JSON
+    gappy_ids = [None if i % 7 == 0 else 2**60 + i for i in range(n)]
+    assert encode_trace({"y": gappy_ids})["y"] == gappy_ids
+    beyond_int64 = [2**64 + i for i in range(n)]
+    assert encode_trace({"y": beyond_int64})["y"] == beyond_int64
+
+
+def test_bdata_is_smaller_and_negotiation_is_validated():
+    from services.charts.trace_encoding import encode_payload, resolve_trace_encoding
+
+    rng = np.random.default_rng(1)
+    payload = {"traces": [{"type": "scatter", "x": rng.random(100_000).tolist(),
+                           "y": rng.random(100_000).tolist()}]}
+    plain = json.dumps(payload)
+    compact = json.dumps(encode_payload(payload, "bdata"))
+    assert len(compact) < len(plain) * 0.75
+
+    assert encode_payload(payload, "json") is payload
+    assert resolve_trace_encoding(None) == "json"
+    assert resolve_trace_encoding("BDATA") == "bdata"
+    with pytest.raises(ValueError):
+        resolve_trace_encoding("arrow")